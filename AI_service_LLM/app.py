@@ -2,40 +2,63 @@
 
 from __future__ import annotations
 
+import json
 import os
-from typing import List, Optional
+import threading
+import time
+from itertools import chain
+from typing import Any, Dict, Iterator, List, Optional
 from datetime import datetime
 
-from fastapi import FastAPI, HTTPException
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
 # 🔹 DB 저장/조회용 레포지토리
 from chatbot.core.chat_repository import (
     upsert_session_with_log,
-    list_sessions as db_list_sessions,
+    list_sessions_page as db_list_sessions_page,
     get_session_messages as db_get_session_messages,
+    get_session_messages_page as db_get_session_messages_page,
+    ensure_chat_schema as db_ensure_chat_schema,
     delete_session as db_delete_session,
-    delete_all_sessions as db_delete_all_sessions,
+    create_delete_job as db_create_delete_job,
+    run_delete_job as db_run_delete_job,
+    get_delete_job as db_get_delete_job,
+    resume_stale_delete_jobs as db_resume_stale_delete_jobs,
+    get_health_report as db_get_health_report,
+    get_pool_stats as db_get_pool_stats,
+    record_chat_metrics as db_record_chat_metrics,
+    get_latency_percentiles as db_get_latency_percentiles,
+    try_advisory_lock,
 )
 
 # 🔹 ChatState & Supervisor(오케스트레이터)
 from chatbot.core.state import ChatState
 from chatbot.core.supervisor import run_orchestrator
+from chatbot.core.timing import timed_stage, stage_totals
+from chatbot.core.metrics import (
+    CONTENT_TYPE_LATEST,
+    HTTP_LATENCY,
+    HTTP_REQUESTS,
+    record_cache_lookup,
+    register_gauges,
+    render_metrics,
+)
 
-# 🔹 건강 분석용 (db_agent 로직 재사용)
-from chatbot.core.user_repository import (
-    get_user_profile,
-    get_allergies,
-    get_chronic_diseases,
-    get_acute_diseases,
-    get_drugs,
-    get_prescriptions,
-    get_visits,
+# 🔹 건강 분석 리포트 (사전 생성 + 변경 시 재생성)
+from chatbot.core.health_report import (
+    HEALTH_REPORT_SCHEDULER_ENABLED,
+    HealthReportScheduler,
+    get_or_create_report,
+    refresh_report,
+    refresh_report_quietly,
+    stream_report,
 )
-from chatbot.core.llm import call_llm
-from chatbot.core.prompts import HEALTH_ANALYSIS_PROMPT
+from chatbot.core.hedging import DeadlineExceeded
+from chatbot.core.llm_gateway import GatewayError, get_gateway
 
 load_dotenv()
 
@@ -106,16 +129,24 @@ class ChatQueryResponse(BaseModel):
 class HealthAnalysisResponse(BaseModel):
     """건강 분석 리포트 응답 (챗봇 이력 저장 X)"""
     analysis: str
+    generated_at: Optional[datetime] = None
 
 
 class SessionItem(BaseModel):
     session_id: int
     title: str
     created_at: datetime   # Swagger example: "2025-12-05T09:35:20.871Z"
+    # 세션 미리보기 (chat_session 비정규화 컬럼)
+    first_query: Optional[str] = None
+    first_answer_snippet: Optional[str] = None
+    last_activity_at: Optional[datetime] = None
+    message_count: Optional[int] = None
 
 
 class SessionsResponse(BaseModel):
     sessions: List[SessionItem]
+    # 다음 페이지 커서 (없으면 마지막 페이지)
+    next_cursor: Optional[str] = None
 
 
 class SessionMessage(BaseModel):
@@ -126,9 +157,26 @@ class SessionMessage(BaseModel):
     sources: Optional[List[ChatSource]] = None
 
 
+class DeleteStartedResponse(BaseModel):
+    """전체 세션 삭제 시작 응답 (진행 상황은 job_id 로 조회)"""
+    message: str
+    job_id: str
+
+
+class DeleteJobResponse(BaseModel):
+    """세션 일괄 삭제 작업 상태 (pending / running / done / error)"""
+    job_id: str
+    status: str
+    total_sessions: int
+    deleted_sessions: int
+    error: Optional[str] = None
+
+
 class SessionDetailResponse(BaseModel):
     session_id: int
     messages: List[SessionMessage]
+    # 다음 페이지 커서 (limit 을 지정했을 때만, 없으면 마지막 페이지)
+    next_cursor: Optional[str] = None
 
 
 # ============================================
@@ -157,6 +205,139 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def _metrics_middleware(request: Request, call_next):
+    """
+    route 템플릿(/chatbot/sessions/{session_id} 등) 기준으로 요청 수 / 처리 시간 집계.
+    (경로 파라미터별로 라벨이 늘어나지 않도록 실제 path 대신 템플릿 사용)
+    """
+    started_at = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        route_path = getattr(route, "path", None) or "unmatched"
+        if route_path != "/metrics":
+            HTTP_REQUESTS.inc(method=request.method, route=route_path, status=str(status))
+            HTTP_LATENCY.observe(
+                time.perf_counter() - started_at,
+                method=request.method,
+                route=route_path,
+            )
+
+
+# DB 커넥션 풀 상태도 /metrics 에서 같이 노출 (scrape 시점에 get_pool_stats 읽기)
+register_gauges(
+    "medinote_db_pool",
+    "DB 커넥션 풀 상태 (get_pool_stats)",
+    "field",
+    lambda: {
+        k: v for k, v in db_get_pool_stats().items()
+        if isinstance(v, (int, float))
+    },
+)
+register_gauges(
+    "medinote_llm_gateway",
+    "OpenAI 게이트웨이 상태 (동시 실행/대기열/shed/재시도)",
+    "field",
+    lambda: get_gateway().get_stats(),
+)
+
+
+def _llm_cost_by_caller() -> dict:
+    totals: dict = {}
+    for row in get_gateway().get_usage_stats():
+        totals[row["caller"]] = totals.get(row["caller"], 0.0) + row["cost_usd"]
+    return totals
+
+
+register_gauges(
+    "medinote_llm_cost_usd",
+    "caller 별 OpenAI 누적 비용(USD, 프로세스 기동 이후)",
+    "caller",
+    _llm_cost_by_caller,
+)
+
+
+SCHEMA_LOCK_NAME = "medinote_chat_schema"
+
+
+@app.on_event("startup")
+def _ensure_db_schema() -> None:
+    """
+    chat_session / chat_log 보조 인덱스 등 보강 DDL 실행.
+    워커가 여러 개면 advisory lock 을 잡은 워커 하나만 실행한다
+    (동시에 CREATE INDEX IF NOT EXISTS 를 돌리면 카탈로그 경합으로 실패할 수 있음).
+    DB 연결이 안 돼도 서비스 자체는 뜰 수 있도록 에러는 로그만 남긴다.
+    """
+    try:
+        with try_advisory_lock(SCHEMA_LOCK_NAME) as acquired:
+            if not acquired:
+                print("[SCHEMA] skipped (다른 워커가 실행 중)")
+                return
+            db_ensure_chat_schema()
+    except Exception as e:
+        print(f"[SCHEMA ERROR] error={e!r}")
+
+
+# 무거운 의존성(chromadb, openai)은 lazy import 라서, 기동 직후 백그라운드에서 미리 로드해
+# 프로세스는 바로 요청을 받고 첫 /chatbot/query 도 import 비용을 내지 않게 한다.
+LLM_WARMUP_ON_STARTUP = os.getenv("LLM_WARMUP_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+
+
+def _warm_up() -> None:
+    from chatbot.core import retriever
+
+    started = time.perf_counter()
+    retriever.warm_up()
+    print(f"[WARMUP] done in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+
+@app.on_event("startup")
+def _start_warm_up() -> None:
+    if LLM_WARMUP_ON_STARTUP:
+        threading.Thread(target=_warm_up, name="warmup", daemon=True).start()
+
+
+_health_report_scheduler: Optional[HealthReportScheduler] = None
+
+
+@app.on_event("startup")
+def _start_health_report_scheduler() -> None:
+    """건강 분석 리포트 야간 사전 생성 (기록 해시가 바뀐 사용자만 재생성)."""
+    global _health_report_scheduler
+    if not HEALTH_REPORT_SCHEDULER_ENABLED:
+        return
+    _health_report_scheduler = HealthReportScheduler(user_ids=[DEFAULT_USER_ID])
+    _health_report_scheduler.start()
+
+
+@app.on_event("shutdown")
+def _stop_health_report_scheduler() -> None:
+    if _health_report_scheduler is not None:
+        _health_report_scheduler.stop()
+
+
+def _resume_delete_jobs() -> None:
+    try:
+        job_ids = db_resume_stale_delete_jobs()
+    except Exception as e:
+        print(f"[DELETE JOB] stale job sweep failed: {e!r}")
+        return
+    for job_id in job_ids:
+        print(f"[DELETE JOB] resuming stale job_id={job_id}")
+        db_run_delete_job(job_id)
+
+
+@app.on_event("startup")
+def _start_delete_job_sweep() -> None:
+    """재시작 전에 BackgroundTasks 로 돌던 세션 삭제 작업 중 멈춘 것을 이어서 실행."""
+    threading.Thread(target=_resume_delete_jobs, name="delete-job-sweep", daemon=True).start()
+
+
 # ============================================
 # (옵션) DB 기반 컨텍스트 빌더
 # ============================================
@@ -199,13 +380,86 @@ async def health_check():
     return {"status": "ok"}
 
 
+@app.get("/health/db", tags=["default"])
+async def health_check_db():
+    """
+    DB 커넥션 풀 상태 (사용 중 커넥션 수, 체크아웃 대기 시간).
+    """
+    return {"status": "ok", "pool": db_get_pool_stats()}
+
+
+@app.get("/health/llm", tags=["default"])
+async def health_check_llm():
+    """
+    OpenAI 게이트웨이 상태 + caller / model 별 누적 토큰·비용.
+    """
+    gateway = get_gateway()
+    return {"status": "ok", "gateway": gateway.get_stats(), "usage": gateway.get_usage_stats()}
+
+
+@app.get("/metrics", tags=["default"], include_in_schema=False)
+async def metrics():
+    """
+    Prometheus text exposition format 메트릭 (프로세스 내부 레지스트리).
+    - 라우트별 요청 수 / latency 히스토그램
+    - 단계별 소요 시간, 에이전트 호출 수, Q-score 분포
+    - rerank / 웹 fallback 비율, OpenAI 토큰 사용량, 캐시 hit/miss, DB 풀 상태
+    """
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+
+@app.get("/health/latency", tags=["default"])
+async def health_check_latency(
+    hours: int = Query(24, ge=1, le=24 * 30, description="집계 기간(시간)"),
+):
+    """
+    최근 hours 시간 동안 /chatbot/query 의 단계별 p50 / p95 (chat_metrics 기준).
+    """
+    return {"hours": hours, "stages": db_get_latency_percentiles(hours=hours)}
+
+
+def _record_turn_metrics(
+    state: ChatState,
+    session_id: Optional[int],
+    user_id: int,
+    started_at: float,
+) -> None:
+    """
+    한 턴의 단계별 소요 시간 + 토큰 사용량을 chat_metrics 에 저장.
+    계측 저장 실패가 응답 실패로 이어지지 않도록 예외는 로그만 남긴다.
+    """
+    usage = state.get("usage") or {}
+    models = usage.get("models") or []
+    stages = stage_totals(state.get("timings") or [])
+    latency_ms = (time.perf_counter() - started_at) * 1000
+    try:
+        db_record_chat_metrics(
+            session_id=session_id,
+            user_id=user_id,
+            latency_ms=latency_ms,
+            stages=stages,
+            routes=state.get("route"),
+            used_model=",".join(models) or None,
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+            cached_prompt_tokens=usage.get("cached_prompt_tokens", 0),
+        )
+    except Exception as e:
+        print(f"[METRICS ERROR] session_id={session_id} error={e!r}")
+
+    print(f"[LATENCY] session_id={session_id} total={latency_ms:.1f}ms stages={stages}")
+
+
 # ============================================
 # POST /chatbot/query  (⭢ LangGraph + DB 저장)
 # ============================================
 
 @app.post("/chatbot/query", response_model=ChatQueryResponse, tags=["chatbot"])
-async def post_chatbot_query(payload: ChatQueryRequest):
+def post_chatbot_query(payload: ChatQueryRequest):
     """
+    (async 가 아닌 def: LLM 게이트웨이 대기 / 재시도 sleep / hedging 대기가 블로킹이라
+     FastAPI 스레드풀에서 실행해야 이벤트 루프와 다른 요청(/health, /metrics 등)이 멈추지 않는다)
+
     - payload.session_id == 0 또는 세션 없음 → 새 세션 생성 + 첫 로그 저장
     - payload.session_id != 0              → 해당 세션에 로그 append
 
@@ -214,8 +468,11 @@ async def post_chatbot_query(payload: ChatQueryRequest):
       2) run_orchestrator(state) 실행 → 여러 에이전트 조합
       3) result 에서 answer / sources 추출
       4) upsert_session_with_log(...) 로 세션/로그 저장
-      5) session_id + answer + sources 반환
+      5) 단계별 소요 시간 / 토큰 사용량을 chat_metrics 에 저장
+      6) session_id + answer + sources 반환
     """
+    started_at = time.perf_counter()
+
     # 🔥 이제 body 에서 user_id 안 받고, 서버 내부 기본값 사용
     user_id = _default_user_id()
 
@@ -238,6 +495,14 @@ async def post_chatbot_query(payload: ChatQueryRequest):
     # 2) 오케스트레이터 실행
     try:
         new_state = run_orchestrator(state)
+    except (GatewayError, DeadlineExceeded) as e:
+        # 대기열 포화 / deadline 초과(fallback 모델까지) → 500 대신 503 (재시도 가능한 과부하)
+        print(f"[LLM OVERLOADED] session_id={payload.session_id} error={e!r}")
+        raise HTTPException(
+            status_code=503,
+            detail="요청이 많아 잠시 답변을 생성할 수 없습니다. 잠시 후 다시 시도해 주세요.",
+            headers={"Retry-After": "5"},
+        )
     except Exception as e:
         print(f"[LLM ERROR] session_id={payload.session_id} error={e!r}")
         raise HTTPException(
@@ -273,15 +538,19 @@ async def post_chatbot_query(payload: ChatQueryRequest):
     sources_for_db = [s.dict() for s in sources] if sources else None
 
     # 4) DB 에 세션 + 로그 저장
-    used_session_id = upsert_session_with_log(
-        session_id=payload.session_id,
-        user_id=user_id,
-        query=payload.query,
-        answer=answer_text,
-        sources=sources_for_db,
-    )
+    with timed_stage("db_write", state=new_state):
+        used_session_id = upsert_session_with_log(
+            session_id=payload.session_id,
+            user_id=user_id,
+            query=payload.query,
+            answer=answer_text,
+            sources=sources_for_db,
+        )
 
-    # 5) 프론트/백엔드로 session_id + answer + sources 반환
+    # 5) 턴 단위 계측 저장
+    _record_turn_metrics(new_state, used_session_id, user_id, started_at)
+
+    # 6) 프론트/백엔드로 session_id + answer + sources 반환
     return ChatQueryResponse(
         session_id=used_session_id,
         answer=answer_text,
@@ -294,18 +563,28 @@ async def post_chatbot_query(payload: ChatQueryRequest):
 # ============================================
 
 @app.get("/chatbot/sessions", response_model=SessionsResponse, tags=["chatbot"])
-async def get_chatbot_sessions():
+async def get_chatbot_sessions(
+    limit: int = Query(50, ge=1, le=100, description="한 페이지 세션 수"),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor"),
+):
     """
-    세션 목록 조회.
+    세션 목록 조회 (최신순, (created_at, session_id) 키셋 페이지네이션).
     DB 에러가 나도 서비스 전체가 죽지 않도록 try/except 로 감싸고,
     실패 시에는 빈 배열을 반환한다.
     """
     try:
         target_user_id = _default_user_id()
-        rows = db_list_sessions(user_id=target_user_id, limit=50, order="desc")
-        # rows 예: [{"session_id":1,"title":"...","created_at":"2025-12-05T09:35:20.871Z"}, ...]
-        sessions = [SessionItem(**row) for row in rows]
-        return SessionsResponse(sessions=sessions)
+        page = db_list_sessions_page(
+            user_id=target_user_id,
+            limit=limit,
+            cursor=cursor,
+            order="desc",
+        )
+        # page["sessions"] 예: [{"session_id":1,"title":"...","created_at":"2025-12-05T09:35:20.871Z"}, ...]
+        sessions = [SessionItem(**row) for row in page["sessions"]]
+        return SessionsResponse(sessions=sessions, next_cursor=page["next_cursor"])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"[SESSIONS ERROR] user_id={_default_user_id()} error={e!r}")
         return SessionsResponse(sessions=[])
@@ -315,10 +594,50 @@ async def get_chatbot_sessions():
 # DELETE /chatbot/sessions  (해당 유저 전체 삭제)
 # ============================================
 
-@app.delete("/chatbot/sessions", response_model=str, tags=["chatbot"])
-async def delete_all_chatbot_sessions():
-    db_delete_all_sessions(user_id=_default_user_id())
-    return "모든 챗봇 세션을 삭제했습니다."
+@app.delete("/chatbot/sessions", response_model=DeleteStartedResponse, tags=["chatbot"])
+async def delete_all_chatbot_sessions(background_tasks: BackgroundTasks):
+    """
+    해당 유저 전체 세션 삭제.
+    삭제 작업만 등록하고 바로 응답하며, 실제 삭제는 백그라운드에서 배치 단위로 진행된다.
+    (진행 상황은 GET /chatbot/sessions/delete-jobs/{job_id} 로 조회)
+    """
+    job = db_create_delete_job(user_id=_default_user_id())
+    background_tasks.add_task(db_run_delete_job, job["job_id"])
+    return DeleteStartedResponse(
+        message="사용자 세션 삭제를 시작했습니다.",
+        job_id=job["job_id"],
+    )
+
+
+@app.post(
+    "/chatbot/sessions/delete-jobs",
+    response_model=DeleteJobResponse,
+    status_code=202,
+    tags=["chatbot"],
+)
+async def create_chatbot_delete_job(background_tasks: BackgroundTasks):
+    """
+    해당 유저 전체 세션 삭제 작업 등록 → job_id 즉시 반환.
+    진행 상황은 GET /chatbot/sessions/delete-jobs/{job_id} 로 조회.
+    """
+    job = db_create_delete_job(user_id=_default_user_id())
+    background_tasks.add_task(db_run_delete_job, job["job_id"])
+    return DeleteJobResponse(**job)
+
+
+@app.get(
+    "/chatbot/sessions/delete-jobs/{job_id}",
+    response_model=DeleteJobResponse,
+    tags=["chatbot"],
+)
+async def get_chatbot_delete_job(job_id: str, background_tasks: BackgroundTasks):
+    job = db_get_delete_job(job_id=job_id, user_id=_default_user_id())
+    if job is None:
+        raise HTTPException(status_code=404, detail="삭제 작업을 찾을 수 없습니다.")
+    # 실행하던 프로세스가 재시작돼 멈춘 작업이면 이어서 실행
+    if job["status"] in ("pending", "running") and db_resume_stale_delete_jobs(job_id):
+        background_tasks.add_task(db_run_delete_job, job_id)
+    return DeleteJobResponse(**job)
 
 
 # ============================================
@@ -330,31 +649,42 @@ async def delete_all_chatbot_sessions():
     response_model=SessionDetailResponse,
     tags=["chatbot"],
 )
-async def get_chatbot_session_detail(session_id: int):
+async def get_chatbot_session_detail(
+    session_id: int,
+    limit: Optional[int] = Query(
+        None, ge=1, le=100, description="한 페이지 메시지 수 (없으면 전체)"
+    ),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor"),
+):
     """
-    특정 세션의 전체 메시지 조회.
+    특정 세션의 메시지 조회 (오래된 순, (created_at, message_id) 키셋 페이지네이션).
     에러 시 404/500 대신 깔끔한 메시지로 정리.
     """
     try:
         target_user_id = _default_user_id()
-        rows = db_get_session_messages(
+        page = db_get_session_messages_page(
             session_id=session_id,
             user_id=target_user_id,
+            limit=limit,
+            cursor=cursor,
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"[SESSION DETAIL ERROR] session_id={session_id} error={e!r}")
         raise HTTPException(status_code=500, detail="세션 정보를 불러오지 못했습니다.")
 
-    if not rows:
+    if page is None:
         raise HTTPException(status_code=404, detail="세션을 찾을 수 없습니다.")
 
     # rows 안에 created_at 은 ISO 문자열 / datetime 둘 다 허용
     # sources 컬럼이 없으면 Pydantic 이 기본값(None) 채움
-    messages = [SessionMessage(**row) for row in rows]
+    messages = [SessionMessage(**row) for row in page["messages"]]
 
     return SessionDetailResponse(
         session_id=session_id,
         messages=messages,
+        next_cursor=page["next_cursor"],
     )
 
 
@@ -383,111 +713,126 @@ async def delete_one_chatbot_session(session_id: int):
 # ============================================
 
 @app.post("/chatbot/analysis", response_model=HealthAnalysisResponse, tags=["chatbot"])
-async def post_health_analysis():
+def post_health_analysis(
+    background_tasks: BackgroundTasks,
+    refresh: bool = Query(False, description="true 면 저장된 리포트를 무시하고 지금 다시 생성"),
+):
     """
-    건강 분석 리포트 생성 (챗봇 대화 이력 저장 X)
-    - db_agent 로직 재사용하여 사용자 건강 데이터 조회
-    - LLM으로 분석 리포트 생성
+    건강 분석 리포트 조회 (챗봇 대화 이력 저장 X)
+    - 스케줄러가 미리 만들어 둔 리포트(health_report)를 바로 반환
+    - 저장된 리포트가 없거나 refresh=true 면 지금 생성
+    - 저장본을 반환한 경우, 백그라운드에서 건강 기록 해시를 확인해 바뀌었으면 재생성 (다음 요청부터 반영)
     - chat_log에 저장하지 않음
+    (리포트 생성이 LLM 게이트웨이를 거치므로 /chatbot/query 와 같은 이유로 def)
     """
     user_id = _default_user_id()
 
-    # 1) 백엔드에서 건강 데이터 조회 (병렬 처리로 속도 개선)
-    import concurrent.futures
-
     try:
-        with concurrent.futures.ThreadPoolExecutor(max_workers=7) as executor:
-            future_profile = executor.submit(get_user_profile, user_id)
-            future_allergies = executor.submit(get_allergies, user_id)
-            future_chronic = executor.submit(get_chronic_diseases, user_id)
-            future_acute = executor.submit(get_acute_diseases, user_id)
-            future_drugs = executor.submit(get_drugs, user_id)
-            future_prescriptions = executor.submit(get_prescriptions, user_id)
-            future_visits = executor.submit(get_visits, user_id)
-
-            profile = future_profile.result()
-            allergies = future_allergies.result()
-            chronic = future_chronic.result()
-            acute = future_acute.result()
-            drugs = future_drugs.result()
-            prescriptions = future_prescriptions.result()
-            visits = future_visits.result()   
+        if refresh:
+            report = refresh_report(user_id, force=True)
+        else:
+            report = get_or_create_report(user_id)
+            if not report["regenerated"]:
+                background_tasks.add_task(refresh_report_quietly, user_id)
+    except (GatewayError, DeadlineExceeded) as e:
+        print(f"[ANALYSIS LLM OVERLOADED] user_id={user_id} error={e!r}")
+        raise HTTPException(
+            status_code=503,
+            detail="요청이 많아 잠시 건강 분석을 할 수 없습니다. 잠시 후 다시 시도해 주세요.",
+            headers={"Retry-After": "5"},
+        )
     except Exception as e:
         print(f"[ANALYSIS ERROR] user_id={user_id} error={e!r}")
         raise HTTPException(
             status_code=500,
-            detail="건강 정보를 불러오는 중 오류가 발생했습니다."
+            detail="건강 분석 중 오류가 발생했습니다."
         )
 
-    # 2) LLM에 전달할 컨텍스트 구성
-    context_blocks = []
-
-    if profile:
-        # BMI 계산
-        height = profile.get('height')
-        weight = profile.get('weight')
-        bmi_str = ""
-        if height and weight:
-            h_m = float(height) / 100
-            bmi = float(weight) / (h_m * h_m)
-            bmi_str = f" (BMI: {bmi:.1f})"
-
-        context_blocks.append(
-            f"[건강 프로필]\n"
-            f"출생: {profile.get('birth')}\n"
-            f"성별: {profile.get('gender')}\n"
-            f"혈액형: {profile.get('blood_type')}\n"
-            f"키: {profile.get('height')} cm\n"
-            f"몸무게: {profile.get('weight')} kg{bmi_str}\n"
-            f"음주: {profile.get('drinking')}\n"
-            f"흡연: {profile.get('smoking')}"
-        )
+    # 응답 반환 (chat_log 저장 X)
+    return HealthAnalysisResponse(
+        analysis=report["analysis"],
+        generated_at=report.get("generated_at"),
+    )
 
-    if allergies:
-        context_blocks.append(
-            "[알레르기]\n" + "\n".join([a.get('allergy_name', '') for a in allergies])
-        )
 
-    if chronic:
-        context_blocks.append(
-            "[만성 질환]\n" + "\n".join([f"{c.get('disease_name')} ({c.get('note', '')})" for c in chronic])
-        )
-
-    if acute:
-        context_blocks.append(
-            "[급성 질환]\n" + "\n".join([f"{a.get('disease_name')} ({a.get('note', '')})" for a in acute])
-        )
+# ============================================
+# POST /chatbot/analysis/stream  (건강 분석 리포트 - SSE 스트리밍)
+# ============================================
 
-    if drugs:
-        drug_lines = [f"{d.get('med_name')} {d.get('dose')}{d.get('unit')} ({d.get('schedule')})" for d in drugs]
-        context_blocks.append("[복용 중인 약]\n" + "\n".join(drug_lines))
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
 
-    if prescriptions:
-        pres_lines = [f"{p.get('med_name')} ({p.get('start_date')}~{p.get('end_date')})" for p in prescriptions]
-        context_blocks.append("[처방 이력]\n" + "\n".join(pres_lines))
 
-    if visits:
-        visit_lines = [f"{v.get('hospital')} {v.get('dept')} - {v.get('diagnosis_name')} ({v.get('date')})" for v in visits]
-        context_blocks.append("[진료 기록]\n" + "\n".join(visit_lines))
+def _health_analysis_events(user_id: int) -> Iterator[str]:
+    """
+    stream_report 를 SSE 이벤트로 변환.
+    - delta: {"text": "..."} 생성되는 대로
+    - done : {"generated_at": ...} 저장까지 끝난 뒤
+    - error: 첫 이벤트 이후 실패한 경우 (첫 이벤트 전 실패는 예외로 올려서 HTTP 상태코드로 응답)
+    """
+    started = False
+    try:
+        report = stream_report(user_id)
+        while True:
+            try:
+                delta = next(report)
+            except StopIteration as stop:
+                saved = stop.value or {}
+                break
+            started = True
+            yield _sse("delta", {"text": delta})
+        yield _sse("done", {"generated_at": saved.get("generated_at")})
+    except Exception as e:
+        if not started:
+            raise
+        print(f"[ANALYSIS STREAM ERROR] user_id={user_id} error={e!r}")
+        yield _sse("error", {"detail": "건강 분석 중 오류가 발생했습니다."})
 
-    medical_context = "\n\n".join(context_blocks) if context_blocks else "등록된 건강 정보가 없습니다."
 
-    # 3) LLM 호출
+@app.post("/chatbot/analysis/stream", tags=["chatbot"])
+def post_health_analysis_stream(
+    background_tasks: BackgroundTasks,
+    refresh: bool = Query(False, description="true 면 저장된 리포트를 무시하고 지금 다시 생성"),
+):
+    """
+    건강 분석 리포트 스트리밍 (text/event-stream, 챗봇 대화 이력 저장 X)
+    - 저장된 리포트가 있고 refresh=false 면 한 번에 전송 (백그라운드에서 변경 확인)
+    - 그 외에는 LLM 이 생성하는 대로 delta 이벤트를 보내고, 끝나면 저장 후 done 이벤트
+    - 첫 토큰이 나올 때까지 응답을 시작하지 않으므로 과부하 / 오류는 503 / 500 으로 응답
+    """
+    user_id = _default_user_id()
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+    if not refresh:
+        try:
+            stored = db_get_health_report(user_id)
+        except Exception as e:
+            print(f"[ANALYSIS ERROR] user_id={user_id} error={e!r}")
+            stored = None
+        record_cache_lookup("health_report", bool(stored))
+        if stored:
+            background_tasks.add_task(refresh_report_quietly, user_id)
+            events = [
+                _sse("delta", {"text": stored["analysis"]}),
+                _sse("done", {"generated_at": stored["generated_at"]}),
+            ]
+            return StreamingResponse(iter(events), media_type="text/event-stream", headers=headers)
+
+    events = _health_analysis_events(user_id)
     try:
-        analysis = call_llm(
-            system_prompt=HEALTH_ANALYSIS_PROMPT,
-            user_message="내 건강 상태를 분석해주세요.",
-            context=medical_context,
+        first = next(events)
+    except (GatewayError, DeadlineExceeded) as e:
+        print(f"[ANALYSIS LLM OVERLOADED] user_id={user_id} error={e!r}")
+        raise HTTPException(
+            status_code=503,
+            detail="요청이 많아 잠시 건강 분석을 할 수 없습니다. 잠시 후 다시 시도해 주세요.",
+            headers={"Retry-After": "5"},
         )
     except Exception as e:
-        print(f"[ANALYSIS LLM ERROR] user_id={user_id} error={e!r}")
+        print(f"[ANALYSIS ERROR] user_id={user_id} error={e!r}")
         raise HTTPException(
             status_code=500,
             detail="건강 분석 중 오류가 발생했습니다."
         )
 
-    if not analysis:
-        analysis = "건강 정보가 부족하여 분석을 수행할 수 없습니다."
-
-    # 4) 응답 반환 (chat_log 저장 X)
-    return HealthAnalysisResponse(analysis=analysis)
+    return StreamingResponse(chain([first], events), media_type="text/event-stream", headers=headers)
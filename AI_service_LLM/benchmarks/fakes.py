@@ -0,0 +1,334 @@
+# AI_service_LLM/benchmarks/fakes.py
+
+"""
+벤치마크용 로컬 대역(fake) 모음.
+
+OpenAI(chat / embeddings), Cohere rerank, Tavily, 백엔드 user_repository, chat_repository 를
+네트워크 없이 결정적(deterministic)으로 흉내 내고, 설정한 만큼 지연(latency)을 주입한다.
+Chroma 는 실제 chromadb PersistentClient 를 임시 디렉터리에 만들고,
+fake 임베딩으로 생성한 작은 컬렉션(disease / drug / interaction)을 채워서 사용한다.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+EMBEDDING_DIM = 256
+
+
+# =========================================================
+# 지연 주입
+# =========================================================
+
+@dataclass
+class LatencyConfig:
+    """각 외부 의존성별 평균 지연(ms)과 지터 비율(0.2 → ±20%)."""
+    llm_ms: float = 300.0
+    embedding_ms: float = 40.0
+    rerank_ms: float = 80.0
+    web_ms: float = 250.0
+    backend_ms: float = 15.0
+    history_ms: float = 10.0
+    jitter: float = 0.2
+    seed: int = 42
+
+
+# 쿼리 단위 누적 상자. hedging 실행 스레드로 context 가 복사되어도 같은 list 를 가리키므로 합산된다
+_injected: contextvars.ContextVar[Optional[List[float]]] = contextvars.ContextVar(
+    "bench_injected_ms", default=None
+)
+
+
+def reset_injected_ms() -> None:
+    _injected.set([0.0])
+
+
+def get_injected_ms() -> float:
+    """현재 쿼리(context)에서 fake 들이 sleep 으로 주입한 지연 합계(ms)."""
+    box = _injected.get()
+    return box[0] if box else 0.0
+
+
+class _Sleeper:
+    def __init__(self, cfg: LatencyConfig):
+        self.cfg = cfg
+        self._rng = random.Random(cfg.seed)
+        self._lock = threading.Lock()
+
+    def sleep(self, mean_ms: float) -> None:
+        if mean_ms <= 0:
+            return
+        with self._lock:
+            factor = 1.0 + self._rng.uniform(-self.cfg.jitter, self.cfg.jitter)
+        ms = max(0.0, mean_ms * factor)
+        time.sleep(ms / 1000)
+        box = _injected.get()
+        if box is not None:
+            with self._lock:
+                box[0] += ms
+
+
+# =========================================================
+# 결정적 임베딩 (문자 bigram 해시 → 정규화 벡터)
+# =========================================================
+
+def fake_embedding(text: str, dim: int = EMBEDDING_DIM) -> List[float]:
+    vec = [0.0] * dim
+    t = re.sub(r"\s+", " ", (text or "").strip())
+    grams = [t[i:i + 2] for i in range(max(1, len(t) - 1))]
+    for g in grams:
+        h = int.from_bytes(hashlib.md5(g.encode("utf-8")).digest()[:4], "little")
+        vec[h % dim] += 1.0 if (h >> 31) & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+    return [v / norm for v in vec]
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    return sum(x * y for x, y in zip(a, b))
+
+
+def _approx_tokens(text: str) -> int:
+    # 한국어 기준 대략 2글자 = 1토큰 정도로 근사
+    return max(1, len(text or "") // 2)
+
+
+# =========================================================
+# OpenAI (chat.completions / embeddings)
+# =========================================================
+
+class FakeOpenAI:
+    def __init__(self, sleeper: _Sleeper):
+        self._sleeper = sleeper
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._chat_create))
+        self.embeddings = SimpleNamespace(create=self._embeddings_create)
+
+    def _chat_create(self, model: str, messages: List[Dict[str, str]], **kwargs: Any) -> Any:
+        self._sleeper.sleep(self._sleeper.cfg.llm_ms)
+
+        system = messages[0]["content"] if messages else ""
+        user = messages[-1]["content"] if messages else ""
+
+        if "멀티 에이전트 오케스트레이터" in system:
+            # 플래너: primary_route 를 그대로 계획으로 반환
+            m = re.search(r"\[primary_route\]\n(\w+)", user)
+            content = json.dumps({"routes": [m.group(1) if m else "chit"]})
+        else:
+            digest = hashlib.sha1(user.encode("utf-8")).hexdigest()[:8]
+            content = f"[bench:{digest}] {user[:40]} 에 대한 일반적인 건강 정보 안내입니다."
+
+        prompt_tokens = sum(_approx_tokens(m.get("content", "")) for m in messages)
+        return SimpleNamespace(
+            model=model,
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=_approx_tokens(content),
+            ),
+        )
+
+    def _embeddings_create(self, model: str, input: List[str], **kwargs: Any) -> Any:
+        self._sleeper.sleep(self._sleeper.cfg.embedding_ms)
+        return SimpleNamespace(
+            model=model,
+            data=[SimpleNamespace(embedding=fake_embedding(t), index=i) for i, t in enumerate(input)],
+            usage=SimpleNamespace(prompt_tokens=sum(_approx_tokens(t) for t in input)),
+        )
+
+
+# =========================================================
+# Cohere rerank / Tavily
+# =========================================================
+
+class FakeCohere:
+    def __init__(self, sleeper: _Sleeper):
+        self._sleeper = sleeper
+
+    def rerank(self, model: str, query: str, documents: List[str], top_n: int, **kwargs: Any) -> Any:
+        self._sleeper.sleep(self._sleeper.cfg.rerank_ms)
+        q = fake_embedding(query)
+        scored = [
+            (i, max(0.0, min(1.0, 0.5 + _cosine(q, fake_embedding(d)))))
+            for i, d in enumerate(documents)
+        ]
+        scored.sort(key=lambda x: x[1], reverse=True)
+        return SimpleNamespace(
+            results=[SimpleNamespace(index=i, relevance_score=s) for i, s in scored[:top_n]]
+        )
+
+
+class FakeTavily:
+    def __init__(self, sleeper: _Sleeper):
+        self._sleeper = sleeper
+
+    def search(self, query: str, max_results: int = 5, **kwargs: Any) -> Dict[str, Any]:
+        self._sleeper.sleep(self._sleeper.cfg.web_ms)
+        return {
+            "results": [
+                {
+                    "title": f"{query[:20]} 관련 기사 {i + 1}",
+                    "url": f"https://example.com/bench/{i + 1}",
+                    "content": f"{query} 에 대한 웹 검색 요약 {i + 1}",
+                    "score": round(0.9 - i * 0.1, 2),
+                }
+                for i in range(max_results)
+            ]
+        }
+
+
+# =========================================================
+# Chroma 컬렉션 생성 (fake 임베딩)
+# =========================================================
+
+_DISEASES = [
+    "고혈압", "당뇨병", "위염", "편두통", "감기", "천식", "장염", "독감",
+    "역류성 식도염", "아토피 피부염", "불면증", "빈혈", "갑상선 기능 저하증", "요로감염",
+]
+_DRUGS = [
+    "타이레놀", "이부프로펜", "메트포르민", "아스피린", "와파린", "오메가3",
+    "비타민D", "암로디핀", "로수바스타틴", "세티리진", "판토프라졸", "아목시실린",
+]
+_DISEASE_TEMPLATES = [
+    "{name}의 주요 증상은 {sym} 등이며, 증상이 지속되면 내과 진료를 권장합니다.",
+    "{name} 진단을 위해서는 혈액 검사와 문진이 필요하며 {sym} 이 동반될 수 있습니다.",
+    "{name} 환자는 생활 습관 관리가 중요하고, {sym} 이 심해지면 병원을 방문해야 합니다.",
+]
+_DRUG_TEMPLATES = [
+    "{name} 복용법: 식후 30분에 복용하며 {side} 같은 부작용이 나타날 수 있습니다.",
+    "{name} 은(는) 다른 약과 병용 시 주의가 필요하고 {side} 가 보고되었습니다.",
+    "{name} 영양제/의약품 정보: 과다 복용 시 {side} 위험이 있습니다.",
+]
+_SYMPTOMS = ["두통", "발열", "기침", "복통", "설사", "메스꺼움", "호흡곤란", "발진"]
+_SIDE_EFFECTS = ["위장 장애", "어지러움", "출혈 경향", "졸림", "두드러기", "간 수치 상승"]
+
+
+def _generate_docs(kind: str, count: int, rng: random.Random) -> List[str]:
+    docs: List[str] = []
+    for i in range(count):
+        if kind == "disease":
+            tpl = _DISEASE_TEMPLATES[i % len(_DISEASE_TEMPLATES)]
+            doc = tpl.format(name=rng.choice(_DISEASES), sym=rng.choice(_SYMPTOMS))
+        elif kind == "drug":
+            tpl = _DRUG_TEMPLATES[i % len(_DRUG_TEMPLATES)]
+            doc = tpl.format(name=rng.choice(_DRUGS), side=rng.choice(_SIDE_EFFECTS))
+        else:
+            a, b = rng.sample(_DRUGS, 2)
+            doc = f"{a} 와(과) {b} 를 같이 복용하면 {rng.choice(_SIDE_EFFECTS)} 가 증가할 수 있어 상호작용에 주의해야 합니다."
+        docs.append(f"{doc} (문서 {kind}-{i})")
+    return docs
+
+
+def build_chroma_client(
+    path: str,
+    collections: Dict[str, str],
+    docs_per_collection: int,
+    seed: int = 42,
+    dim: int = EMBEDDING_DIM,
+) -> Any:
+    """
+    path 에 PersistentClient 를 만들고 {kind: collection_name} 별로 문서를 채운다.
+    (kind: disease / drug / interaction)
+    """
+    import chromadb
+
+    rng = random.Random(seed)
+    client = chromadb.PersistentClient(path=path)
+    for kind, name in collections.items():
+        col = client.get_or_create_collection(name=name)
+        docs = _generate_docs(kind, docs_per_collection, rng)
+        col.add(
+            ids=[f"{kind}-{i}" for i in range(len(docs))],
+            documents=docs,
+            embeddings=[fake_embedding(d, dim) for d in docs],
+            metadatas=[{"detail_url": f"https://example.com/{kind}/{i}"} for i in range(len(docs))],
+        )
+    return client
+
+
+# =========================================================
+# 설치 / 원복
+# =========================================================
+
+@dataclass
+class FakeEnvironment:
+    latency: LatencyConfig
+    chroma_client: Any
+    _restore: List[Callable[[], None]] = field(default_factory=list)
+
+    def restore(self) -> None:
+        while self._restore:
+            self._restore.pop()()
+
+
+def _patch(env: FakeEnvironment, module: Any, name: str, value: Any) -> None:
+    original = getattr(module, name)
+    setattr(module, name, value)
+    env._restore.append(lambda: setattr(module, name, original))
+
+
+def install_fakes(latency: LatencyConfig, chroma_client: Any) -> FakeEnvironment:
+    """
+    chatbot 모듈들의 외부 의존성을 fake 로 교체한다. (env.restore() 로 원복)
+    """
+    from chatbot.core import llm, retriever, reranker, web_search
+    from chatbot.agents import db_agent, history_agent
+
+    sleeper = _Sleeper(latency)
+    openai_client = FakeOpenAI(sleeper)
+    cohere_client = FakeCohere(sleeper)
+    tavily_client = FakeTavily(sleeper)
+
+    env = FakeEnvironment(latency=latency, chroma_client=chroma_client)
+
+    _patch(env, llm, "get_client", lambda: openai_client)
+    _patch(env, retriever, "get_openai_client", lambda: openai_client)
+    _patch(env, retriever, "get_chroma_client", lambda: chroma_client)
+    _patch(env, reranker, "_get_client", lambda: cohere_client)
+    _patch(env, web_search, "_get_client", lambda: tavily_client)
+
+    # 백엔드 REST (user_repository) 대역
+    def _backend(payload: Any) -> Callable[[Any], Any]:
+        def _fn(user_id: Any) -> Any:
+            sleeper.sleep(latency.backend_ms)
+            return payload
+        return _fn
+
+    backend_fakes: Dict[str, Any] = {
+        "get_user_profile": {"height": 172, "weight": 68, "bmi": 23.0, "smoking": "비흡연", "drinking": "가끔"},
+        "get_allergies": [{"allergy_name": "페니실린"}],
+        "get_chronic_diseases": [{"disease_name": "고혈압", "note": "암로디핀 복용 중"}],
+        "get_acute_diseases": [],
+        "get_drugs": [{"med_name": "암로디핀", "dosage_form": "정", "dose": 5, "unit": "mg", "schedule": "아침"}],
+        "get_prescriptions": [],
+        "get_visits": [{"hospital": "메디노트의원", "dept": "내과", "diagnosis_name": "고혈압", "date": "2025-10-01"}],
+    }
+    for name, payload in backend_fakes.items():
+        _patch(env, db_agent, name, _backend(payload))
+
+    # chat_repository.get_recent_logs 대역 (history_agent)
+    def _recent_logs(user_id: Any = None, limit: int = 20) -> List[Dict[str, Any]]:
+        sleeper.sleep(latency.history_ms)
+        return [
+            {"session_id": 1, "role": "user", "content": "고혈압 약은 언제 먹어야 하나요?", "created_at": "2025-10-01T09:00:00"},
+            {"session_id": 1, "role": "assistant", "content": "암로디핀은 보통 하루 한 번 같은 시간에 복용합니다.", "created_at": "2025-10-01T09:00:05"},
+        ][:limit]
+
+    _patch(env, history_agent, "get_recent_logs", _recent_logs)
+
+    return env
+
+
+def fake_state(query: str, user_id: Optional[str] = "1") -> Dict[str, Any]:
+    return {
+        "user_id": user_id,
+        "messages": [{"role": "user", "content": query, "meta": {}}],
+    }
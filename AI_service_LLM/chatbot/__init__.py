@@ -8,8 +8,19 @@ FastAPI 쪽에서:
     from chatbot import chatbot_graph
 
 처럼 불러서 사용하도록 graph 객체를 export 한다.
+
+langgraph import 가 무거우므로 chatbot_graph 는 처음 접근할 때 만든다.
+(app.py 처럼 run_orchestrator 만 쓰는 경우 langgraph 를 아예 import 하지 않음)
 """
 
-from .graph import chatbot_graph
+from typing import Any
 
 __all__ = ["chatbot_graph"]
+
+
+def __getattr__(name: str) -> Any:
+    if name == "chatbot_graph":
+        from .graph import chatbot_graph
+
+        return chatbot_graph
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -6,6 +6,7 @@ from ..core.state import ChatState
 from ..core.tracing import traceable
 from ..core.prompts import CHIT_SYSTEM_PROMPT
 from ..core.llm import call_llm
+from ..core.timing import timed_stage
 
 
 @traceable(name="chit_agent")
@@ -16,11 +17,13 @@ def run(state: ChatState) -> ChatState:
     """
     user_message = state["messages"][-1]["content"]
 
-    answer = call_llm(
-        system_prompt=CHIT_SYSTEM_PROMPT,
-        user_message=user_message,
-        context=None,
-    )
+    with timed_stage("generation"):
+        answer = call_llm(
+            system_prompt=CHIT_SYSTEM_PROMPT,
+            user_message=user_message,
+            context=None,
+            caller="chit_agent",
+        )
 
     # LLM 응답을 메시지 히스토리에 추가
     state["messages"].append(
@@ -8,6 +8,7 @@ from ..core.state import ChatState
 from ..core.tracing import traceable
 from ..core.prompts import DB_SYSTEM_PROMPT
 from ..core.llm import call_llm
+from ..core.timing import timed_stage
 from ..core.user_repository import (
     get_user_profile,
     get_allergies,
@@ -160,11 +161,13 @@ def run(state: ChatState) -> ChatState:
     # ------------------------------------------------
     # 3) LLM 호출
     # ------------------------------------------------
-    answer = call_llm(
-        system_prompt=DB_SYSTEM_PROMPT,
-        user_message=user_message,
-        context=medical_context,
-    )
+    with timed_stage("generation"):
+        answer = call_llm(
+            system_prompt=DB_SYSTEM_PROMPT,
+            user_message=user_message,
+            context=medical_context,
+            caller="db_agent",
+        )
 
     # ------------------------------------------------
     # 4) 결과 state에 push
@@ -6,11 +6,13 @@ from typing import List, Dict, Any
 
 from ..core.state import ChatState
 from ..core.tracing import traceable
-from ..core.prompts import DRUG_SYSTEM_PROMPT
+from ..core.prompts import DRUG_SYSTEM_PROMPT, RELIABILITY_NOTE
 from ..core.retriever import search_drug_docs        # Chroma 기반 drug + interaction 컬렉션 pool
 from ..core.reranker import rerank                  # Cohere Rerank
 from ..core.qscore import compute_qscore            # rerank 결과 기반 Q-score
 from ..core.llm import call_llm
+from ..core.metrics import QSCORE, RAG_ANSWERS
+from ..core.timing import timed_stage
 from ..core.web_search import search_web            # Tavily 기반 웹 검색
 
 # q_score 구간:
@@ -76,16 +78,20 @@ def run(state: ChatState) -> ChatState:
 
         context_text = "\n\n---\n\n".join(context_parts) if context_parts else None
 
-        system_prompt = DRUG_SYSTEM_PROMPT.format(
+        # Q-score 는 system prompt 가 아니라 뒤쪽 turn_notes 로 (prompt caching)
+        turn_notes = RELIABILITY_NOTE.format(
             q_score=q_score,
             reliability_level=reliability_level,
         )
 
-        answer = call_llm(
-            system_prompt=system_prompt,
-            user_message=user_message,
-            context=context_text,
-        )
+        with timed_stage("generation"):
+            answer = call_llm(
+                system_prompt=DRUG_SYSTEM_PROMPT,
+                user_message=user_message,
+                context=context_text,
+                turn_notes=turn_notes,
+                caller="drug_agent",
+            )
 
         state["messages"].append(
             {
@@ -101,6 +107,9 @@ def run(state: ChatState) -> ChatState:
             }
         )
 
+        QSCORE.observe(q_score, agent="drug")
+        RAG_ANSWERS.inc(agent="drug", web_fallback="true" if used_web else "false")
+
         state["answer"] = answer
         state["sources"] = sources
         return state
@@ -186,16 +195,20 @@ def run(state: ChatState) -> ChatState:
     # ------------------------------------------------
     # 7) LLM 호출
     # ------------------------------------------------
-    system_prompt = DRUG_SYSTEM_PROMPT.format(
+    # Q-score 는 system prompt 가 아니라 뒤쪽 turn_notes 로 (prompt caching)
+    turn_notes = RELIABILITY_NOTE.format(
         q_score=q_score,
         reliability_level=reliability_level,
     )
 
-    answer = call_llm(
-        system_prompt=system_prompt,
-        user_message=user_message,
-        context=context_text,
-    )
+    with timed_stage("generation"):
+        answer = call_llm(
+            system_prompt=DRUG_SYSTEM_PROMPT,
+            user_message=user_message,
+            context=context_text,
+            turn_notes=turn_notes,
+            caller="drug_agent",
+        )
 
     # ------------------------------------------------
     # 8) state 저장
@@ -215,6 +228,9 @@ def run(state: ChatState) -> ChatState:
         }
     )
 
+    QSCORE.observe(q_score, agent="drug")
+    RAG_ANSWERS.inc(agent="drug", web_fallback="true" if used_web else "false")
+
     state["answer"] = answer
     state["sources"] = sources
 
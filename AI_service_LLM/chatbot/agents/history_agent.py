@@ -8,6 +8,7 @@ from ..core.state import ChatState
 from ..core.tracing import traceable
 from ..core.prompts import HISTORY_SYSTEM_PROMPT
 from ..core.llm import call_llm
+from ..core.timing import timed_stage
 from ..core.chat_repository import get_recent_logs
 
 
@@ -71,11 +72,13 @@ def run(state: ChatState) -> ChatState:
     history_context = "\n\n".join(history_lines)
 
     # 3) LLM 호출 (시스템 프롬프트 + 과거 기록 컨텍스트 제공)
-    answer = call_llm(
-        system_prompt=HISTORY_SYSTEM_PROMPT,
-        user_message=user_message,
-        context=history_context,
-    )
+    with timed_stage("generation"):
+        answer = call_llm(
+            system_prompt=HISTORY_SYSTEM_PROMPT,
+            user_message=user_message,
+            context=history_context,
+            caller="history_agent",
+        )
 
     # 4) state.messages append
     state["messages"].append(
@@ -8,6 +8,7 @@ from ..core.state import ChatState
 from ..core.tracing import traceable
 from ..core.prompts import WEB_SYSTEM_PROMPT
 from ..core.llm import call_llm
+from ..core.timing import timed_stage
 
 # 🔥 이 함수는 네가 구현해둔 웹 검색 래퍼에 맞게 import만 맞추면 돼.
 # 예시) core/web_search.py 에서 search_web 을 제공한다고 가정.
@@ -83,11 +84,13 @@ def run(state: ChatState) -> ChatState:
     # 3) LLM 호출
     # ------------------------------------------------
     if context_text:
-        answer = call_llm(
-            system_prompt=WEB_SYSTEM_PROMPT,
-            user_message=user_message,
-            context=context_text,
-        )
+        with timed_stage("generation"):
+            answer = call_llm(
+                system_prompt=WEB_SYSTEM_PROMPT,
+                user_message=user_message,
+                context=context_text,
+                caller="web_agent",
+            )
     else:
         # 검색 결과가 없을 때의 fallback 답변
         answer = (
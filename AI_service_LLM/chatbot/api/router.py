@@ -6,17 +6,21 @@ import os
 from typing import List, Optional
 from datetime import datetime
 
-from fastapi import APIRouter, HTTPException, Path, Query
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Path, Query
 from pydantic import BaseModel, Field
 
 from ..graph import chatbot_graph
 from ..core.state import ChatState
 from ..core.chat_repository import (
     upsert_session_with_log,
-    list_sessions,
-    get_session_messages,
+    list_sessions_page,
+    get_session_messages_page,
     delete_all_sessions,
     delete_session,
+    create_delete_job,
+    run_delete_job,
+    get_delete_job,
+    resume_stale_delete_jobs,
 )
 
 router = APIRouter(
@@ -86,6 +90,11 @@ class SessionItem(BaseModel):
     session_id: int
     title: str
     created_at: datetime   # 🔥 ISO8601로 직렬화됨
+    # 세션 미리보기 (chat_session 비정규화 컬럼)
+    first_query: Optional[str] = None
+    first_answer_snippet: Optional[str] = None
+    last_activity_at: Optional[datetime] = None
+    message_count: Optional[int] = None
 
 
 class SessionsResponse(BaseModel):
@@ -93,6 +102,7 @@ class SessionsResponse(BaseModel):
     GET /chatbot/sessions 응답 바디
     """
     sessions: List[SessionItem]
+    next_cursor: Optional[str] = None   # 다음 페이지 커서 (없으면 마지막 페이지)
 
 
 class SessionMessage(BaseModel):
@@ -110,6 +120,7 @@ class SessionDetailResponse(BaseModel):
     """
     session_id: int
     messages: List[SessionMessage]
+    next_cursor: Optional[str] = None   # limit 지정 시 다음 페이지 커서
 
 
 class MessageResponse(BaseModel):
@@ -117,6 +128,18 @@ class MessageResponse(BaseModel):
     DELETE 응답 바디 공통
     """
     message: str
+    job_id: Optional[str] = None   # 백그라운드 삭제 작업이 등록된 경우
+
+
+class DeleteJobResponse(BaseModel):
+    """
+    세션 일괄 삭제 작업 상태 (pending / running / done / error)
+    """
+    job_id: str
+    status: str
+    total_sessions: int
+    deleted_sessions: int
+    error: Optional[str] = None
 
 
 # =========================
@@ -125,9 +148,10 @@ class MessageResponse(BaseModel):
 
 
 @router.post("/query", response_model=ChatQueryResponse)
-async def chatbot_query(payload: ChatQueryRequest) -> ChatQueryResponse:
+def chatbot_query(payload: ChatQueryRequest) -> ChatQueryResponse:
     """
     메인 챗봇 엔드포인트.
+    (LLM 호출이 블로킹이라 def: FastAPI 스레드풀에서 실행)
 
     흐름:
     1) ChatState 구성 (user_id / session_id / messages)
@@ -219,21 +243,34 @@ async def get_sessions(
     user_id: int | None = Query(
         None, ge=1, description="조회할 사용자 ID (없으면 기본값 사용)"
     ),
+    limit: int = Query(50, ge=1, le=100, description="한 페이지 세션 수"),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor"),
 ) -> SessionsResponse:
     """
-    모든 챗봇 세션 목록 조회.
+    챗봇 세션 목록 조회 (최신순, (created_at, session_id) 키셋 페이지네이션).
     """
     try:
-        rows = list_sessions(user_id=_resolve_user_id(user_id))
+        page = list_sessions_page(
+            user_id=_resolve_user_id(user_id),
+            limit=limit,
+            cursor=cursor,
+        )
+        rows = page["sessions"]
         items = [
             SessionItem(
                 session_id=int(row["session_id"]),
                 title=row["title"],
                 created_at=row["created_at"],  # 🔥 datetime 그대로 전달
+                first_query=row.get("first_query"),
+                first_answer_snippet=row.get("first_answer_snippet"),
+                last_activity_at=row.get("last_activity_at"),
+                message_count=row.get("message_count"),
             )
             for row in rows
         ]
-        return SessionsResponse(sessions=items)
+        return SessionsResponse(sessions=items, next_cursor=page["next_cursor"])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -247,17 +284,24 @@ async def get_session_detail(
     user_id: int | None = Query(
         None, ge=1, description="조회할 사용자 ID (없으면 기본값 사용)"
     ),
+    limit: Optional[int] = Query(
+        None, ge=1, le=100, description="한 페이지 메시지 수 (없으면 전체)"
+    ),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor"),
 ) -> SessionDetailResponse:
     """
-    특정 세션의 전체 메시지 내역 조회.
+    특정 세션의 메시지 내역 조회 (오래된 순, (created_at, message_id) 키셋 페이지네이션).
     """
     try:
-        rows = get_session_messages(
+        page = get_session_messages_page(
             session_id=session_id,
             user_id=_resolve_user_id(user_id),
+            limit=limit,
+            cursor=cursor,
         )
-        if not rows:
+        if page is None:
             raise HTTPException(status_code=404, detail="세션을 찾을 수 없습니다.")
+        rows = page["messages"]
 
         messages = [
             SessionMessage(
@@ -270,9 +314,12 @@ async def get_session_detail(
         return SessionDetailResponse(
             session_id=session_id,
             messages=messages,
+            next_cursor=page["next_cursor"],
         )
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -282,6 +329,7 @@ async def get_session_detail(
 
 @router.delete("/sessions", response_model=MessageResponse)
 async def delete_sessions_all(
+    background_tasks: BackgroundTasks,
     user_id: int | None = Query(
         None, ge=1, description="삭제할 사용자 ID (없으면 기본값 사용)"
     ),
@@ -292,18 +340,19 @@ async def delete_sessions_all(
 ) -> MessageResponse:
     """
     모든 세션 + 관련 로그 삭제.
+    - 사용자 단위 삭제는 작업만 등록하고 바로 응답 (백그라운드 배치 삭제, job_id 반환)
+    - include_all (개발/관리용) 은 TRUNCATE 로 즉시 삭제
     """
     try:
-        target_user_id = None
-        if not include_all or user_id is not None:
-            target_user_id = _resolve_user_id(user_id)
+        if include_all and user_id is None:
+            delete_all_sessions(user_id=None, include_all=True)
+            return MessageResponse(message="모든 챗봇 세션을 삭제했습니다.")
 
-        delete_all_sessions(
-            user_id=target_user_id,
-            include_all=include_all,
-        )
+        job = create_delete_job(user_id=_resolve_user_id(user_id))
+        background_tasks.add_task(run_delete_job, job["job_id"])
         return MessageResponse(
-            message="모든 챗봇 세션을 삭제했습니다." if include_all else "사용자 세션을 삭제했습니다."
+            message="사용자 세션 삭제를 시작했습니다.",
+            job_id=job["job_id"],
         )
     except Exception as e:
         raise HTTPException(
@@ -338,3 +387,31 @@ async def delete_session_one(
             status_code=500,
             detail=f"세션 삭제 중 오류가 발생했습니다: {e}",
         )
+
+
+@router.get("/sessions/delete-jobs/{job_id}", response_model=DeleteJobResponse)
+async def get_delete_job_status(
+    background_tasks: BackgroundTasks,
+    job_id: str = Path(..., description="삭제 작업 ID"),
+    user_id: int | None = Query(
+        None, ge=1, description="조회할 사용자 ID (없으면 기본값 사용)"
+    ),
+) -> DeleteJobResponse:
+    """
+    세션 일괄 삭제 작업 진행 상황 조회.
+    (실행하던 프로세스가 재시작돼 멈춘 작업이면 이어서 실행한다)
+    """
+    try:
+        job = get_delete_job(job_id=job_id, user_id=_resolve_user_id(user_id))
+        if job is None:
+            raise HTTPException(status_code=404, detail="삭제 작업을 찾을 수 없습니다.")
+        if job["status"] in ("pending", "running") and resume_stale_delete_jobs(job_id):
+            background_tasks.add_task(run_delete_job, job_id)
+        return DeleteJobResponse(**job)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"삭제 작업 조회 중 오류가 발생했습니다: {e}",
+        )
@@ -0,0 +1,321 @@
+# AI_service_LLM/chatbot/core/health_report.py
+
+"""
+건강 분석 리포트 사전 생성 (POST /chatbot/analysis).
+
+백엔드의 건강 기록 7개 섹션(프로필, 알레르기, 만성/급성 질환, 복용약, 처방, 진료)을 모아
+정규화한 JSON 의 sha256 을 records_hash 로 쓴다.
+- 저장된 리포트의 records_hash 가 같으면 LLM 을 다시 부르지 않는다.
+- 스케줄러가 매일 HEALTH_REPORT_SCHEDULE_HOUR 시에 (옵션: CHECK_INTERVAL 마다) 해시를 확인하고
+  바뀐 사용자만 다시 생성해서 health_report 테이블에 저장한다.
+- 엔드포인트는 저장된 리포트를 바로 돌려주고, refresh=true 면 강제로 다시 생성한다.
+- stream_report 는 생성되는 대로 텍스트를 흘려보내고 끝나면 저장한다 (POST /chatbot/analysis/stream).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Generator, Iterable, List, Optional
+
+from .chat_repository import (
+    get_health_report,
+    list_health_report_user_ids,
+    save_health_report,
+    try_advisory_lock,
+)
+from .llm import call_llm, stream_llm
+from .metrics import record_cache_lookup
+from .prompts import HEALTH_ANALYSIS_PROMPT
+from .user_repository import (
+    get_acute_diseases,
+    get_allergies,
+    get_chronic_diseases,
+    get_drugs,
+    get_prescriptions,
+    get_user_profile,
+    get_visits,
+)
+
+HEALTH_REPORT_SCHEDULER_ENABLED = os.getenv(
+    "HEALTH_REPORT_SCHEDULER_ENABLED", "true"
+).lower() in ("1", "true", "yes")
+# 매일 이 시각(서버 로컬 시간, 0~23)에 전체 사용자 해시 확인 → 바뀐 경우만 재생성
+HEALTH_REPORT_SCHEDULE_HOUR = int(os.getenv("HEALTH_REPORT_SCHEDULE_HOUR", "3"))
+# 0 보다 크면 야간 실행과 별개로 이 주기(초)마다도 해시 확인
+HEALTH_REPORT_CHECK_INTERVAL_S = float(os.getenv("HEALTH_REPORT_CHECK_INTERVAL_S", "0"))
+
+# 리포트 요청 user_message (고정 문자열 → prompt caching 대상)
+ANALYSIS_USER_MESSAGE = "내 건강 상태를 분석해주세요."
+EMPTY_CONTEXT = "등록된 건강 정보가 없습니다."
+EMPTY_ANALYSIS = "건강 정보가 부족하여 분석을 수행할 수 없습니다."
+
+RECORD_FETCHERS: Dict[str, Callable[[int], Any]] = {
+    "profile": get_user_profile,
+    "allergies": get_allergies,
+    "chronic": get_chronic_diseases,
+    "acute": get_acute_diseases,
+    "drugs": get_drugs,
+    "prescriptions": get_prescriptions,
+    "visits": get_visits,
+}
+
+# 워커(프로세스)가 여러 개여도 스케줄 실행은 이 lock 을 잡은 한 워커만
+SCHEDULER_LOCK_NAME = "medinote_health_report_scheduler"
+
+# 같은 사용자의 리포트를 스케줄러와 refresh 요청이 동시에 만들지 않도록
+_user_locks: Dict[int, threading.Lock] = {}
+_user_locks_guard = threading.Lock()
+
+
+def _user_lock(user_id: int) -> threading.Lock:
+    with _user_locks_guard:
+        return _user_locks.setdefault(user_id, threading.Lock())
+
+
+# =========================================================
+# 기록 조회 / 해시 / 컨텍스트
+# =========================================================
+
+def fetch_health_records(user_id: int) -> Dict[str, Any]:
+    """백엔드에서 7개 섹션을 병렬로 조회. 조회 실패 시 예외를 그대로 올린다."""
+    with ThreadPoolExecutor(max_workers=len(RECORD_FETCHERS)) as executor:
+        futures = {
+            name: executor.submit(fetch, user_id)
+            for name, fetch in RECORD_FETCHERS.items()
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+
+def records_hash(records: Dict[str, Any]) -> str:
+    """섹션 순서 / dict 키 순서와 무관한 sha256 (날짜 등은 str 로 직렬화)."""
+    payload = json.dumps(
+        {name: records.get(name) for name in RECORD_FETCHERS},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def build_medical_context(records: Dict[str, Any]) -> str:
+    """LLM 에 전달할 건강 기록 컨텍스트."""
+    profile = records.get("profile")
+    allergies = records.get("allergies")
+    chronic = records.get("chronic")
+    acute = records.get("acute")
+    drugs = records.get("drugs")
+    prescriptions = records.get("prescriptions")
+    visits = records.get("visits")
+
+    context_blocks = []
+
+    if profile:
+        # BMI 계산
+        height = profile.get('height')
+        weight = profile.get('weight')
+        bmi_str = ""
+        if height and weight:
+            h_m = float(height) / 100
+            bmi = float(weight) / (h_m * h_m)
+            bmi_str = f" (BMI: {bmi:.1f})"
+
+        context_blocks.append(
+            f"[건강 프로필]\n"
+            f"출생: {profile.get('birth')}\n"
+            f"성별: {profile.get('gender')}\n"
+            f"혈액형: {profile.get('blood_type')}\n"
+            f"키: {profile.get('height')} cm\n"
+            f"몸무게: {profile.get('weight')} kg{bmi_str}\n"
+            f"음주: {profile.get('drinking')}\n"
+            f"흡연: {profile.get('smoking')}"
+        )
+
+    if allergies:
+        context_blocks.append(
+            "[알레르기]\n" + "\n".join([a.get('allergy_name', '') for a in allergies])
+        )
+
+    if chronic:
+        context_blocks.append(
+            "[만성 질환]\n" + "\n".join([f"{c.get('disease_name')} ({c.get('note', '')})" for c in chronic])
+        )
+
+    if acute:
+        context_blocks.append(
+            "[급성 질환]\n" + "\n".join([f"{a.get('disease_name')} ({a.get('note', '')})" for a in acute])
+        )
+
+    if drugs:
+        drug_lines = [f"{d.get('med_name')} {d.get('dose')}{d.get('unit')} ({d.get('schedule')})" for d in drugs]
+        context_blocks.append("[복용 중인 약]\n" + "\n".join(drug_lines))
+
+    if prescriptions:
+        pres_lines = [f"{p.get('med_name')} ({p.get('start_date')}~{p.get('end_date')})" for p in prescriptions]
+        context_blocks.append("[처방 이력]\n" + "\n".join(pres_lines))
+
+    if visits:
+        visit_lines = [f"{v.get('hospital')} {v.get('dept')} - {v.get('diagnosis_name')} ({v.get('date')})" for v in visits]
+        context_blocks.append("[진료 기록]\n" + "\n".join(visit_lines))
+
+    return "\n\n".join(context_blocks) if context_blocks else EMPTY_CONTEXT
+
+
+# =========================================================
+# 생성 / 저장
+# =========================================================
+
+def generate_analysis(records: Dict[str, Any]) -> str:
+    """LLM 으로 리포트 본문 생성 (GatewayError / DeadlineExceeded 등은 호출부에서 처리)."""
+    analysis = call_llm(
+        system_prompt=HEALTH_ANALYSIS_PROMPT,
+        user_message=ANALYSIS_USER_MESSAGE,
+        context=build_medical_context(records),
+        caller="health_analysis",
+    )
+    return analysis or EMPTY_ANALYSIS
+
+
+def refresh_report(user_id: int, force: bool = False) -> Dict[str, Any]:
+    """
+    기록을 다시 조회해서 해시가 바뀌었거나 force 면 리포트를 재생성해 저장.
+    반환: {"user_id", "records_hash", "analysis", "generated_at", "regenerated"}
+    """
+    with _user_lock(user_id):
+        records = fetch_health_records(user_id)
+        digest = records_hash(records)
+
+        stored = get_health_report(user_id)
+        hit = bool(stored) and stored["records_hash"] == digest
+        if not force:
+            record_cache_lookup("health_report_hash", hit)
+        if hit and not force:
+            return {**stored, "regenerated": False}
+
+        analysis = generate_analysis(records)
+        saved = save_health_report(user_id, records_hash=digest, analysis=analysis)
+        print(f"[HEALTH REPORT] user_id={user_id} regenerated (force={force})")
+        return {**saved, "regenerated": True}
+
+
+def stream_report(user_id: int) -> Generator[str, None, Dict[str, Any]]:
+    """
+    리포트를 생성되는 대로 yield 하고, 끝나면 저장한 행을 반환 (StopIteration.value).
+    첫 yield 는 LLM 의 첫 토큰 시점 → 응답 TTFB 가 전체 생성 시간이 아닌 TTFT 에 맞춰진다.
+    """
+    records = fetch_health_records(user_id)
+    digest = records_hash(records)
+
+    parts: List[str] = []
+    for delta in stream_llm(
+        system_prompt=HEALTH_ANALYSIS_PROMPT,
+        user_message=ANALYSIS_USER_MESSAGE,
+        context=build_medical_context(records),
+        caller="health_analysis",
+    ):
+        parts.append(delta)
+        yield delta
+
+    analysis = "".join(parts)
+    if not analysis:
+        analysis = EMPTY_ANALYSIS
+        yield analysis
+
+    saved = save_health_report(user_id, records_hash=digest, analysis=analysis)
+    print(f"[HEALTH REPORT] user_id={user_id} regenerated (stream)")
+    return saved
+
+
+def get_or_create_report(user_id: int) -> Dict[str, Any]:
+    """저장된 리포트가 있으면 그대로, 없으면 지금 생성."""
+    stored = get_health_report(user_id)
+    record_cache_lookup("health_report", bool(stored))
+    if stored:
+        return {**stored, "regenerated": False}
+    return refresh_report(user_id)
+
+
+def refresh_report_quietly(user_id: int) -> None:
+    """백그라운드용: 변경 확인 후 필요 시 재생성. 실패는 로그만."""
+    try:
+        refresh_report(user_id)
+    except Exception as e:
+        print(f"[HEALTH REPORT ERROR] user_id={user_id} error={e!r}")
+
+
+# =========================================================
+# 스케줄러
+# =========================================================
+
+def run_scheduled_pass(user_ids: Iterable[int]) -> int:
+    """대상 사용자 전체 해시 확인. 재생성한 사용자 수를 반환."""
+    targets = sorted(set(user_ids) | set(list_health_report_user_ids()))
+    regenerated = 0
+    for user_id in targets:
+        try:
+            if refresh_report(user_id)["regenerated"]:
+                regenerated += 1
+        except Exception as e:
+            print(f"[HEALTH REPORT ERROR] user_id={user_id} error={e!r}")
+    print(f"[HEALTH REPORT] scheduled pass users={len(targets)} regenerated={regenerated}")
+    return regenerated
+
+
+def seconds_until_next_run(now: Optional[datetime] = None) -> float:
+    """다음 실행까지 남은 초 (야간 시각과 CHECK_INTERVAL 중 빠른 쪽)."""
+    now = now or datetime.now()
+    nightly = now.replace(hour=HEALTH_REPORT_SCHEDULE_HOUR, minute=0, second=0, microsecond=0)
+    if nightly <= now:
+        nightly += timedelta(days=1)
+    wait_s = (nightly - now).total_seconds()
+    if HEALTH_REPORT_CHECK_INTERVAL_S > 0:
+        wait_s = min(wait_s, HEALTH_REPORT_CHECK_INTERVAL_S)
+    return wait_s
+
+
+def run_scheduled_pass_locked(user_ids: Iterable[int]) -> Optional[int]:
+    """
+    advisory lock 을 잡은 워커만 run_scheduled_pass 실행.
+    다른 워커가 실행 중이면 None (같은 시각에 깨어난 나머지 워커는 건너뜀).
+    """
+    try:
+        with try_advisory_lock(SCHEDULER_LOCK_NAME) as acquired:
+            if not acquired:
+                print("[HEALTH REPORT] scheduled pass skipped (다른 워커가 실행 중)")
+                return None
+            return run_scheduled_pass(user_ids)
+    except Exception as e:
+        print(f"[HEALTH REPORT ERROR] scheduled pass error={e!r}")
+        return None
+
+
+class HealthReportScheduler:
+    """데몬 스레드 하나로 run_scheduled_pass 를 주기 실행 (워커 간에는 advisory lock 으로 1회만)."""
+
+    def __init__(self, user_ids: List[int]):
+        self.user_ids = list(user_ids)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name="health-report", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stop.wait(seconds_until_next_run()):
+            started = time.perf_counter()
+            run_scheduled_pass_locked(self.user_ids)
+            print(f"[HEALTH REPORT] pass took {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,161 @@
+# AI_service_LLM/chatbot/core/hedging.py
+
+"""
+외부 API 호출용 hedged request + 단계별 hard deadline.
+
+run_hedged(name, fn, deadline_s, hedge_after_s)
+  - fn(timeout) 을 전용 스레드 풀에서 실행하고 호출 스레드는 deadline 까지만 기다린다.
+  - hedge_after_s 가 지나도 응답이 없으면 같은 요청을 한 번 더 보내고 먼저 성공한 쪽을 쓴다.
+  - 진 쪽은 아직 시작 전이면 취소하고, 이미 나간 요청은 결과를 버린다.
+    (동기 SDK 호출은 중간에 끊을 수 없으므로 fn 에 남은 deadline 을 timeout 으로 넘겨 수명을 제한)
+  - deadline 을 넘기면 DeadlineExceeded → 호출부에서 fallback (rerank: 원본 순서, LLM: 짧은 모델)
+
+hedge 지연은 고정값이 아니라 최근 latency 의 p9x (LatencyWindow) 로 잡는다.
+샘플이 충분히 쌓이기 전에는 hedge 하지 않는다.
+
+run_hedged 는 호출 스레드를 deadline 까지 블로킹한다. 이벤트 루프에서 부르면 안 되므로
+이 경로를 타는 FastAPI 핸들러는 async 가 아닌 def 로 둔다 (app.py /chatbot/query, /chatbot/analysis).
+"""
+
+from __future__ import annotations
+
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Deque, List, Optional, TypeVar
+
+from .metrics import HEDGE_EVENTS
+
+T = TypeVar("T")
+
+# hedged / deadline 호출을 실행하는 스레드 수 (워커당). 진 요청이 timeout 까지 자리를 차지하므로 넉넉하게
+HEDGE_MAX_WORKERS = int(os.getenv("HEDGE_MAX_WORKERS", "32"))
+# p9x 계산에 쓰는 최근 샘플 수 / hedge 를 시작하기 위한 최소 샘플 수
+HEDGE_WINDOW_SIZE = int(os.getenv("HEDGE_WINDOW_SIZE", "200"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+
+
+class DeadlineExceeded(TimeoutError):
+    """단계별 hard deadline 초과."""
+
+
+# =========================================================
+# 최근 latency 분위수
+# =========================================================
+
+class LatencyWindow:
+    """최근 size 개 성공 호출 latency(초)를 보관하고 분위수를 계산."""
+
+    def __init__(self, size: int = HEDGE_WINDOW_SIZE, min_samples: int = HEDGE_MIN_SAMPLES):
+        self._samples: Deque[float] = deque(maxlen=max(1, size))
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        idx = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+        return ordered[idx]
+
+    def hedge_delay(self, q: float, floor_s: float = 0.0) -> Optional[float]:
+        """p{q} 와 floor_s 중 큰 값. 샘플 부족하면 None (hedge 안 함)."""
+        value = self.quantile(q)
+        return None if value is None else max(value, floor_s)
+
+
+# =========================================================
+# 실행
+# =========================================================
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=HEDGE_MAX_WORKERS, thread_name_prefix="hedge")
+    return _executor
+
+
+def _submit(fn: Callable[[float], T], timeout: float) -> "Future[T]":
+    # 턴 단위 계측(timing 의 contextvar)이 작업 스레드에서도 보이도록 context 를 복사해서 실행
+    ctx = contextvars.copy_context()
+    return _get_executor().submit(ctx.run, fn, max(0.1, timeout))
+
+
+def run_hedged(
+    name: str,
+    fn: Callable[[float], T],
+    deadline_s: float,
+    hedge_after_s: Optional[float] = None,
+    window: Optional[LatencyWindow] = None,
+) -> T:
+    """
+    fn(timeout) 실행. hedge_after_s 가 None 이면 hedge 없이 deadline 만 적용.
+
+    - 성공한 첫 결과 반환 (window 가 있으면 latency 기록)
+    - 나간 요청이 모두 실패하면 마지막 예외를 그대로 raise
+    - deadline 초과 → DeadlineExceeded
+    """
+    start = time.monotonic()
+    deadline = start + deadline_s
+    futures: List["Future[T]"] = [_submit(fn, deadline_s)]
+    hedge_future: Optional["Future[T]"] = None
+    last_error: Optional[BaseException] = None
+
+    while futures:
+        now = time.monotonic()
+        remaining = deadline - now
+        if remaining <= 0:
+            break
+
+        wait_for = remaining
+        if hedge_after_s is not None and hedge_future is None:
+            wait_for = min(wait_for, max(0.0, start + hedge_after_s - now))
+
+        done, _ = wait(futures, timeout=wait_for, return_when=FIRST_COMPLETED)
+        for f in done:
+            futures.remove(f)
+            error = f.exception()
+            if error is not None:
+                last_error = error
+                continue
+            for loser in futures:
+                loser.cancel()
+            if window is not None:
+                window.observe(time.monotonic() - start)
+            if hedge_future is not None:
+                HEDGE_EVENTS.inc(call=name, event="hedge_won" if f is hedge_future else "primary_won")
+            return f.result()
+
+        if (
+            futures
+            and hedge_after_s is not None
+            and hedge_future is None
+            and time.monotonic() - start >= hedge_after_s
+        ):
+            hedge_future = _submit(fn, deadline - time.monotonic())
+            futures.append(hedge_future)
+            HEDGE_EVENTS.inc(call=name, event="hedged")
+            print(f"[HEDGE] {name}: {hedge_after_s * 1000:.0f}ms 초과 → 중복 요청 발송")
+
+    if futures:
+        for f in futures:
+            f.cancel()
+        HEDGE_EVENTS.inc(call=name, event="deadline")
+        raise DeadlineExceeded(f"{name}: {deadline_s:.1f}s deadline 초과")
+
+    assert last_error is not None
+    raise last_error
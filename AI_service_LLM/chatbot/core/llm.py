@@ -3,29 +3,99 @@
 from __future__ import annotations
 
 import os
-from typing import Optional, List, Dict, Any
+from typing import TYPE_CHECKING, Optional, List, Dict, Any, Iterator
 
-from openai import OpenAI
+from .hedging import DeadlineExceeded, LatencyWindow, run_hedged
+from .llm_gateway import estimate_tokens, get_gateway
+from .metrics import HEDGE_EVENTS, LLM_TOKENS, record_cache_lookup
+from .prompt_layout import build_messages
+from .timing import cached_prompt_tokens, record_usage
+
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 # ============================================
 # 🔹 OpenAI 클라이언트 & 기본 모델 설정
 # ============================================
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# 부하 테스트 시 OpenAI 호환 mock 서버(openai_mock)로 보내려면 지정 (예: http://localhost:8010/v1)
+# (빈 문자열이면 SDK 가 환경변수를 다시 읽어 "" 를 쓰므로 None 대신 명시적 기본값)
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or "https://api.openai.com/v1"
 CHATBOT_MODEL = os.getenv("CHATBOT_MODEL", "gpt-4o-mini")
 
-_client: Optional[OpenAI] = None
+# 답변 생성 hard deadline (초). 넘기면 LLM_FALLBACK_MODEL 로 짧게 다시 생성
+LLM_DEADLINE_S = float(os.getenv("LLM_DEADLINE_S", "30"))
+# 비우면(기본) fallback 없이 DeadlineExceeded 를 그대로 올림.
+# 원래 모델보다 실제로 빠른 모델을 지정할 때만 의미가 있다 (같은 모델이면 fallback 하지 않음)
+LLM_FALLBACK_MODEL = os.getenv("LLM_FALLBACK_MODEL", "")
+LLM_FALLBACK_MAX_TOKENS = int(os.getenv("LLM_FALLBACK_MAX_TOKENS", "400"))
+LLM_FALLBACK_DEADLINE_S = float(os.getenv("LLM_FALLBACK_DEADLINE_S", "15"))
+
+# hedged request: 모델별 최근 latency 의 p{PERCENTILE} (최소 MIN_MS) 가 지나면 같은 요청을 한 번 더 보냄
+# (토큰 비용이 그만큼 늘어나므로 기본은 꺼 둔다)
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "false").lower() in ("1", "true", "yes")
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95"))
+LLM_HEDGE_MIN_MS = float(os.getenv("LLM_HEDGE_MIN_MS", "2000"))
+
+_client: Optional["OpenAI"] = None
+_latency_by_model: Dict[str, LatencyWindow] = {}
 
 
-def get_client() -> OpenAI:
+def get_client() -> "OpenAI":
     global _client
     if _client is None:
         if not OPENAI_API_KEY:
             raise RuntimeError("OPENAI_API_KEY 환경변수가 설정되지 않았습니다.")
-        _client = OpenAI(api_key=OPENAI_API_KEY)
+        # openai SDK 는 import 비용이 커서 첫 호출 때 로드 (cold start 단축)
+        from openai import OpenAI
+
+        # 재시도는 llm_gateway 에서 한 번만 (SDK 재시도와 겹치지 않게)
+        _client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL, max_retries=0)
     return _client
 
 
+def _complete(
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    caller: str,
+    deadline_s: float,
+    max_tokens: int | None = None,
+) -> Any:
+    """
+    chat.completions 1회 (deadline + 선택적 hedge).
+    rate limit / 429·5xx 재시도 / 대기열 포화 시 shed 는 게이트웨이가 처리하고,
+    게이트웨이 deadline 은 이 단계의 남은 시간으로 맞춘다.
+    """
+    client = get_client()
+    extra: Dict[str, Any] = {"max_tokens": max_tokens} if max_tokens else {}
+    est_tokens = estimate_tokens(messages, max_tokens=max_tokens)
+
+    def _attempt(timeout: float) -> Any:
+        return get_gateway().call(
+            caller=caller,
+            model=model,
+            fn=lambda t: client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                timeout=t,
+                **extra,
+            ),
+            est_tokens=est_tokens,
+            timeout_s=timeout,
+        )
+
+    window = _latency_by_model.setdefault(model, LatencyWindow())
+    hedge_after = (
+        window.hedge_delay(LLM_HEDGE_PERCENTILE, LLM_HEDGE_MIN_MS / 1000)
+        if LLM_HEDGE_ENABLED
+        else None
+    )
+    return run_hedged("llm", _attempt, deadline_s=deadline_s, hedge_after_s=hedge_after, window=window)
+
+
 # ============================================
 # 🔹 공통 LLM 호출 함수
 # ============================================
@@ -36,41 +106,114 @@ def call_llm(
     context: str | None = None,
     model: str | None = None,
     temperature: float = 0.2,
+    caller: str = "chatbot",
+    turn_notes: str | None = None,
 ) -> str:
     """
     에이전트에서 공통으로 사용하는 LLM 호출 함수.
 
-    - system_prompt: 시스템 역할 설명 (에이전트별 프롬프트)
+    - system_prompt: 시스템 역할 설명 (에이전트별 프롬프트, 턴 변수 없이 고정 문자열)
     - user_message: 사용자의 실제 질문
     - context: RAG로 검색된 문서들 (선택)
+    - caller: llm_gateway 토큰/비용 집계 단위 (에이전트 이름 등)
+    - turn_notes: Q-score 등 턴마다 바뀌는 값 (선택, 메시지 뒤쪽에 배치)
     """
-    messages: List[Dict[str, str]] = [
-        {"role": "system", "content": system_prompt},
-    ]
-
-    if context:
-        messages.append(
-            {
-                "role": "user",
-                "content": f"[검색된 참고 정보]\n{context}",
-            }
+    # 고정 system prompt 를 맨 앞에, 턴마다 바뀌는 값은 뒤로 (provider prompt caching)
+    messages = build_messages(
+        system_prompt=system_prompt,
+        user_message=user_message,
+        context=context,
+        turn_notes=turn_notes,
+    )
+
+    target_model = model or CHATBOT_MODEL
+    try:
+        resp = _complete(messages, target_model, temperature, caller, LLM_DEADLINE_S)
+    except DeadlineExceeded as e:
+        if not LLM_FALLBACK_MODEL or LLM_FALLBACK_MODEL == target_model:
+            raise
+        # 꼬리 지연: 더 짧은 답변(max_tokens 제한)으로 한 번 더
+        print(f"[LLM] {e} → fallback model={LLM_FALLBACK_MODEL} max_tokens={LLM_FALLBACK_MAX_TOKENS}")
+        HEDGE_EVENTS.inc(call="llm", event="fallback")
+        target_model = LLM_FALLBACK_MODEL
+        resp = _complete(
+            messages,
+            target_model,
+            temperature,
+            caller,
+            LLM_FALLBACK_DEADLINE_S,
+            max_tokens=LLM_FALLBACK_MAX_TOKENS,
         )
+    _account_usage(getattr(resp, "model", None) or target_model, getattr(resp, "usage", None))
+
+    return resp.choices[0].message.content or ""
 
-    messages.append(
-        {
-            "role": "user",
-            "content": user_message,
-        }
-    )
 
+def stream_llm(
+    system_prompt: str,
+    user_message: str,
+    context: str | None = None,
+    model: str | None = None,
+    temperature: float = 0.2,
+    caller: str = "chatbot",
+    turn_notes: str | None = None,
+) -> Iterator[str]:
+    """
+    call_llm 의 스트리밍 버전. 생성되는 대로 텍스트 조각(delta)을 yield 한다.
+
+    - 연결까지의 재시도 / shed 는 게이트웨이가 처리 (LLM_DEADLINE_S 안에서)
+    - 스트림은 중간에 다른 요청으로 바꿀 수 없으므로 hedge / fallback 모델은 적용하지 않는다
+    - 토큰 사용량은 마지막 usage chunk 로 집계
+    """
+    messages = build_messages(
+        system_prompt=system_prompt,
+        user_message=user_message,
+        context=context,
+        turn_notes=turn_notes,
+    )
     client = get_client()
-    resp = client.chat.completions.create(
-        model=model or CHATBOT_MODEL,
-        messages=messages,
-        temperature=temperature,
+    target_model = model or CHATBOT_MODEL
+
+    chunks = get_gateway().stream(
+        caller=caller,
+        model=target_model,
+        fn=lambda timeout: client.chat.completions.create(
+            model=target_model,
+            messages=messages,
+            temperature=temperature,
+            stream=True,
+            stream_options={"include_usage": True},
+            timeout=timeout,
+        ),
+        est_tokens=estimate_tokens(messages),
+        timeout_s=LLM_DEADLINE_S,
     )
 
-    return resp.choices[0].message.content or ""
+    used_model = target_model
+    usage = None
+    for chunk in chunks:
+        used_model = getattr(chunk, "model", None) or used_model
+        if getattr(chunk, "usage", None) is not None:
+            usage = chunk.usage
+        for choice in getattr(chunk, "choices", None) or []:
+            delta = getattr(choice.delta, "content", None)
+            if delta:
+                yield delta
+
+    _account_usage(used_model, usage)
+
+
+def _account_usage(model: str, usage: Any) -> None:
+    """턴 단위 토큰 사용량 누적 (chat_metrics 저장용) + /metrics 누적 카운터"""
+    record_usage(model, usage)
+    if usage is not None:
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        cached_tokens = cached_prompt_tokens(usage)
+        LLM_TOKENS.inc(prompt_tokens, model=model, kind="prompt")
+        LLM_TOKENS.inc(cached_tokens, model=model, kind="cached_prompt")
+        LLM_TOKENS.inc(getattr(usage, "completion_tokens", 0) or 0, model=model, kind="completion")
+        if prompt_tokens:
+            record_cache_lookup("openai_prompt", cached_tokens > 0)
 
 
 # run_llm 이라는 이름을 쓰는 코드도 있을 수 있으니 alias 제공
@@ -80,6 +223,8 @@ def run_llm(
     context: str | None = None,
     model: str | None = None,
     temperature: float = 0.2,
+    caller: str = "chatbot",
+    turn_notes: str | None = None,
 ) -> str:
     return call_llm(
         system_prompt=system_prompt,
@@ -87,4 +232,6 @@ def run_llm(
         context=context,
         model=model,
         temperature=temperature,
+        caller=caller,
+        turn_notes=turn_notes,
     )
@@ -0,0 +1,272 @@
+# AI_service_LLM/chatbot/core/metrics.py
+
+"""
+프로세스 내부 메트릭 레지스트리 (Prometheus text exposition format).
+
+LangSmith(SaaS) 없이도 로컬에서 /metrics 를 긁어 갈 수 있도록
+Counter / Histogram 과 scrape 시점에 값을 읽는 gauge collector 만 가볍게 구현한다.
+(uvicorn 워커가 여러 개면 워커별로 따로 집계됨)
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+# 초 단위 latency 기본 버킷 (LLM 호출까지 고려해서 넉넉하게)
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+QSCORE_BUCKETS: Tuple[float, ...] = (
+    0.05, 0.1, 0.15, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+# =========================================================
+# Metric 타입
+# =========================================================
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, v in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets)) + (math.inf,)
+        # key → (버킷별 count, sum, count)
+        self._values: Dict[LabelValues, Tuple[List[int], float, int]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            counts, total, n = self._values.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            for i, upper in enumerate(self.buckets):
+                if value <= upper:
+                    counts[i] += 1
+                    break
+            self._values[key] = (counts, total + value, n + 1)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, (list(c), s, n)) for k, (c, s, n) in self._values.items())
+        for key, (counts, total, n) in items:
+            cumulative = 0
+            for upper, c in zip(self.buckets, counts):
+                cumulative += c
+                le = f'le="{_format_value(upper)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {n}")
+        return lines
+
+
+# =========================================================
+# 레지스트리
+# =========================================================
+
+GaugeCollector = Callable[[], Dict[str, float]]
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, object] = {}
+        # name → (help, label, collector) : scrape 시점에 {"label_value": value} 를 읽어 gauge 로 노출
+        self._gauges: Dict[str, Tuple[str, str, GaugeCollector]] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = Counter(name, documentation, labelnames)
+            return self._metrics[name]  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = Histogram(name, documentation, labelnames, buckets)
+            return self._metrics[name]  # type: ignore[return-value]
+
+    def register_gauges(
+        self,
+        name: str,
+        documentation: str,
+        label: str,
+        collector: GaugeCollector,
+    ) -> None:
+        """
+        값이 다른 곳(DB 풀 등)에 이미 있는 경우 scrape 시점에 collector() 로 읽어서 노출.
+        collector 예외는 해당 gauge 만 건너뛴다.
+        """
+        with self._lock:
+            self._gauges[name] = (documentation, label, collector)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            gauges = list(self._gauges.items())
+
+        lines: List[str] = []
+        for m in metrics:
+            lines.extend(m.render())  # type: ignore[attr-defined]
+
+        for name, (documentation, label, collector) in gauges:
+            try:
+                values = collector()
+            except Exception as e:
+                print(f"[METRICS] gauge collector '{name}' 실패: {e!r}")
+                continue
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} gauge")
+            for key, v in sorted(values.items()):
+                if v is None:
+                    continue
+                lines.append(f"{name}{_format_labels((label,), (key,))} {_format_value(float(v))}")
+
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# Prometheus text exposition format Content-Type
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# =========================================================
+# 서비스 공통 메트릭 정의
+# =========================================================
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "medinote_http_requests_total",
+    "HTTP 요청 수 (route 템플릿 기준)",
+    ["method", "route", "status"],
+)
+HTTP_LATENCY = REGISTRY.histogram(
+    "medinote_http_request_duration_seconds",
+    "HTTP 요청 처리 시간(초)",
+    ["method", "route"],
+)
+STAGE_LATENCY = REGISTRY.histogram(
+    "medinote_stage_duration_seconds",
+    "턴 내부 단계별 소요 시간(초) - timing.timed_stage 기록",
+    ["stage"],
+)
+AGENT_INVOCATIONS = REGISTRY.counter(
+    "medinote_agent_invocations_total",
+    "에이전트 실행 횟수",
+    ["agent"],
+)
+QSCORE = REGISTRY.histogram(
+    "medinote_qscore",
+    "RAG 에이전트 Q-score 분포",
+    ["agent"],
+    buckets=QSCORE_BUCKETS,
+)
+RERANK_CALLS = REGISTRY.counter(
+    "medinote_rerank_calls_total",
+    "Rerank 호출 결과 (ok / fallback_no_client / fallback_error / fallback_deadline)",
+    ["outcome"],
+)
+RAG_ANSWERS = REGISTRY.counter(
+    "medinote_rag_answers_total",
+    "RAG 에이전트 응답 수 (web_fallback=true 면 웹 검색 결과 사용)",
+    ["agent", "web_fallback"],
+)
+LLM_TOKENS = REGISTRY.counter(
+    "medinote_llm_tokens_total",
+    "OpenAI 토큰 사용량 (prompt / cached_prompt / completion, cached_prompt 는 prompt 에 포함된 값)",
+    ["model", "kind"],
+)
+HEDGE_EVENTS = REGISTRY.counter(
+    "medinote_hedge_events_total",
+    "hedged request / deadline 이벤트 (hedged, primary_won, hedge_won, deadline, fallback)",
+    ["call", "event"],
+)
+CACHE_LOOKUPS = REGISTRY.counter(
+    "medinote_cache_lookups_total",
+    "캐시 조회 결과 (hit / miss). cache: health_report(저장된 리포트) / health_report_hash(기록 해시 일치) / openai_prompt(prompt caching 적중)",
+    ["cache", "result"],
+)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
+
+
+def register_gauges(
+    name: str,
+    documentation: str,
+    label: str,
+    collector: GaugeCollector,
+) -> None:
+    REGISTRY.register_gauges(name, documentation, label, collector)
+
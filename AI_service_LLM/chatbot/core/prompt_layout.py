@@ -0,0 +1,45 @@
+# AI_service_LLM/chatbot/core/prompt_layout.py
+
+"""
+LLM 에 보낼 messages 조립.
+
+OpenAI 는 요청 앞부분(prefix)이 이전 요청과 바이트 단위로 같으면 prompt caching 을 적용한다.
+그래서 순서를 "고정 → 가변" 으로 맞춘다.
+
+  1) system       : 에이전트별 고정 지시문 (턴마다 바뀌는 값을 넣지 않는다)
+  2) user         : [검색된 참고 정보] 컨텍스트 (질문마다 다름)
+  3) user         : [이번 턴 정보] Q-score / 신뢰도 같은 턴 변수 (있을 때만)
+  4) user         : 실제 질문 (항상 마지막)
+
+턴 변수를 system 에 format 해 넣으면 매 호출 prefix 가 달라져 캐시가 전혀 맞지 않는다.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+CONTEXT_HEADER = "[검색된 참고 정보]"
+TURN_NOTES_HEADER = "[이번 턴 정보]"
+
+
+def build_messages(
+    system_prompt: str,
+    user_message: str,
+    context: Optional[str] = None,
+    turn_notes: Optional[str] = None,
+) -> List[Dict[str, str]]:
+    """
+    system_prompt 는 그대로(strip 등 가공 없이) 맨 앞에 둔다. 같은 에이전트끼리 prefix 가 항상 같아야 함.
+    """
+    messages: List[Dict[str, str]] = [
+        {"role": "system", "content": system_prompt},
+    ]
+
+    if context:
+        messages.append({"role": "user", "content": f"{CONTEXT_HEADER}\n{context}"})
+
+    if turn_notes:
+        messages.append({"role": "user", "content": f"{TURN_NOTES_HEADER}\n{turn_notes}"})
+
+    messages.append({"role": "user", "content": user_message})
+    return messages
@@ -6,6 +6,10 @@
 의료 서비스 특성상:
 - 진단 / 처방 지시를 직접 내리지 말고,
 - 일반적인 정보 제공 + 병원 방문 권유를 기본으로 한다.
+
+system prompt 는 provider prompt caching 을 위해 고정 문자열로 둔다.
+Q-score 같은 턴마다 바뀌는 값은 여기에 format 하지 말고 RELIABILITY_NOTE 로 만들어
+call_llm(turn_notes=...) 에 넘긴다. (prompt_layout.build_messages 가 메시지 뒤쪽에 배치)
 """
 
 # 잡담/일반 대화
@@ -35,7 +39,7 @@ DISEASE_SYSTEM_PROMPT = """
 - 사용자가 묻는 증상을 기반으로 가능한 원인을 '예시' 수준에서만 언급하세요.
 - 직접적인 진단을 내리지 말고, 언제 병원/응급실에 가야 하는지 안내해 주세요.
 - 전문 용어는 쉽게 풀어서 설명하고, 필요한 경우 간단한 예시를 사용하세요.
-- Q-score: {q_score:.2f}  (0.0에 가까울수록 검색된 정보가 부정확할 수 있음)
+- [이번 턴 정보]로 Q-score(0.0~1.0)가 주어집니다. 0.0에 가까울수록 검색된 정보가 부정확할 수 있습니다.
   - Q-score가 낮을 경우 "정확한 정보가 부족할 수 있다"는 주의를 덧붙이세요.
 """
 
@@ -48,9 +52,13 @@ DRUG_SYSTEM_PROMPT = """
   단정적인 표현을 사용하지 마세요.
 - 상호작용이 불명확하거나 Q-score가 낮을 경우, 반드시
   "정확한 판단을 위해서는 담당 의사나 약사와 상담이 필요합니다."라는 문구를 포함하세요.
-- Q-score: {q_score:.2f}
+- Q-score(0.0~1.0)는 [이번 턴 정보]로 주어집니다.
 """
 
+# 질병/약 RAG 의 턴 변수 (call_llm 의 turn_notes 로 전달)
+RELIABILITY_NOTE = """Q-score: {q_score:.2f}
+신뢰도: {reliability_level}"""
+
 # 과거 챗봇 대화 기록 기반
 HISTORY_SYSTEM_PROMPT = """
 당신은 사용자의 '지난 챗봇 대화 기록'을 요약하고 다시 설명해주는 어시스턴트입니다.
@@ -2,20 +2,33 @@
 
 from __future__ import annotations
 
+import math
 import os
-from typing import List, Dict, Any, Optional
+from typing import TYPE_CHECKING, List, Dict, Any, Optional
 from functools import lru_cache
 
-try:
-    import cohere  # pip install cohere
-except ImportError:  # 코히어 SDK가 없으면 None 처리
-    cohere = None  # type: ignore[assignment]
+from .hedging import DeadlineExceeded, LatencyWindow, run_hedged
+from .metrics import HEDGE_EVENTS, RERANK_CALLS
+from .timing import timed_stage
+
+# cohere SDK 는 첫 rerank 호출 때 import (cold start 단축)
+if TYPE_CHECKING:
+    import cohere
 
 
 COHERE_API_KEY = os.getenv("COHERE_API_KEY")
 # 🔹 기본값을 다국어 모델로 (한국어 포함)
 COHERE_RERANK_MODEL = os.getenv("COHERE_RERANK_MODEL", "rerank-multilingual-v3.0")
 
+# rerank 단계 hard deadline. 넘기면 rerank 없이 원본(벡터 검색) 순서로 진행
+RERANK_DEADLINE_MS = float(os.getenv("RERANK_DEADLINE_MS", "3000"))
+# hedged request: 최근 rerank latency 의 p{PERCENTILE} (최소 MIN_MS) 가 지나면 같은 요청을 한 번 더 보냄
+RERANK_HEDGE_ENABLED = os.getenv("RERANK_HEDGE_ENABLED", "false").lower() in ("1", "true", "yes")
+RERANK_HEDGE_PERCENTILE = float(os.getenv("RERANK_HEDGE_PERCENTILE", "0.95"))
+RERANK_HEDGE_MIN_MS = float(os.getenv("RERANK_HEDGE_MIN_MS", "200"))
+
+_rerank_latency = LatencyWindow()
+
 
 @lru_cache(maxsize=1)
 def _get_client() -> Optional["cohere.Client"]:
@@ -23,15 +36,25 @@ def _get_client() -> Optional["cohere.Client"]:
     Cohere 클라이언트 싱글톤.
     - COHERE_API_KEY 가 없거나 cohere 패키지가 없으면 None 반환.
     """
-    if cohere is None:
-        print("[reranker] ⚠ cohere 패키지가 설치되어 있지 않습니다. (pip install cohere)")
-        return None
     if not COHERE_API_KEY:
         print("[reranker] ⚠ COHERE_API_KEY 환경변수가 설정되어 있지 않습니다.")
         return None
+    try:
+        import cohere  # pip install cohere
+    except ImportError:  # 코히어 SDK가 없으면 None 처리
+        print("[reranker] ⚠ cohere 패키지가 설치되어 있지 않습니다. (pip install cohere)")
+        return None
     return cohere.Client(api_key=COHERE_API_KEY)
 
 
+def _original_order(docs: List[str], top_k: int) -> List[Dict[str, Any]]:
+    """rerank 를 못 한 경우: 점수 없이 원본 순서 그대로 상위 top_k."""
+    return [
+        {"text": d, "score": None, "index": i}
+        for i, d in enumerate(docs[:top_k])
+    ]
+
+
 def rerank(
     query: str,
     docs: List[str],
@@ -74,26 +97,46 @@ def rerank(
     if client is None:
         # 클라이언트 사용 불가한 경우 → 점수 없이 원본 순서 그대로 반환
         print("[reranker] ⚠ Cohere 클라이언트 없음. 원본 순서로 반환합니다.")
-        return [
-            {"text": d, "score": None, "index": i}
-            for i, d in enumerate(docs[:top_k])
-        ]
+        RERANK_CALLS.inc(outcome="fallback_no_client")
+        return _original_order(docs, top_k)
 
-    try:
-        # Cohere Rerank 호출
-        response = client.rerank(
+    def _call(timeout: float) -> Any:
+        return client.rerank(
             model=COHERE_RERANK_MODEL,
             query=query,
             documents=docs,
             top_n=min(top_k, len(docs)),  # 🔹 여기서 상위 top_k만 받아옴
+            request_options={"timeout_in_seconds": max(1, math.ceil(timeout))},
         )
+
+    hedge_after = (
+        _rerank_latency.hedge_delay(RERANK_HEDGE_PERCENTILE, RERANK_HEDGE_MIN_MS / 1000)
+        if RERANK_HEDGE_ENABLED
+        else None
+    )
+
+    try:
+        # Cohere Rerank 호출 (deadline + 선택적 hedge)
+        with timed_stage("rerank"):
+            response = run_hedged(
+                "rerank",
+                _call,
+                deadline_s=RERANK_DEADLINE_MS / 1000,
+                hedge_after_s=hedge_after,
+                window=_rerank_latency,
+            )
+    except DeadlineExceeded as e:
+        print(f"[reranker] ⏱ {e}. 원본 순서로 반환합니다.")
+        RERANK_CALLS.inc(outcome="fallback_deadline")
+        HEDGE_EVENTS.inc(call="rerank", event="fallback")
+        return _original_order(docs, top_k)
     except Exception as e:
         print(f"[reranker] ❌ Cohere rerank 호출 중 오류: {e}")
+        RERANK_CALLS.inc(outcome="fallback_error")
         # 실패 시에도 서비스 전체가 죽지 않도록, 원본 순서 그대로 반환
-        return [
-            {"text": d, "score": None, "index": i}
-            for i, d in enumerate(docs[:top_k])
-        ]
+        return _original_order(docs, top_k)
+
+    RERANK_CALLS.inc(outcome="ok")
 
     results: List[Dict[str, Any]] = []
     for r in response.results:
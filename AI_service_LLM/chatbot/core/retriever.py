@@ -4,11 +4,18 @@ from __future__ import annotations
 
 import os
 from functools import lru_cache
-from typing import List, Dict, Any
+from typing import TYPE_CHECKING, List, Dict, Any
 
-import chromadb
-from chromadb.api.models import Collection
-from openai import OpenAI  # 🔹 임베딩용
+from .llm_gateway import estimate_tokens, get_gateway
+from .timing import timed_stage
+
+# chromadb / openai 는 import 만으로 수백 ms 가 걸려서 첫 사용 시점에 로드한다
+if TYPE_CHECKING:
+    import chromadb
+    from chromadb.api.models import Collection
+    from openai import OpenAI
+
+    from .vector_snapshot import SnapshotCollection
 
 
 # ============================================================
@@ -28,21 +35,33 @@ CHROMA_INTERACTION_COLLECTION = os.getenv("CHROMA_INTERACTION_COLLECTION", "inte
 # 🔹 컬렉션을 만들 때 사용한 임베딩 모델 (3072차원)
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-large")
 
+# 검색 백엔드
+#   - chroma   : chromadb PersistentClient (워커마다 HNSW 인덱스를 자기 메모리에 올림)
+#   - snapshot : CHROMA_SNAPSHOT_DIR 의 읽기 전용 mmap 스냅샷 (워커끼리 page cache 공유, vector_snapshot.py)
+RETRIEVER_BACKEND = os.getenv("RETRIEVER_BACKEND", "chroma").lower()
+CHROMA_SNAPSHOT_DIR = os.getenv("CHROMA_SNAPSHOT_DIR", "")
+
+# OpenAI 호환 mock 서버 등 다른 엔드포인트를 쓸 때 지정 (없으면 OpenAI 기본값)
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or "https://api.openai.com/v1"
+
 
 # ============================================================
 # 🔹 OpenAI 클라이언트 (임베딩용, 싱글톤)
 # ============================================================
 
-_openai_client: OpenAI | None = None
+_openai_client: "OpenAI | None" = None
 
 
-def get_openai_client() -> OpenAI:
+def get_openai_client() -> "OpenAI":
     global _openai_client
     if _openai_client is None:
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise RuntimeError("OPENAI_API_KEY 환경변수가 설정되지 않았습니다.")
-        _openai_client = OpenAI(api_key=api_key)
+        from openai import OpenAI
+
+        # 재시도는 llm_gateway 에서 한 번만 (SDK 재시도와 겹치지 않게)
+        _openai_client = OpenAI(api_key=api_key, base_url=OPENAI_BASE_URL, max_retries=0)
     return _openai_client
 
 
@@ -52,9 +71,15 @@ def embed_query(text: str) -> List[float]:
     (컬렉션 생성 시 사용한 임베딩과 동일한 모델 사용)
     """
     client = get_openai_client()
-    resp = client.embeddings.create(
+    resp = get_gateway().call(
+        caller="retriever",
         model=EMBEDDING_MODEL,
-        input=[text],
+        fn=lambda timeout: client.embeddings.create(
+            model=EMBEDDING_MODEL,
+            input=[text],
+            timeout=timeout,
+        ),
+        est_tokens=estimate_tokens([text], max_tokens=0),
     )
     return resp.data[0].embedding
 
@@ -64,18 +89,47 @@ def embed_query(text: str) -> List[float]:
 # ============================================================
 
 @lru_cache(maxsize=1)
-def get_chroma_client() -> chromadb.ClientAPI:
+def get_chroma_client() -> "chromadb.ClientAPI":
     """
     Chroma PersistentClient 싱글톤.
     """
+    import chromadb
+
     return chromadb.PersistentClient(path=CHROMA_DB_DIR)
 
 
-def _get_collection(name: str) -> Collection:
+@lru_cache(maxsize=None)
+def _get_snapshot_collection(name: str) -> "SnapshotCollection":
+    from .vector_snapshot import SnapshotCollection
+
+    if not CHROMA_SNAPSHOT_DIR:
+        raise RuntimeError("RETRIEVER_BACKEND=snapshot 이면 CHROMA_SNAPSHOT_DIR 를 설정해야 합니다.")
+    return SnapshotCollection(CHROMA_SNAPSHOT_DIR, name)
+
+
+def _get_collection(name: str) -> "Collection | SnapshotCollection":
+    if RETRIEVER_BACKEND == "snapshot":
+        return _get_snapshot_collection(name)
     client = get_chroma_client()
     return client.get_collection(name=name)
 
 
+def warm_up() -> None:
+    """
+    서버 기동 직후 백그라운드에서 호출: chromadb / openai import 와 컬렉션 로딩을
+    첫 사용자 요청 전에 끝내 둔다. (실패해도 첫 요청 때 다시 시도되므로 로그만)
+    """
+    for name in (CHROMA_DISEASE_COLLECTION, CHROMA_DRUG_COLLECTION, CHROMA_INTERACTION_COLLECTION):
+        try:
+            _get_collection(name)
+        except Exception as e:
+            print(f"[retriever] warm-up: 컬렉션 '{name}' 로딩 실패: {e}")
+    try:
+        get_openai_client()
+    except Exception as e:
+        print(f"[retriever] warm-up: OpenAI 클라이언트 생성 실패: {e}")
+
+
 # ============================================================
 # 🔹 단일 컬렉션 검색 함수
 #   - text + detail_url 메타데이터까지 같이 반환
@@ -107,18 +161,20 @@ def _query_collection(name: str, query: str, k: int) -> List[Dict[str, Any]]:
 
     # 1) 질의문 임베딩
     try:
-        q_emb = embed_query(query)
+        with timed_stage("embedding"):
+            q_emb = embed_query(query)
     except Exception as e:
         print(f"[retriever] ❌ ERROR: 쿼리 임베딩 생성 실패: {e}")
         return []
 
     # 2) documents + metadatas 함께 조회
     try:
-        res = col.query(
-            query_embeddings=[q_emb],
-            n_results=k,
-            include=["documents", "metadatas"],
-        )
+        with timed_stage(f"chroma_query:{name}"):
+            res = col.query(
+                query_embeddings=[q_emb],
+                n_results=k,
+                include=["documents", "metadatas"],
+            )
         docs_list = res.get("documents", [[]])[0]
         metas_list = res.get("metadatas", [[]])[0]
 
@@ -36,3 +36,12 @@ class ChatState(TypedDict, total=False):
     # 이번 턴에서 사용된 출처 리스트
     # 예: [{"id": "...", "collection": "disease", "title": "...", "url": "...", "score": 0.87}, ...]
     sources: List[Dict[str, Any]]
+
+    # ===== 성능 계측 =====
+    # 이번 턴의 단계별 소요 시간 (실행 순서대로)
+    # 예: [{"stage": "rule_routing", "ms": 0.2}, {"stage": "planner_llm", "ms": 812.5}, ...]
+    timings: List[Dict[str, Any]]
+
+    # 이번 턴의 LLM 토큰 사용량
+    # 예: {"prompt_tokens": 1830, "cached_prompt_tokens": 1024, "completion_tokens": 412, "models": ["gpt-4o-mini"]}
+    usage: Dict[str, Any]
@@ -8,6 +8,8 @@ from typing import List, Literal
 from .state import ChatState
 from .tracing import traceable
 from .llm import call_llm
+from .metrics import AGENT_INVOCATIONS
+from .timing import start_turn, timed_stage, attach_to_state
 
 # 각 에이전트 import
 from ..agents import (
@@ -195,6 +197,7 @@ def _plan_routes_with_llm(user_message: str, primary_route: RouteName) -> List[R
             user_message=planner_user_message,
             context=None,
             temperature=0.0,  # 플래너는 결정적이어야 함
+            caller="supervisor.planner",
         )
     except Exception as e:
         print(f"[SUPERVISOR] planner LLM 호출 실패: {e!r}")
@@ -234,6 +237,8 @@ def _run_agent(route: RouteName, state: ChatState) -> ChatState:
     주어진 route 이름에 따라 해당 에이전트를 실행.
     각 에이전트는 state를 수정하고 반환한다.
     """
+    AGENT_INVOCATIONS.inc(agent=route)
+
     if route == "chit":
         return chit_agent.run(state)
     if route == "db":
@@ -270,21 +275,30 @@ def run_orchestrator(state: ChatState) -> ChatState:
     각 에이전트는 state["messages"] 에 assistant 메시지를 append 한다.
     최종적으로는 마지막 에이전트의 답변이 "최종 답변"이 된다.
     """
+    # 단계별 소요 시간 / 토큰 사용량 수집 시작 (결과는 state["timings"], state["usage"])
+    turn = start_turn()
+
     user_message = _get_last_user_message(state)
     if not user_message:
-        return chit_agent.run(state)
+        with timed_stage("agent:chit"):
+            current_state = chit_agent.run(state)
+        return attach_to_state(current_state, turn)
 
-    primary_route = route_supervisor(state)
+    with timed_stage("rule_routing"):
+        primary_route = route_supervisor(state)
 
-    planned_routes = _plan_routes_with_llm(
-        user_message=user_message,
-        primary_route=primary_route,
-    )
+    with timed_stage("planner_llm"):
+        planned_routes = _plan_routes_with_llm(
+            user_message=user_message,
+            primary_route=primary_route,
+        )
 
     print(f"[SUPERVISOR] primary={primary_route}, planned_routes={planned_routes}")
 
     current_state = state
     for route in planned_routes:
-        current_state = _run_agent(route, current_state)
+        with timed_stage(f"agent:{route}"):
+            current_state = _run_agent(route, current_state)
 
-    return current_state
+    current_state["route"] = ",".join(planned_routes)
+    return attach_to_state(current_state, turn)
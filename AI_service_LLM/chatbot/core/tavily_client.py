@@ -3,19 +3,21 @@
 from __future__ import annotations
 
 import os
-from typing import List
+from typing import TYPE_CHECKING, List
 
-try:
-    from tavily import TavilyClient  # pip install tavily-python
-except ImportError:  # 패키지가 없다면 Optional
-    TavilyClient = None  # type: ignore[assignment]
+if TYPE_CHECKING:
+    from tavily import TavilyClient
 
 
 _TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
 
 
 def _get_client() -> "TavilyClient | None":
-    if TavilyClient is None or not _TAVILY_API_KEY:
+    if not _TAVILY_API_KEY:
+        return None
+    try:
+        from tavily import TavilyClient  # pip install tavily-python (첫 사용 시 import)
+    except ImportError:  # 패키지가 없다면 Optional
         return None
     return TavilyClient(api_key=_TAVILY_API_KEY)
 
@@ -0,0 +1,131 @@
+# AI_service_LLM/chatbot/core/timing.py
+
+"""
+한 턴(질문 1개) 동안의 단계별 소요 시간 / 토큰 사용량 수집기.
+
+run_orchestrator 가 턴을 시작하면 contextvar 에 수집기를 걸어두고,
+retriever / reranker / llm 처럼 state 를 받지 않는 깊은 함수에서도
+timed_stage(...) / record_usage(...) 로 바로 기록할 수 있게 한다.
+턴이 끝나면 attach_to_state 로 ChatState["timings"], ChatState["usage"] 에 붙인다.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+from .metrics import STAGE_LATENCY
+from .state import ChatState
+
+
+@dataclass
+class TurnMetrics:
+    started_at: float = field(default_factory=time.perf_counter)
+    # 실행 순서대로 [{"stage": "embedding", "ms": 123.4}, ...]
+    stages: List[Dict[str, Any]] = field(default_factory=list)
+    prompt_tokens: int = 0
+    # prompt_tokens 중 provider prompt cache 에서 처리된 토큰 수
+    cached_prompt_tokens: int = 0
+    completion_tokens: int = 0
+    models: List[str] = field(default_factory=list)
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started_at) * 1000
+
+
+_current_turn: ContextVar[Optional[TurnMetrics]] = ContextVar(
+    "medinote_turn_metrics", default=None
+)
+
+
+def start_turn() -> TurnMetrics:
+    """새 턴 수집기를 만들어 현재 컨텍스트에 건다."""
+    turn = TurnMetrics()
+    _current_turn.set(turn)
+    return turn
+
+
+def current_turn() -> Optional[TurnMetrics]:
+    return _current_turn.get()
+
+
+@contextmanager
+def timed_stage(name: str, state: Optional[ChatState] = None) -> Iterator[None]:
+    """
+    with timed_stage("rerank"):
+        ...
+    monotonic clock(perf_counter)으로 재서 현재 턴에 기록한다.
+    - state 를 넘기면 state["timings"] 에 직접 기록 (턴이 이미 끝난 뒤 DB 저장 등)
+    - 턴이 시작되지 않았고 state 도 없으면 아무것도 기록하지 않음
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_LATENCY.observe(elapsed, stage=name)
+        record = {"stage": name, "ms": round(elapsed * 1000, 3)}
+        if state is not None:
+            state.setdefault("timings", []).append(record)
+        else:
+            turn = _current_turn.get()
+            if turn is not None:
+                turn.stages.append(record)
+
+
+def cached_prompt_tokens(usage: Any) -> int:
+    """
+    usage.prompt_tokens_details.cached_tokens (prompt caching 적중 토큰 수).
+    필드가 없는 모델 / mock 응답이면 0.
+    """
+    details = getattr(usage, "prompt_tokens_details", None)
+    if details is None:
+        return 0
+    if isinstance(details, dict):
+        return int(details.get("cached_tokens") or 0)
+    return int(getattr(details, "cached_tokens", 0) or 0)
+
+
+def record_usage(model: Optional[str], usage: Any) -> None:
+    """
+    OpenAI 응답의 usage(prompt_tokens / cached_tokens / completion_tokens)를 현재 턴에 누적.
+    """
+    turn = _current_turn.get()
+    if turn is None or usage is None:
+        return
+    turn.prompt_tokens += int(getattr(usage, "prompt_tokens", 0) or 0)
+    turn.cached_prompt_tokens += cached_prompt_tokens(usage)
+    turn.completion_tokens += int(getattr(usage, "completion_tokens", 0) or 0)
+    if model and model not in turn.models:
+        turn.models.append(model)
+
+
+def attach_to_state(state: ChatState, turn: TurnMetrics) -> ChatState:
+    """
+    턴 수집 결과를 ChatState 에 붙인다.
+    (stages 리스트는 그대로 공유하므로 이후 timed_stage 기록도 state 에 반영된다)
+    """
+    state["timings"] = turn.stages
+    state["usage"] = {
+        "prompt_tokens": turn.prompt_tokens,
+        "cached_prompt_tokens": turn.cached_prompt_tokens,
+        "completion_tokens": turn.completion_tokens,
+        "models": list(turn.models),
+    }
+    return state
+
+
+def stage_totals(timings: List[Dict[str, Any]]) -> Dict[str, float]:
+    """
+    같은 이름의 단계는 합산해서 {"stage": total_ms} 로 변환 (chat_metrics.stages 저장용).
+    """
+    totals: Dict[str, float] = {}
+    for t in timings or []:
+        name = t.get("stage")
+        if not name:
+            continue
+        totals[name] = round(totals.get(name, 0.0) + float(t.get("ms") or 0.0), 3)
+    return totals
@@ -1,8 +1,9 @@
 # AI_service_LLM/chatbot/core/tracing.py
 from __future__ import annotations
 
+import functools
 import os
-from typing import Any, Callable, TypeVar
+from typing import Any, Callable, Optional, TypeVar
 
 from dotenv import load_dotenv
 
@@ -14,70 +15,77 @@ T = TypeVar("T", bound=Callable[..., Any])
 LANGSMITH_API_KEY = os.getenv("LANGSMITH_API_KEY")
 LANGSMITH_PROJECT = os.getenv("LANGSMITH_PROJECT", "medinote-chatbot")
 
-try:
-    # 🔹 최신 버전 기준: Client, traceable 을 여기서 바로 import
-    from langsmith import Client, traceable as _ls_traceable  # type: ignore
+# langsmith 는 import / Client 생성 비용이 커서 모듈 import 시점에는 건드리지 않는다.
+# - API 키가 없으면 langsmith 를 아예 import 하지 않고 @traceable 은 no-op
+# - API 키가 있으면 데코레이트된 함수가 처음 호출될 때 langsmith.traceable 로 감싼다
+if LANGSMITH_API_KEY:
+    print(f"[tracing] LangSmith tracing ENABLED (project={LANGSMITH_PROJECT}, lazy load)")
+else:
+    print("[tracing] LangSmith API key not set. Tracing DISABLED.")
 
+
+@functools.lru_cache(maxsize=1)
+def _langsmith() -> Optional[Any]:
+    """langsmith 모듈 (설치되어 있지 않거나 import 에러면 None)."""
+    try:
+        import langsmith  # type: ignore
+
+        return langsmith
+    except Exception as e:
+        print(f"[tracing] LangSmith import error ({e}). Tracing DISABLED.")
+        return None
+
+
+@functools.lru_cache(maxsize=1)
+def get_langsmith_client() -> Optional[Any]:
+    """
+    LangSmith Client 인스턴스를 반환 (첫 호출 때 생성).
+    LANGSMITH_API_KEY 가 없거나 langsmith 를 쓸 수 없으면 None.
+    """
+    if not LANGSMITH_API_KEY:
+        return None
+    langsmith = _langsmith()
+    if langsmith is None:
+        return None
     # 🔹 Client 는 더 이상 project 인자를 받지 않음
     #     - 프로젝트 이름은 LANGSMITH_PROJECT 환경변수로 전달
-    _client: Client | None = Client(
-        api_key=LANGSMITH_API_KEY
-    ) if LANGSMITH_API_KEY else None
-
-    # 🔥 여기서 한번 로그 찍어주기
-    if LANGSMITH_API_KEY and _client is not None:
-        print(f"[tracing] LangSmith tracing ENABLED (project={LANGSMITH_PROJECT})")
-    else:
-        print("[tracing] LangSmith API key not set. Tracing DISABLED.")
-
-    def get_langsmith_client() -> Client | None:
-        """
-        LangSmith Client 인스턴스를 반환.
-        LANGSMITH_API_KEY 가 없으면 None.
-        """
-        return _client
-
-    def traceable(_func: T | None = None, **kwargs: Any) -> T:
-        """
-        langsmith.traceable 을 그대로 래핑.
-
-        사용 예:
-            @traceable
-            def my_fn(...):
-                ...
-
-            @traceable(name="my_span")
-            def my_fn(...):
-                ...
-        """
-        if _func is None:
-            # @traceable(name="...") 같은 형태
-            return _ls_traceable(**kwargs)  # type: ignore[return-value]
-        # @traceable 바로 데코레이팅하는 형태
-        return _ls_traceable(_func, **kwargs)  # type: ignore[return-value]
-
-except Exception as e:
-    # LangSmith 가 설치되어 있지 않거나, import 에러가 난 경우: no-op 버전
-    print(f"[tracing] LangSmith import error ({e}). Tracing DISABLED.")
-
-    def get_langsmith_client() -> None:
-        """
-        LangSmith 미사용 환경에서 항상 None 반환.
-        """
-        return None
+    return langsmith.Client(api_key=LANGSMITH_API_KEY)
+
+
+def traceable(_func: T | None = None, **kwargs: Any) -> T:
+    """
+    langsmith.traceable 을 지연 래핑.
+
+    사용 예:
+        @traceable
+        def my_fn(...):
+            ...
 
-    def traceable(_func: T | None = None, **kwargs: Any) -> T:
-        """
-        LangSmith 미사용 환경에서의 no-op decorator.
+        @traceable(name="my_span")
+        def my_fn(...):
+            ...
 
-        LangSmith 가 없어도 기존 코드에서 @traceable 을 그대로 달아둘 수 있게 한다.
-        """
+    LangSmith 가 없어도 기존 코드에서 @traceable 을 그대로 달아둘 수 있게 한다.
+    """
 
-        def decorator(func: T) -> T:
+    def decorator(func: T) -> T:
+        if not LANGSMITH_API_KEY:
             return func
 
-        if _func is None:
-            # @traceable() 처럼 쓰인 경우
-            return decorator  # type: ignore[return-value]
-        # @traceable 바로 데코레이팅된 경우
-        return _func
+        traced: Optional[Callable[..., Any]] = None
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kw: Any) -> Any:
+            nonlocal traced
+            if traced is None:
+                langsmith = _langsmith()
+                traced = langsmith.traceable(**kwargs)(func) if langsmith is not None else func
+            return traced(*args, **kw)
+
+        return wrapper  # type: ignore[return-value]
+
+    if _func is None:
+        # @traceable(name="...") 같은 형태
+        return decorator  # type: ignore[return-value]
+    # @traceable 바로 데코레이팅하는 형태
+    return decorator(_func)
@@ -0,0 +1,211 @@
+# AI_service_LLM/chatbot/core/vector_snapshot.py
+
+"""
+Chroma 컬렉션의 읽기 전용 스냅샷 (멀티 워커 서빙용).
+
+chromadb PersistentClient 는 프로세스마다 HNSW 인덱스를 자기 힙에 통째로 올린다.
+uvicorn --workers N 으로 띄우면 같은 인덱스가 N 벌 메모리에 올라가므로,
+서빙 전용으로 컬렉션을 아래 형태로 내보내고 워커는 np.load(mmap_mode="r") 로 연다.
+
+  <dir>/manifest.json              {"collections": {name: {"count", "dim"}}, "source", "created_at"}
+  <dir>/<name>.embeddings.npy      float32 (count, dim), 행마다 L2 정규화
+  <dir>/<name>.docs.json           {"documents": [...], "detail_urls": [...]}
+
+- mmap 된 임베딩 페이지는 OS page cache 에 한 벌만 있고 모든 워커가 공유한다 (워커당 추가 메모리 ≈ 문서 JSON).
+- 검색은 정확한(brute-force) 내적 top-k. OpenAI 임베딩은 정규화되어 있어서 Chroma 기본 l2 거리와 순위가 같다.
+- 파일은 임시 파일에 쓴 뒤 os.replace 로 바꿔치기 → 떠 있는 워커는 기존 inode 를 계속 읽는다.
+
+내보내기 (AI_service_LLM 디렉터리에서):
+    python -m chatbot.core.vector_snapshot --out /app/chroma_snapshot
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+
+if TYPE_CHECKING:
+    import numpy as np
+
+MANIFEST_NAME = "manifest.json"
+# col.get() 한 번에 읽어올 문서 수 (큰 컬렉션을 한 번에 올리지 않도록)
+EXPORT_BATCH_SIZE = int(os.getenv("CHROMA_SNAPSHOT_EXPORT_BATCH", "2000"))
+
+
+def _embeddings_path(directory: Path, name: str) -> Path:
+    return directory / f"{name}.embeddings.npy"
+
+
+def _docs_path(directory: Path, name: str) -> Path:
+    return directory / f"{name}.docs.json"
+
+
+def _atomic_write(path: Path, write: Any) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+# =========================================================
+# 내보내기
+# =========================================================
+
+def export_collection(collection: Any, directory: Path) -> Dict[str, int]:
+    """Chroma 컬렉션 하나를 스냅샷 파일로 쓴다. 반환: {"count", "dim"}"""
+    import numpy as np
+
+    vectors: List[Any] = []
+    documents: List[str] = []
+    detail_urls: List[Optional[str]] = []
+
+    total = collection.count()
+    for offset in range(0, total, EXPORT_BATCH_SIZE):
+        batch = collection.get(
+            include=["embeddings", "documents", "metadatas"],
+            limit=EXPORT_BATCH_SIZE,
+            offset=offset,
+        )
+        vectors.append(np.asarray(batch["embeddings"], dtype=np.float32))
+        documents.extend(batch["documents"] or [])
+        detail_urls.extend((meta or {}).get("detail_url") for meta in batch["metadatas"] or [])
+
+    matrix = np.concatenate(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True) if len(matrix) else None
+    if norms is not None:
+        norms[norms == 0] = 1.0
+        matrix = matrix / norms
+
+    name = collection.name
+    _atomic_write(_embeddings_path(directory, name), lambda f: np.save(f, matrix))
+    payload = json.dumps(
+        {"documents": documents, "detail_urls": detail_urls}, ensure_ascii=False
+    ).encode("utf-8")
+    _atomic_write(_docs_path(directory, name), lambda f: f.write(payload))
+
+    return {"count": int(matrix.shape[0]), "dim": int(matrix.shape[1]) if matrix.ndim == 2 else 0}
+
+
+def export_snapshot(client: Any, names: Sequence[str], out_dir: str, source: str = "") -> Dict[str, Any]:
+    """names 컬렉션들을 out_dir 에 내보내고 manifest 를 마지막에 갱신한다."""
+    directory = Path(out_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    collections = {
+        name: export_collection(client.get_collection(name=name), directory) for name in names
+    }
+    manifest = {
+        "collections": collections,
+        "source": source,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    data = json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8")
+    _atomic_write(directory / MANIFEST_NAME, lambda f: f.write(data))
+    return manifest
+
+
+# =========================================================
+# 조회 (Chroma Collection.query 와 같은 모양으로 반환)
+# =========================================================
+
+class SnapshotCollection:
+    """
+    mmap 으로 연 스냅샷 컬렉션. retriever 가 Chroma Collection 대신 그대로 쓸 수 있도록
+    query(query_embeddings, n_results, include) 의 반환 형태를 맞춘다.
+    """
+
+    def __init__(self, directory: str, name: str):
+        import numpy as np
+
+        self.name = name
+        self._np = np
+        path = Path(directory)
+        # 쓰기 불가 mmap: 페이지는 page cache 에서 워커끼리 공유 (copy-on-write 도 일어나지 않음)
+        self.embeddings: "np.ndarray" = np.load(_embeddings_path(path, name), mmap_mode="r")
+        docs = json.loads(_docs_path(path, name).read_text(encoding="utf-8"))
+        self.documents: List[str] = docs["documents"]
+        self.detail_urls: List[Optional[str]] = docs["detail_urls"]
+
+    def count(self) -> int:
+        return int(self.embeddings.shape[0])
+
+    def top_k(self, query_embedding: Sequence[float], k: int) -> List[int]:
+        """내적(= 정규화 벡터의 cosine) 상위 k 개 인덱스, 점수 내림차순."""
+        np = self._np
+        n = self.count()
+        k = min(k, n)
+        if k <= 0:
+            return []
+        q = np.asarray(query_embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(q))
+        if norm > 0:
+            q = q / norm
+        scores = self.embeddings @ q
+        if k < n:
+            idx = np.argpartition(-scores, k - 1)[:k]
+        else:
+            idx = np.arange(n)
+        return [int(i) for i in idx[np.argsort(-scores[idx], kind="stable")]]
+
+    def query(
+        self,
+        query_embeddings: Sequence[Sequence[float]],
+        n_results: int = 10,
+        include: Sequence[str] = ("documents", "metadatas"),
+    ) -> Dict[str, List[List[Any]]]:
+        documents: List[List[Any]] = []
+        metadatas: List[List[Any]] = []
+        for q in query_embeddings:
+            idx = self.top_k(q, n_results)
+            documents.append([self.documents[i] for i in idx])
+            metadatas.append([{"detail_url": self.detail_urls[i]} for i in idx])
+        return {"documents": documents, "metadatas": metadatas}
+
+
+def load_manifest(directory: str) -> Dict[str, Any]:
+    return json.loads((Path(directory) / MANIFEST_NAME).read_text(encoding="utf-8"))
+
+
+# =========================================================
+# CLI
+# =========================================================
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    from . import retriever
+
+    p = argparse.ArgumentParser(description="Chroma 컬렉션 → 읽기 전용 mmap 스냅샷 내보내기")
+    p.add_argument("--source", default=retriever.CHROMA_DB_DIR, help="Chroma PersistentClient 경로")
+    p.add_argument("--out", default=retriever.CHROMA_SNAPSHOT_DIR, help="스냅샷 디렉터리")
+    p.add_argument(
+        "--collections",
+        nargs="+",
+        default=[
+            retriever.CHROMA_DISEASE_COLLECTION,
+            retriever.CHROMA_DRUG_COLLECTION,
+            retriever.CHROMA_INTERACTION_COLLECTION,
+        ],
+    )
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import chromadb
+
+    args = _parse_args(argv)
+    if not args.out:
+        print("[snapshot] --out 또는 CHROMA_SNAPSHOT_DIR 를 지정하세요.")
+        return 2
+    client = chromadb.PersistentClient(path=args.source)
+    manifest = export_snapshot(client, args.collections, args.out, source=args.source)
+    for name, info in manifest["collections"].items():
+        print(f"[snapshot] {name}: {info['count']} docs × {info['dim']} dim")
+    print(f"[snapshot] saved → {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
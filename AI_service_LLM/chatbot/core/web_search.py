@@ -4,6 +4,7 @@ from __future__ import annotations
 from typing import List, Dict, Any
 
 from .tavily_client import _get_client
+from .timing import timed_stage
 
 
 def search_web(query: str, top_k: int = 5) -> List[Dict[str, Any]]:
@@ -15,11 +16,12 @@ def search_web(query: str, top_k: int = 5) -> List[Dict[str, Any]]:
     if client is None:
         return []   # 검색 불가 → 빈 결과
 
-    resp = client.search(
-        query=query,
-        search_depth="basic",
-        max_results=top_k,
-    )
+    with timed_stage("web_search"):
+        resp = client.search(
+            query=query,
+            search_depth="basic",
+            max_results=top_k,
+        )
 
     results: List[Dict[str, Any]] = []
     for item in resp.get("results", []):
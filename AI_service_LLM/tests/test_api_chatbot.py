@@ -134,7 +134,9 @@ def _setup_mocks(monkeypatch):
     # chat_repository 용 fake 함수들
     # router.py 에서 import 하는 이름과 정확히 맞춘다:
     #   create_session_with_log, append_log, list_sessions,
-    #   get_session_messages, delete_all_sessions, delete_session
+    #   get_session_messages, delete_all_sessions, delete_session,
+    #   upsert_session_with_log, list_sessions_page, get_session_messages_page,
+    #   create_delete_job, run_delete_job
     # ─────────────────────────────
 
     # 새 세션 생성 + 첫 로그 기록
@@ -179,10 +181,33 @@ def _setup_mocks(monkeypatch):
         else:
             return []
 
+    # 세션 목록 조회 (키셋 페이지네이션)
+    def fake_list_sessions_page(*args, **kwargs) -> dict:
+        return {"sessions": fake_list_sessions(), "next_cursor": None}
+
+    # 세션 상세 메시지 조회 (키셋 페이지네이션)
+    def fake_get_session_messages_page(session_id: int, *args, **kwargs):
+        rows = fake_get_session_messages(session_id)
+        if not rows:
+            return None
+        return {"messages": rows, "next_cursor": None}
+
     # 전체 세션 삭제
     def fake_delete_all_sessions() -> None:
         return None
 
+    # 전체 세션 삭제 작업 등록 / 실행 (백그라운드)
+    def fake_create_delete_job(*args, **kwargs) -> dict:
+        return {
+            "job_id": "job-1",
+            "status": "pending",
+            "total_sessions": 2,
+            "deleted_sessions": 0,
+        }
+
+    def fake_run_delete_job(job_id: str) -> None:
+        return None
+
     # 특정 세션 삭제
     def fake_delete_session(session_id: int) -> bool:
         # 1번은 존재한다고 가정
@@ -215,12 +240,36 @@ def _setup_mocks(monkeypatch):
         fake_get_session_messages,
         raising=False,
     )
+    monkeypatch.setattr(
+        chat_repo,
+        "list_sessions_page",
+        fake_list_sessions_page,
+        raising=False,
+    )
+    monkeypatch.setattr(
+        chat_repo,
+        "get_session_messages_page",
+        fake_get_session_messages_page,
+        raising=False,
+    )
     monkeypatch.setattr(
         chat_repo,
         "delete_all_sessions",
         fake_delete_all_sessions,
         raising=False,
     )
+    monkeypatch.setattr(
+        chat_repo,
+        "create_delete_job",
+        fake_create_delete_job,
+        raising=False,
+    )
+    monkeypatch.setattr(
+        chat_repo,
+        "run_delete_job",
+        fake_run_delete_job,
+        raising=False,
+    )
     monkeypatch.setattr(
         chat_repo,
         "delete_session",
@@ -0,0 +1,84 @@
+# AI_service_LLM/tests/test_app_concurrency.py
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import httpx
+
+import app as app_module
+from chatbot.core.llm_gateway import LLMGateway
+
+
+# =========================================================
+# LLM 을 부르는 엔드포인트가 이벤트 루프를 막지 않는지
+# (게이트웨이 대기 / 재시도 sleep / hedging 대기는 블로킹 → def 핸들러로 스레드풀에서)
+# =========================================================
+
+def _response():
+    return SimpleNamespace(
+        model="gpt-4o-mini",
+        usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5),
+    )
+
+
+def test_llm_requests_wait_in_limiter_without_blocking_loop(monkeypatch):
+    """
+    동시 실행 1개짜리 게이트웨이로 /chatbot/query 와 /chatbot/analysis 를 동시에 보낸다.
+    첫 요청이 LLM 슬롯을 잡고 있는 동안
+    - 두 번째 요청은 limiter 대기열에서 기다리고 (waiting == 1)
+    - /health 는 바로 응답해야 한다 (이벤트 루프가 막히지 않음)
+    """
+    gateway = LLMGateway(max_concurrency=1, max_queue=1)
+    entered = threading.Event()
+    release = threading.Event()
+
+    def fake_llm(timeout):
+        entered.set()
+        assert release.wait(5), "테스트가 슬롯을 풀지 않음"
+        return _response()
+
+    def run_orchestrator(state):
+        gateway.call(caller="chatbot.answer", model="gpt-4o-mini", fn=fake_llm)
+        return {**state, "answer": "답변"}
+
+    def refresh_report(user_id, force=False):
+        gateway.call(caller="health_report", model="gpt-4o-mini", fn=fake_llm)
+        return {"analysis": "분석", "generated_at": None, "regenerated": True}
+
+    monkeypatch.setattr(app_module, "run_orchestrator", run_orchestrator)
+    monkeypatch.setattr(app_module, "refresh_report", refresh_report)
+    monkeypatch.setattr(app_module, "upsert_session_with_log", lambda **kwargs: 1)
+    monkeypatch.setattr(app_module, "_record_turn_metrics", lambda *args, **kwargs: None)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            query = asyncio.create_task(
+                client.post("/chatbot/query", json={"session_id": 0, "query": "두통이 있어요"})
+            )
+            assert await asyncio.to_thread(entered.wait, 5)
+
+            analysis = asyncio.create_task(client.post("/chatbot/analysis?refresh=true"))
+            for _ in range(200):
+                if gateway.limiter.waiting == 1:
+                    break
+                await asyncio.sleep(0.01)
+            assert gateway.limiter.in_flight == 1
+            assert gateway.limiter.waiting == 1
+
+            health = await asyncio.wait_for(client.get("/health"), timeout=2)
+            assert health.status_code == 200
+
+            release.set()
+            return await asyncio.wait_for(asyncio.gather(query, analysis), timeout=10)
+
+    query_resp, analysis_resp = asyncio.run(scenario())
+
+    assert query_resp.status_code == 200
+    assert query_resp.json()["answer"] == "답변"
+    assert analysis_resp.status_code == 200
+    assert analysis_resp.json()["analysis"] == "분석"
+    assert gateway.limiter.in_flight == 0
@@ -0,0 +1,53 @@
+# AI_service_LLM/tests/test_app_schema.py
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+
+import app as app_module
+
+
+# =========================================================
+# startup 스키마 DDL: 워커 여러 개 중 advisory lock 을 잡은 하나만
+# =========================================================
+
+def _fake_lock(held):
+    @contextmanager
+    def fake_lock(name):
+        acquired = not held["value"]
+        held["value"] = True
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                held["value"] = False
+
+    return fake_lock
+
+
+def test_schema_ddl_runs_only_on_lock_holder(monkeypatch):
+    held = {"value": False}
+    calls = []
+    fake_lock = _fake_lock(held)
+    monkeypatch.setattr(app_module, "try_advisory_lock", fake_lock)
+    monkeypatch.setattr(app_module, "db_ensure_chat_schema", lambda: calls.append(1))
+
+    app_module._ensure_db_schema()
+    assert calls == [1]
+
+    with fake_lock(app_module.SCHEMA_LOCK_NAME):
+        # 다른 워커가 DDL 실행 중
+        app_module._ensure_db_schema()
+    assert calls == [1]
+
+
+def test_schema_db_error_does_not_block_startup(monkeypatch):
+    """DB 에 붙지 못해도 (lock 단계 포함) 예외 없이 로그만."""
+    @contextmanager
+    def broken_lock(name):
+        raise RuntimeError("connection refused")
+        yield
+
+    monkeypatch.setattr(app_module, "try_advisory_lock", broken_lock)
+
+    app_module._ensure_db_schema()
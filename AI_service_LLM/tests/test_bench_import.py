@@ -0,0 +1,31 @@
+# AI_service_LLM/tests/test_bench_import.py
+
+from __future__ import annotations
+
+from benchmarks.bench_import import _run_once, parse_importtime, summarize_importtime
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       233 |        233 |     _io
+import time:       510 |        743 |   chatbot.core.timing
+import time:       440 |       1183 | chatbot.core
+"""
+
+
+def test_parse_importtime():
+    rows = parse_importtime(SAMPLE)
+
+    assert [(r["module"], r["depth"]) for r in rows] == [
+        ("_io", 2),
+        ("chatbot.core.timing", 1),
+        ("chatbot.core", 0),
+    ]
+    summary = summarize_importtime(rows, top=2)
+    assert summary["modules"] == 3
+    assert summary["top_cumulative"][0] == {"module": "chatbot.core", "cumulative_ms": 1.183}
+    assert summary["top_packages"][0] == {"package": "chatbot", "self_ms": 0.95}
+
+
+def test_import_app_does_not_load_heavy_packages():
+    """cold start: import app 만으로 chromadb / langgraph / langsmith / cohere / openai 를 로드하지 않는다."""
+    assert _run_once()["eager_heavy"] == []
@@ -0,0 +1,35 @@
+# AI_service_LLM/tests/test_bench_orchestrator.py
+
+from __future__ import annotations
+
+from benchmarks.bench_orchestrator import _parse_args, compare_results, run_benchmark
+
+
+# =========================================================
+# 오프라인 벤치마크 스모크 테스트 (지연 0, 작은 컬렉션)
+# =========================================================
+
+def test_bench_orchestrator_smoke():
+    """fake 대역만으로 run_orchestrator 가 전 라우트를 돌고 단계별 계측이 나오는지 확인."""
+    args = _parse_args([
+        "--concurrency", "2",
+        "--requests-per-worker", "1",
+        "--warmup", "0",
+        "--docs-per-collection", "10",
+        "--llm-latency-ms", "0",
+        "--embedding-latency-ms", "0",
+        "--rerank-latency-ms", "0",
+        "--web-latency-ms", "0",
+        "--backend-latency-ms", "0",
+        "--history-latency-ms", "0",
+    ])
+
+    result = run_benchmark(args)
+
+    seq = result["sequential"]
+    assert set(seq["routes"]) == {"chit", "db", "disease", "drug", "history", "web"}
+    for stage in ("rule_routing", "planner_llm", "embedding", "rerank", "generation"):
+        assert stage in seq["per_stage"]
+    assert seq["prompt_tokens"] > 0
+    assert result["concurrency"][0]["requests"] == 2
+    assert compare_results(result, result)
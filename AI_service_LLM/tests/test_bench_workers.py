@@ -0,0 +1,34 @@
+# AI_service_LLM/tests/test_bench_workers.py
+
+from __future__ import annotations
+
+from benchmarks.bench_workers import parse_smaps_rollup, suggest_workers
+
+SAMPLE = """\
+55d0c0a00000-7ffd3b5fe000 ---p 00000000 00:00 0                          [rollup]
+Rss:              307200 kB
+Pss:              153600 kB
+Pss_Anon:          81920 kB
+Shared_Clean:     204800 kB
+Shared_Dirty:          0 kB
+Private_Clean:     20480 kB
+Private_Dirty:     81920 kB
+Swap:                  0 kB
+"""
+
+
+def test_parse_smaps_rollup():
+    assert parse_smaps_rollup(SAMPLE) == {
+        "rss_mb": 300.0,
+        "pss_mb": 150.0,
+        "uss_mb": 100.0,
+        "shared_mb": 200.0,
+    }
+
+
+def test_suggest_workers_bounded_by_memory_and_cpus():
+    # 8GB × 0.8 - 공유 1GB = 5553MB → uss 1000MB 워커 5개, cpu 가 2개면 2개
+    assert suggest_workers(uss_mb=1000, shared_mb=1000, instance_mem_mb=8192, mem_budget=0.8, cpus=8) == 5
+    assert suggest_workers(uss_mb=1000, shared_mb=1000, instance_mem_mb=8192, mem_budget=0.8, cpus=2) == 2
+    # 메모리가 모자라도 최소 1개
+    assert suggest_workers(uss_mb=9000, shared_mb=1000, instance_mem_mb=8192, mem_budget=0.8, cpus=4) == 1
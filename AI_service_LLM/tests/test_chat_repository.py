@@ -0,0 +1,228 @@
+# AI_service_LLM/tests/test_chat_repository.py
+
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+
+from chatbot.core import chat_repository
+from chatbot.core.chat_repository import decode_cursor, encode_cursor
+
+
+# =========================================================
+# 키셋 페이지네이션 커서
+# =========================================================
+
+def test_cursor_roundtrip():
+    """encode_cursor → decode_cursor 로 (created_at, id) 가 그대로 복원되는지 확인."""
+    created_at = datetime(2025, 12, 5, 9, 35, 20, 871000)
+
+    cursor = encode_cursor(created_at, 42)
+
+    assert isinstance(cursor, str)
+    assert "=" not in cursor  # URL 쿼리스트링에 그대로 넣을 수 있어야 함
+    assert decode_cursor(cursor) == (created_at, 42)
+
+
+def test_decode_cursor_invalid():
+    """형식이 잘못된 커서는 ValueError (라우터에서 400 으로 변환)."""
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+# =========================================================
+# 배치 삭제 / 삭제 작업 상태 (가짜 커넥션)
+# =========================================================
+
+class _Result:
+    def __init__(self, rowcount=0, scalar=None, row=None, rows=()):
+        self.rowcount = rowcount
+        self._scalar = scalar
+        self._row = row
+        self._rows = list(rows)
+
+    def scalar_one(self):
+        return self._scalar
+
+    def scalar(self):
+        return self._scalar
+
+    def mappings(self):
+        return self
+
+    def first(self):
+        return self._row
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+
+class FakeDB:
+    """
+    chat_session / chat_delete_job 을 흉내 내는 가짜 커넥션.
+    - locked: 다른 트랜잭션이 잡고 있는 session_id (SKIP LOCKED 로 건너뜀)
+    - unlock_after: 0건 배치가 이만큼 나온 뒤 락이 풀린다 (None 이면 계속 잠김)
+    """
+
+    def __init__(self, session_ids, locked=(), unlock_after=None):
+        self.sessions = set(session_ids)
+        self.locked = set(locked)
+        self.unlock_after = unlock_after
+        self.batches = []
+        self.empty_batches = 0
+        self.jobs = {}
+
+    def execute(self, sql, params=None):
+        params = params or {}
+        if sql is chat_repository._DELETE_SESSION_BATCH_SQL:
+            candidates = sorted(
+                s for s in self.sessions
+                if s <= params["max_session_id"] and s not in self.locked
+            )[: params["batch_size"]]
+            self.sessions -= set(candidates)
+            self.batches.append(len(candidates))
+            if not candidates:
+                self.empty_batches += 1
+                if self.unlock_after is not None and self.empty_batches >= self.unlock_after:
+                    self.locked.clear()
+            return _Result(rowcount=len(candidates))
+        if sql is chat_repository._COUNT_REMAINING_SESSIONS_SQL:
+            return _Result(scalar=sum(1 for s in self.sessions if s <= params["max_session_id"]))
+        if sql is chat_repository._CLAIM_STALE_DELETE_JOBS_SQL:
+            claimed = [
+                job_id for job_id, job in self.jobs.items()
+                if job["status"] in ("pending", "running") and job.get("stale")
+                and params["job_id"] in (None, job_id)
+            ]
+            for job_id in claimed:
+                self.jobs[job_id].update(status="running", stale=False)
+            return _Result(rows=claimed)
+
+        sql_text = str(sql)
+        if "FROM chat_delete_job" in sql_text:
+            job = self.jobs.get(params["job_id"])
+            return _Result(row=dict(job) if job else None)
+        if "UPDATE chat_delete_job" in sql_text:
+            fields = {k: v for k, v in params.items() if k != "job_id"}
+            self.jobs[params["job_id"]].update(fields)
+            self.jobs[params["job_id"]].setdefault("history", []).append(fields)
+            return _Result(rowcount=1)
+        raise AssertionError(f"unexpected SQL: {sql_text}")
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    from contextlib import contextmanager
+
+    holder = {}
+
+    @contextmanager
+    def fake_conn():
+        yield holder["db"]
+
+    monkeypatch.setattr(chat_repository, "_write_conn", fake_conn)
+    monkeypatch.setattr(chat_repository, "_read_conn", fake_conn)
+    sleeps = []
+    monkeypatch.setattr(chat_repository.time, "sleep", sleeps.append)
+
+    def install(db):
+        holder["db"] = db
+        return db, sleeps
+
+    return install
+
+
+def test_delete_in_batches_reports_progress(fake_db):
+    """batch_size 개씩 지우고, 배치마다 누적 삭제 수로 on_progress 호출. max_session_id 이후 세션은 보존."""
+    db, _ = fake_db(FakeDB(range(1, 251)))
+    progress = []
+
+    deleted = chat_repository._delete_sessions_in_batches(
+        user_id=1, max_session_id=230, batch_size=100, on_progress=progress.append
+    )
+
+    assert deleted == 230
+    assert db.batches == [100, 100, 30, 0]
+    assert progress == [100, 200, 230]
+    assert db.sessions == set(range(231, 251))
+
+
+def test_delete_in_batches_waits_for_locked_rows(fake_db):
+    """남은 세션이 잠겨서 배치가 0건이어도 끝내지 않고, 백오프 후 락이 풀리면 마저 지운다."""
+    db, sleeps = fake_db(FakeDB(range(1, 11), locked={9, 10}, unlock_after=3))
+
+    deleted = chat_repository._delete_sessions_in_batches(
+        user_id=1, max_session_id=10, batch_size=100
+    )
+
+    assert deleted == 10
+    assert db.sessions == set()
+    assert db.batches == [8, 0, 0, 0, 2, 0]
+    # 잠긴 동안의 대기 시간은 지수적으로 늘어난다
+    backoffs = sleeps[1:4]
+    assert backoffs == sorted(backoffs) and backoffs[0] < backoffs[-1]
+
+
+def test_delete_in_batches_gives_up_when_rows_stay_locked(fake_db, monkeypatch):
+    """락이 DELETE_LOCKED_MAX_WAIT_S 넘게 안 풀리면 RuntimeError (작업은 error 상태가 된다)."""
+    fake_db(FakeDB(range(1, 4), locked={3}))
+    clock = iter(range(0, 1000, 10))
+    monkeypatch.setattr(chat_repository.time, "monotonic", lambda: next(clock))
+    monkeypatch.setattr(chat_repository, "DELETE_LOCKED_MAX_WAIT_S", 30)
+
+    with pytest.raises(RuntimeError):
+        chat_repository._delete_sessions_in_batches(user_id=1, max_session_id=3)
+
+
+def _job(**fields):
+    job = {"user_id": 1, "max_session_id": 10, "deleted_sessions": 0, "status": "pending"}
+    job.update(fields)
+    return job
+
+
+def test_run_delete_job_marks_done_with_progress(fake_db, monkeypatch):
+    monkeypatch.setattr(chat_repository, "DELETE_BATCH_SIZE", 4)
+    db, _ = fake_db(FakeDB(range(1, 11)))
+    db.jobs["j1"] = _job()
+
+    chat_repository.run_delete_job("j1")
+
+    job = db.jobs["j1"]
+    assert job["status"] == "done"
+    assert job["deleted_sessions"] == 10
+    assert [h["deleted_sessions"] for h in job["history"] if "status" not in h] == [4, 8, 10]
+
+
+def test_run_delete_job_records_error(fake_db, monkeypatch):
+    db, _ = fake_db(FakeDB(range(1, 4), locked={3}))
+    db.jobs["j1"] = _job(max_session_id=3)
+    monkeypatch.setattr(chat_repository, "DELETE_LOCKED_MAX_WAIT_S", -1)
+
+    chat_repository.run_delete_job("j1")
+
+    assert db.jobs["j1"]["status"] == "error"
+    assert "잠겨" in db.jobs["j1"]["error"]
+    assert db.jobs["j1"]["deleted_sessions"] == 2
+
+
+def test_resume_stale_job_continues_count(fake_db):
+    """재시작으로 멈춘 running 작업을 다시 가져가 이미 지운 수에 이어서 센다."""
+    db, _ = fake_db(FakeDB(range(4, 11)))
+    db.jobs["j1"] = _job(status="running", deleted_sessions=3, stale=True)
+    db.jobs["j2"] = _job(status="running", deleted_sessions=1)   # 진행 중 (stale 아님)
+    db.jobs["j3"] = _job(status="done", deleted_sessions=5, stale=True)
+
+    assert chat_repository.resume_stale_delete_jobs("j2") == []
+    job_ids = chat_repository.resume_stale_delete_jobs()
+    assert job_ids == ["j1"]
+    # 한 번 가져간 작업은 다른 워커가 다시 가져가지 않는다
+    assert chat_repository.resume_stale_delete_jobs() == []
+
+    chat_repository.run_delete_job("j1")
+
+    assert db.jobs["j1"]["status"] == "done"
+    assert db.jobs["j1"]["deleted_sessions"] == 10
@@ -0,0 +1,151 @@
+# AI_service_LLM/tests/test_health_report.py
+
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+
+from chatbot.core import health_report
+
+
+@pytest.fixture
+def fake_backend(monkeypatch):
+    """백엔드 조회 / LLM / health_report 테이블을 메모리로 대체."""
+    records = {name: [] for name in health_report.RECORD_FETCHERS}
+    records["profile"] = {"height": 170, "weight": 65, "gender": "M"}
+    store = {}
+    llm_calls = []
+
+    monkeypatch.setattr(health_report, "fetch_health_records", lambda user_id: dict(records))
+
+    def fake_generate(recs):
+        llm_calls.append(recs)
+        return f"report #{len(llm_calls)}"
+
+    def fake_save(user_id, records_hash, analysis):
+        store[user_id] = {
+            "user_id": user_id,
+            "records_hash": records_hash,
+            "analysis": analysis,
+            "generated_at": datetime(2025, 1, 1),
+        }
+        return store[user_id]
+
+    monkeypatch.setattr(health_report, "generate_analysis", fake_generate)
+    monkeypatch.setattr(health_report, "get_health_report", lambda user_id: store.get(user_id))
+    monkeypatch.setattr(health_report, "save_health_report", fake_save)
+    monkeypatch.setattr(health_report, "list_health_report_user_ids", lambda: list(store))
+    return records, store, llm_calls
+
+
+def test_records_hash_ignores_key_order():
+    a = {"profile": {"height": 170, "weight": 65}, "drugs": [{"med_name": "A"}]}
+    b = {"drugs": [{"med_name": "A"}], "profile": {"weight": 65, "height": 170}}
+
+    assert health_report.records_hash(a) == health_report.records_hash(b)
+    assert health_report.records_hash(a) != health_report.records_hash({**a, "drugs": []})
+
+
+def test_build_medical_context_empty():
+    assert health_report.build_medical_context({}) == health_report.EMPTY_CONTEXT
+
+
+def test_recompute_only_when_records_change(fake_backend):
+    records, store, llm_calls = fake_backend
+
+    first = health_report.get_or_create_report(1)
+    assert first["regenerated"] is True
+    assert first["analysis"] == "report #1"
+
+    # 저장본 그대로 반환 / 기록이 같으면 재생성 안 함
+    assert health_report.get_or_create_report(1)["regenerated"] is False
+    assert health_report.refresh_report(1)["regenerated"] is False
+    assert len(llm_calls) == 1
+
+    # 기록 변경 → 스케줄러 패스에서 재생성
+    records["drugs"] = [{"med_name": "타이레놀", "dose": 500, "unit": "mg"}]
+    assert health_report.run_scheduled_pass([1]) == 1
+    assert store[1]["analysis"] == "report #2"
+
+    # refresh=true → 강제 재생성
+    assert health_report.refresh_report(1, force=True)["analysis"] == "report #3"
+
+
+def test_cache_lookups_are_counted(fake_backend):
+    """저장된 리포트 / 기록 해시 적중 여부가 /metrics 의 medinote_cache_lookups_total 로 집계되는지 확인."""
+    from chatbot.core.metrics import CACHE_LOOKUPS
+
+    def count(cache, result):
+        return CACHE_LOOKUPS.value(cache=cache, result=result)
+
+    before = {
+        key: count(*key)
+        for key in [("health_report", "hit"), ("health_report", "miss"), ("health_report_hash", "hit")]
+    }
+
+    health_report.get_or_create_report(1)   # 저장본 없음 → miss (생성)
+    health_report.get_or_create_report(1)   # 저장본 있음 → hit
+    health_report.refresh_report(1)         # 기록 해시 같음 → hit
+
+    assert count("health_report", "miss") - before[("health_report", "miss")] == 1
+    assert count("health_report", "hit") - before[("health_report", "hit")] == 1
+    assert count("health_report_hash", "hit") - before[("health_report_hash", "hit")] == 1
+
+
+def test_scheduled_pass_runs_only_on_lock_holder(fake_backend, monkeypatch):
+    """워커 여러 개: advisory lock 을 못 잡은 워커는 패스를 건너뛴다."""
+    from contextlib import contextmanager
+
+    records, store, llm_calls = fake_backend
+    held = {"value": False}
+
+    @contextmanager
+    def fake_lock(name):
+        acquired = not held["value"]
+        held["value"] = True
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                held["value"] = False
+
+    monkeypatch.setattr(health_report, "try_advisory_lock", fake_lock)
+
+    assert health_report.run_scheduled_pass_locked([1]) == 1
+    with fake_lock(health_report.SCHEDULER_LOCK_NAME):
+        # 다른 워커가 lock 을 잡고 있는 동안
+        assert health_report.run_scheduled_pass_locked([1]) is None
+    assert len(llm_calls) == 1
+
+
+def test_seconds_until_next_run(monkeypatch):
+    monkeypatch.setattr(health_report, "HEALTH_REPORT_SCHEDULE_HOUR", 3)
+    monkeypatch.setattr(health_report, "HEALTH_REPORT_CHECK_INTERVAL_S", 0)
+
+    assert health_report.seconds_until_next_run(datetime(2025, 1, 1, 2, 0)) == 3600
+    assert health_report.seconds_until_next_run(datetime(2025, 1, 1, 4, 0)) == 23 * 3600
+
+    monkeypatch.setattr(health_report, "HEALTH_REPORT_CHECK_INTERVAL_S", 600)
+    assert health_report.seconds_until_next_run(datetime(2025, 1, 1, 4, 0)) == 600
+
+
+def test_stream_report_yields_deltas_then_saves(fake_backend, monkeypatch):
+    records, store, llm_calls = fake_backend
+    monkeypatch.setattr(health_report, "stream_llm", lambda **kwargs: iter(["1. 주요 ", "건강 이력\n", "..."]))
+
+    stream = health_report.stream_report(1)
+    assert next(stream) == "1. 주요 "
+    assert 1 not in store  # 생성이 끝나기 전에는 저장하지 않음
+
+    rest = []
+    while True:
+        try:
+            rest.append(next(stream))
+        except StopIteration as stop:
+            saved = stop.value
+            break
+
+    assert rest == ["건강 이력\n", "..."]
+    assert saved["analysis"] == "1. 주요 건강 이력\n..."
+    assert store[1]["records_hash"] == health_report.records_hash(records)
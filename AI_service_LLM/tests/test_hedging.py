@@ -0,0 +1,180 @@
+# AI_service_LLM/tests/test_hedging.py
+
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from chatbot.core.hedging import DeadlineExceeded, LatencyWindow, run_hedged
+
+
+# =========================================================
+# LatencyWindow
+# =========================================================
+
+def test_latency_window_needs_min_samples():
+    window = LatencyWindow(size=10, min_samples=3)
+    window.observe(0.1)
+    window.observe(0.2)
+    assert window.hedge_delay(0.95) is None
+
+    window.observe(0.9)
+    assert window.quantile(0.95) == pytest.approx(0.9)
+    # floor 보다 작으면 floor 사용
+    assert window.hedge_delay(0.0, floor_s=0.5) == pytest.approx(0.5)
+
+
+# =========================================================
+# run_hedged
+# =========================================================
+
+def test_hedge_wins_when_primary_is_slow():
+    """첫 요청이 느리면 hedge_after 후 중복 요청이 나가고 먼저 끝난 쪽 결과를 쓴다."""
+    calls = []
+    lock = threading.Lock()
+
+    def fn(timeout: float):
+        with lock:
+            n = len(calls)
+            calls.append(timeout)
+        if n == 0:
+            time.sleep(0.5)
+            return "primary"
+        return "hedge"
+
+    window = LatencyWindow(size=10, min_samples=1)
+    start = time.monotonic()
+    result = run_hedged("test", fn, deadline_s=2.0, hedge_after_s=0.05, window=window)
+
+    assert result == "hedge"
+    assert len(calls) == 2
+    assert time.monotonic() - start < 0.4
+    assert window.quantile(0.5) is not None
+
+
+def test_no_hedge_when_primary_is_fast():
+    calls = []
+
+    def fn(timeout: float):
+        calls.append(timeout)
+        return "ok"
+
+    assert run_hedged("test", fn, deadline_s=1.0, hedge_after_s=0.5) == "ok"
+    assert len(calls) == 1
+
+
+def test_deadline_exceeded():
+    def fn(timeout: float):
+        time.sleep(0.3)
+        return "late"
+
+    with pytest.raises(DeadlineExceeded):
+        run_hedged("test", fn, deadline_s=0.05)
+
+
+def test_error_propagates_when_all_attempts_fail():
+    def fn(timeout: float):
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        run_hedged("test", fn, deadline_s=1.0)
+
+
+def test_deadline_wait_does_not_block_event_loop(monkeypatch):
+    """
+    /chatbot/query 가 run_hedged 의 deadline 까지 기다리는 동안에도 /health 는 바로 응답하고,
+    deadline 초과는 503 으로 돌아온다 (핸들러가 스레드풀에서 실행되는지).
+    """
+    import asyncio
+
+    import httpx
+
+    import app as app_module
+
+    release = threading.Event()
+
+    def run_orchestrator(state):
+        return run_hedged("llm", lambda timeout: release.wait(5), deadline_s=0.5)
+
+    monkeypatch.setattr(app_module, "run_orchestrator", run_orchestrator)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            query = asyncio.create_task(
+                client.post("/chatbot/query", json={"session_id": 0, "query": "두통이 있어요"})
+            )
+            await asyncio.sleep(0.1)
+            health = await client.get("/health")
+            # 이벤트 루프에서 기다렸다면 /health 보다 query 가 먼저 끝나 있다
+            query_pending = not query.done()
+            return health, query_pending, await query
+
+    try:
+        health, query_pending, query = asyncio.run(scenario())
+    finally:
+        release.set()
+
+    assert health.status_code == 200
+    assert query_pending
+    assert query.status_code == 503
+
+
+# =========================================================
+# call_llm deadline fallback
+# =========================================================
+
+class _FakeResponse:
+    def __init__(self, model):
+        self.model = model
+        self.usage = None
+        message = type("Message", (), {"content": f"answer from {model}"})()
+        self.choices = [type("Choice", (), {"message": message})()]
+
+
+def _fake_complete(calls, slow_models):
+    def fake(messages, model, temperature, caller, deadline_s, max_tokens=None):
+        calls.append((model, max_tokens))
+        if model in slow_models:
+            raise DeadlineExceeded(f"{model} deadline")
+        return _FakeResponse(model)
+
+    return fake
+
+
+def test_call_llm_fallback_disabled_by_default(monkeypatch):
+    from chatbot.core import llm
+
+    calls = []
+    monkeypatch.setattr(llm, "_complete", _fake_complete(calls, {"gpt-4o-mini"}))
+    monkeypatch.setattr(llm, "LLM_FALLBACK_MODEL", "")
+
+    with pytest.raises(DeadlineExceeded):
+        llm.call_llm("system", "질문", model="gpt-4o-mini")
+    assert calls == [("gpt-4o-mini", None)]
+
+
+def test_call_llm_skips_fallback_to_same_model(monkeypatch):
+    """fallback 모델이 원래 모델과 같으면 다시 돌려도 빨라지지 않으므로 그대로 실패."""
+    from chatbot.core import llm
+
+    calls = []
+    monkeypatch.setattr(llm, "_complete", _fake_complete(calls, {"gpt-4o-mini"}))
+    monkeypatch.setattr(llm, "LLM_FALLBACK_MODEL", "gpt-4o-mini")
+
+    with pytest.raises(DeadlineExceeded):
+        llm.call_llm("system", "질문", model="gpt-4o-mini")
+    assert len(calls) == 1
+
+
+def test_call_llm_falls_back_to_faster_model(monkeypatch):
+    from chatbot.core import llm
+
+    calls = []
+    monkeypatch.setattr(llm, "_complete", _fake_complete(calls, {"gpt-4o"}))
+    monkeypatch.setattr(llm, "LLM_FALLBACK_MODEL", "gpt-4.1-nano")
+
+    assert llm.call_llm("system", "질문", model="gpt-4o") == "answer from gpt-4.1-nano"
+    assert calls == [("gpt-4o", None), ("gpt-4.1-nano", llm.LLM_FALLBACK_MAX_TOKENS)]
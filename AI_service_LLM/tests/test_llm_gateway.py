@@ -0,0 +1,152 @@
+# AI_service_LLM/tests/test_llm_gateway.py
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from chatbot.core import llm_gateway
+from chatbot.core.llm_gateway import GatewayOverloaded, LLMGateway
+
+
+class FakeStatusError(Exception):
+    """openai.APIStatusError 와 같은 모양 (status_code + response.headers)"""
+
+    def __init__(self, status_code: int, retry_after: str | None = None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        headers = {"retry-after": retry_after} if retry_after else {}
+        self.response = SimpleNamespace(headers=headers)
+
+
+def _response(prompt_tokens: int = 1000, completion_tokens: int = 500):
+    return SimpleNamespace(
+        model="gpt-4o-mini-2024-07-18",
+        usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens),
+    )
+
+
+@pytest.fixture(autouse=True)
+def _fast_backoff(monkeypatch):
+    monkeypatch.setattr(llm_gateway, "LLM_GATEWAY_BACKOFF_BASE_S", 0.001)
+    monkeypatch.setattr(llm_gateway, "LLM_GATEWAY_BACKOFF_MAX_S", 0.01)
+
+
+# =========================================================
+# 재시도 / 비용 집계
+# =========================================================
+
+def test_retries_429_then_accounts_usage():
+    """429 두 번 → 성공. 재시도 횟수, 동시 실행 한도 축소, caller별 토큰/비용 집계 확인."""
+    gateway = LLMGateway(max_concurrency=4, max_queue=4, max_retries=3)
+    calls = []
+
+    def fn(timeout: float):
+        calls.append(timeout)
+        if len(calls) <= 2:
+            raise FakeStatusError(429, retry_after="0")
+        return _response()
+
+    resp = gateway.call("disease_agent", "gpt-4o-mini", fn, est_tokens=100)
+
+    assert resp.usage.prompt_tokens == 1000
+    assert len(calls) == 3
+    assert all(t > 0 for t in calls)  # 남은 deadline 이 SDK timeout 으로 전달됨
+
+    stats = gateway.get_stats()
+    assert stats["retries"] == 2
+    assert stats["in_flight"] == 0
+    assert stats["concurrency_limit"] < 4  # 429 → AIMD 감소
+
+    [usage] = gateway.get_usage_stats()
+    assert usage["caller"] == "disease_agent"
+    assert usage["calls"] == 1 and usage["errors"] == 2
+    # gpt-4o-mini: 입력 0.15 / 출력 0.60 USD per 1M (날짜 붙은 모델명은 prefix 매칭)
+    assert usage["cost_usd"] == pytest.approx((1000 * 0.15 + 500 * 0.60) / 1_000_000)
+
+
+def test_non_retryable_error_is_raised_immediately():
+    gateway = LLMGateway(max_retries=3)
+    calls = []
+
+    def fn(timeout: float):
+        calls.append(timeout)
+        raise FakeStatusError(400)
+
+    with pytest.raises(FakeStatusError):
+        gateway.call("chatbot", "gpt-4o-mini", fn)
+    assert len(calls) == 1
+
+
+def test_stream_holds_slot_until_consumed_and_accounts_usage():
+    """stream() 은 스트림을 다 읽을 때까지 동시 실행 슬롯을 잡고, 마지막 usage chunk 로 집계."""
+    gateway = LLMGateway(max_concurrency=1, max_queue=0)
+    chunks = [
+        SimpleNamespace(model="gpt-4o-mini", usage=None, text="a"),
+        SimpleNamespace(model="gpt-4o-mini", usage=None, text="b"),
+        _response(prompt_tokens=100, completion_tokens=2),
+    ]
+
+    stream = gateway.stream("health_analysis", "gpt-4o-mini", lambda timeout: iter(chunks))
+    assert next(stream).text == "a"
+    assert gateway.get_stats()["in_flight"] == 1
+    with pytest.raises(GatewayOverloaded):
+        gateway.call("chatbot", "gpt-4o-mini", lambda timeout: _response())
+
+    rest = list(stream)
+    assert len(rest) == 2
+    assert gateway.get_stats()["in_flight"] == 0
+
+    usage = {u["caller"]: u for u in gateway.get_usage_stats()}["health_analysis"]
+    assert usage["calls"] == 1
+    assert usage["prompt_tokens"] == 100 and usage["completion_tokens"] == 2
+
+
+# =========================================================
+# load shedding
+# =========================================================
+
+def test_sheds_when_queue_is_full():
+    """동시 실행 1 + 대기열 0 이 가득 찬 상태에서 들어온 요청은 기다리지 않고 거절."""
+    gateway = LLMGateway(max_concurrency=1, max_queue=0)
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow(timeout: float):
+        started.set()
+        release.wait(5)
+        return _response()
+
+    worker = threading.Thread(target=lambda: gateway.call("chatbot", "gpt-4o-mini", slow))
+    worker.start()
+    try:
+        assert started.wait(5)
+        with pytest.raises(GatewayOverloaded):
+            gateway.call("chatbot", "gpt-4o-mini", lambda timeout: _response())
+    finally:
+        release.set()
+        worker.join(5)
+
+    assert gateway.get_stats()["shed"] == 1
+
+
+def test_sheds_when_token_bucket_cannot_fill_before_deadline():
+    gateway = LLMGateway(limits={"gpt-4o-mini": (60, 1000)})
+
+    gateway.call("chatbot", "gpt-4o-mini", lambda timeout: _response(), est_tokens=1000, timeout_s=1)
+    with pytest.raises(GatewayOverloaded):
+        gateway.call("chatbot", "gpt-4o-mini", lambda timeout: _response(), est_tokens=1000, timeout_s=1)
+
+
+# =========================================================
+# 서비스별 복사본 동기화
+# =========================================================
+
+def test_service_copies_are_identical():
+    root = Path(__file__).resolve().parents[2]
+    source = (root / "AI_service_LLM" / "chatbot" / "core" / "llm_gateway.py").read_text(encoding="utf-8")
+    for copy in ("AI_service_ocr/core/llm_gateway.py", "AI_service_stt/core/llm_gateway.py"):
+        assert (root / copy).read_text(encoding="utf-8") == source, f"{copy} 가 다름"
@@ -0,0 +1,34 @@
+# AI_service_LLM/tests/test_metrics.py
+
+from __future__ import annotations
+
+from chatbot.core.metrics import MetricsRegistry
+
+
+# =========================================================
+# /metrics text exposition format
+# =========================================================
+
+def test_registry_renders_counter_and_histogram():
+    """Counter / Histogram / gauge collector 가 Prometheus text format 으로 렌더링되는지 확인."""
+    registry = MetricsRegistry()
+    requests = registry.counter("t_requests_total", "요청 수", ["route"])
+    latency = registry.histogram("t_latency_seconds", "처리 시간", ["route"], buckets=(0.1, 1.0))
+    registry.register_gauges("t_pool", "풀 상태", "field", lambda: {"checked_out": 3})
+
+    requests.inc(route="/chatbot/query")
+    requests.inc(route="/chatbot/query")
+    latency.observe(0.05, route="/chatbot/query")
+    latency.observe(0.5, route="/chatbot/query")
+    latency.observe(3.0, route="/chatbot/query")
+
+    text = registry.render()
+
+    assert "# TYPE t_requests_total counter" in text
+    assert 't_requests_total{route="/chatbot/query"} 2' in text
+    # 버킷은 누적값 (le="+Inf" == 전체 count)
+    assert 't_latency_seconds_bucket{route="/chatbot/query",le="0.1"} 1' in text
+    assert 't_latency_seconds_bucket{route="/chatbot/query",le="1"} 2' in text
+    assert 't_latency_seconds_bucket{route="/chatbot/query",le="+Inf"} 3' in text
+    assert 't_latency_seconds_count{route="/chatbot/query"} 3' in text
+    assert 't_pool{field="checked_out"} 3' in text
@@ -0,0 +1,42 @@
+# AI_service_LLM/tests/test_prompt_layout.py
+
+from __future__ import annotations
+
+from chatbot.core.prompt_layout import build_messages
+from chatbot.core.prompts import DISEASE_SYSTEM_PROMPT, DRUG_SYSTEM_PROMPT, RELIABILITY_NOTE
+
+
+def test_static_prefix_is_identical_across_turns():
+    """Q-score 가 달라도 system 메시지는 바이트 단위로 같고, 턴 변수는 질문 바로 앞에 온다."""
+    first = build_messages(
+        DISEASE_SYSTEM_PROMPT,
+        "두통이 심해요",
+        context="문서 A",
+        turn_notes=RELIABILITY_NOTE.format(q_score=0.82, reliability_level="high"),
+    )
+    second = build_messages(
+        DISEASE_SYSTEM_PROMPT,
+        "기침이 나요",
+        context="문서 B",
+        turn_notes=RELIABILITY_NOTE.format(q_score=0.21, reliability_level="low"),
+    )
+
+    assert first[0] == second[0] == {"role": "system", "content": DISEASE_SYSTEM_PROMPT}
+    assert [m["role"] for m in first] == ["system", "user", "user", "user"]
+    assert first[1]["content"].startswith("[검색된 참고 정보]\n")
+    assert "Q-score: 0.82" in first[2]["content"]
+    assert first[-1]["content"] == "두통이 심해요"
+
+
+def test_optional_blocks_are_skipped():
+    messages = build_messages("고정 지시문", "안녕")
+
+    assert messages == [
+        {"role": "system", "content": "고정 지시문"},
+        {"role": "user", "content": "안녕"},
+    ]
+
+
+def test_system_prompts_have_no_format_fields():
+    for prompt in (DISEASE_SYSTEM_PROMPT, DRUG_SYSTEM_PROMPT):
+        assert "{" not in prompt
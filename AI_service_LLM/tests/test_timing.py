@@ -0,0 +1,61 @@
+# AI_service_LLM/tests/test_timing.py
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from chatbot.core.timing import (
+    attach_to_state,
+    record_usage,
+    stage_totals,
+    start_turn,
+    timed_stage,
+)
+
+
+# =========================================================
+# 턴 단위 단계별 계측
+# =========================================================
+
+def test_timed_stage_records_into_turn_and_state():
+    """start_turn 이후 timed_stage / record_usage 가 state["timings"], state["usage"] 로 모이는지 확인."""
+    turn = start_turn()
+
+    with timed_stage("embedding"):
+        pass
+    with timed_stage("embedding"):
+        pass
+    record_usage("gpt-4o-mini", SimpleNamespace(prompt_tokens=120, completion_tokens=30))
+    record_usage(
+        "gpt-4o-mini",
+        SimpleNamespace(
+            prompt_tokens=80,
+            completion_tokens=20,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=64),
+        ),
+    )
+
+    state = attach_to_state({"messages": []}, turn)
+
+    # 턴이 끝난 뒤(DB 저장 등)는 state 에 직접 기록
+    with timed_stage("db_write", state=state):
+        pass
+
+    assert [t["stage"] for t in state["timings"]] == ["embedding", "embedding", "db_write"]
+    assert all(t["ms"] >= 0 for t in state["timings"])
+    assert state["usage"] == {
+        "prompt_tokens": 200,
+        "cached_prompt_tokens": 64,
+        "completion_tokens": 50,
+        "models": ["gpt-4o-mini"],
+    }
+
+
+def test_stage_totals_sums_repeated_stages():
+    timings = [
+        {"stage": "embedding", "ms": 10.5},
+        {"stage": "rerank", "ms": 3.0},
+        {"stage": "embedding", "ms": 4.5},
+    ]
+
+    assert stage_totals(timings) == {"embedding": 15.0, "rerank": 3.0}
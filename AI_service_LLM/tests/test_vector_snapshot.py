@@ -0,0 +1,79 @@
+# AI_service_LLM/tests/test_vector_snapshot.py
+
+from __future__ import annotations
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from chatbot.core.vector_snapshot import SnapshotCollection, export_snapshot, load_manifest
+
+
+class _FakeCollection:
+    """chromadb Collection 의 count / get(limit, offset) 만 흉내."""
+
+    def __init__(self, name, embeddings, documents):
+        self.name = name
+        self._embeddings = embeddings
+        self._documents = documents
+
+    def count(self):
+        return len(self._documents)
+
+    def get(self, include, limit, offset):
+        sl = slice(offset, offset + limit)
+        return {
+            "embeddings": self._embeddings[sl],
+            "documents": self._documents[sl],
+            "metadatas": [{"detail_url": f"https://example.com/{d}"} for d in self._documents[sl]],
+        }
+
+
+class _FakeClient:
+    def __init__(self, collections):
+        self._collections = {c.name: c for c in collections}
+
+    def get_collection(self, name):
+        return self._collections[name]
+
+
+def _export(tmp_path, monkeypatch, n=25, dim=8):
+    from chatbot.core import vector_snapshot
+
+    # 배치 경계를 넘나드는 내보내기도 확인
+    monkeypatch.setattr(vector_snapshot, "EXPORT_BATCH_SIZE", 10)
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(n, dim)).astype(np.float32) * 3  # 정규화 안 된 입력
+    documents = [f"doc-{i}" for i in range(n)]
+    client = _FakeClient([_FakeCollection("disease", embeddings, documents)])
+    manifest = export_snapshot(client, ["disease"], str(tmp_path))
+    return embeddings, manifest
+
+
+def test_export_writes_normalized_mmap_snapshot(tmp_path, monkeypatch):
+    _, manifest = _export(tmp_path, monkeypatch)
+
+    assert manifest["collections"] == {"disease": {"count": 25, "dim": 8}}
+    assert load_manifest(str(tmp_path))["collections"] == manifest["collections"]
+
+    col = SnapshotCollection(str(tmp_path), "disease")
+    assert isinstance(col.embeddings, np.memmap)
+    assert not col.embeddings.flags.writeable
+    assert np.allclose(np.linalg.norm(col.embeddings, axis=1), 1.0, atol=1e-5)
+
+
+def test_query_matches_bruteforce_cosine_and_chroma_shape(tmp_path, monkeypatch):
+    embeddings, _ = _export(tmp_path, monkeypatch)
+    col = SnapshotCollection(str(tmp_path), "disease")
+
+    q = embeddings[7] + 0.01
+    normed = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    expected = list(np.argsort(-(normed @ (q / np.linalg.norm(q))))[:5])
+
+    res = col.query(query_embeddings=[q.tolist()], n_results=5, include=["documents", "metadatas"])
+
+    assert res["documents"][0] == [f"doc-{i}" for i in expected]
+    assert res["documents"][0][0] == "doc-7"
+    assert res["metadatas"][0][0] == {"detail_url": "https://example.com/doc-7"}
+    # n_results 가 문서 수보다 커도 전체만 반환
+    assert len(col.query(query_embeddings=[q.tolist()], n_results=100)["documents"][0]) == 25
@@ -8,6 +8,7 @@ from dotenv import load_dotenv
 
 from database import Base, engine
 from api.ocr import router as ocr_router
+from core.llm_gateway import get_gateway
 
 load_dotenv()
 
@@ -49,6 +50,13 @@ def home():
     return {"message": "MediNote OCR Service 연결 성공 🚀"}
 
 
+@app.get("/health/llm")
+def health_llm():
+    """GPT 호출 게이트웨이 현황 (대기열/shed/재시도 + caller별 토큰·비용)"""
+    gateway = get_gateway()
+    return {"gateway": gateway.get_stats(), "usage": gateway.get_usage_stats()}
+
+
 # ================================
 # OCR 라우터 등록
 # ================================
@@ -11,3 +11,7 @@ OCR_UPLOAD_DIR = os.getenv("OCR_UPLOAD_DIR", "uploads/ocr")
 
 # GPT 모델
 OCR_GPT_MODEL = os.getenv("OCR_GPT_MODEL", "gpt-4o-mini")
+
+# OpenAI 호환 엔드포인트 (부하 테스트용 openai_mock 등). 비우면 OpenAI 기본값
+# (빈 문자열이면 SDK 가 환경변수를 다시 읽어 "" 를 쓰므로 None 대신 명시적 기본값)
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or "https://api.openai.com/v1"
@@ -8,7 +8,8 @@ from typing import Dict, Any
 from dotenv import load_dotenv
 from openai import OpenAI
 
-from .config import OCR_GPT_MODEL
+from .config import OCR_GPT_MODEL, OPENAI_BASE_URL
+from .llm_gateway import estimate_tokens, get_gateway
 
 load_dotenv()
 
@@ -20,6 +21,7 @@ _client: OpenAI | None = None
 print("[GPT] ===== gpt_client.py loaded =====")
 print(f"[GPT] OPENAI_API_KEY loaded: {bool(OPENAI_API_KEY)}")
 print(f"[GPT] OCR_GPT_MODEL: {OCR_GPT_MODEL}")
+print(f"[GPT] OPENAI_BASE_URL: {OPENAI_BASE_URL}")
 print("=======================================")
 
 
@@ -28,7 +30,8 @@ def get_client() -> OpenAI:
     if _client is None:
         if not OPENAI_API_KEY:
             raise RuntimeError("OPENAI_API_KEY 환경변수가 설정되지 않았습니다.")
-        _client = OpenAI(api_key=OPENAI_API_KEY)
+        # 재시도는 llm_gateway 에서 한 번만 (SDK 재시도와 겹치지 않게)
+        _client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL, max_retries=0)
     return _client
 
 
@@ -83,14 +86,21 @@ def parse_visit_form_from_ocr(text: str) -> Dict[str, Any]:
     print("[GPT][VISIT] input head:")
     print(text[:500])
 
-    resp = client.chat.completions.create(
+    messages = [
+        {"role": "system", "content": VISIT_SYSTEM_PROMPT},
+        {"role": "user", "content": text},
+    ]
+    resp = get_gateway().call(
+        caller="ocr.visit",
         model=OCR_GPT_MODEL,
-        temperature=0.1,
-        response_format={"type": "json_object"},
-        messages=[
-            {"role": "system", "content": VISIT_SYSTEM_PROMPT},
-            {"role": "user", "content": text},
-        ],
+        fn=lambda timeout: client.chat.completions.create(
+            model=OCR_GPT_MODEL,
+            temperature=0.1,
+            response_format={"type": "json_object"},
+            messages=messages,
+            timeout=timeout,
+        ),
+        est_tokens=estimate_tokens(messages),
     )
 
     content = resp.choices[0].message.content or "{}"
@@ -202,14 +212,21 @@ def parse_prescription_form_from_ocr(text: str) -> Dict[str, Any]:
     print("[GPT][PRESC] input head:")
     print(text[:500])
 
-    resp = client.chat.completions.create(
+    messages = [
+        {"role": "system", "content": PRESCRIPTION_SYSTEM_PROMPT},
+        {"role": "user", "content": text},
+    ]
+    resp = get_gateway().call(
+        caller="ocr.prescription",
         model=OCR_GPT_MODEL,
-        temperature=0.1,
-        response_format={"type": "json_object"},
-        messages=[
-            {"role": "system", "content": PRESCRIPTION_SYSTEM_PROMPT},
-            {"role": "user", "content": text},
-        ],
+        fn=lambda timeout: client.chat.completions.create(
+            model=OCR_GPT_MODEL,
+            temperature=0.1,
+            response_format={"type": "json_object"},
+            messages=messages,
+            timeout=timeout,
+        ),
+        est_tokens=estimate_tokens(messages),
     )
 
     content = resp.choices[0].message.content or "{}"
@@ -0,0 +1,506 @@
+# llm_gateway.py
+#
+# ⚠️ AI_service_LLM/chatbot/core, AI_service_ocr/core, AI_service_stt/core 에
+#    같은 파일이 복사되어 있다 (서비스별 Docker 빌드 컨텍스트가 분리되어 있음).
+#    수정할 때는 세 파일을 함께 바꿀 것 (AI_service_LLM/tests/test_llm_gateway.py 가 동일 여부를 확인).
+
+"""
+OpenAI 호출 공통 게이트웨이 (프로세스 단위).
+
+- 모델별 token bucket: 분당 요청 수(RPM) / 분당 토큰 수(TPM)를 미리 나눠 쓰고,
+  deadline 안에 토큰을 못 받으면 보내기 전에 포기한다.
+- 429 / 5xx / 연결 오류는 지수 백오프 + full jitter 로 재시도 (Retry-After 헤더 우선).
+- 호출마다 deadline 을 두고 남은 시간을 SDK timeout 으로 그대로 넘긴다.
+- 동시 실행 수 제한 + 대기열 상한: 대기열이 가득 차면 기다리지 않고 GatewayOverloaded (load shedding).
+- 429 를 받으면 동시 실행 한도를 절반으로 줄이고, 성공할 때마다 조금씩 늘린다 (AIMD backpressure).
+- caller / model 별 호출 수 · 토큰 · 비용(USD) 누적 → get_usage_stats()
+
+사용 예:
+    resp = get_gateway().call(
+        caller="ocr.visit",
+        model="gpt-4o-mini",
+        fn=lambda timeout: client.chat.completions.create(..., timeout=timeout),
+        est_tokens=estimate_tokens(messages, max_tokens=1000),
+    )
+
+    # 스트리밍: 슬롯은 스트림을 다 읽을 때까지 유지
+    for chunk in get_gateway().stream(..., fn=lambda timeout: client.chat.completions.create(
+        ..., stream=True, stream_options={"include_usage": True}, timeout=timeout,
+    )):
+        ...
+
+SDK 자체 재시도와 겹치지 않도록 OpenAI 클라이언트는 max_retries=0 으로 만든다.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+# =========================================================
+# 설정 (환경변수)
+# =========================================================
+
+# uvicorn 워커 수: 모델별 한도는 서비스 전체 기준으로 받고 워커 수로 나눠서 쓴다
+WEB_CONCURRENCY = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+
+# 호출 1건의 전체 deadline (재시도·대기 포함, 초)
+LLM_GATEWAY_TIMEOUT_S = float(os.getenv("LLM_GATEWAY_TIMEOUT_S", "60"))
+LLM_GATEWAY_MAX_RETRIES = int(os.getenv("LLM_GATEWAY_MAX_RETRIES", "3"))
+LLM_GATEWAY_BACKOFF_BASE_S = float(os.getenv("LLM_GATEWAY_BACKOFF_BASE_S", "0.5"))
+LLM_GATEWAY_BACKOFF_MAX_S = float(os.getenv("LLM_GATEWAY_BACKOFF_MAX_S", "8"))
+
+# 동시에 OpenAI 로 나가는 요청 수 / 그 뒤에서 기다릴 수 있는 요청 수 (워커당)
+LLM_GATEWAY_MAX_CONCURRENCY = int(os.getenv("LLM_GATEWAY_MAX_CONCURRENCY", "16"))
+LLM_GATEWAY_MAX_QUEUE = int(os.getenv("LLM_GATEWAY_MAX_QUEUE", "64"))
+
+# "gpt-4o-mini=5000:2000000,text-embedding-3-large=3000:1000000" (모델=RPM:TPM, 서비스 전체 기준)
+# 지정하지 않은 모델은 rate limit 없이 동시 실행 수 제한만 적용
+LLM_GATEWAY_LIMITS = os.getenv("LLM_GATEWAY_LIMITS", "")
+
+# "gpt-4o-mini=0.15:0.60" (모델=입력:출력, 1M 토큰당 USD) - 기본 단가를 덮어쓴다
+LLM_GATEWAY_PRICES = os.getenv("LLM_GATEWAY_PRICES", "")
+
+DEFAULT_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "text-embedding-3-large": (0.13, 0.0),
+    "text-embedding-3-small": (0.02, 0.0),
+}
+
+
+def _parse_model_pairs(spec: str) -> Dict[str, Tuple[float, float]]:
+    """'model=a:b,model2=c:d' → {model: (a, b)} (형식이 틀린 항목은 무시)"""
+    result: Dict[str, Tuple[float, float]] = {}
+    for item in (spec or "").split(","):
+        item = item.strip()
+        if not item or "=" not in item:
+            continue
+        model, _, values = item.partition("=")
+        first, _, second = values.partition(":")
+        try:
+            result[model.strip()] = (float(first), float(second or 0))
+        except ValueError:
+            print(f"[LLM GATEWAY] 설정 무시: {item!r}")
+    return result
+
+
+def _match_model(table: Dict[str, T], model: str) -> Optional[T]:
+    """
+    정확히 일치하는 키 → 없으면 가장 긴 prefix 키.
+    (응답 모델명이 'gpt-4o-mini-2024-07-18' 처럼 날짜가 붙어서 오는 경우)
+    """
+    if model in table:
+        return table[model]
+    candidates = [k for k in table if model.startswith(k)]
+    if not candidates:
+        return None
+    return table[max(candidates, key=len)]
+
+
+# =========================================================
+# 예외
+# =========================================================
+
+class GatewayError(RuntimeError):
+    """게이트웨이가 요청을 보내지 않고 거절한 경우의 공통 부모."""
+
+
+class GatewayOverloaded(GatewayError):
+    """대기열이 가득 찼거나 rate limit 때문에 deadline 안에 보낼 수 없는 경우 (즉시 거절)."""
+
+
+class GatewayTimeout(GatewayError):
+    """재시도/대기 중 호출 deadline 을 넘긴 경우."""
+
+
+# =========================================================
+# Token bucket / 동시 실행 제한
+# =========================================================
+
+class TokenBucket:
+    """분당 per_minute 만큼 채워지는 버킷 (최대 1분치까지 burst 허용)."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._cond = threading.Condition()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount: float, deadline: float) -> bool:
+        """deadline 전에 amount 만큼 꺼낼 수 있으면 True. 기다려도 안 되면 기다리지 않고 False."""
+        amount = min(float(amount), self.capacity)
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return True
+                wait = (amount - self.tokens) / self.rate
+                if now + wait > deadline:
+                    return False
+                self._cond.wait(timeout=wait)
+
+
+class AdaptiveLimiter:
+    """
+    동시 실행 수 제한 (AIMD).
+    - 429 → limit 절반 (최소 1)
+    - 성공 → limit += 1/limit (최대 max_concurrency)
+    - 빈 자리가 없고 대기열도 max_queue 만큼 차 있으면 즉시 GatewayOverloaded
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.max_queue = max(0, int(max_queue))
+        self.limit = float(self.max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        self._cond = threading.Condition()
+
+    def _has_slot(self) -> bool:
+        return self.in_flight < max(1, int(self.limit))
+
+    def acquire(self, deadline: float) -> None:
+        with self._cond:
+            if not self._has_slot() and self.waiting >= self.max_queue:
+                raise GatewayOverloaded(
+                    f"LLM 대기열 포화 (in_flight={self.in_flight}, waiting={self.waiting})"
+                )
+            self.waiting += 1
+            try:
+                while not self._has_slot():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise GatewayTimeout("LLM 대기열에서 deadline 초과")
+                    self._cond.wait(timeout=remaining)
+                self.in_flight += 1
+            finally:
+                self.waiting -= 1
+
+    def release(self, throttled: bool = False) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(1.0, self.limit / 2)
+            else:
+                self.limit = min(float(self.max_concurrency), self.limit + 1.0 / max(self.limit, 1.0))
+            self._cond.notify_all()
+
+
+# =========================================================
+# 에러 분류 / 백오프
+# =========================================================
+
+def _status_of(exc: BaseException) -> Optional[int]:
+    status = getattr(exc, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """429 / 5xx / 연결 끊김 / SDK timeout 만 재시도 (4xx 는 다시 보내도 같은 결과)."""
+    status = _status_of(exc)
+    if status is not None:
+        return status == 429 or status >= 500
+    name = type(exc).__name__
+    return name in ("APIConnectionError", "APITimeoutError") or isinstance(exc, (ConnectionError, TimeoutError))
+
+
+def _retry_after_s(exc: BaseException) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def backoff_delay(attempt: int, exc: Optional[BaseException] = None) -> float:
+    """full jitter: uniform(0, min(cap, base * 2^attempt)). Retry-After 가 있으면 그 값이 하한."""
+    ceiling = min(LLM_GATEWAY_BACKOFF_MAX_S, LLM_GATEWAY_BACKOFF_BASE_S * (2 ** attempt))
+    delay = random.uniform(0, ceiling)
+    retry_after = _retry_after_s(exc) if exc is not None else None
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, LLM_GATEWAY_BACKOFF_MAX_S))
+    return delay
+
+
+def estimate_tokens(messages: Iterable[Any], max_tokens: Optional[int] = None) -> int:
+    """
+    token bucket 차감용 대략치 (tiktoken 없이).
+    한국어 위주라 글자 2개 ≈ 1토큰으로 잡고, 출력 토큰 상한(max_tokens, 없으면 512)을 더한다.
+    messages 는 chat messages(dict) 또는 임베딩 입력 문자열 목록.
+    """
+    chars = 0
+    for m in messages:
+        content = m.get("content", "") if isinstance(m, dict) else m
+        chars += len(str(content or ""))
+    return chars // 2 + (512 if max_tokens is None else int(max_tokens))
+
+
+# =========================================================
+# 게이트웨이
+# =========================================================
+
+class LLMGateway:
+    def __init__(
+        self,
+        limits: Optional[Dict[str, Tuple[float, float]]] = None,
+        prices: Optional[Dict[str, Tuple[float, float]]] = None,
+        max_concurrency: int = LLM_GATEWAY_MAX_CONCURRENCY,
+        max_queue: int = LLM_GATEWAY_MAX_QUEUE,
+        timeout_s: float = LLM_GATEWAY_TIMEOUT_S,
+        max_retries: int = LLM_GATEWAY_MAX_RETRIES,
+    ):
+        self.timeout_s = timeout_s
+        self.max_retries = max_retries
+        self.limiter = AdaptiveLimiter(max_concurrency, max_queue)
+        self.prices = dict(prices if prices is not None else DEFAULT_PRICES)
+
+        # model → (요청 버킷, 토큰 버킷)
+        self._buckets: Dict[str, Tuple[TokenBucket, TokenBucket]] = {
+            model: (TokenBucket(max(1.0, rpm)), TokenBucket(max(1.0, tpm)))
+            for model, (rpm, tpm) in (limits or {}).items()
+        }
+
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {"shed": 0, "timeouts": 0, "retries": 0}
+        # (caller, model) → 누적 사용량
+        self._usage: Dict[Tuple[str, str], Dict[str, float]] = {}
+
+    # ---------------------------------------------------------
+    # 내부 기록
+    # ---------------------------------------------------------
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._counters[key] += 1
+
+    def _usage_entry(self, caller: str, model: str) -> Dict[str, float]:
+        return self._usage.setdefault(
+            (caller, model),
+            {"calls": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0},
+        )
+
+    def cost_usd(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        price = _match_model(self.prices, model)
+        if price is None:
+            return 0.0
+        return (prompt_tokens * price[0] + completion_tokens * price[1]) / 1_000_000
+
+    def _record_success(self, caller: str, model: str, resp: Any) -> None:
+        usage = getattr(resp, "usage", None)
+        prompt_tokens = int(getattr(usage, "prompt_tokens", 0) or 0)
+        completion_tokens = int(getattr(usage, "completion_tokens", 0) or 0)
+        cost = self.cost_usd(getattr(resp, "model", None) or model, prompt_tokens, completion_tokens)
+        with self._lock:
+            entry = self._usage_entry(caller, model)
+            entry["calls"] += 1
+            entry["prompt_tokens"] += prompt_tokens
+            entry["completion_tokens"] += completion_tokens
+            entry["cost_usd"] += cost
+
+    def _record_error(self, caller: str, model: str) -> None:
+        with self._lock:
+            self._usage_entry(caller, model)["errors"] += 1
+
+    def _shed(self, message: str) -> GatewayOverloaded:
+        self._count("shed")
+        print(f"[LLM GATEWAY] shed: {message}")
+        return GatewayOverloaded(message)
+
+    # ---------------------------------------------------------
+    # 호출
+    # ---------------------------------------------------------
+
+    def call(
+        self,
+        caller: str,
+        model: str,
+        fn: Callable[[float], T],
+        est_tokens: int = 0,
+        timeout_s: Optional[float] = None,
+    ) -> T:
+        """
+        fn(timeout) 를 rate limit / 동시 실행 제한 / 재시도 아래에서 실행.
+        fn 은 넘겨받은 timeout(남은 시간, 초)을 SDK 호출의 timeout 으로 써야 한다.
+
+        - 재시도할 수 없는 오류 / 재시도 소진 → 마지막 예외를 그대로 raise
+        - 보내기 전에 포기 → GatewayOverloaded, deadline 초과 → GatewayTimeout
+        """
+        resp = self._run_holding_slot(caller, model, fn, est_tokens, timeout_s)
+        self.limiter.release()
+        self._record_success(caller, model, resp)
+        return resp
+
+    def stream(
+        self,
+        caller: str,
+        model: str,
+        fn: Callable[[float], Iterable[Any]],
+        est_tokens: int = 0,
+        timeout_s: Optional[float] = None,
+    ) -> Iterator[Any]:
+        """
+        스트리밍 호출 (stream=True). fn(timeout) 은 chunk iterable 을 반환해야 한다.
+
+        - 연결(응답 헤더)까지는 call() 과 같은 rate limit / 재시도 / shed 적용
+          (첫 chunk 이후 끊기면 재시도하지 않고 예외를 그대로 올림)
+        - 동시 실행 슬롯은 스트림을 끝까지 읽거나 닫을 때까지 유지
+        - 토큰 / 비용은 usage 가 실린 chunk (stream_options={"include_usage": True}) 로 집계
+        """
+        chunks = self._run_holding_slot(caller, model, fn, est_tokens, timeout_s)
+        last: Any = None
+        failed = False
+        try:
+            for chunk in chunks:
+                if getattr(chunk, "usage", None) is not None:
+                    last = chunk
+                yield chunk
+        except Exception:
+            failed = True
+            raise
+        finally:
+            close = getattr(chunks, "close", None)
+            if callable(close):
+                close()
+            self.limiter.release()
+            if failed:
+                self._record_error(caller, model)
+            else:
+                self._record_success(caller, model, last)
+
+    def _run_holding_slot(
+        self,
+        caller: str,
+        model: str,
+        fn: Callable[[float], T],
+        est_tokens: int,
+        timeout_s: Optional[float],
+    ) -> T:
+        """
+        call() / stream() 공통 재시도 루프.
+        성공하면 동시 실행 슬롯을 잡은 채로 반환하므로 호출부에서 limiter.release() 해야 한다.
+        """
+        deadline = time.monotonic() + (timeout_s if timeout_s is not None else self.timeout_s)
+        buckets = _match_model(self._buckets, model)
+        attempt = 0
+
+        while True:
+            if buckets is not None:
+                requests_bucket, tokens_bucket = buckets
+                if not requests_bucket.acquire(1, deadline) or not tokens_bucket.acquire(est_tokens, deadline):
+                    raise self._shed(f"{model} rate limit 대기가 deadline 을 넘음 (caller={caller})")
+
+            try:
+                self.limiter.acquire(deadline)
+            except GatewayOverloaded as e:
+                raise self._shed(f"{e} (caller={caller})")
+            except GatewayTimeout:
+                self._count("timeouts")
+                raise
+
+            try:
+                return fn(max(0.1, deadline - time.monotonic()))
+            except Exception as e:
+                error = e
+                self.limiter.release(throttled=_status_of(error) == 429)
+
+            self._record_error(caller, model)
+            if not is_retryable(error) or attempt >= self.max_retries:
+                raise error
+
+            delay = backoff_delay(attempt, error)
+            if time.monotonic() + delay >= deadline:
+                self._count("timeouts")
+                raise GatewayTimeout(
+                    f"{model} 재시도 중 deadline 초과 (caller={caller}, attempt={attempt + 1})"
+                ) from error
+
+            attempt += 1
+            self._count("retries")
+            print(
+                f"[LLM GATEWAY] retry caller={caller} model={model} attempt={attempt} "
+                f"status={_status_of(error)} delay={delay:.2f}s error={type(error).__name__}"
+            )
+            time.sleep(delay)
+
+    # ---------------------------------------------------------
+    # 통계
+    # ---------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, float]:
+        """대기열 / 동시 실행 / shed 현황 (health, /metrics gauge 용)."""
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            "in_flight": self.limiter.in_flight,
+            "waiting": self.limiter.waiting,
+            "concurrency_limit": round(self.limiter.limit, 2),
+            "max_concurrency": self.limiter.max_concurrency,
+            "max_queue": self.limiter.max_queue,
+            **counters,
+        }
+
+    def get_usage_stats(self) -> List[Dict[str, Any]]:
+        """caller / model 별 누적 호출 수 · 오류 수 · 토큰 · 비용."""
+        with self._lock:
+            items = sorted((k, dict(v)) for k, v in self._usage.items())
+        return [
+            {
+                "caller": caller,
+                "model": model,
+                "calls": int(v["calls"]),
+                "errors": int(v["errors"]),
+                "prompt_tokens": int(v["prompt_tokens"]),
+                "completion_tokens": int(v["completion_tokens"]),
+                "cost_usd": round(v["cost_usd"], 6),
+            }
+            for (caller, model), v in items
+        ]
+
+
+# =========================================================
+# 프로세스 싱글톤
+# =========================================================
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def _build_default_gateway() -> LLMGateway:
+    limits = {
+        model: (rpm / WEB_CONCURRENCY, tpm / WEB_CONCURRENCY)
+        for model, (rpm, tpm) in _parse_model_pairs(LLM_GATEWAY_LIMITS).items()
+    }
+    prices = dict(DEFAULT_PRICES)
+    prices.update(_parse_model_pairs(LLM_GATEWAY_PRICES))
+    print(
+        f"[LLM GATEWAY] concurrency={LLM_GATEWAY_MAX_CONCURRENCY} queue={LLM_GATEWAY_MAX_QUEUE} "
+        f"timeout={LLM_GATEWAY_TIMEOUT_S}s retries={LLM_GATEWAY_MAX_RETRIES} limits={limits or '-'}"
+    )
+    return LLMGateway(limits=limits, prices=prices)
+
+
+def get_gateway() -> LLMGateway:
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = _build_default_gateway()
+    return _gateway
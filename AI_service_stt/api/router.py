@@ -1,163 +1,272 @@
 """
 STT Processing Router
-백그라운드로 STT 처리 + 요약 생성 + 백엔드로 결과 전송
+업로드 파일을 저장하고 작업 큐(stt_job)에 등록 → 워커 풀이 STT + 요약 + 백엔드 전송 처리
 """
+import asyncio
+import json
 import os
-import time
-import tempfile
+import uuid
 from pathlib import Path
-from fastapi import APIRouter, UploadFile, File, Form, BackgroundTasks, HTTPException
-from datetime import datetime
-import httpx
+from fastapi import APIRouter, HTTPException, Request, WebSocket
 
-from core.engine.openai_engine import OpenAIWhisperSTT
-from core.summarize import generate_summary
+from core.engine.openai_engine import MAX_UPLOAD_SIZE
+from core.job_queue import STT_UPLOAD_DIR, JobWorkerPool, enqueue, queue_stats
+from core.upload import InvalidUpload, UploadTooLarge, check_content_length, receive_upload
+from core.streaming import StreamingSession, get_stream_engine
+from core.stt_pipeline import (
+    cached_stage, error_payload, lookup_cache, on_give_up, run_job, summary_payload,
+)
 
 router = APIRouter(prefix="/stt", tags=["STT"])
 
-# STT 엔진 (OpenAI Whisper API)
-stt_engine = OpenAIWhisperSTT(model="whisper-1")
+# 작업 큐 워커 풀 (app.py startup / shutdown 에서 start / stop)
+worker_pool = JobWorkerPool(handler=run_job, on_give_up=on_give_up)
 
-# 백엔드 URL (환경 변수로 관리 가능)
-BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
 
-
-def process_stt_task(stt_id: str, file_path: str):
+@router.post("/process")
+async def process_stt(request: Request):
     """
-    백그라운드에서 실행되는 STT 처리 함수
-    처리 완료 후 백엔드로 결과 POST
+    백엔드에서 호출하는 STT 처리 엔드포인트
+
+    백엔드가 이미 stt_id를 생성하고 DB에 pending 상태로 저장한 후,
+    이 엔드포인트로 stt_id + 파일을 전송합니다.
+    본문은 FastAPI 폼 파라미터로 받지 않고 (그러면 본문 전체를 spool 한 뒤에야 핸들러가 실행됨)
+    core/upload.receive_upload 로 읽으면서 바로 STT_UPLOAD_DIR 에 저장하므로
+    크기 제한이 읽는 도중에 걸리고, 작업 큐에 넣기만 하고 바로 응답합니다.
+
+    multipart/form-data 필드:
+        stt_id: 백엔드에서 생성한 STT 작업 ID
+        file: 업로드된 오디오 파일
+        sha256: (선택) 백엔드가 계산한 파일 해시. 주면 저장한 파일과 비교
+        user_id: (선택) 작업 소유자. stt_job.user_id 에 저장 (stt_id 에서는 알 수 없음)
 
-    Args:
-        stt_id: STT 작업 ID (백엔드에서 생성)
-        file_path: 임시 저장된 오디오 파일 경로
+    Returns:
+        {"message": "STT processing queued", "stt_id": stt_id, "size": ..., "sha256": ...,
+         "cached": 캐시 적중 여부}
     """
+    part_path = os.path.join(STT_UPLOAD_DIR, f"upload_{uuid.uuid4().hex}.part")
+    file_path = None
     try:
-        total_start = time.time()
-        print(f"🎙️ [{stt_id}] STT 처리 시작...")
-
-        # 1. STT 처리
-        stt_start = time.time()
-        result = stt_engine.transcribe(file_path)
-        transcript_text = result.get("text", "")
-        stt_time = time.time() - stt_start
-
-        print(f"✅ [{stt_id}] STT 완료 ({stt_time:.1f}초): {len(transcript_text)} 글자")
-
-        # 2. 요약 생성
-        if transcript_text.strip():
-            print(f"🤖 [{stt_id}] 요약 생성 중...")
-            summary_start = time.time()
-            summary_result = generate_summary(transcript_text)
-            summary_time = time.time() - summary_start
-            print(f"✅ [{stt_id}] 요약 완료 ({summary_time:.1f}초)")
-
-            # 3. 백엔드로 결과 POST
-            print(f"📤 [{stt_id}] 백엔드로 결과 전송 중...")
-
-            with httpx.Client(timeout=30.0) as client:
-                response = client.post(
-                    f"{BACKEND_URL}/stt/{stt_id}/result",
-                    json={
-                        "status": "done",
-                        "symptoms": summary_result["symptoms"],
-                        "diagnosis": summary_result["diagnosis"],
-                        "notes": summary_result["notes"],
-                        "date": datetime.now().strftime("%Y-%m-%d")
-                    }
-                )
-
-                if response.status_code == 200:
-                    total_time = time.time() - total_start
-                    print(f"✅ [{stt_id}] 백엔드 업데이트 성공")
-                    print(f"⏱️ [{stt_id}] 전체 처리 완료: {total_time:.1f}초")
-                else:
-                    print(f"⚠️ [{stt_id}] 백엔드 업데이트 실패: {response.status_code}")
+        check_content_length(request.headers.get("content-length"), MAX_UPLOAD_SIZE)
+
+        # 1. 업로드 디렉터리에 스트리밍 저장 (재시작 후에도 워커가 이어서 처리할 수 있도록)
+        fields, filename, size, digest = await receive_upload(request, part_path, MAX_UPLOAD_SIZE)
+        stt_id = fields.get("stt_id")
+        if not stt_id:
+            os.remove(part_path)
+            raise HTTPException(status_code=422, detail="stt_id is required")
+        user_id = fields.get("user_id")
+        if user_id is not None and not user_id.isdigit():
+            os.remove(part_path)
+            raise HTTPException(status_code=422, detail="user_id must be an integer")
+
+        suffix = Path(filename).suffix if filename else ".mp3"
+        file_path = os.path.join(STT_UPLOAD_DIR, f"{Path(stt_id).name}{suffix}")
+        os.replace(part_path, file_path)
+
+        sha256 = fields.get("sha256")
+        if sha256 and sha256.lower() != digest:
+            os.remove(file_path)
+            raise HTTPException(status_code=400, detail="File hash mismatch")
+
+        print(f"📁 [{stt_id}] 파일 저장: {file_path} ({size} bytes, sha256={digest[:12]})")
 
+        # 2. 같은 녹음의 이전 결과가 있으면 STT / 요약 없이 전송 단계만 큐에 넣는다
+        #    (콜백 재시도는 큐가 그대로 맡는다)
+        #    DB 조회 / 등록은 블로킹이라 스레드에서 (이벤트 루프를 막지 않도록)
+        cached = await asyncio.to_thread(lookup_cache, digest)
+        if cached:
+            stage, results = cached_stage(cached)
+            print(f"♻️ [{stt_id}] 캐시 적중 → {stage} 단계부터")
+            os.remove(file_path)
+            file_path = None
         else:
-            print(f"⚠️ [{stt_id}] 텍스트가 비어있어 요약 생략")
+            stage, results = "transcribe", {}
 
-            # 빈 텍스트도 백엔드에 알림
-            with httpx.Client(timeout=30.0) as client:
-                client.post(
-                    f"{BACKEND_URL}/stt/{stt_id}/result",
-                    json={
-                        "status": "error",
-                        "symptoms": "",
-                        "diagnosis": "",
-                        "notes": "음성 인식 실패 (빈 텍스트)",
-                        "date": datetime.now().strftime("%Y-%m-%d")
-                    }
-                )
+        # 3. 작업 큐 등록
+        await asyncio.to_thread(
+            enqueue, stt_id, file_path, user_id=int(user_id) if user_id else None,
+            audio_sha256=digest, audio_bytes=size, stage=stage, **results,
+        )
+        worker_pool.notify()
+
+        return {
+            "message": "STT processing queued",
+            "stt_id": stt_id,
+            "size": size,
+            "sha256": digest,
+            "cached": stage != "transcribe",
+        }
 
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidUpload as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"❌ [{stt_id}] 처리 실패: {e}")
+        for path in (part_path, file_path):
+            if path and os.path.exists(path):
+                os.remove(path)
+        raise HTTPException(status_code=500, detail=f"File upload failed: {str(e)}")
 
-        # 에러 발생 시 백엔드에 알림
-        try:
-            with httpx.Client(timeout=30.0) as client:
-                client.post(
-                    f"{BACKEND_URL}/stt/{stt_id}/result",
-                    json={
-                        "status": "error",
-                        "symptoms": "",
-                        "diagnosis": "",
-                        "notes": f"STT 처리 중 에러: {str(e)}",
-                        "date": datetime.now().strftime("%Y-%m-%d")
-                    }
-                )
-        except:
-            pass
 
-    finally:
-        # 4. 임시 파일 삭제
-        try:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-                print(f"🗑️ [{stt_id}] 임시 파일 삭제 완료")
-        except Exception as e:
-            print(f"⚠️ [{stt_id}] 임시 파일 삭제 실패: {e}")
+@router.websocket("/stream/{stt_id}")
+async def stream_stt(websocket: WebSocket, stt_id: str):
+    """
+    실시간 스트리밍 STT (녹음 중 오디오 프레임 수신 → 중간 결과 전송, core/streaming.py)
 
+    클라이언트 → 서버
+        (선택) {"type": "start", "sample_rate": 16000}   첫 메시지. 기본 16000
+        binary                                          16-bit little-endian mono PCM 프레임
+        {"type": "stop"}                                녹음 종료
+    서버 → 클라이언트
+        {"type": "ready"}
+        {"type": "partial", "text": ...}                아직 확정되지 않은 구간 (계속 바뀜)
+        {"type": "segment", "index", "start", "end", "text"}   확정된 구간
+        {"type": "final", "text", "summary", "duration", "queued"}
+        {"type": "error", "detail": ...}
 
-@router.post("/process")
-async def process_stt(
-    background_tasks: BackgroundTasks,
-    stt_id: str = Form(...),
-    file: UploadFile = File(...)
-):
+    최종 결과는 작업 큐의 deliver 단계로 등록해 /stt/process 와 같은 백엔드 콜백으로 전달한다.
+    요약이 실패하면 summarize 단계로 등록해 워커가 재시도한다 (queued: true).
+    연결이 끊겨도 그때까지 받은 오디오로 마무리한다.
     """
-    백엔드에서 호출하는 STT 처리 엔드포인트
+    await websocket.accept()
 
-    백엔드가 이미 stt_id를 생성하고 DB에 pending 상태로 저장한 후,
-    이 엔드포인트로 stt_id + 파일을 전송합니다.
+    async def send(event: dict):
+        try:
+            await websocket.send_json(event)
+        except Exception:
+            pass  # 연결이 끊긴 뒤에도 마무리(백엔드 전달)는 계속
 
-    Args:
-        stt_id: 백엔드에서 생성한 STT 작업 ID
-        file: 업로드된 오디오 파일
-        background_tasks: FastAPI BackgroundTasks
+    async def close(code: int = 1000):
+        try:
+            await websocket.close(code=code)
+        except Exception:
+            pass  # 클라이언트가 먼저 끊은 경우
 
-    Returns:
-        {"message": "Processing started", "stt_id": stt_id}
-    """
     try:
-        # 1. 임시 파일로 저장
-        suffix = Path(file.filename).suffix if file.filename else ".mp3"
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
+        engine = await asyncio.to_thread(get_stream_engine)
+    except Exception as e:
+        await send({"type": "error", "detail": f"STT engine unavailable: {e}"})
+        await close(1011)
+        return
+
+    # 1. 첫 메시지: 설정 또는 바로 오디오
+    sample_rate = 16000
+    first = await websocket.receive()
+    if first["type"] == "websocket.disconnect":
+        return
+    if first.get("text"):
+        try:
+            sample_rate = int(json.loads(first["text"]).get("sample_rate", sample_rate))
+        except (ValueError, AttributeError):
+            await send({"type": "error", "detail": "Invalid start message"})
+            await close(1003)
+            return
+    session = StreamingSession(engine, sample_rate=sample_rate)
+    print(f"🎙️ [{stt_id}] 스트리밍 시작 ({sample_rate}Hz)")
+    await send({"type": "ready"})
 
-        print(f"📁 [{stt_id}] 파일 저장: {temp_file_path} ({len(content)} bytes)")
+    # 2. 수신 루프 + 변환 루프 (변환은 스레드에서, 변환 중에도 프레임은 계속 받는다)
+    new_audio = asyncio.Event()
+    stopping = False
 
-        # 2. 백그라운드 작업 시작
-        background_tasks.add_task(process_stt_task, stt_id, temp_file_path)
+    async def pump():
+        while not stopping:
+            await new_audio.wait()
+            new_audio.clear()
+            if not stopping and session.ready():
+                try:
+                    events = await asyncio.to_thread(session.step)
+                except Exception as e:
+                    # 중간 결과 1회 실패는 다음 step 에서 다시 (확정 안 된 오디오는 그대로 남아 있음)
+                    print(f"⚠️ [{stt_id}] 중간 변환 실패: {e}")
+                    continue
+                for event in events:
+                    await send(event)
 
-        return {
-            "message": "STT processing started",
-            "stt_id": stt_id
-        }
+    pump_task = asyncio.create_task(pump())
+    try:
+        if first.get("bytes"):
+            session.add_pcm(first["bytes"])
+            new_audio.set()
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                print(f"⚠️ [{stt_id}] 스트리밍 연결 끊김 → 받은 오디오로 마무리")
+                break
+            if message.get("bytes"):
+                session.add_pcm(message["bytes"])
+                new_audio.set()
+            elif message.get("text"):
+                try:
+                    control = json.loads(message["text"])
+                except ValueError:
+                    control = None
+                if isinstance(control, dict) and control.get("type") == "stop":
+                    break
+    except ValueError as e:
+        await send({"type": "error", "detail": str(e)})
+    finally:
+        stopping = True
+        new_audio.set()
+        await pump_task  # 진행 중인 step 이 끝날 때까지 (finish 와 겹치지 않게)
+
+    if session.duration_s == 0:
+        session.close()
+        await close()
+        return
 
+    # 3. 남은 구간 확정 → 요약 → 작업 큐(deliver) 등록
+    try:
+        for event in await asyncio.to_thread(session.finish):
+            await send(event)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"File upload failed: {str(e)}")
+        # 마지막 구간 변환 실패: 확정된 구간까지만 쓴다
+        print(f"⚠️ [{stt_id}] 마지막 구간 변환 실패: {e}")
+    transcript_text = session.transcript
+    print(
+        f"✅ [{stt_id}] 스트리밍 STT 완료: {session.duration_s:.1f}초 녹음, "
+        f"{len(transcript_text)} 글자 (변환 {session.transcribe_time:.1f}초)"
+    )
+
+    payload = None
+    try:
+        summary_result = await asyncio.to_thread(session.summarize)
+        if summary_result:
+            payload = summary_payload(summary_result)
+        else:
+            # 빈 텍스트도 백엔드에 알림
+            payload = error_payload("음성 인식 실패 (빈 텍스트)")
+        stage, results = "deliver", {"transcript_text": transcript_text, "summary": payload}
+    except Exception as e:
+        print(f"⚠️ [{stt_id}] 요약 실패 → 작업 큐에서 재시도: {e}")
+        stage, results = "summarize", {"transcript_text": transcript_text}
+    finally:
+        session.close()
+
+    await asyncio.to_thread(enqueue, stt_id, None, stage=stage, **results)
+    worker_pool.notify()
+
+    await send({
+        "type": "final",
+        "text": transcript_text,
+        "summary": payload,
+        "duration": round(session.duration_s, 2),
+        "queued": stage != "deliver",
+    })
+    await close()
+
+
+@router.get("/queue")
+def get_queue_stats():
+    """작업 큐 지표 (상태별 작업 수, 대기 중 가장 오래된 작업의 대기 시간 등)"""
+    return {
+        "workers": worker_pool.workers,
+        "in_flight": worker_pool.in_flight(),
+        **queue_stats(),
+    }
 
 
 @router.get("/status")
@@ -4,8 +4,9 @@ STT API Server (port 8002)
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from api.router import router
+from api.router import router, worker_pool
 from core.crud import init_db
+from core.llm_gateway import get_gateway
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -32,11 +33,18 @@ app.include_router(router)
 
 @app.on_event("startup")
 async def startup_event():
-    """서버 시작 시 DB 초기화"""
+    """서버 시작 시 DB 초기화 + 작업 큐 워커 시작"""
     init_db()
+    worker_pool.start()
     print("✅ STT API Server started on port 8002")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """새 작업 가져오기 중단 (처리 중이던 작업은 lease 만료 후 재처리)"""
+    worker_pool.stop()
+
+
 @app.get("/")
 async def root():
     """Health check"""
@@ -51,3 +59,10 @@ async def root():
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy"}
+
+
+@app.get("/health/llm")
+async def health_llm():
+    """요약(GPT) 호출 게이트웨이 현황 (대기열/shed/재시도 + caller별 토큰·비용)"""
+    gateway = get_gateway()
+    return {"gateway": gateway.get_stats(), "usage": gateway.get_usage_stats()}
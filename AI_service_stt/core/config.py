@@ -1,6 +1,7 @@
 """
 STT config
 """
+import os
 from pathlib import Path
 import torch
 
@@ -14,6 +15,13 @@ class STTConfig:
         "accurate": "openai/whisper-large-v3",
     }
 
+    # CTranslate2(faster-whisper) 로컬 모델 - int8 양자화 CPU 추론 (core/engine/ct2_engine.py)
+    CT2_MODELS = {
+        "ct2-fast": "small",
+        "ct2-balanced": "medium",
+        "ct2-accurate": "large-v3",
+    }
+
     # OpenAI API 모델
     API_MODELS = {
         "whisper-1": "whisper-1",
@@ -22,13 +30,25 @@ class STTConfig:
     }
 
     # 전체 모델 (개발 테스트용)
-    ALL_MODELS = {**HF_MODELS, **API_MODELS}
+    ALL_MODELS = {**HF_MODELS, **CT2_MODELS, **API_MODELS}
     MODEL_CHOICES = list(ALL_MODELS.keys())
     DEFAULT_MODEL = "fast"
 
     LANGUAGE = "korean"
     DEVICE = "cuda" if torch.cuda.is_available() else "cpu"  # GPU 자동 감지
 
+    # HF 긴 오디오 배치 추론 (HFWhisperSTT, 엔진 생성자 인자로 덮어쓸 수 있음)
+    HF_CHUNK_LENGTH_S = float(os.getenv("STT_HF_CHUNK_LENGTH_S", "30"))   # Whisper 입력 창 길이
+    HF_STRIDE_LENGTH_S = float(os.getenv("STT_HF_STRIDE_LENGTH_S", "5"))  # 창 양쪽 겹침 (경계 단어 보정)
+    HF_BATCH_SIZE = int(os.getenv("STT_HF_BATCH_SIZE", "8"))              # 한 번에 모델에 넣는 창 수
+    HF_THREADS = int(os.getenv("STT_HF_THREADS", "0"))                    # torch CPU 스레드 (0 = torch 기본값)
+
+    # CTranslate2 추론 설정 (엔진 생성자 인자로 덮어쓸 수 있음)
+    CT2_LANGUAGE = "ko"
+    CT2_COMPUTE_TYPE = os.getenv("STT_CT2_COMPUTE_TYPE", "int8")      # int8 / int8_float32 / float32 (GPU: int8_float16)
+    CT2_CPU_THREADS = int(os.getenv("STT_CT2_THREADS", "0")) or os.cpu_count() or 1
+    CT2_BEAM_SIZE = int(os.getenv("STT_CT2_BEAM_SIZE", "1"))         # 1 = greedy (HF pipeline 기본값과 같음)
+
     # Paths
     AUDIO_DIR = "tests/sample_audio"
     REF_FILE = "tests/reference.txt"
@@ -48,6 +68,8 @@ class STTConfig:
         """모델 경로/이름 반환"""
         if model_name in cls.HF_MODELS:
             return cls.HF_MODELS[model_name]
+        elif model_name in cls.CT2_MODELS:
+            return cls.CT2_MODELS[model_name]
         elif model_name in cls.API_MODELS:
             return cls.API_MODELS[model_name]
         else:
@@ -58,6 +80,11 @@ class STTConfig:
         """API 모델인지 확인"""
         return name in cls.API_MODELS
 
+    @classmethod
+    def is_ct2_model(cls, name):
+        """CTranslate2 로컬 모델인지 확인"""
+        return name in cls.CT2_MODELS
+
     @classmethod
     def get_device(cls):
         """Return device id (cuda -> 0, cpu -> -1)."""
@@ -3,6 +3,7 @@ Database CRUD operations
 """
 import time
 from datetime import datetime
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 from core.models import SessionLocal, STTJob, Base, engine
 
@@ -66,14 +67,38 @@ def get_stt_job(db: Session, stt_id: str) -> STTJob | None:
     return db.query(STTJob).filter(STTJob.stt_id == stt_id).first()
 
 
+# === 스키마 보강 ===
+# create_all 은 이미 있는 테이블에 컬럼을 추가하지 않으므로, 기존 stt_job 테이블에
+# 작업 큐 컬럼(core/job_queue.py)을 덧붙인다.
+STT_JOB_QUEUE_DDL = [
+    "ALTER TABLE stt_job ADD COLUMN IF NOT EXISTS stage VARCHAR",
+    "ALTER TABLE stt_job ADD COLUMN IF NOT EXISTS file_path VARCHAR",
+    "ALTER TABLE stt_job ADD COLUMN IF NOT EXISTS audio_sha256 VARCHAR(64)",
+    "ALTER TABLE stt_job ADD COLUMN IF NOT EXISTS audio_bytes INTEGER",
+    "ALTER TABLE stt_job ADD COLUMN IF NOT EXISTS transcript_text TEXT",
+    "ALTER TABLE stt_job ADD COLUMN IF NOT EXISTS summary JSON",
+    "ALTER TABLE stt_job ADD COLUMN IF NOT EXISTS attempts INTEGER DEFAULT 0",
+    "ALTER TABLE stt_job ADD COLUMN IF NOT EXISTS last_error TEXT",
+    "ALTER TABLE stt_job ADD COLUMN IF NOT EXISTS available_at TIMESTAMPTZ",
+    "ALTER TABLE stt_job ADD COLUMN IF NOT EXISTS locked_by VARCHAR",
+    "ALTER TABLE stt_job ADD COLUMN IF NOT EXISTS locked_until TIMESTAMPTZ",
+    "ALTER TABLE stt_job ADD COLUMN IF NOT EXISTS created_at TIMESTAMPTZ DEFAULT NOW()",
+    "ALTER TABLE stt_job ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW()",
+    # 큐 조회 (status, available_at) / lease 만료 확인용
+    "CREATE INDEX IF NOT EXISTS ix_stt_job_queue ON stt_job (status, available_at)",
+]
+
+
 # === CLI용 함수 (test_cli.py에서 사용) ===
 
 def init_db():
     """
-    DB 초기화 (테이블 생성)
-    PostgreSQL에서는 자동으로 생성되므로 이 함수는 호환성을 위해 유지
+    DB 초기화 (테이블 생성 + 작업 큐 컬럼 보강)
     """
     Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for ddl in STT_JOB_QUEUE_DDL:
+            conn.execute(text(ddl))
     print(f"✅ PostgreSQL tables created")
 
 
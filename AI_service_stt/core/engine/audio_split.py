@@ -0,0 +1,70 @@
+"""
+긴 녹음을 무음(저에너지) 지점에서 나누는 분할기 (pydub AudioSegment 기준)
+
+고정 길이로 자르면 단어 중간이 잘려서 경계마다 인식이 틀어진다.
+목표 길이(target_ms) 근처 ±search_ms 안에서 quiet_ms 동안 RMS 평균이 가장 낮은 구간을 찾아
+그 구간 가운데에서 자른다. 절대 임계값을 쓰지 않으므로 녹음 볼륨/배경 소음과 상관없이
+"주변에서 가장 조용한 곳" 을 고른다.
+"""
+from typing import List, Tuple
+
+from pydub import AudioSegment
+
+
+def energy_profile(audio: AudioSegment, window_ms: int) -> List[int]:
+    """window_ms 단위 RMS 목록"""
+    return [audio[i:i + window_ms].rms for i in range(0, len(audio), window_ms)]
+
+
+def find_split_points(
+    audio: AudioSegment,
+    target_ms: int,
+    search_ms: int,
+    window_ms: int = 100,
+    quiet_ms: int = 400,
+) -> List[int]:
+    """
+    자를 위치(ms) 목록. 남은 길이가 target_ms + search_ms 이하면 더 자르지 않는다
+    (마지막 청크가 아주 짧아지지 않도록).
+    """
+    total = len(audio)
+    if total <= target_ms + search_ms:
+        return []
+
+    profile = energy_profile(audio, window_ms)
+    span = max(1, quiet_ms // window_ms)
+
+    # rolling[i] = profile[i:i+span] 평균 (prefix sum)
+    prefix = [0]
+    for value in profile:
+        prefix.append(prefix[-1] + value)
+    rolling = [
+        (prefix[min(i + span, len(profile))] - prefix[i]) / max(1, min(span, len(profile) - i))
+        for i in range(len(profile))
+    ]
+
+    points: List[int] = []
+    start = 0
+    while total - start > target_ms + search_ms:
+        target = start + target_ms
+        lo = max(target - search_ms, start + window_ms) // window_ms
+        hi = max(lo + 1, min(target + search_ms, total) // window_ms)
+        # 가장 조용한 곳, 같으면 목표 길이에 가까운 곳
+        best = min(
+            range(lo, min(hi, len(rolling))),
+            key=lambda i: (rolling[i], abs(i * window_ms - target)),
+        )
+        cut = best * window_ms + (span * window_ms) // 2
+        points.append(cut)
+        start = cut
+    return points
+
+
+def split_audio(
+    audio: AudioSegment,
+    target_ms: int,
+    search_ms: int,
+) -> List[Tuple[int, AudioSegment]]:
+    """[(시작 ms, 청크)] 목록. 짧은 오디오는 통째로 1개"""
+    bounds = [0] + find_split_points(audio, target_ms, search_ms) + [len(audio)]
+    return [(start, audio[start:end]) for start, end in zip(bounds, bounds[1:])]
@@ -0,0 +1,74 @@
+"""
+작업 큐 워커들의 transcribe() 호출을 모아 한 번에 처리하는 래퍼 (로컬 HFWhisperSTT 용)
+
+워커 스레드가 STT_WORKERS 개여도 로컬 모델은 파일 하나씩 돌리면 배치가 차지 않는다.
+첫 요청이 온 뒤 wait_ms 동안(또는 max_files 개가 찰 때까지) 들어온 요청을 모아
+engine.transcribe_many() 한 번으로 돌리고 각 워커에게 결과를 돌려준다.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class BatchedTranscriber:
+    """engine.transcribe_many 를 가진 엔진을 감싼다. 나머지 속성(model, language 등)은 엔진 것을 그대로 쓴다"""
+
+    def __init__(self, engine, max_files=8, wait_ms=200):
+        self.engine = engine
+        self.max_files = max_files
+        self.wait_s = wait_ms / 1000
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self.engine, name)
+
+    def transcribe(self, audio_path, on_chunk=None, reference_text=None):
+        """
+        워커 스레드에서 호출 (다른 워커 요청과 묶여서 처리될 때까지 블록)
+        on_chunk 는 OpenAIWhisperSTT 와 시그니처를 맞추기 위한 인자 (청크별 결과가 없으므로 호출하지 않음)
+        """
+        future = Future()
+        self._queue.put((audio_path, reference_text, future))
+        self._ensure_thread()
+        return future.result()
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="stt-batcher", daemon=True)
+                self._thread.start()
+
+    def _loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.wait_s
+            while len(batch) < self.max_files:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._run(batch)
+
+    def _run(self, batch):
+        try:
+            results = self.engine.transcribe_many([b[0] for b in batch], [b[1] for b in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][2].set_exception(e)
+                return
+            # 파일 하나가 배치 전체를 실패시키지 않도록 하나씩 다시
+            print(f"⚠️ 배치 STT 실패 ({len(batch)}개) → 파일별로 재시도: {e}")
+            for audio_path, reference_text, future in batch:
+                try:
+                    future.set_result(self.engine.transcribe(audio_path, reference_text))
+                except Exception as single_error:
+                    future.set_exception(single_error)
+            return
+        for (_, _, future), result in zip(batch, results):
+            future.set_result(result)
@@ -0,0 +1,156 @@
+"""
+CTranslate2 Whisper STT 엔진 (faster-whisper, 로컬 모델)
+
+HFWhisperSTT 와 같은 transcribe() 결과 형식. transformers pipeline(float32) 대신
+int8 양자화 CTranslate2 런타임으로 CPU 에서 돌린다 (GPU 없는 배포용).
+설치: pip install faster-whisper
+"""
+import time
+from pathlib import Path
+from datetime import datetime
+
+import librosa
+import numpy as np
+
+from core.config import STTConfig
+from core.metrics import compute_metrics, compute_rtf
+
+
+class CT2WhisperSTT:
+    def __init__(self, model="ct2-fast", threads=None, beam_size=None, compute_type=None, use_vad=False):
+        """
+        Args:
+            model: "ct2-fast", "ct2-balanced", "ct2-accurate" 중 하나
+            threads: CPU 스레드 수 (기본: STT_CT2_THREADS, 없으면 코어 수)
+            beam_size: 빔 크기 (기본: STT_CT2_BEAM_SIZE, 1 = greedy)
+            compute_type: CTranslate2 연산 타입 (기본: STT_CT2_COMPUTE_TYPE = int8)
+            use_vad: faster-whisper 내장 Silero VAD 로 무음 구간 건너뛰기
+        """
+        # faster-whisper 는 이 엔진을 쓸 때만 필요 (서버 기본 구성은 OpenAI API 엔진)
+        from faster_whisper import WhisperModel
+
+        self.model = model
+        self.model_name = STTConfig.get_model(model)
+        self.threads = threads or STTConfig.CT2_CPU_THREADS
+        self.beam_size = beam_size or STTConfig.CT2_BEAM_SIZE
+        self.compute_type = compute_type or STTConfig.CT2_COMPUTE_TYPE
+        self.use_vad = use_vad
+
+        print(f"Loading {self.model_name} (CTranslate2 {self.compute_type}, {self.threads} threads)...")
+        load_start = time.time()
+        self.transcriber = WhisperModel(
+            self.model_name,
+            device=STTConfig.DEVICE,
+            compute_type=self.compute_type,
+            cpu_threads=self.threads,
+        )
+        self.load_time = round(time.time() - load_start, 2)
+        print(f"Model loaded successfully! ({self.load_time}s)")
+
+    def transcribe(self, audio_path, reference_text=None):
+        """
+        오디오 파일을 텍스트로 변환 (HFWhisperSTT.transcribe 와 같은 형식)
+
+        Args:
+            audio_path: 오디오 파일 경로
+            reference_text: 평가용 참조 텍스트 (제공 시 WER/CER 계산)
+
+        Returns:
+            dict: {
+                "text": 변환된 텍스트,
+                "audio_file": 오디오 파일명,
+                "model": 사용한 모델,
+                "processing_time": 처리 시간(초),
+                "audio_length": 오디오 길이(초),
+                "rtf": 처리 시간 / 오디오 길이,
+                "timestamp": 변환 시각,
+                "segments": [{"timestamp": (시작, 끝), "text": ...}],
+                # reference_text 제공 시 추가:
+                "metrics": {"wer": 0.05, "cer": 0.02}
+            }
+        """
+        print(f"\nProcessing: {audio_path}")
+
+        start_time = time.time()
+
+        # 오디오 로드 (HF 엔진과 같은 16kHz mono float32)
+        y, sr = librosa.load(audio_path, sr=16000, mono=True)
+        audio_length = len(y) / sr
+
+        # 너무 짧거나 조용한 오디오 (HF 엔진과 같은 기준)
+        audio_rms = np.sqrt(np.mean(y**2)) if len(y) else 0.0
+        if audio_length < STTConfig.MIN_AUDIO_LENGTH or audio_rms < STTConfig.SILENCE_RMS_THRESHOLD:
+            print(f"  Audio too short or quiet ({audio_length:.1f}s, RMS {audio_rms:.4f}). Returning empty result.")
+            processing_time = time.time() - start_time
+            return {
+                "text": "",
+                "audio_file": Path(audio_path).name,
+                "model": self.model_name,
+                "processing_time": round(processing_time, 2),
+                "audio_length": round(audio_length, 2),
+                "rtf": compute_rtf(processing_time, audio_length)
+            }
+
+        text, segments = self._run(y)
+
+        processing_time = time.time() - start_time
+
+        # 결과 정리
+        output = {
+            "text": text,
+            "audio_file": Path(audio_path).name,
+            "model": f"ct2/{self.model_name}",
+            "processing_time": round(processing_time, 2),
+            "audio_length": round(audio_length, 2),
+            "rtf": compute_rtf(processing_time, audio_length),
+            "timestamp": datetime.now().isoformat(),
+            "segments": segments
+        }
+
+        # 평가 지표 계산 (옵션)
+        if reference_text:
+            metrics = compute_metrics(reference_text, output["text"])
+            output["metrics"] = metrics
+            print(f"WER: {metrics['wer']:.2%}, CER: {metrics['cer']:.2%}")
+
+        print(f"Done in {processing_time:.2f}s (RTF {output['rtf']})")
+
+        return output
+
+    def _run(self, y, prompt=None):
+        """16kHz float32 배열 변환. 반환: (텍스트, segments)"""
+        # segments 는 generator → 끝까지 돌아야 디코딩이 끝난다
+        segments, _ = self.transcriber.transcribe(
+            y,
+            language=STTConfig.CT2_LANGUAGE,
+            task="transcribe",
+            beam_size=self.beam_size,
+            vad_filter=self.use_vad,
+            initial_prompt=prompt,
+        )
+        chunks = [{"timestamp": (round(s.start, 2), round(s.end, 2)), "text": s.text} for s in segments]
+        return "".join(c["text"] for c in chunks).strip(), chunks
+
+    def transcribe_segment(self, audio, prompt=None):
+        """
+        메모리에 있는 짧은 구간(pydub AudioSegment) 변환 (실시간 스트리밍용, core/streaming.py)
+        반환: 텍스트
+        """
+        audio = audio.set_channels(1).set_frame_rate(16000).set_sample_width(2)
+        y = np.array(audio.get_array_of_samples(), dtype=np.float32) / 32768.0
+        text, _ = self._run(y, prompt=prompt)
+        return text
+
+    def get_model_info(self):
+        """모델 정보 반환"""
+        return {
+            "model": self.model,
+            "model_name": self.model_name,
+            "runtime": "CTranslate2",
+            "device": STTConfig.DEVICE,
+            "compute_type": self.compute_type,
+            "threads": self.threads,
+            "beam_size": self.beam_size,
+            "language": STTConfig.CT2_LANGUAGE,
+            "use_vad": self.use_vad
+        }
@@ -12,18 +12,30 @@ from core.metrics import compute_metrics
 
 
 class HFWhisperSTT:
-    def __init__(self, model="fast", noise_reduction=False, use_vad=False):
+    def __init__(self, model="fast", noise_reduction=False, use_vad=False,
+                 batch_size=None, chunk_length_s=None, stride_length_s=None):
         """
         Args:
             model: "fast", "balanced", "accurate" 중 하나
             noise_reduction: 노이즈 제거 전처리 사용 여부
             use_vad: VAD(Voice Activity Detection) 사용 여부
+            batch_size: 한 번에 모델에 넣는 30초 창 수 (기본: STT_HF_BATCH_SIZE)
+            chunk_length_s: 긴 오디오를 나누는 창 길이 (기본: STT_HF_CHUNK_LENGTH_S = 30)
+            stride_length_s: 창 양쪽 겹침 (기본: STT_HF_STRIDE_LENGTH_S = 5)
         """
         self.model = model
         self.model_name = STTConfig.get_model(model)
+        self.language = STTConfig.LANGUAGE
         self.noise_reduction = noise_reduction
         self.use_vad = use_vad
         self.vad_model = None
+        self.batch_size = batch_size or STTConfig.HF_BATCH_SIZE
+        self.chunk_length_s = chunk_length_s or STTConfig.HF_CHUNK_LENGTH_S
+        self.stride_length_s = stride_length_s if stride_length_s is not None else STTConfig.HF_STRIDE_LENGTH_S
+
+        if STTConfig.HF_THREADS:
+            import torch
+            torch.set_num_threads(STTConfig.HF_THREADS)
 
         print(f"Loading {self.model_name}...")
         self.transcriber = pipeline(
@@ -57,10 +69,101 @@ class HFWhisperSTT:
                 "metrics": {"wer": 0.05, "cer": 0.02}
             }
         """
-        print(f"\nProcessing: {audio_path}")
+        return self.transcribe_many([audio_path], [reference_text])[0]
+
+    def transcribe_many(self, audio_paths, reference_texts=None):
+        """
+        여러 오디오 파일을 한 번에 변환 (평가 세트 / 작업 큐 배치용)
+
+        긴 오디오는 chunk_length_s 창(양쪽 stride_length_s 겹침)으로 나누고, 모든 파일의 창을
+        batch_size 개씩 묶어 모델에 넣는다. 파일 경계와 상관없이 배치가 차므로
+        짧은 파일 여러 개 / 긴 파일 하나 모두 코어를 채워서 돌린다.
+
+        Args:
+            audio_paths: 오디오 파일 경로 목록
+            reference_texts: 파일별 평가용 참조 텍스트 목록 (선택)
+
+        Returns:
+            list[dict]: 파일 순서대로 transcribe() 와 같은 형식. 배치 추론 시간은 오디오 길이 비율로
+                        나눠 processing_time 에 넣고, 전체 값은 "batch_time" / "batch_files" 로 남긴다
+        """
+        reference_texts = reference_texts or [None] * len(audio_paths)
+        outputs = [None] * len(audio_paths)
+        pending = []  # (idx, audio_input, audio_length, 전처리 시간)
+
+        for idx, audio_path in enumerate(audio_paths):
+            print(f"\nProcessing: {audio_path}")
+            start_time = time.time()
+            y, sr, audio_length = self._prepare(audio_path)
+            if y is None:
+                processing_time = time.time() - start_time
+                outputs[idx] = {
+                    "text": "",
+                    "audio_file": Path(audio_path).name,
+                    "model": self.model_name,
+                    "processing_time": round(processing_time, 2),
+                    "audio_length": round(audio_length, 2),
+                    "rtf": round(processing_time / max(audio_length, 0.001), 4)
+                }
+                continue
+            pending.append((idx, {"array": np.asarray(y), "sampling_rate": sr}, audio_length, time.time() - start_time))
+
+        if not pending:
+            return outputs
+
+        # STT 수행 (창 단위 배치 추론)
+        generate_kwargs = {
+            "language": STTConfig.LANGUAGE,
+            "task": "transcribe"
+        }
+        total_audio = sum(p[2] for p in pending)
+        print(
+            f"  Batched inference: {len(pending)} file(s), {total_audio:.0f}s audio, "
+            f"{self.chunk_length_s:.0f}s windows (stride {self.stride_length_s:.0f}s), batch_size={self.batch_size}"
+        )
+        infer_start = time.time()
+        results = self.transcriber(
+            [p[1] for p in pending],
+            batch_size=self.batch_size,
+            chunk_length_s=self.chunk_length_s,
+            stride_length_s=self.stride_length_s,
+            generate_kwargs=generate_kwargs,
+        )
+        infer_time = time.time() - infer_start
+
+        for (idx, _, audio_length, prep_time), result in zip(pending, results):
+            processing_time = prep_time + infer_time * audio_length / max(total_audio, 0.001)
+
+            # 결과 정리
+            output = {
+                "text": result["text"],
+                "audio_file": Path(audio_paths[idx]).name,
+                "model": self.model_name,
+                "processing_time": round(processing_time, 2),
+                "audio_length": round(audio_length, 2),
+                "timestamp": datetime.now().isoformat(),
+                "segments": result.get("chunks", []),  # Whisper segments 포함 (신뢰도 계산용)
+                "batch_time": round(infer_time, 2),
+                "batch_files": len(pending)
+            }
+
+            # 평가 지표 계산 (옵션)
+            if reference_texts[idx]:
+                metrics = compute_metrics(reference_texts[idx], output["text"])
+                output["metrics"] = metrics
+                print(f"WER: {metrics['wer']:.2%}, CER: {metrics['cer']:.2%}")
+
+            outputs[idx] = output
+
+        print(f"Done in {infer_time:.2f}s ({total_audio / max(infer_time, 0.001):.1f}x real-time)")
 
-        start_time = time.time()
+        return outputs
 
+    def _prepare(self, audio_path):
+        """
+        오디오 로드 + 전처리. 반환: (y, sr, audio_length)
+        너무 짧거나 조용한 오디오는 y=None (빈 결과)
+        """
         # 오디오 로드
         y, sr = librosa.load(audio_path, sr=16000, mono=True)
         audio_length = len(y) / sr
@@ -68,36 +171,14 @@ class HFWhisperSTT:
         # 1) 너무 짧은 오디오 체크
         if audio_length < STTConfig.MIN_AUDIO_LENGTH:
             print(f"  Audio too short ({audio_length:.1f}s < {STTConfig.MIN_AUDIO_LENGTH}s). Returning empty result.")
-            processing_time = time.time() - start_time
-            return {
-                "text": "",
-                "audio_file": Path(audio_path).name,
-                "model": self.model_name,
-                "processing_time": round(processing_time, 2),
-                "audio_length": round(audio_length, 2),
-                "rtf": round(processing_time / max(audio_length, 0.001), 4)
-            }
+            return None, sr, audio_length
 
         # 2) 무음 체크 (RMS 에너지)
         audio_rms = np.sqrt(np.mean(y**2))
         print(f"  Audio RMS energy: {audio_rms:.4f} (threshold: {STTConfig.SILENCE_RMS_THRESHOLD})")
         if audio_rms < STTConfig.SILENCE_RMS_THRESHOLD:
             print(f"  Audio too quiet. Returning empty result.")
-            processing_time = time.time() - start_time
-            return {
-                "text": "",
-                "audio_file": Path(audio_path).name,
-                "model": self.model_name,
-                "processing_time": round(processing_time, 2),
-                "audio_length": round(audio_length, 2),
-                "rtf": round(processing_time / max(audio_length, 0.001), 4)
-            }
-
-        # STT 수행 (ffmpeg 미설치 시 librosa로 대체 로딩)
-        generate_kwargs = {
-            "language": STTConfig.LANGUAGE,
-            "task": "transcribe"
-        }
+            return None, sr, audio_length
 
         # 노이즈 제거 전처리 (이미 로드된 오디오 사용)
         if self.noise_reduction:
@@ -109,33 +190,20 @@ class HFWhisperSTT:
             print("  Applying VAD (removing silence)...")
             y = self._apply_vad(y, sr)
 
-        audio_input = {"array": np.asarray(y), "sampling_rate": sr}
-
-        # STT 수행 (librosa로 이미 로드했으므로 에러 복구 불필요)
-        result = self.transcriber(audio_input, generate_kwargs=generate_kwargs)
-
-        processing_time = time.time() - start_time
-
-        # 결과 정리
-        output = {
-            "text": result["text"],
-            "audio_file": Path(audio_path).name,
-            "model": self.model_name,
-            "processing_time": round(processing_time, 2),
-            "audio_length": round(audio_length, 2),
-            "timestamp": datetime.now().isoformat(),
-            "segments": result.get("chunks", [])  # Whisper segments 포함 (신뢰도 계산용)
-        }
-
-        # 평가 지표 계산 (옵션)
-        if reference_text:
-            metrics = compute_metrics(reference_text, output["text"])
-            output["metrics"] = metrics
-            print(f"WER: {metrics['wer']:.2%}, CER: {metrics['cer']:.2%}")
-
-        print(f"Done in {processing_time:.2f}s")
+        return y, sr, audio_length
 
-        return output
+    def transcribe_segment(self, audio, prompt=None):
+        """
+        메모리에 있는 짧은 구간(pydub AudioSegment) 변환 (실시간 스트리밍용, core/streaming.py)
+        반환: 텍스트 (prompt 는 API 엔진과 시그니처를 맞추기 위한 인자, 사용하지 않음)
+        """
+        audio = audio.set_channels(1).set_frame_rate(16000).set_sample_width(2)
+        y = np.array(audio.get_array_of_samples(), dtype=np.float32) / 32768.0
+        result = self.transcriber(
+            {"array": y, "sampling_rate": 16000},
+            generate_kwargs={"language": STTConfig.LANGUAGE, "task": "transcribe"},
+        )
+        return result["text"]
 
     def _get_audio_length(self, audio_path):
         """오디오 파일 길이를 초 단위로 반환"""
@@ -218,5 +286,8 @@ class HFWhisperSTT:
             "device": "GPU" if STTConfig.get_device() == 0 else "CPU",
             "language": STTConfig.LANGUAGE,
             "noise_reduction": self.noise_reduction,
-            "use_vad": self.use_vad
+            "use_vad": self.use_vad,
+            "batch_size": self.batch_size,
+            "chunk_length_s": self.chunk_length_s,
+            "stride_length_s": self.stride_length_s
         }
@@ -3,37 +3,66 @@ OpenAI Whisper API STT 엔진
 """
 import os
 import time
-import tempfile
 from pathlib import Path
 from datetime import datetime
 from openai import OpenAI
 from pydub import AudioSegment
+from pydub.utils import mediainfo
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from core.engine.audio_split import split_audio
+from core.engine.transcode import STT_TRANSCODE_FORMAT, Transcoder
+
 
 # 파일 크기 제한
 MAX_FILE_SIZE = 25 * 1024 * 1024      # OpenAI API 제한 (25MB) - 초과 시 청크 분할
 MAX_UPLOAD_SIZE = 100 * 1024 * 1024   # 업로드 제한 (100MB) - 초과 시 거부
-# 청크 길이 (10분 = 600초 = 600,000ms)
-CHUNK_LENGTH_MS = 10 * 60 * 1000
+# 청크 목표 길이 (기본 150초). 파일 크기와 상관없이 이보다 긴 오디오는 나눠서 동시에 변환한다
+CHUNK_TARGET_MS = int(float(os.getenv("STT_CHUNK_TARGET_S", "150")) * 1000)
+# 목표 지점 ±이 범위 안에서 가장 조용한 곳을 자른다
+CHUNK_SEARCH_MS = int(float(os.getenv("STT_CHUNK_SEARCH_S", "20")) * 1000)
+# 동시에 변환하는 청크 수
+CHUNK_CONCURRENCY = int(os.getenv("STT_CHUNK_CONCURRENCY", "8"))
+# OpenAI 호환 엔드포인트 (부하 테스트용 openai_mock 등). 비우면 OpenAI 기본값
+# (빈 문자열이면 SDK 가 환경변수를 다시 읽어 "" 를 쓰므로 None 대신 명시적 기본값)
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or "https://api.openai.com/v1"
+
+
+def _load_audio(audio_path):
+    file_ext = Path(audio_path).suffix.lower()
+    if file_ext == ".mp3":
+        return AudioSegment.from_mp3(audio_path)
+    elif file_ext == ".m4a":
+        return AudioSegment.from_file(audio_path, format="m4a")
+    elif file_ext == ".wav":
+        return AudioSegment.from_wav(audio_path)
+    else:
+        return AudioSegment.from_file(audio_path)
 
 
 class OpenAIWhisperSTT:
-    def __init__(self, model="whisper-1"):
+    def __init__(self, model="whisper-1", transcode=STT_TRANSCODE_FORMAT, bitrate=None, language="ko"):
         """
         Args:
             model: OpenAI 모델 (whisper-1, gpt-4o-transcribe, gpt-4o-mini-transcribe)
+            language: 인식 언어 (transcript 캐시 키에도 쓰인다)
+            transcode: 업로드 전 재인코딩 형식 (opus / mp3 / none, core/engine/transcode.py)
+            bitrate: 재인코딩 비트레이트 (예: "24k"). None 이면 형식별 기본값
         """
         self.model = model
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.language = language
+        self.transcoder = Transcoder(transcode, bitrate=bitrate)
+        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), base_url=OPENAI_BASE_URL)
 
-    def transcribe(self, audio_path):
+    def transcribe(self, audio_path, on_chunk=None):
         """
         오디오 파일을 OpenAI Whisper API로 변환
-        25MB 초과 시 10분 단위로 분할 처리
+        CHUNK_TARGET_MS 보다 길거나 25MB 를 넘으면 무음 지점에서 나눠 병렬 처리
 
         Args:
             audio_path: 오디오 파일 경로
+            on_chunk: (선택) 분할 처리 시 청크가 끝날 때마다 on_chunk(idx, 전체 청크 수, 텍스트) 호출
+                      (끝나는 순서대로. 요약 map 을 STT 와 겹쳐 돌리는 용도, core/summarize.ChunkSummarizer)
 
         Returns:
             dict: {
@@ -50,39 +79,75 @@ class OpenAIWhisperSTT:
         if file_size > MAX_UPLOAD_SIZE:
             raise ValueError(f"파일 크기({file_size / 1024 / 1024:.1f}MB)가 100MB 제한을 초과했습니다.")
 
-        if file_size <= MAX_FILE_SIZE:
+        duration_ms = self._probe_duration_ms(audio_path)
+        short = duration_ms is not None and duration_ms <= CHUNK_TARGET_MS + CHUNK_SEARCH_MS
+
+        # 재인코딩하면 짧은 오디오는 25MB 를 넘을 수 없다 (150초 × 24kbps ≈ 450KB)
+        if short and (file_size <= MAX_FILE_SIZE or self.transcoder.enabled):
             return self._transcribe_single(audio_path)
         else:
-            print(f"  File size ({file_size / 1024 / 1024:.1f}MB) exceeds 25MB limit. Splitting into chunks...")
-            return self._transcribe_chunked(audio_path)
+            print(f"  Audio ({file_size / 1024 / 1024:.1f}MB) split at silence into ~{CHUNK_TARGET_MS // 1000}s chunks...")
+            return self._transcribe_chunked(audio_path, on_chunk=on_chunk)
 
-    def _transcribe_single(self, audio_path):
-        """단일 파일 STT 처리 (25MB 이하)"""
-        print(f"\nProcessing with OpenAI API: {audio_path}")
-        start_time = time.time()
+    @staticmethod
+    def _probe_duration_ms(audio_path):
+        """ffprobe 로 길이만 확인 (디코딩 없이). 실패하면 None → 분할 경로에서 디코딩 후 판단"""
+        try:
+            return int(float(mediainfo(audio_path)["duration"]) * 1000)
+        except Exception:
+            return None
 
+    def _request(self, upload_path, prompt=None):
+        """API 호출 1회. 반환: (텍스트, 오디오 길이 or None). prompt: 앞 문맥 (용어 / 문체 유지용)"""
         # 모델별 response_format 설정
         if self.model.startswith("gpt-4o"):
             response_format = "json"
         else:
             response_format = "verbose_json"
 
-        with open(audio_path, "rb") as audio_file:
+        extra = {"prompt": prompt} if prompt else {}
+        with open(upload_path, "rb") as audio_file:
             response = self.client.audio.transcriptions.create(
                 model=self.model,
                 file=audio_file,
-                language="ko",
-                response_format=response_format
+                language=self.language,
+                response_format=response_format,
+                **extra
             )
 
-        processing_time = time.time() - start_time
-
         if response_format == "verbose_json":
-            text = response.text
-            audio_length = response.duration if hasattr(response, 'duration') else None
-        else:
-            text = response.text if hasattr(response, 'text') else response.get("text", "")
-            audio_length = None
+            return response.text, getattr(response, "duration", None)
+        text = response.text if hasattr(response, 'text') else response.get("text", "")
+        return text, None
+
+    def _transcribe_single(self, audio_path):
+        """단일 요청 STT 처리 (짧은 오디오). 재인코딩이 켜져 있으면 16kHz mono 로 줄여서 올린다"""
+        print(f"\nProcessing with OpenAI API: {audio_path}")
+        start_time = time.time()
+
+        source_bytes = os.path.getsize(audio_path)
+        upload_path, upload_bytes, transcode_time = audio_path, source_bytes, 0.0
+        if self.transcoder.enabled:
+            upload_path, upload_bytes, transcode_time = self.transcoder.export_temp(_load_audio(audio_path))
+            if upload_bytes >= source_bytes and source_bytes <= MAX_FILE_SIZE:
+                # 이미 작은 파일 (예: 16kHz 저비트레이트 녹음) → 원본 그대로
+                os.unlink(upload_path)
+                upload_path, upload_bytes = audio_path, source_bytes
+            print(
+                f"  Transcoded ({self.transcoder.describe()}): "
+                f"{source_bytes / 1024:.0f}KB → {upload_bytes / 1024:.0f}KB in {transcode_time:.2f}s"
+            )
+
+        try:
+            text, audio_length = self._request(upload_path)
+        finally:
+            if upload_path != audio_path:
+                try:
+                    os.unlink(upload_path)
+                except OSError:
+                    pass
+
+        processing_time = time.time() - start_time
 
         return {
             "text": text,
@@ -90,43 +155,38 @@ class OpenAIWhisperSTT:
             "model": f"openai/{self.model}",
             "processing_time": round(processing_time, 2),
             "audio_length": audio_length,
+            "source_bytes": source_bytes,
+            "upload_bytes": upload_bytes,
+            "transcode_time": round(transcode_time, 2),
             "timestamp": datetime.now().isoformat()
         }
 
+    def transcribe_segment(self, audio, prompt=None):
+        """
+        메모리에 있는 짧은 구간(pydub AudioSegment) 변환 (실시간 스트리밍용, core/streaming.py)
+        반환: 텍스트
+        """
+        temp_path, _, _ = self.transcoder.export_temp(audio)
+        try:
+            text, _ = self._request(temp_path, prompt=prompt)
+            return text
+        finally:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+
     def _process_single_chunk(self, args):
-        """단일 청크 STT 처리 (병렬용)"""
+        """단일 청크 STT 처리 (병렬용). 반환: (idx, 텍스트, 업로드 바이트, 인코딩 시간)"""
         idx, chunk, total = args
 
-        # 임시 파일 생성
-        temp_file = tempfile.NamedTemporaryFile(suffix=".mp3", delete=False)
-        temp_path = temp_file.name
-        temp_file.close()
+        # 청크 저장 (재인코딩 설정 적용)
+        temp_path, upload_bytes, transcode_time = self.transcoder.export_temp(chunk)
 
         try:
-            # 청크 저장
-            chunk.export(temp_path, format="mp3")
-            print(f"  Processing chunk {idx + 1}/{total}...")
-
-            # API 호출
-            if self.model.startswith("gpt-4o"):
-                response_format = "json"
-            else:
-                response_format = "verbose_json"
-
-            with open(temp_path, "rb") as audio_file:
-                response = self.client.audio.transcriptions.create(
-                    model=self.model,
-                    file=audio_file,
-                    language="ko",
-                    response_format=response_format
-                )
-
-            if response_format == "verbose_json":
-                text = response.text
-            else:
-                text = response.text if hasattr(response, 'text') else response.get("text", "")
-
-            return idx, text
+            print(f"  Processing chunk {idx + 1}/{total} ({upload_bytes / 1024:.0f}KB)...")
+            text, _ = self._request(temp_path)
+            return idx, text, upload_bytes, transcode_time
         finally:
             # 임시 파일 삭제
             try:
@@ -134,48 +194,50 @@ class OpenAIWhisperSTT:
             except:
                 pass
 
-    def _transcribe_chunked(self, audio_path):
-        """청크 분할 STT 처리 (25MB 초과)"""
+    def _transcribe_chunked(self, audio_path, on_chunk=None):
+        """무음 지점 분할 + 청크 병렬 STT 처리 (전체 시간 ≈ 가장 긴 청크 처리 시간)"""
         print(f"\nProcessing with OpenAI API (chunked): {audio_path}")
         start_time = time.time()
 
-        # 오디오 로드
-        file_ext = Path(audio_path).suffix.lower()
-        if file_ext == ".mp3":
-            audio = AudioSegment.from_mp3(audio_path)
-        elif file_ext == ".m4a":
-            audio = AudioSegment.from_file(audio_path, format="m4a")
-        elif file_ext == ".wav":
-            audio = AudioSegment.from_wav(audio_path)
-        else:
-            audio = AudioSegment.from_file(audio_path)
+        # 오디오 로드 → (재인코딩 시) 16kHz mono 로 먼저 줄여서 분할 / 청크 인코딩을 가볍게
+        source_bytes = os.path.getsize(audio_path)
+        audio = self.transcoder.compact(_load_audio(audio_path))
 
         audio_length_sec = len(audio) / 1000  # 밀리초 → 초
 
-        # 10분 단위로 분할
-        chunks = []
-        for i in range(0, len(audio), CHUNK_LENGTH_MS):
-            chunk = audio[i:i + CHUNK_LENGTH_MS]
-            chunks.append(chunk)
-
-        print(f"  Split into {len(chunks)} chunks ({CHUNK_LENGTH_MS // 60000} min each)")
+        # 목표 길이 근처의 가장 조용한 지점에서 분할
+        split_start = time.time()
+        chunks = [chunk for _, chunk in split_audio(audio, CHUNK_TARGET_MS, CHUNK_SEARCH_MS)]
+        lengths = ", ".join(f"{len(c) / 1000:.0f}s" for c in chunks)
+        print(f"  Split into {len(chunks)} chunks at silence ({time.time() - split_start:.2f}s): {lengths}")
 
         # STT 처리 (병렬 처리)
         chunk_args = [(idx, chunk, len(chunks)) for idx, chunk in enumerate(chunks)]
 
         results = {}
-        with ThreadPoolExecutor(max_workers=5) as executor:
+        upload_bytes = 0
+        transcode_time = 0.0
+        with ThreadPoolExecutor(max_workers=max(1, min(CHUNK_CONCURRENCY, len(chunks)))) as executor:
             futures = {executor.submit(self._process_single_chunk, arg): arg[0] for arg in chunk_args}
 
             for future in as_completed(futures):
-                idx, text = future.result()
+                idx, text, chunk_bytes, chunk_transcode_time = future.result()
                 results[idx] = text
+                upload_bytes += chunk_bytes
+                transcode_time += chunk_transcode_time
+                if on_chunk:
+                    on_chunk(idx, len(chunks), text)
+
+        print(
+            f"  Uploaded {upload_bytes / 1024:.0f}KB for {source_bytes / 1024:.0f}KB source "
+            f"({self.transcoder.describe()})"
+        )
 
         # 순서대로 합침
         all_texts = [results[i] for i in range(len(chunks))]
 
         processing_time = time.time() - start_time
-        combined_text = " ".join(all_texts)
+        combined_text = " ".join(t.strip() for t in all_texts if t and t.strip())
 
         return {
             "text": combined_text,
@@ -183,6 +245,10 @@ class OpenAIWhisperSTT:
             "model": f"openai/{self.model}",
             "processing_time": round(processing_time, 2),
             "audio_length": round(audio_length_sec, 2),
+            "chunks": len(chunks),
+            "source_bytes": source_bytes,
+            "upload_bytes": upload_bytes,
+            "transcode_time": round(transcode_time, 2),
             "timestamp": datetime.now().isoformat()
         }
 
@@ -190,5 +256,6 @@ class OpenAIWhisperSTT:
         """모델 정보 반환"""
         return {
             "model": self.model,
-            "type": "OpenAI API"
+            "type": "OpenAI API",
+            "transcode": self.transcoder.describe()
         }
@@ -0,0 +1,77 @@
+"""
+업로드 전 오디오 재인코딩
+
+Whisper 는 내부적으로 16kHz mono 로 바꿔서 쓰므로, 휴대폰 녹음(44.1/48kHz 스테레오 WAV/M4A)을
+그대로 올리면 대부분이 버려지는 바이트다. 16kHz mono 저비트레이트로 줄여서 올린다.
+
+  opus : Ogg/Opus (기본 24kbps). 음성 품질 대비 가장 작다
+  mp3  : MP3 (기본 32kbps). Opus 인코더(libopus)가 없는 ffmpeg 용
+  none : 재인코딩하지 않음 (원본 그대로, 분할 청크는 기존처럼 기본 MP3)
+"""
+import os
+import tempfile
+import time
+from typing import Tuple
+
+from pydub import AudioSegment
+
+# 엔진 생성자 인자로 덮어쓸 수 있는 기본값
+STT_TRANSCODE_FORMAT = os.getenv("STT_TRANSCODE_FORMAT", "opus")
+STT_TRANSCODE_BITRATE = os.getenv("STT_TRANSCODE_BITRATE", "")  # 비우면 형식별 기본값
+STT_TRANSCODE_SAMPLE_RATE = int(os.getenv("STT_TRANSCODE_SAMPLE_RATE", "16000"))
+
+# 형식별 pydub export 인자
+TRANSCODE_PRESETS = {
+    "opus": {"format": "ogg", "codec": "libopus", "suffix": ".ogg", "bitrate": "24k"},
+    "mp3": {"format": "mp3", "codec": "libmp3lame", "suffix": ".mp3", "bitrate": "32k"},
+    "none": {"format": "mp3", "codec": None, "suffix": ".mp3", "bitrate": None},
+}
+
+
+class Transcoder:
+    """엔진별 재인코딩 설정 (OpenAIWhisperSTT(transcode=..., bitrate=...) 로 지정)"""
+
+    def __init__(self, fmt=STT_TRANSCODE_FORMAT, bitrate=None, sample_rate=STT_TRANSCODE_SAMPLE_RATE):
+        if fmt not in TRANSCODE_PRESETS:
+            raise ValueError(f"Invalid transcode format: {fmt}. Choose from {list(TRANSCODE_PRESETS)}")
+        self.fmt = fmt
+        self.preset = TRANSCODE_PRESETS[fmt]
+        self.bitrate = bitrate or STT_TRANSCODE_BITRATE or self.preset["bitrate"]
+        self.sample_rate = sample_rate
+
+    @property
+    def enabled(self):
+        return self.fmt != "none"
+
+    @property
+    def suffix(self):
+        return self.preset["suffix"]
+
+    def compact(self, audio: AudioSegment) -> AudioSegment:
+        """16kHz mono 로 변환 (분할 전에 한 번 하면 분할/에너지 계산도 가벼워진다)"""
+        if not self.enabled:
+            return audio
+        return audio.set_channels(1).set_frame_rate(self.sample_rate)
+
+    def export(self, audio: AudioSegment, path: str) -> None:
+        kwargs = {"format": self.preset["format"]}
+        if self.enabled:
+            kwargs.update(codec=self.preset["codec"], bitrate=self.bitrate)
+        self.compact(audio).export(path, **kwargs)
+
+    def export_temp(self, audio: AudioSegment) -> Tuple[str, int, float]:
+        """임시 파일로 내보내기. 반환: (경로, 바이트 수, 인코딩 시간 초). 파일 삭제는 호출부에서"""
+        start = time.time()
+        temp_file = tempfile.NamedTemporaryFile(suffix=self.suffix, delete=False)
+        temp_file.close()
+        try:
+            self.export(audio, temp_file.name)
+        except Exception:
+            os.unlink(temp_file.name)
+            raise
+        return temp_file.name, os.path.getsize(temp_file.name), time.time() - start
+
+    def describe(self):
+        if not self.enabled:
+            return "none"
+        return f"{self.fmt} {self.bitrate} {self.sample_rate // 1000}kHz mono"
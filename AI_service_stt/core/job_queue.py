@@ -0,0 +1,352 @@
+"""
+STT 작업 큐 (stt_job 테이블 기반) + 워커 풀
+
+/stt/process 는 업로드 파일을 STT_UPLOAD_DIR 에 저장하고 stt_job 에 queued 행을 넣기만 한다.
+실제 처리는 STT_WORKERS 개의 워커 스레드가 DB 에서 작업을 가져가서(claim) 수행한다.
+
+- 영속성: 큐 상태가 DB 에 있으므로 서버가 재시작돼도 작업이 사라지지 않는다.
+- 동시성 제한: 동시에 처리하는 녹음은 최대 STT_WORKERS 개 (프로세스/컨테이너가 여러 개여도
+  SELECT ... FOR UPDATE SKIP LOCKED 로 같은 작업을 두 번 가져가지 않는다)
+- visibility timeout: 가져간 작업은 locked_until 까지 다른 워커에게 보이지 않는다.
+  처리 중에는 heartbeat 스레드가 lease 를 연장하고, 워커가 죽으면 만료 후 다른 워커가 다시 가져간다.
+- 단계별 재시도: transcribe → summarize → deliver 중 실패한 단계부터 다시 한다
+  (앞 단계 결과는 transcript_text / summary 컬럼에 남아 있음). 시도는 STT_MAX_ATTEMPTS 회까지,
+  재시도 간격은 STT_RETRY_BACKOFF_S × 2^(시도-1).
+- 지표: queue_stats() → GET /stt/queue
+"""
+import os
+import socket
+import threading
+import uuid
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import func, or_
+
+from core.models import SessionLocal, STTJob
+
+# 워커 스레드 수 (= 동시에 처리하는 녹음 수)
+STT_WORKERS = int(os.getenv("STT_WORKERS", "2"))
+# 가져간 작업의 lease 길이(초). heartbeat 가 1/3 주기마다 연장한다
+STT_VISIBILITY_TIMEOUT_S = float(os.getenv("STT_VISIBILITY_TIMEOUT_S", "300"))
+# 작업 하나당 최대 시도 횟수 (lease 만료로 다시 가져간 경우도 1회로 센다)
+STT_MAX_ATTEMPTS = int(os.getenv("STT_MAX_ATTEMPTS", "3"))
+STT_RETRY_BACKOFF_S = float(os.getenv("STT_RETRY_BACKOFF_S", "30"))
+# 대기 작업이 없을 때 DB 를 다시 확인하는 주기(초). 같은 프로세스의 enqueue 는 즉시 깨운다
+STT_POLL_INTERVAL_S = float(os.getenv("STT_POLL_INTERVAL_S", "2"))
+# 업로드 파일 보관 위치 (재시작 후에도 남아 있어야 하므로 /tmp 가 아닌 볼륨 경로)
+STT_UPLOAD_DIR = os.getenv("STT_UPLOAD_DIR", "data/uploads")
+
+STAGES = ("transcribe", "summarize", "deliver")
+
+Path(STT_UPLOAD_DIR).mkdir(parents=True, exist_ok=True)
+
+
+class LeaseLost(RuntimeError):
+    """lease 가 만료돼서 다른 워커가 작업을 가져감 (이 워커는 결과를 저장하지 않고 손을 뗀다)"""
+
+
+class Lease:
+    """claim 으로 가져온 작업 (세션과 분리된 값만 보관)"""
+
+    def __init__(self, job: STTJob, token: str):
+        self.token = token
+        self.stt_id = job.stt_id
+        self.stage = job.stage or STAGES[0]
+        self.file_path = job.file_path
+        self.audio_sha256 = job.audio_sha256
+        self.transcript_text = job.transcript_text
+        self.summary = job.summary
+        self.attempts = job.attempts or 0
+
+
+# === 큐 조작 ===
+
+def enqueue(
+    stt_id: str,
+    file_path: str,
+    user_id: Optional[int] = None,
+    audio_sha256: Optional[str] = None,
+    audio_bytes: Optional[int] = None,
+    stage: str = STAGES[0],
+    transcript_text: Optional[str] = None,
+    summary: Optional[dict] = None,
+) -> None:
+    """
+    작업 등록 (같은 stt_id 가 다시 오면 stage 부터 다시 큐에 넣는다)
+    transcript 캐시에 결과가 있으면 stage="summarize" / "deliver" 와 앞 단계 결과를 같이 넘긴다
+    """
+    db = SessionLocal()
+    try:
+        job = db.query(STTJob).filter(STTJob.stt_id == stt_id).first()
+        if job is None:
+            job = STTJob(stt_id=stt_id)
+            db.add(job)
+        if user_id is not None:
+            # 백엔드가 /stt/process 폼으로 보낸 값 (스트리밍 등 값이 없으면 기존 행 값 유지)
+            job.user_id = user_id
+        job.status = "queued"
+        job.stage = stage
+        job.file_path = file_path
+        job.audio_sha256 = audio_sha256
+        job.audio_bytes = audio_bytes
+        job.transcript_text = transcript_text
+        job.summary = summary
+        job.attempts = 0
+        job.last_error = None
+        job.available_at = func.now()
+        job.locked_by = None
+        job.locked_until = None
+        job.created_at = func.now()
+        db.commit()
+    finally:
+        db.close()
+
+
+def claim(worker_id: str) -> Optional[Lease]:
+    """
+    가져갈 수 있는 작업 하나를 lease 와 함께 가져온다.
+    - queued 이고 available_at 이 지난 것
+    - running 인데 lease(locked_until)가 만료된 것 (처리하던 워커가 죽음)
+    """
+    db = SessionLocal()
+    try:
+        now = func.now()
+        job = (
+            db.query(STTJob)
+            .filter(
+                or_(
+                    (STTJob.status == "queued") & (STTJob.available_at <= now),
+                    (STTJob.status == "running") & (STTJob.locked_until < now),
+                )
+            )
+            .order_by(STTJob.available_at)
+            .with_for_update(skip_locked=True)
+            .first()
+        )
+        if job is None:
+            db.rollback()
+            return None
+
+        token = f"{worker_id}:{uuid.uuid4().hex[:8]}"
+        job.status = "running"
+        job.attempts = (job.attempts or 0) + 1
+        job.locked_by = token
+        job.locked_until = now + timedelta(seconds=STT_VISIBILITY_TIMEOUT_S)
+        db.commit()
+        db.refresh(job)
+        return Lease(job, token)
+    finally:
+        db.close()
+
+
+def _update_leased(lease: Lease, **fields) -> bool:
+    """lease 를 아직 갖고 있을 때만 갱신 (만료돼서 다른 워커가 가져갔으면 False)"""
+    db = SessionLocal()
+    try:
+        updated = (
+            db.query(STTJob)
+            .filter(STTJob.stt_id == lease.stt_id, STTJob.locked_by == lease.token)
+            .update(fields, synchronize_session=False)
+        )
+        db.commit()
+        return updated == 1
+    finally:
+        db.close()
+
+
+def heartbeat(lease: Lease) -> bool:
+    return _update_leased(
+        lease, locked_until=func.now() + timedelta(seconds=STT_VISIBILITY_TIMEOUT_S)
+    )
+
+
+def save_stage(lease: Lease, next_stage: str, **results) -> None:
+    """단계 결과 저장 + 다음 단계로 (재시도 시 이 단계는 건너뛴다). lease 를 잃었으면 LeaseLost"""
+    if not _update_leased(lease, stage=next_stage, **results):
+        raise LeaseLost(f"{lease.stt_id}: lease 만료")
+    lease.stage = next_stage
+    for key, value in results.items():
+        setattr(lease, key, value)
+
+
+def complete(lease: Lease) -> bool:
+    return _update_leased(
+        lease, status="done", stage=None, locked_by=None, locked_until=None, last_error=None
+    )
+
+
+def retry_later(lease: Lease, error: str) -> bool:
+    """실패 기록 후 backoff 만큼 뒤에 같은 단계부터 다시 가져가도록 queued 로 되돌린다"""
+    delay = STT_RETRY_BACKOFF_S * (2 ** max(0, lease.attempts - 1))
+    return _update_leased(
+        lease,
+        status="queued",
+        last_error=error[:2000],
+        available_at=func.now() + timedelta(seconds=delay),
+        locked_by=None,
+        locked_until=None,
+    )
+
+
+def give_up(lease: Lease, error: str) -> bool:
+    """시도 횟수를 다 쓴 작업을 error 로 종료"""
+    return _update_leased(
+        lease, status="error", last_error=error[:2000], locked_by=None, locked_until=None
+    )
+
+
+def queue_stats() -> Dict:
+    """
+    큐 지표:
+    - counts: 상태별 작업 수 (queued / running / done / error)
+    - ready / delayed: queued 중 지금 가져갈 수 있는 것 / 재시도 backoff 대기 중인 것
+    - oldest_queued_age_s: 가장 오래 기다린 queued 작업의 대기 시간(초, created_at 기준)
+    - expired_leases: lease 가 만료된 running 작업 (워커가 죽었을 가능성)
+    """
+    db = SessionLocal()
+    try:
+        now = db.query(func.now()).scalar()
+        counts = dict(
+            db.query(STTJob.status, func.count())
+            .filter(STTJob.status.in_(("queued", "running", "done", "error")))
+            .group_by(STTJob.status)
+            .all()
+        )
+        ready = (
+            db.query(func.count())
+            .filter(STTJob.status == "queued", STTJob.available_at <= now)
+            .scalar()
+        )
+        oldest = (
+            db.query(func.min(STTJob.created_at)).filter(STTJob.status == "queued").scalar()
+        )
+        expired = (
+            db.query(func.count())
+            .filter(STTJob.status == "running", STTJob.locked_until < now)
+            .scalar()
+        )
+        return {
+            "counts": {s: int(counts.get(s, 0)) for s in ("queued", "running", "done", "error")},
+            "ready": int(ready or 0),
+            "delayed": int(counts.get("queued", 0)) - int(ready or 0),
+            "oldest_queued_age_s": round((now - oldest).total_seconds(), 1) if oldest else 0.0,
+            "expired_leases": int(expired or 0),
+        }
+    finally:
+        db.close()
+
+
+# === 워커 풀 ===
+
+class JobWorkerPool:
+    """
+    STT_WORKERS 개 워커 스레드 + heartbeat 스레드 1개.
+    handler(lease) 는 단계를 진행하며 save_stage 를 부르고, 예외를 던지면 retry_later 로 재시도된다.
+    시도 횟수를 다 쓰면 give_up 후 on_give_up(lease, error) 을 부른다.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Lease], None],
+        on_give_up: Optional[Callable[[Lease, str], None]] = None,
+        workers: int = STT_WORKERS,
+    ):
+        self.handler = handler
+        self.on_give_up = on_give_up
+        self.workers = max(1, workers)
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._in_flight: Dict[str, Lease] = {}
+        self._lock = threading.Lock()
+
+    def start(self):
+        if self._threads:
+            return
+        for i in range(self.workers):
+            t = threading.Thread(target=self._loop, name=f"stt-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        t = threading.Thread(target=self._heartbeat_loop, name="stt-heartbeat", daemon=True)
+        t.start()
+        self._threads.append(t)
+        print(f"✅ STT 워커 {self.workers}개 시작 ({self.worker_id})")
+
+    def stop(self, timeout: float = 10.0):
+        """새 작업은 가져가지 않음. 처리 중이던 작업은 lease 만료 후 다른 워커가 이어받는다"""
+        self._stop.set()
+        self._wake.set()
+        for t in self._threads:
+            t.join(timeout=timeout)
+        self._threads = []
+
+    def notify(self):
+        """같은 프로세스에서 enqueue 했을 때 대기 중인 워커를 바로 깨운다"""
+        self._wake.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._in_flight)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            # claim 전에 지워야 그 사이에 들어온 notify 를 놓치지 않는다
+            self._wake.clear()
+            try:
+                lease = claim(self.worker_id)
+            except Exception as e:
+                print(f"❌ 작업 가져오기 실패: {e}")
+                lease = None
+
+            if lease is None:
+                self._wake.wait(STT_POLL_INTERVAL_S)
+                continue
+
+            self._run(lease)
+
+    def _run(self, lease: Lease):
+        with self._lock:
+            self._in_flight[lease.stt_id] = lease
+        try:
+            if lease.attempts > STT_MAX_ATTEMPTS:
+                # lease 만료로 여러 번 다시 가져간 작업 (처리 중 프로세스가 계속 죽는 경우)
+                self._give_up(lease, "처리 시간 초과 (visibility timeout)")
+                return
+            self.handler(lease)
+            complete(lease)
+        except LeaseLost as e:
+            print(f"⚠️ [{lease.stt_id}] {e} → 다른 워커가 이어서 처리")
+        except Exception as e:
+            error = f"{lease.stage}: {e}"
+            print(f"❌ [{lease.stt_id}] {error} (시도 {lease.attempts}/{STT_MAX_ATTEMPTS})")
+            if lease.attempts < STT_MAX_ATTEMPTS:
+                retry_later(lease, error)
+            else:
+                self._give_up(lease, error)
+        finally:
+            with self._lock:
+                self._in_flight.pop(lease.stt_id, None)
+
+    def _give_up(self, lease: Lease, error: str):
+        # lease 를 이미 잃었으면 (다른 워커가 처리 중) 실패 알림을 보내지 않는다
+        if not give_up(lease, error):
+            return
+        if self.on_give_up is not None:
+            try:
+                self.on_give_up(lease, error)
+            except Exception as e:
+                print(f"⚠️ [{lease.stt_id}] 실패 처리 중 에러: {e}")
+
+    def _heartbeat_loop(self):
+        while not self._stop.wait(STT_VISIBILITY_TIMEOUT_S / 3):
+            with self._lock:
+                leases = list(self._in_flight.values())
+            for lease in leases:
+                try:
+                    if not heartbeat(lease):
+                        print(f"⚠️ [{lease.stt_id}] lease 를 잃음 (다른 워커가 가져감)")
+                except Exception as e:
+                    print(f"⚠️ [{lease.stt_id}] heartbeat 실패: {e}")
@@ -2,7 +2,7 @@
 Database models (PostgreSQL + SQLAlchemy)
 """
 import os
-from sqlalchemy import create_engine, Column, String, Integer
+from sqlalchemy import create_engine, Column, String, Integer, Text, DateTime, JSON, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -37,3 +37,44 @@ class STTJob(Base):
 
     # 날짜 (YYYY-MM-DD 형식 문자열)
     date = Column(String, nullable=True)
+
+    # === 작업 큐 (core/job_queue.py) ===
+    # status: queued → running → done / error
+    # stage : transcribe → summarize → deliver (실패하면 그 단계부터 재시도)
+    stage = Column(String, nullable=True)
+    file_path = Column(String, nullable=True)
+    # 업로드 저장 시 같은 패스에서 계산한 sha256 / 크기
+    audio_sha256 = Column(String(64), nullable=True)
+    audio_bytes = Column(Integer, nullable=True)
+    transcript_text = Column(Text, nullable=True)
+    summary = Column(JSON, nullable=True)
+    attempts = Column(Integer, default=0)
+    last_error = Column(Text, nullable=True)
+    # 이 시각 이후에 가져갈 수 있음 (재시도 backoff)
+    available_at = Column(DateTime(timezone=True), nullable=True)
+    # 가져간 워커의 lease. locked_until 이 지나면 (워커가 죽은 것으로 보고) 다른 워커가 다시 가져간다
+    locked_by = Column(String, nullable=True)
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class TranscriptCache(Base):
+    """
+    같은 녹음 재업로드 시 Whisper / 요약을 다시 하지 않기 위한 캐시 (core/transcript_cache.py)
+    키: (오디오 sha256, STT 모델, 언어)
+    """
+    __tablename__ = "stt_transcript_cache"
+
+    audio_sha256 = Column(String(64), primary_key=True)
+    model = Column(String, primary_key=True)
+    language = Column(String, primary_key=True)
+
+    transcript_text = Column(Text, nullable=True)
+    # 요약은 만든 요약 모델이 같을 때만 재사용
+    summary = Column(JSON, nullable=True)
+    summary_model = Column(String, nullable=True)
+
+    hits = Column(Integer, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_hit_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,247 @@
+"""
+실시간 스트리밍 STT (WebSocket /stt/stream/{stt_id}, api/router.py)
+
+녹음 중에 들어오는 PCM 프레임을 모아 rolling window 로 변환한다.
+
+- 확정(commit): 확정되지 않은 구간(tail)이 STT_STREAM_WINDOW_S 를 넘으면 끝부분
+  ±STT_STREAM_SEARCH_S 안에서 가장 조용한 지점(core/engine/audio_split.py)까지를 한 번 더 변환해
+  확정 구간으로 만든다. 확정된 오디오는 버리고 다시 변환하지 않는다.
+- 중간 결과(partial): 새 오디오가 STT_STREAM_STEP_S 쌓일 때마다 남은 tail 을 변환해서 보낸다.
+  (tail 을 매번 다시 변환하므로 API 사용량은 오디오 길이의 약 WINDOW / (2 × STEP) 배가 된다)
+- 요약: 확정 텍스트가 STT_SUMMARY_MAP_CHARS 만큼 쌓이면 녹음 중에 그 부분 요약(map)을 미리 시작하고,
+  녹음이 끝나면 남은 부분만 요약해서 합친다(reduce). 짧은 상담은 끝난 뒤 요약 1회.
+
+오디오 형식: 16-bit little-endian mono PCM (기본 16kHz, 시작 메시지로 변경 가능)
+"""
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from pydub import AudioSegment
+
+from core.engine.audio_split import find_split_points
+from core.summarize import SUMMARY_MAP_CHARS, ChunkSummarizer, generate_summary
+
+# 중간 결과를 보내는 주기 (새 오디오 기준, 초)
+STT_STREAM_STEP_S = float(os.getenv("STT_STREAM_STEP_S", "3"))
+# 확정하지 않은 구간의 최대 길이. 넘으면 조용한 지점에서 확정
+STT_STREAM_WINDOW_S = float(os.getenv("STT_STREAM_WINDOW_S", "20"))
+# 확정 지점을 찾는 범위 (window 끝 기준 앞쪽 초)
+STT_STREAM_SEARCH_S = float(os.getenv("STT_STREAM_SEARCH_S", "6"))
+# 녹음 1건 최대 길이 (초). 넘으면 연결 종료
+STT_STREAM_MAX_S = float(os.getenv("STT_STREAM_MAX_S", "7200"))
+# 변환 엔진: api(OpenAI Whisper) / fast / balanced / accurate (로컬 HFWhisperSTT) / ct2-fast 등 (CT2WhisperSTT)
+STT_STREAM_ENGINE = os.getenv("STT_STREAM_ENGINE", "api")
+# 이보다 조용한 구간은 변환하지 않는다 (무음에서 Whisper 가 문장을 지어내는 것 방지)
+STT_STREAM_SILENCE_DBFS = float(os.getenv("STT_STREAM_SILENCE_DBFS", "-45"))
+
+# 너무 짧은 구간은 변환하지 않는다 (ms)
+MIN_SEGMENT_MS = 1000
+# 앞 문맥으로 넘기는 확정 텍스트 길이 (API prompt)
+PROMPT_CHARS = 200
+SAMPLE_WIDTH = 2
+
+
+_engine_lock = threading.Lock()
+
+
+def get_stream_engine(name: str = STT_STREAM_ENGINE):
+    """스트리밍용 엔진 (프로세스당 1개, 로컬 모델은 처음 연결 때 로드)"""
+    # 동시에 들어온 첫 연결들이 모델을 각각 로드하지 않도록
+    with _engine_lock:
+        return _load_stream_engine(name)
+
+
+@lru_cache(maxsize=None)
+def _load_stream_engine(name: str):
+    if name == "api":
+        # 작업 큐 엔진(core.stt_pipeline.stt_engine)은 STT_ENGINE 이 로컬 모델이면 BatchedTranscriber 라서
+        # 공유하지 않고 스트리밍 전용 API 엔진을 따로 만든다
+        from core.engine.openai_engine import OpenAIWhisperSTT
+        return OpenAIWhisperSTT(model="whisper-1")
+    if name.startswith("ct2-"):
+        from core.engine.ct2_engine import CT2WhisperSTT
+        return LockedEngine(CT2WhisperSTT(model=name))
+    from core.engine.hf_engine import HFWhisperSTT
+    return LockedEngine(HFWhisperSTT(model=name))
+
+
+class LockedEngine:
+    """
+    로컬 엔진(HFWhisperSTT / CT2WhisperSTT)을 감싼다. 나머지 속성(model, language 등)은 엔진 것을 그대로 쓴다.
+    모델 1개를 모든 스트리밍 세션이 같이 쓰는데 로컬 모델 호출은 스레드에 안전하지 않으므로
+    transcribe_segment 를 한 번에 하나씩 실행한다 (API 엔진은 요청별로 독립이라 감싸지 않음)
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self.engine, name)
+
+    def transcribe_segment(self, audio, prompt=None):
+        with self._lock:
+            return self.engine.transcribe_segment(audio, prompt=prompt)
+
+
+class StreamingSession:
+    """
+    연결 1개의 상태. add_pcm 은 이벤트 루프에서, step / finish 는 워커 스레드에서 호출된다.
+    반환하는 이벤트:
+        {"type": "segment", "index": i, "start": 초, "end": 초, "text": 확정 텍스트}
+        {"type": "partial", "text": 아직 확정되지 않은 구간 텍스트}
+    """
+
+    def __init__(self, engine, sample_rate: int = 16000, summarize: bool = True):
+        self.engine = engine
+        self.sample_rate = sample_rate
+        self.bytes_per_ms = sample_rate * SAMPLE_WIDTH / 1000
+        self.step_ms = int(STT_STREAM_STEP_S * 1000)
+        self.window_ms = int(STT_STREAM_WINDOW_S * 1000)
+        self.search_ms = int(min(STT_STREAM_SEARCH_S, STT_STREAM_WINDOW_S / 2) * 1000)
+        self.max_bytes = int(STT_STREAM_MAX_S * 1000 * self.bytes_per_ms)
+
+        self._lock = threading.Lock()
+        self._tail = bytearray()    # 확정되지 않은 PCM
+        self._tail_start_ms = 0     # tail 시작 시각 (녹음 시작 기준)
+        self._received = 0          # 받은 전체 바이트
+        self._stepped = 0           # 마지막 step 때의 _received
+
+        self.segments: List[str] = []
+        self.partial = ""
+        self.transcribe_time = 0.0
+
+        # 녹음 중 미리 요약할 확정 텍스트 블록
+        self.summarizer = ChunkSummarizer() if summarize else None
+        self._block: List[str] = []
+        self._block_chars = 0
+        self._blocks = 0
+
+    # === 입력 ===
+
+    def add_pcm(self, data: bytes) -> None:
+        with self._lock:
+            if self._received + len(data) > self.max_bytes:
+                raise ValueError(f"녹음 길이 제한({STT_STREAM_MAX_S:.0f}초) 초과")
+            self._tail.extend(data)
+            self._received += len(data)
+
+    @property
+    def duration_s(self) -> float:
+        return self._received / self.bytes_per_ms / 1000
+
+    def ready(self) -> bool:
+        """마지막 step 이후 새 오디오가 STEP 이상 쌓였는지"""
+        return (self._received - self._stepped) >= self.step_ms * self.bytes_per_ms
+
+    # === 변환 ===
+
+    def _segment(self, data: bytes) -> AudioSegment:
+        return AudioSegment(
+            data=bytes(data[: len(data) - len(data) % SAMPLE_WIDTH]),
+            sample_width=SAMPLE_WIDTH,
+            frame_rate=self.sample_rate,
+            channels=1,
+        )
+
+    def _transcribe(self, audio: AudioSegment) -> str:
+        if len(audio) < MIN_SEGMENT_MS or audio.dBFS < STT_STREAM_SILENCE_DBFS:
+            return ""
+        start = time.time()
+        prompt = " ".join(self.segments)[-PROMPT_CHARS:] or None
+        text = self.engine.transcribe_segment(audio, prompt=prompt).strip()
+        self.transcribe_time += time.time() - start
+        return text
+
+    def step(self) -> List[Dict]:
+        """window 를 넘었으면 확정 + 남은 tail 중간 결과"""
+        with self._lock:
+            data = bytes(self._tail)
+            self._stepped = self._received
+        events = []
+
+        audio = self._segment(data)
+        while len(audio) > self.window_ms:
+            points = find_split_points(audio, self.window_ms - self.search_ms, self.search_ms)
+            cut = points[0] if points else self.window_ms
+            events.append(self._commit(audio[:cut], cut))
+            audio = audio[cut:]
+
+        self.partial = self._transcribe(audio)
+        events.append({"type": "partial", "text": self.partial})
+        return events
+
+    def finish(self) -> List[Dict]:
+        """녹음 종료: 남은 tail 전체를 확정"""
+        with self._lock:
+            data = bytes(self._tail)
+        events = []
+        audio = self._segment(data)
+        # 마지막 step 이후 길어졌을 수 있으므로 window 단위로 나눠서 확정
+        while len(audio) > self.window_ms:
+            points = find_split_points(audio, self.window_ms - self.search_ms, self.search_ms)
+            cut = points[0] if points else self.window_ms
+            events.append(self._commit(audio[:cut], cut))
+            audio = audio[cut:]
+        if len(audio):
+            events.append(self._commit(audio, len(audio)))
+        self.partial = ""
+        return [e for e in events if e["text"]]
+
+    def _commit(self, audio: AudioSegment, cut_ms: int) -> Dict:
+        """tail 앞부분 cut_ms 를 확정 (해당 PCM 은 버린다)"""
+        text = self._transcribe(audio)
+        start_ms = self._tail_start_ms
+        with self._lock:
+            del self._tail[: int(cut_ms * self.bytes_per_ms) // SAMPLE_WIDTH * SAMPLE_WIDTH]
+            self._tail_start_ms += cut_ms
+        if text:
+            self.segments.append(text)
+            self._add_to_summary(text)
+        return {
+            "type": "segment",
+            "index": len(self.segments) - 1,
+            "start": round(start_ms / 1000, 2),
+            "end": round((start_ms + cut_ms) / 1000, 2),
+            "text": text,
+        }
+
+    # === 요약 ===
+
+    def _add_to_summary(self, text: str) -> None:
+        if self.summarizer is None:
+            return
+        self._block.append(text)
+        self._block_chars += len(text)
+        if self._block_chars >= SUMMARY_MAP_CHARS:
+            self._flush_block()
+
+    def _flush_block(self) -> None:
+        if self._block:
+            self.summarizer.submit(self._blocks, None, " ".join(self._block))
+            self._blocks += 1
+            self._block, self._block_chars = [], 0
+
+    @property
+    def transcript(self) -> str:
+        return " ".join(self.segments)
+
+    def summarize(self) -> Optional[dict]:
+        """
+        finish 이후 호출. 녹음 중 미리 요약한 블록이 있으면 남은 블록만 요약해서 합치고,
+        없으면 전체 텍스트 1회 요약. 실패하면 예외 (호출부가 작업 큐로 넘긴다)
+        """
+        if not self.transcript.strip():
+            return None
+        if self.summarizer is None or self._blocks == 0:
+            self.close()
+            return generate_summary(self.transcript, raise_errors=True)
+        self._flush_block()
+        return self.summarizer.result(raise_errors=True)
+
+    def close(self) -> None:
+        if self.summarizer:
+            self.summarizer.close()
@@ -0,0 +1,182 @@
+"""
+STT 작업 처리 단계 (core/job_queue.py 워커가 실행)
+
+transcribe → summarize → deliver 순서로 진행하고, 단계가 끝날 때마다 결과를 stt_job 에 저장한다.
+중간에 실패하면 워커 풀이 같은 단계부터 재시도하므로 이미 끝난 STT / 요약을 다시 하지 않는다.
+"""
+import os
+import time
+from datetime import datetime
+
+import httpx
+
+from core.engine.openai_engine import OpenAIWhisperSTT
+from core.job_queue import Lease, save_stage
+from core.summarize import SUMMARY_MODEL, ChunkSummarizer, generate_summary
+from core import transcript_cache
+
+# 백엔드 URL (환경 변수로 관리 가능)
+BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
+
+# STT 엔진: api(OpenAI Whisper API, 기본) / fast / balanced / accurate (로컬 HFWhisperSTT)
+STT_ENGINE = os.getenv("STT_ENGINE", "api")
+# 로컬 엔진: 워커들의 요청을 모아 한 번에 추론 (core/engine/batching.py)
+STT_BATCH_MAX_FILES = int(os.getenv("STT_BATCH_MAX_FILES", "8"))
+STT_BATCH_WAIT_MS = float(os.getenv("STT_BATCH_WAIT_MS", "200"))
+
+
+def _build_engine(name: str):
+    if name == "api":
+        return OpenAIWhisperSTT(model="whisper-1")
+    from core.engine.batching import BatchedTranscriber
+    from core.engine.hf_engine import HFWhisperSTT
+    return BatchedTranscriber(
+        HFWhisperSTT(model=name), max_files=STT_BATCH_MAX_FILES, wait_ms=STT_BATCH_WAIT_MS
+    )
+
+
+stt_engine = _build_engine(STT_ENGINE)
+
+# 긴 녹음(청크 분할)은 청크 STT 가 끝나는 대로 요약을 시작한다 (STT / 요약 시간 겹침). 0 이면 STT 후 한 번에 요약
+STT_SUMMARY_PIPELINE = os.getenv("STT_SUMMARY_PIPELINE", "1") == "1"
+
+
+def _post_result(stt_id: str, payload: dict):
+    """백엔드로 결과 POST. 5xx / 연결 실패는 예외 → 재시도, 4xx 는 재시도해도 같으므로 로그만"""
+    with httpx.Client(timeout=30.0) as client:
+        response = client.post(f"{BACKEND_URL}/stt/{stt_id}/result", json=payload)
+    if response.status_code >= 500:
+        raise RuntimeError(f"백엔드 업데이트 실패: {response.status_code}")
+    if response.status_code != 200:
+        print(f"⚠️ [{stt_id}] 백엔드 업데이트 실패: {response.status_code}")
+        return False
+    return True
+
+
+def error_payload(notes: str) -> dict:
+    return {
+        "status": "error",
+        "symptoms": "",
+        "diagnosis": "",
+        "notes": notes,
+        "date": datetime.now().strftime("%Y-%m-%d"),
+    }
+
+
+def summary_payload(summary_result: dict) -> dict:
+    """generate_summary 결과 → 백엔드 콜백 payload"""
+    return {
+        "status": "done",
+        "symptoms": summary_result["symptoms"],
+        "diagnosis": summary_result["diagnosis"],
+        "notes": summary_result["notes"],
+        "date": datetime.now().strftime("%Y-%m-%d"),
+    }
+
+
+def lookup_cache(audio_sha256: str):
+    """현재 STT 엔진 / 요약 모델 기준 transcript 캐시 조회 (core/transcript_cache.py)"""
+    return transcript_cache.lookup(
+        audio_sha256, stt_engine.model, stt_engine.language, summary_model=SUMMARY_MODEL
+    )
+
+
+def cached_stage(cached) -> tuple:
+    """캐시 결과로 건너뛸 수 있는 단계. 반환: (시작 단계, 앞 단계 결과)"""
+    if cached["summary"]:
+        # 날짜는 이번 업로드 기준
+        summary = {**cached["summary"], "date": datetime.now().strftime("%Y-%m-%d")}
+        return "deliver", {"transcript_text": cached["transcript_text"], "summary": summary}
+    return "summarize", {"transcript_text": cached["transcript_text"]}
+
+
+def _remove_file(stt_id: str, file_path: str):
+    try:
+        if file_path and os.path.exists(file_path):
+            os.remove(file_path)
+            print(f"🗑️ [{stt_id}] 업로드 파일 삭제 완료")
+    except Exception as e:
+        print(f"⚠️ [{stt_id}] 업로드 파일 삭제 실패: {e}")
+
+
+def run_job(lease: Lease):
+    """
+    워커 풀 handler. lease.stage 부터 이어서 처리한다.
+    """
+    # 청크 분할 시 청크별 요약 map 을 STT 와 같이 돌린다 (실패 / lease 만료 시에도 스레드 정리)
+    summarizer = ChunkSummarizer() if STT_SUMMARY_PIPELINE and lease.stage == "transcribe" else None
+    try:
+        _run_stages(lease, summarizer)
+    finally:
+        if summarizer:
+            summarizer.close()
+
+
+def _run_stages(lease: Lease, summarizer: ChunkSummarizer = None):
+    stt_id = lease.stt_id
+    total_start = time.time()
+
+    # 0. 같은 녹음이 앞에서 처리됐으면 (동시에 두 번 올라온 경우 등) 캐시 결과로 건너뛴다
+    if lease.stage == "transcribe":
+        cached = lookup_cache(lease.audio_sha256)
+        if cached:
+            next_stage, results = cached_stage(cached)
+            print(f"♻️ [{stt_id}] 캐시 적중 → {next_stage} 단계부터")
+            save_stage(lease, next_stage, **results)
+            _remove_file(stt_id, lease.file_path)
+
+    # 1. STT 처리 (청크 분할 시 청크별 요약 map 을 같이 시작)
+    if lease.stage == "transcribe":
+        print(f"🎙️ [{stt_id}] STT 처리 시작... (시도 {lease.attempts})")
+        stt_start = time.time()
+        result = stt_engine.transcribe(
+            lease.file_path, on_chunk=summarizer.submit if summarizer else None
+        )
+        transcript_text = result.get("text", "")
+        print(f"✅ [{stt_id}] STT 완료 ({time.time() - stt_start:.1f}초): {len(transcript_text)} 글자")
+        save_stage(lease, "summarize", transcript_text=transcript_text)
+        transcript_cache.store_transcript(
+            lease.audio_sha256, stt_engine.model, stt_engine.language, transcript_text
+        )
+        # 텍스트를 DB 에 남겼으므로 오디오는 더 필요 없다
+        _remove_file(stt_id, lease.file_path)
+
+    # 2. 요약 생성
+    if lease.stage == "summarize":
+        transcript_text = lease.transcript_text or ""
+        if transcript_text.strip():
+            summary_start = time.time()
+            if summarizer and summarizer.futures:
+                # 청크별 요약은 STT 중에 이미 돌았으므로 합치기(reduce)만 남았다.
+                # 실패하면 재시도 때 전체 transcript 로 다시 요약한다 (generate_summary 가 길면 map-reduce)
+                print(f"🤖 [{stt_id}] 청크 요약 {len(summarizer.futures)}개 합치는 중...")
+                summary_result = summarizer.result(raise_errors=True)
+            else:
+                print(f"🤖 [{stt_id}] 요약 생성 중...")
+                summary_result = generate_summary(transcript_text, raise_errors=True)
+            print(f"✅ [{stt_id}] 요약 완료 ({time.time() - summary_start:.1f}초)")
+            summary = summary_payload(summary_result)
+            transcript_cache.store_summary(
+                lease.audio_sha256, stt_engine.model, stt_engine.language, summary, SUMMARY_MODEL
+            )
+        else:
+            print(f"⚠️ [{stt_id}] 텍스트가 비어있어 요약 생략")
+            # 빈 텍스트도 백엔드에 알림
+            summary = error_payload("음성 인식 실패 (빈 텍스트)")
+        save_stage(lease, "deliver", summary=summary)
+
+    # 3. 백엔드로 결과 POST
+    if lease.stage == "deliver":
+        print(f"📤 [{stt_id}] 백엔드로 결과 전송 중...")
+        if _post_result(stt_id, lease.summary):
+            print(f"✅ [{stt_id}] 백엔드 업데이트 성공")
+        print(f"⏱️ [{stt_id}] 처리 완료: {time.time() - total_start:.1f}초")
+
+
+def on_give_up(lease: Lease, error: str):
+    """재시도를 다 쓴 작업: 백엔드에 에러 알림 + 업로드 파일 정리"""
+    print(f"❌ [{lease.stt_id}] 처리 실패 (재시도 종료): {error}")
+    try:
+        _post_result(lease.stt_id, error_payload(f"STT 처리 중 에러: {error}"))
+    finally:
+        _remove_file(lease.stt_id, lease.file_path)
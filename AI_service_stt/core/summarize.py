@@ -1,21 +1,265 @@
 """
 OpenAI를 사용한 의료 상담 요약 모듈
+
+요약은 JSON schema(response_format) 로 받는다 ({"symptoms", "diagnosis", "notes"}).
+응답이 어긋나면 (코드 블록, 한글 키, 번호 목록 등) 로컬에서 먼저 고치고,
+그래도 안 되면 응답 텍스트만 JSON 으로 바꾸는 repair 호출을 한 번 한다.
+max_tokens 에서 잘린 응답은 로컬에서 닫지 않는다 (뒷부분이 빠진 요약이 성공으로 나간다).
+max_tokens 를 늘려 한 번 더 부르고, 그래도 잘리면 repair 로 넘긴다.
+파싱 실패 때문에 빈 요약이 나가서 사용자가 STT + 요약을 다시 돌리는 일이 없도록 한다.
 """
+import json
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
 from openai import OpenAI
 from dotenv import load_dotenv
 
+from core.llm_gateway import estimate_tokens, get_gateway
+
 # .env 파일에서 환경변수 로드
 load_dotenv()
 
+# OpenAI 호환 엔드포인트 (부하 테스트용 openai_mock 등). 비우면 OpenAI 기본값
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or "https://api.openai.com/v1"
+
+# 요약 모델 (transcript 캐시는 같은 모델로 만든 요약만 재사용한다)
+SUMMARY_MODEL = "gpt-4o-mini"
+# 요약 호출 1회 deadline(초). 게이트웨이 재시도 포함
+SUMMARY_TIMEOUT_S = float(os.getenv("STT_SUMMARY_TIMEOUT_S", "60"))
+
+# 이보다 긴 transcript 는 나눠서 요약(map) 후 합친다(reduce). 한 번에 넣으면 max_tokens / 컨텍스트 예산을 넘긴다
+SUMMARY_MAP_CHARS = int(os.getenv("STT_SUMMARY_MAP_CHARS", "6000"))
+# 동시에 요약하는 조각 수
+SUMMARY_MAP_CONCURRENCY = int(os.getenv("STT_SUMMARY_MAP_CONCURRENCY", "4"))
+
+# 응답이 max_tokens 에서 잘리면 max_tokens × 이 배수로 한 번 더 호출
+TRUNCATED_RETRY_FACTOR = 2
+
+SYSTEM_PROMPT = "당신은 의료 상담 기록을 이해하기 쉬운 말로 정확하게 요약하는 전문가입니다."
+
+# 요약 필드 (JSON 키 → 화면 섹션 이름). 응답에 한글 키가 와도 받아준다
+SUMMARY_FIELDS = {"symptoms": "증상", "diagnosis": "진단", "notes": "권고사항"}
+EMPTY_FIELD = "없음"
+
+# response_format json_schema (strict: 세 필드 모두 문자열로만)
+SUMMARY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "symptoms": {"type": "string", "description": "환자의 증상"},
+        "diagnosis": {"type": "string", "description": "진단명 또는 추정 진단"},
+        "notes": {"type": "string", "description": "처방, 복용 방법, 생활 습관, 주의사항, 재방문 일정 등 권고사항"},
+    },
+    "required": list(SUMMARY_FIELDS),
+    "additionalProperties": False,
+}
+RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "consultation_summary", "strict": True, "schema": SUMMARY_SCHEMA},
+}
+
+# 최종 요약 형식 (전체 요약 / reduce 공통)
+SUMMARY_FORMAT = """
+다음 JSON 형식으로 정리해주세요. 해당 내용이 없으면 "없음"으로 작성하세요:
+{"symptoms": "...", "diagnosis": "...", "notes": "..."}
+
+- symptoms: 환자의 증상을 간결하게 정리
+- diagnosis: 의사의 진단명 또는 추정 진단만 간결하게 정리하여 텍스트로 기재 (진단명에 -, *같은 이모티콘 제거).
+  예: "급성 장염", "내분비내과 검사 필요", "감기 추정"
+  단, 정확한 진단명이 없을때는 "~추정, ~필요" 식으로 추정 진단명만 간결하게 기재
+- notes: 처방된 약물명, 용량, 복용 방법. 식이요법, 운동, 권고사항, 주의사항, 재방문 일정 등
+"""
+
+FAILED_SUMMARY = {
+    "symptoms": "요약 생성 실패",
+    "diagnosis": "요약 생성 실패",
+    "notes": "요약 생성 실패",
+    "summary_time": 0.0
+}
+
+
+class SummaryTruncated(ValueError):
+    """max_tokens 를 늘려 다시 불러도 응답이 잘림 (content: 마지막 잘린 응답)"""
+
+    def __init__(self, content: str, max_tokens: int):
+        super().__init__(f"max_tokens({max_tokens}) 에서 응답이 잘림")
+        self.content = content
+
+
+_client: Optional[OpenAI] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> OpenAI:
+    """프로세스 전체에서 재사용하는 OpenAI 클라이언트 (요청마다 만들면 연결 풀을 매번 새로 연다)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                # API 키 가져오기
+                api_key = os.getenv("OPENAI_API_KEY")
+                if not api_key:
+                    raise ValueError("OPENAI_API_KEY가 .env 파일에 설정되지 않았습니다")
+
+                # OpenAI 클라이언트 생성 (재시도는 llm_gateway 에서 한 번만)
+                _client = OpenAI(api_key=api_key, base_url=OPENAI_BASE_URL, max_retries=0)
+    return _client
+
+
+def _chat(
+    prompt: str,
+    caller: str = "stt.summarize",
+    max_tokens: int = 1000,
+    temperature: float = 0.3,  # 낮은 값 = 더 일관되고 정확한 응답
+    retry_truncated: bool = True,
+) -> str:
+    """
+    요약 모델 호출 (JSON schema 응답) → 응답 텍스트
+    응답이 max_tokens 에서 잘리면 max_tokens 를 늘려 한 번 더, 그래도 잘리면 SummaryTruncated
+    """
+    client = get_client()
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+    # rate limit / 429 재시도 / deadline 은 게이트웨이가 처리
+    response = get_gateway().call(
+        caller=caller,
+        model=SUMMARY_MODEL,
+        fn=lambda timeout: client.chat.completions.create(
+            model=SUMMARY_MODEL,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,  # 최대 토큰 수
+            response_format=RESPONSE_FORMAT,
+            timeout=timeout,
+        ),
+        est_tokens=estimate_tokens(messages, max_tokens=max_tokens),
+        timeout_s=SUMMARY_TIMEOUT_S,
+    )
+    choice = response.choices[0]
+    content = (choice.message.content or "").strip()
+    if getattr(choice, "finish_reason", None) == "length":
+        if not retry_truncated:
+            raise SummaryTruncated(content, max_tokens)
+        retry_tokens = max_tokens * TRUNCATED_RETRY_FACTOR
+        print(f"⚠️ [{caller}] max_tokens({max_tokens}) 에서 응답이 잘림 → max_tokens({retry_tokens}) 로 재호출")
+        return _chat(prompt, caller, retry_tokens, temperature, retry_truncated=False)
+    return content
+
+
+def _to_result(content: str, start_time: float, caller: str = "stt.summarize") -> dict:
+    # 응답 JSON 검증 / 복구 → 3개 필드
+    fields = parse_summary_json(content)
+    if fields is None:
+        fields = repair_summary(content, caller)
+    return {**fields, "summary_time": round(time.time() - start_time, 2)}
+
+
+def _summary_call(prompt: str, start_time: float, caller: str = "stt.summarize", max_tokens: int = 1000) -> dict:
+    """_chat + _to_result. 늘린 max_tokens 로도 잘린 응답은 로컬 복구 없이 repair 호출로"""
+    try:
+        content = _chat(prompt, caller=caller, max_tokens=max_tokens)
+    except SummaryTruncated as e:
+        print(f"⚠️ [{caller}] max_tokens 를 늘려도 {e}")
+        return {**repair_summary(e.content, caller), "summary_time": round(time.time() - start_time, 2)}
+    return _to_result(content, start_time, caller)
+
+
+# === 응답 검증 / 복구 ===
+
+def _field_text(value) -> str:
+    """필드 값을 문자열로 (리스트는 줄바꿈으로, 빈 값은 "없음")"""
+    if value is None:
+        return EMPTY_FIELD
+    if isinstance(value, list):
+        value = "\n".join(_field_text(v) for v in value if v not in (None, ""))
+    elif isinstance(value, dict):
+        value = "\n".join(f"{k}: {_field_text(v)}" for k, v in value.items())
+    text = str(value).strip()
+    return text or EMPTY_FIELD
+
+
+def _load_json_object(content: str) -> Optional[dict]:
+    """
+    JSON 객체 추출 (```json 코드 블록 / 앞뒤 설명 문장 / 닫는 괄호가 빠진 JSON 허용)
+    max_tokens 에서 잘린 응답은 여기까지 오지 않는다 (_chat 이 재호출, 그래도 잘리면 repair)
+    """
+    text = content.strip()
+    start = text.find("{")
+    if start < 0:
+        return None
+    end = text.rfind("}")
+    candidates = [text[start:end + 1]] if end > start else []
+    # 닫는 괄호가 빠진 JSON: 열린 문자열 / 객체를 닫아서 한 번 더
+    tail = text[start:].rstrip().rstrip(",")
+    if tail.count('"') % 2 == 1:
+        tail += '"'
+    candidates.append(tail + "}")
+    for candidate in candidates:
+        try:
+            data = json.loads(candidate)
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            return data
+    return None
+
+
+def parse_summary_json(content: str) -> Optional[Dict[str, str]]:
+    """
+    응답 → {"symptoms", "diagnosis", "notes"}. 세 필드 모두 못 찾으면 None
+    (JSON 이 아니면 예전 "1. 증상:" 형식도 받아준다)
+    """
+    data = _load_json_object(content or "")
+    if data is not None:
+        fields = {}
+        for key, label in SUMMARY_FIELDS.items():
+            value = data.get(key, data.get(label))
+            if value is not None:
+                fields[key] = _field_text(value)
+    else:
+        sections = parse_summary_sections(content or "")
+        fields = {key: sections[label] for key, label in SUMMARY_FIELDS.items() if sections.get(label)}
+
+    if not fields:
+        return None
+    return {key: fields.get(key, EMPTY_FIELD) for key in SUMMARY_FIELDS}
+
 
-def generate_summary(transcript_text: str) -> dict:
+def repair_summary(content: str, caller: str = "stt.summarize") -> Dict[str, str]:
+    """
+    로컬 복구가 안 되는 응답 → 응답 텍스트만 JSON 으로 다시 정리하는 호출 1회.
+    (transcript 를 다시 보내지 않으므로 요약보다 훨씬 싸다.) 그래도 안 되면 원문을 notes 에 담는다
+    """
+    print(f"⚠️ [{caller}] 요약 JSON 파싱 실패 → repair 호출")
+    if content.strip():
+        try:
+            repaired = _chat(
+                f"다음 의료 상담 요약을 내용은 바꾸지 말고 JSON 으로만 다시 정리해주세요.\n\n"
+                f"[요약]\n{content}\n{SUMMARY_FORMAT}",
+                caller=f"{caller}.repair",
+                temperature=0.0,
+            )
+            fields = parse_summary_json(repaired)
+            if fields is not None:
+                return fields
+        except Exception as e:
+            print(f"❌ [{caller}] repair 호출 실패: {e}")
+    return {"symptoms": EMPTY_FIELD, "diagnosis": EMPTY_FIELD, "notes": content.strip() or EMPTY_FIELD}
+
+
+def generate_summary(transcript_text: str, raise_errors: bool = False) -> dict:
     """
     STT 결과를 OpenAI로 요약
+    SUMMARY_MAP_CHARS 보다 긴 텍스트는 조각별 요약 → 합치기(map-reduce)
 
     Args:
         transcript_text: STT로 변환된 전체 대화 텍스트
+        raise_errors: True 면 API 실패 시 "요약 생성 실패" 대신 예외를 올린다 (작업 큐 재시도용)
         model:  gpt-4o-mini
 
     Returns:
@@ -26,13 +270,8 @@ def generate_summary(transcript_text: str) -> dict:
             "summary_time": 1.23  # 초
         }
     """
-    # API 키 가져오기
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY가 .env 파일에 설정되지 않았습니다")
-
-    # OpenAI 클라이언트 생성
-    client = OpenAI(api_key=api_key)
+    if len(transcript_text) > SUMMARY_MAP_CHARS:
+        return summarize_map_reduce(split_transcript(transcript_text), raise_errors=raise_errors)
 
     # 프롬프트 작성
     prompt = f"""
@@ -41,63 +280,148 @@ def generate_summary(transcript_text: str) -> dict:
 
 [대화 내용]
 {transcript_text}
+{SUMMARY_FORMAT}"""
+
+    # API 호출 시간 측정
+    start_time = time.time()
+
+    try:
+        # GPT 응답 파싱
+        return _summary_call(prompt, start_time)
 
-다음 형식으로 정리해주세요. 각 섹션은 명확하게 구분하고, 해당 내용이 없으면 "없음"으로 작성하세요:
+    except Exception as e:
+        print(f"❌ OpenAI API 호출 실패: {e}")
+        if raise_errors:
+            raise
+        return dict(FAILED_SUMMARY)
 
-1. 증상:
-(환자의 증상을 간결하게 정리)
 
-2. 진단:
-(의사의 진단명 또는 추정 진단만 간결하게 정리하여 텍스트로 기재 (진단명에 -, *같은 이모티콘 제거).
-예: "급성 장염", "내분비내과 검사 필요", "감기 추정"
-단, 정확한 진단명이 없을때는 "~추정, ~필요" 식으로 추정 진단명만 간결하게 기재)
+# === 긴 상담: map-reduce 요약 ===
 
-3. 권고사항:
-(처방된 약물명, 용량, 복용 방법. 식이요법, 운동, 권고사항, 주의사항, 재방문 일정 등)
-"""
+def split_transcript(transcript_text: str, max_chars: int = None) -> List[str]:
+    """문장 경계(. ? ! 공백)에서 max_chars 이하 조각으로 나눈다"""
+    max_chars = max_chars or SUMMARY_MAP_CHARS
+    parts = []
+    rest = transcript_text.strip()
+    while len(rest) > max_chars:
+        window = rest[:max_chars]
+        cut = max(window.rfind(". "), window.rfind("? "), window.rfind("! "))
+        if cut < max_chars // 2:
+            cut = window.rfind(" ")
+        if cut <= 0:
+            cut = max_chars - 1
+        parts.append(rest[:cut + 1].strip())
+        rest = rest[cut + 1:].strip()
+    if rest:
+        parts.append(rest)
+    return parts
 
-    # API 호출 시간 측정
+
+def summarize_part(text: str, index: int, total: Optional[int]) -> Dict[str, str]:
+    """
+    map: 긴 상담의 한 조각에서 증상 / 진단 / 권고사항 메모를 뽑는다.
+    최종 요약이 아니므로 쉬운 말로 바꾸지 않고 약 이름 / 용량 / 일정 같은 세부 사항을 그대로 남긴다.
+    (실시간 스트리밍처럼 전체 조각 수를 아직 모르면 total=None)
+    """
+    position = f"{index + 1}/{total}" if total else f"{index + 1}"
+    prompt = f"""
+다음은 긴 의료 상담 대화의 일부입니다 ({position}번째 부분).
+이 부분에 나온 내용만 빠짐없이 메모해주세요. 약물명, 용량, 검사, 일정 등 세부 사항은 그대로 남기고,
+이 부분에 없는 섹션은 "없음"으로 작성하세요.
+
+[대화 내용]
+{text}
+
+다음 JSON 형식으로 작성하세요:
+{{"symptoms": "...", "diagnosis": "...", "notes": "..."}}
+"""
     start_time = time.time()
+    result = _summary_call(prompt, start_time, "stt.summarize.map", max_tokens=600)
+    result.pop("summary_time")
+    return result
 
-    try:
-        response = client.chat.completions.create(
-            model='gpt-4o-mini',
-            messages=[
-                {"role": "system", "content": "당신은 의료 상담 기록을 이해하기 쉬운 말로 정확하게 요약하는 전문가입니다."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,  # 낮은 값 = 더 일관되고 정확한 응답
-            max_tokens=1000   # 최대 토큰 수
-        )
-
-        summary_time = time.time() - start_time
 
-        # GPT 응답 파싱
-        content = response.choices[0].message.content.strip()
+def reduce_summaries(partials: List[Dict[str, str]], start_time: float) -> dict:
+    """reduce: 조각별 메모(시간 순서)를 하나의 최종 요약으로 합친다. 반환 형식은 generate_summary 와 같다"""
+    notes = "\n\n".join(
+        f"[{i + 1}번째 부분]\n{json.dumps(p, ensure_ascii=False)}" for i, p in enumerate(partials)
+    )
+    prompt = f"""
+당신은 의료 상담 기록을 분석하는 전문가입니다.
+다음은 하나의 긴 의료 상담 대화를 시간 순서대로 나눠 정리한 메모입니다.
+중복은 합치고, 뒤에서 바뀐 내용(진단 변경, 처방 변경 등)은 뒤의 내용을 따르세요.
+전체 상담을 어린아이도 이해할 수 있게 쉬운 말로 요약 정리해주세요:
 
-        # 응답을 3개 섹션으로 분리
-        sections = parse_summary_sections(content)
+[부분별 메모]
+{notes}
+{SUMMARY_FORMAT}"""
+    return _summary_call(prompt, start_time, "stt.summarize.reduce")
 
-        return {
-            "symptoms": sections.get("증상", ""),
-            "diagnosis": sections.get("진단", ""),
-            "notes": sections.get("권고사항", ""),
-            "summary_time": round(summary_time, 2)
-        }
+
+def summarize_map_reduce(parts: List[str], raise_errors: bool = False) -> dict:
+    """조각들을 동시에 요약(map)한 뒤 합친다(reduce). 반환 형식은 generate_summary 와 같다"""
+    start_time = time.time()
+    try:
+        workers = max(1, min(SUMMARY_MAP_CONCURRENCY, len(parts)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            partials = list(executor.map(
+                lambda args: summarize_part(args[1], args[0], len(parts)), enumerate(parts)
+            ))
+        print(f"  Summarized {len(parts)} parts (map {time.time() - start_time:.1f}s), merging...")
+        return reduce_summaries(partials, start_time)
 
     except Exception as e:
-        print(f"❌ OpenAI API 호출 실패: {e}")
-        return {
-            "symptoms": "요약 생성 실패",
-            "diagnosis": "요약 생성 실패",
-            "notes": "요약 생성 실패",
-            "summary_time": 0.0
-        }
+        print(f"❌ OpenAI API 호출 실패 (map-reduce): {e}")
+        if raise_errors:
+            raise
+        return dict(FAILED_SUMMARY)
+
+
+class ChunkSummarizer:
+    """
+    STT 청크가 끝나는 대로 요약(map)을 시작하고, 전체 STT 가 끝나면 합친다(reduce).
+    STT 와 요약 시간이 겹치므로 전체 처리 시간 ≈ STT 시간 + reduce 1회.
+
+        summarizer = ChunkSummarizer()
+        result = stt_engine.transcribe(path, on_chunk=summarizer.submit)
+        summary = summarizer.result() if summarizer.parts else generate_summary(result["text"])
+    """
+
+    def __init__(self, workers: int = None):
+        self.start_time = time.time()
+        self.executor = ThreadPoolExecutor(max_workers=workers or SUMMARY_MAP_CONCURRENCY)
+        self.futures = {}
+        self.parts = 0
+
+    def submit(self, index: int, total: Optional[int], text: str):
+        """청크 하나의 STT 결과 도착 (engine on_chunk 콜백, 스트리밍은 total=None)"""
+        self.parts = total or index + 1
+        if text and text.strip():
+            self.futures[index] = self.executor.submit(summarize_part, text, index, total)
+
+    def result(self, raise_errors: bool = False) -> dict:
+        """남은 map 을 기다린 뒤 reduce. 반환 형식은 generate_summary 와 같다"""
+        try:
+            partials = [self.futures[i].result() for i in sorted(self.futures)]
+            if not partials:
+                raise ValueError("요약할 청크 텍스트가 없습니다")
+            return reduce_summaries(partials, self.start_time)
+
+        except Exception as e:
+            print(f"❌ OpenAI API 호출 실패 (map-reduce): {e}")
+            if raise_errors:
+                raise
+            return dict(FAILED_SUMMARY)
+        finally:
+            self.close()
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
 
 
 def parse_summary_sections(content: str) -> dict:
     """
-    응답을 3개 섹션으로 파싱
+    예전 번호 목록 형식("1. 증상:" ...) 응답을 3개 섹션으로 파싱 (JSON 이 아닌 응답 복구용)
     """
     sections = {}
     current_section = None
@@ -0,0 +1,123 @@
+"""
+같은 녹음 재업로드용 transcript / 요약 캐시 (stt_transcript_cache 테이블)
+
+UI 흐름이 실패하면 사용자가 같은 파일을 다시 올리는 경우가 많다.
+업로드 중 계산한 sha256(core/upload.py) + STT 모델 + 언어를 키로 이전 결과를 찾아
+Whisper / 요약 호출 없이 바로 백엔드 콜백을 보낸다.
+
+- transcript 는 STT 가 끝나면, 요약은 요약이 끝나면 각각 저장한다
+  (요약 단계가 실패해도 다음 재업로드는 STT 를 건너뛴다)
+- 요약은 같은 요약 모델(SUMMARY_MODEL)로 만든 것만 재사용
+- STT_TRANSCRIPT_CACHE_TTL_DAYS 보다 오래된 항목은 쓰지 않는다
+- 캐시 DB 오류는 로그만 남기고 캐시 없음으로 취급 (작업 처리를 막지 않는다)
+"""
+import os
+from datetime import timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+
+from core.models import SessionLocal, TranscriptCache
+
+STT_TRANSCRIPT_CACHE = os.getenv("STT_TRANSCRIPT_CACHE", "1") == "1"
+STT_TRANSCRIPT_CACHE_TTL_DAYS = float(os.getenv("STT_TRANSCRIPT_CACHE_TTL_DAYS", "30"))
+
+
+def _key(audio_sha256: str, model: str, language: str):
+    return (
+        (TranscriptCache.audio_sha256 == audio_sha256)
+        & (TranscriptCache.model == model)
+        & (TranscriptCache.language == language)
+    )
+
+
+def lookup(
+    audio_sha256: Optional[str],
+    model: str,
+    language: str,
+    summary_model: Optional[str] = None,
+) -> Optional[Dict]:
+    """
+    캐시 조회. 없으면 None
+    반환: {"transcript_text": ..., "summary": dict or None}
+    (summary 는 summary_model 이 같을 때만 채운다)
+    """
+    if not STT_TRANSCRIPT_CACHE or not audio_sha256:
+        return None
+    db = SessionLocal()
+    try:
+        entry = (
+            db.query(TranscriptCache)
+            .filter(
+                _key(audio_sha256, model, language),
+                TranscriptCache.transcript_text.isnot(None),
+                TranscriptCache.created_at
+                > func.now() - timedelta(days=STT_TRANSCRIPT_CACHE_TTL_DAYS),
+            )
+            .first()
+        )
+        if entry is None:
+            return None
+        entry.hits = (entry.hits or 0) + 1
+        entry.last_hit_at = func.now()
+        result = {
+            "transcript_text": entry.transcript_text,
+            "summary": entry.summary if entry.summary_model == summary_model else None,
+        }
+        db.commit()
+        return result
+    except Exception as e:
+        print(f"⚠️ transcript 캐시 조회 실패: {e}")
+        return None
+    finally:
+        db.close()
+
+
+def store_transcript(audio_sha256: Optional[str], model: str, language: str, transcript_text: str) -> None:
+    """STT 결과 저장 (다시 만든 transcript 면 이전 요약은 버린다)"""
+    if not STT_TRANSCRIPT_CACHE or not audio_sha256 or not transcript_text.strip():
+        return
+    values = {
+        "transcript_text": transcript_text,
+        "summary": None,
+        "summary_model": None,
+        "created_at": func.now(),
+    }
+    db = SessionLocal()
+    try:
+        db.execute(
+            insert(TranscriptCache)
+            .values(audio_sha256=audio_sha256, model=model, language=language, hits=0, **values)
+            .on_conflict_do_update(
+                index_elements=["audio_sha256", "model", "language"], set_=values
+            )
+        )
+        db.commit()
+    except Exception as e:
+        print(f"⚠️ transcript 캐시 저장 실패: {e}")
+    finally:
+        db.close()
+
+
+def store_summary(
+    audio_sha256: Optional[str],
+    model: str,
+    language: str,
+    summary: Dict,
+    summary_model: str,
+) -> None:
+    """요약 저장 (transcript 가 먼저 저장돼 있어야 한다)"""
+    if not STT_TRANSCRIPT_CACHE or not audio_sha256:
+        return
+    db = SessionLocal()
+    try:
+        db.query(TranscriptCache).filter(_key(audio_sha256, model, language)).update(
+            {"summary": summary, "summary_model": summary_model},
+            synchronize_session=False,
+        )
+        db.commit()
+    except Exception as e:
+        print(f"⚠️ 요약 캐시 저장 실패: {e}")
+    finally:
+        db.close()
@@ -0,0 +1,179 @@
+"""
+업로드 파일 스트리밍 저장
+
+/stt/process 의 multipart 본문을 Starlette 폼 파서(본문 전체를 임시 파일로 spool 한 뒤에야
+핸들러가 실행됨)에 맡기지 않고 request.stream() 에서 직접 파싱해서
+- 파일 파트는 받는 대로 디스크에 쓰고
+- 같은 패스에서 sha256 을 계산하고
+- 누적 크기가 max_bytes 를 넘는 순간 중단한다 (넘긴 파일은 남기지 않음)
+Content-Length 가 없는 (chunked) 요청도 읽는 도중에 제한이 걸린다.
+메모리에는 네트워크에서 받은 청크 하나와 작은 폼 필드만 올라간다.
+"""
+import hashlib
+import os
+from typing import Dict, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+
+try:
+    from python_multipart.exceptions import MultipartParseError
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ModuleNotFoundError:  # python-multipart < 0.0.13
+    from multipart.exceptions import MultipartParseError
+    from multipart.multipart import MultipartParser, parse_options_header
+
+# multipart 경계 / 파트 헤더 / 폼 필드 몫 여유분
+MULTIPART_OVERHEAD = 1024 * 1024
+# 파일이 아닌 폼 필드 하나의 최대 크기 (stt_id, sha256 등 짧은 값만 받는다)
+FORM_FIELD_MAX_BYTES = 64 * 1024
+
+
+class UploadTooLarge(ValueError):
+    """업로드가 크기 제한을 넘음 (→ 413)"""
+
+
+class InvalidUpload(ValueError):
+    """multipart 형식이 아니거나 파일 파트가 없음 (→ 400)"""
+
+
+def check_content_length(content_length: Optional[str], max_bytes: int):
+    """
+    본문을 읽기 전에 Content-Length 로 먼저 거른다.
+    multipart 경계/헤더 몫으로 1MB 여유를 둔다 (정확한 제한은 receive_upload 가 적용).
+    """
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes + MULTIPART_OVERHEAD:
+        raise UploadTooLarge(
+            f"요청 크기({int(content_length) / 1024 / 1024:.1f}MB)가 {max_bytes / 1024 / 1024:.0f}MB 제한을 초과했습니다."
+        )
+
+
+class _MultipartSink:
+    """
+    MultipartParser 콜백 모음.
+    file_field 파트는 part_path 에 쓰면서 크기 / sha256 을 세고, 나머지 파트는 문자열 필드로 모은다.
+    """
+
+    def __init__(self, file_field: str, part_path: str, max_bytes: int):
+        self.file_field = file_field
+        self.part_path = part_path
+        self.max_bytes = max_bytes
+        self.fields: Dict[str, str] = {}
+        self.filename: Optional[str] = None
+        self.size = 0
+        self.digest = hashlib.sha256()
+        self.out = None
+        self.complete = False
+        self._headers: Dict[bytes, bytes] = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._name: Optional[str] = None
+        self._is_file = False
+        self._value = bytearray()
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_end": self.on_end,
+        }
+
+    def on_part_begin(self):
+        self._headers = {}
+        self._value = bytearray()
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = options.get(b"name")
+        if name is None:
+            raise InvalidUpload("multipart 파트에 name 이 없습니다.")
+        self._name = name.decode("utf-8", errors="replace")
+        self._is_file = self._name == self.file_field and b"filename" in options
+        if self._is_file:
+            if self.out is not None:
+                raise InvalidUpload(f"'{self.file_field}' 파일 파트가 두 개 이상입니다.")
+            self.filename = options[b"filename"].decode("utf-8", errors="replace")
+            self.out = open(self.part_path, "wb")
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        chunk = data[start:end]
+        if self._is_file:
+            self.size += len(chunk)
+            if self.size > self.max_bytes:
+                raise UploadTooLarge(f"파일 크기가 {self.max_bytes / 1024 / 1024:.0f}MB 제한을 초과했습니다.")
+            self.digest.update(chunk)
+            self.out.write(chunk)
+        else:
+            self._value += chunk
+            if len(self._value) > FORM_FIELD_MAX_BYTES:
+                raise InvalidUpload(f"폼 필드 '{self._name}' 가 너무 큽니다.")
+
+    def on_part_end(self):
+        if not self._is_file:
+            self.fields[self._name] = self._value.decode("utf-8", errors="replace")
+
+    def on_end(self):
+        self.complete = True
+
+    def close(self):
+        if self.out is not None:
+            self.out.close()
+
+
+async def receive_upload(
+    request: Request, part_path: str, max_bytes: int, file_field: str = "file",
+) -> Tuple[Dict[str, str], Optional[str], int, str]:
+    """
+    multipart/form-data 요청 본문을 읽으면서 file_field 파일을 part_path 에 저장.
+    반환: (나머지 폼 필드, 업로드 파일 이름, 바이트 수, sha256 hex)
+    제한 초과 시 UploadTooLarge, 형식 오류 / 파일 없음은 InvalidUpload (두 경우 모두 part_path 는 삭제).
+    파일 이름이 폼 필드(stt_id 등)에 따라 정해지므로 최종 위치로 옮기는 건 호출하는 쪽이 한다.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise InvalidUpload("multipart/form-data 요청이 아닙니다.")
+
+    sink = _MultipartSink(file_field, part_path, max_bytes)
+    parser = MultipartParser(boundary, sink.callbacks())
+    received = 0
+    try:
+        try:
+            async for chunk in request.stream():
+                received += len(chunk)
+                if received > max_bytes + MULTIPART_OVERHEAD:
+                    raise UploadTooLarge(
+                        f"요청 크기가 {max_bytes / 1024 / 1024:.0f}MB 제한을 초과했습니다."
+                    )
+                # 파싱 콜백이 파일 쓰기까지 하므로 스레드에서 (이벤트 루프를 막지 않도록)
+                await run_in_threadpool(parser.write, chunk)
+            parser.finalize()
+        except MultipartParseError as e:
+            raise InvalidUpload(f"multipart 본문을 해석할 수 없습니다: {e}")
+        finally:
+            sink.close()
+        if not sink.complete:
+            raise InvalidUpload("multipart 본문이 끝 경계 전에 끊겼습니다.")
+        if sink.out is None:
+            raise InvalidUpload(f"'{file_field}' 파일 파트가 없습니다.")
+    except BaseException:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+    return sink.fields, sink.filename, sink.size, sink.digest.hexdigest()
@@ -0,0 +1,6 @@
+# AI_service_stt/tests/__init__.py
+
+"""
+테스트 패키지 초기화용 (test_*.py 끼리 가짜 객체를 import 할 수 있게).
+test_cli.py / test_record.py 는 직접 실행하는 스크립트라 conftest.py 에서 수집 제외.
+"""
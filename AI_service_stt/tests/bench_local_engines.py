@@ -0,0 +1,97 @@
+"""
+로컬 STT 엔진 RTF / WER 비교 (개발용)
+
+같은 오디오를 HFWhisperSTT(transformers float32) 와 CT2WhisperSTT(CTranslate2 int8) 에 돌려서
+모델 로드 시간, 처리 시간, RTF(core/metrics.compute_rtf), (참조 텍스트가 있으면) WER / CER
+(core/metrics.compute_metrics) 을 비교한다. CT2 는 스레드 수 / 빔 크기별로 여러 번 돌릴 수 있다.
+
+python tests/bench_local_engines.py tests/sample_audio/doctor_conversation.mp3 --ref-file tests/reference.txt
+python tests/bench_local_engines.py tests/sample_audio/doctor_conversation.mp3 --models fast ct2-fast --threads 2 4 8 --beam-sizes 1 5
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core.config import STTConfig
+from core.metrics import compute_metrics, compute_rtf
+
+
+def load_engine(model, threads=None, beam_size=None):
+    """반환: (엔진, 설정 설명, 로드 시간)"""
+    start = time.time()
+    if STTConfig.is_ct2_model(model):
+        from core.engine.ct2_engine import CT2WhisperSTT
+        stt = CT2WhisperSTT(model=model, threads=threads, beam_size=beam_size)
+        label = f"{model} int8 t{stt.threads} b{stt.beam_size}"
+    else:
+        from core.engine.hf_engine import HFWhisperSTT
+        stt = HFWhisperSTT(model=model)
+        label = f"{model} hf-fp32"
+    return stt, label, time.time() - start
+
+
+def run(audio_path, model, repeat, ref_text=None, threads=None, beam_size=None):
+    stt, label, load_time = load_engine(model, threads, beam_size)
+    # 첫 호출은 워밍업 (메모리 할당 / 커널 초기화)
+    stt.transcribe(audio_path)
+    runs = [stt.transcribe(audio_path) for _ in range(repeat)]
+    last = runs[-1]
+    processing_time = statistics.median(r["processing_time"] for r in runs)
+    row = {
+        "engine": label,
+        "load_s": round(load_time, 2),
+        "audio_s": last["audio_length"],
+        "processing_s": round(processing_time, 2),
+        "rtf": compute_rtf(processing_time, last["audio_length"]),
+    }
+    if ref_text:
+        metrics = compute_metrics(ref_text, last["text"])
+        row["wer"] = round(metrics["wer"], 4)
+        row["cer"] = round(metrics["cer"], 4)
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 STT 엔진(HF / CTranslate2) RTF / WER 비교")
+    parser.add_argument("audio_path")
+    local_models = list(STTConfig.HF_MODELS) + list(STTConfig.CT2_MODELS)
+    parser.add_argument("--models", nargs="+", choices=local_models, default=["fast", "ct2-fast"])
+    parser.add_argument("--threads", nargs="+", type=int, default=[None], help="CT2 스레드 수 (여러 개면 각각 실행)")
+    parser.add_argument("--beam-sizes", nargs="+", type=int, default=[None], help="CT2 빔 크기 (여러 개면 각각 실행)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--ref-file", default=None)
+    parser.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    ref_text = Path(args.ref_file).read_text(encoding="utf-8") if args.ref_file else None
+    rows = []
+    for model in args.models:
+        if STTConfig.is_ct2_model(model):
+            for threads in args.threads:
+                for beam_size in args.beam_sizes:
+                    rows.append(run(args.audio_path, model, args.repeat, ref_text, threads, beam_size))
+        else:
+            rows.append(run(args.audio_path, model, args.repeat, ref_text))
+
+    base = rows[0]
+    print(f"\n{'engine':<28}{'load':>8}{'process':>10}{'RTF':>9}{'speedup':>9}")
+    for row in rows:
+        speedup = base["rtf"] / row["rtf"] if row["rtf"] else 0.0
+        print(
+            f"{row['engine']:<28}{row['load_s']:>7.1f}s{row['processing_s']:>9.2f}s"
+            f"{row['rtf']:>9.4f}{speedup:>8.2f}x"
+            + (f"  WER {row['wer']:.4f}  CER {row['cer']:.4f}" if "wer" in row else "")
+        )
+
+    if args.out:
+        Path(args.out).write_text(json.dumps(rows, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\nsaved → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
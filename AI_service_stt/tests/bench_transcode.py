@@ -0,0 +1,73 @@
+"""
+업로드 전 재인코딩 벤치마크 (개발용)
+
+같은 오디오를 재인코딩 형식(none / mp3 / opus)별로 OpenAIWhisperSTT 에 돌려서
+업로드 바이트, 인코딩 시간, 전체 처리 시간(end-to-end), (참조 텍스트가 있으면) CER 을 비교한다.
+
+python tests/bench_transcode.py tests/sample_audio/doctor_conversation.mp3
+python tests/bench_transcode.py tests/sample_audio/doctor_conversation.mp3 --formats none opus --repeat 3 --ref-file tests/reference.txt
+"""
+import argparse
+import json
+import statistics
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dotenv import load_dotenv
+
+from core.engine.openai_engine import OpenAIWhisperSTT
+from core.engine.transcode import TRANSCODE_PRESETS
+from core.metrics import compute_metrics
+
+load_dotenv()
+
+
+def run(audio_path, fmt, repeat, model, ref_text=None):
+    stt = OpenAIWhisperSTT(model=model, transcode=fmt)
+    runs = [stt.transcribe(audio_path) for _ in range(repeat)]
+    last = runs[-1]
+    row = {
+        "format": stt.transcoder.describe(),
+        "source_kb": round(last["source_bytes"] / 1024, 1),
+        "upload_kb": round(last["upload_bytes"] / 1024, 1),
+        "transcode_s": round(statistics.median(r["transcode_time"] for r in runs), 2),
+        "end_to_end_s": round(statistics.median(r["processing_time"] for r in runs), 2),
+    }
+    if ref_text:
+        row["cer"] = round(compute_metrics(ref_text, last["text"])["cer"], 4)
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description="업로드 전 재인코딩 형식별 바이트 / 지연 비교")
+    parser.add_argument("audio_path")
+    parser.add_argument("--formats", nargs="+", choices=list(TRANSCODE_PRESETS), default=list(TRANSCODE_PRESETS))
+    parser.add_argument("--model", default="whisper-1")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--ref-file", default=None)
+    parser.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    ref_text = Path(args.ref_file).read_text(encoding="utf-8") if args.ref_file else None
+    rows = [run(args.audio_path, fmt, args.repeat, args.model, ref_text) for fmt in args.formats]
+
+    base = rows[0]
+    print(f"\n{'format':<24}{'upload':>12}{'reduction':>11}{'transcode':>11}{'e2e':>9}{'Δe2e':>9}")
+    for row in rows:
+        reduction = 1 - row["upload_kb"] / base["upload_kb"] if base["upload_kb"] else 0.0
+        print(
+            f"{row['format']:<24}{row['upload_kb']:>10.0f}KB{reduction:>10.0%}"
+            f"{row['transcode_s']:>10.2f}s{row['end_to_end_s']:>8.2f}s"
+            f"{row['end_to_end_s'] - base['end_to_end_s']:>+8.2f}s"
+            + (f"  CER {row['cer']:.4f}" if "cer" in row else "")
+        )
+
+    if args.out:
+        Path(args.out).write_text(json.dumps(rows, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\nsaved → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
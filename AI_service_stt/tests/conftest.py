@@ -0,0 +1,20 @@
+# AI_service_stt/tests/conftest.py
+"""
+STT 단위 테스트 공통 설정 (python -m pytest tests, AI_service_stt 에서 실행)
+
+- DB / OpenAI 없이 돌도록 모듈 import 전에 환경 변수를 채운다
+  (core.stt_pipeline 은 import 시점에 OpenAIWhisperSTT 를 만들고, core.models 는 엔진을 만든다.
+  실제 DB 호출은 각 테스트가 SessionLocal 을 가짜 세션으로 바꿔서 막는다)
+- test_cli.py / test_record.py 는 pytest 테스트가 아니라 직접 실행하는 스크립트 (마이크, 로컬 모델 필요)
+"""
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("STT_UPLOAD_DIR", os.path.join("/tmp", "stt_test_uploads"))
+
+collect_ignore = ["test_cli.py", "test_record.py"]
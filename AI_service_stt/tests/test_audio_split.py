@@ -0,0 +1,48 @@
+# AI_service_stt/tests/test_audio_split.py
+
+from __future__ import annotations
+
+from pydub import AudioSegment
+from pydub.generators import Sine
+
+from core.engine.audio_split import find_split_points, split_audio
+
+
+def _speech(ms: int) -> AudioSegment:
+    return Sine(440).to_audio_segment(duration=ms, volume=-10).set_frame_rate(16000).set_channels(1)
+
+
+def _silence(ms: int) -> AudioSegment:
+    return AudioSegment.silent(duration=ms, frame_rate=16000)
+
+
+def test_short_audio_not_split():
+    audio = _speech(5000)
+
+    assert find_split_points(audio, target_ms=4000, search_ms=1000) == []
+    chunks = split_audio(audio, target_ms=4000, search_ms=1000)
+    assert [(start, len(chunk)) for start, chunk in chunks] == [(0, 5000)]
+
+
+def test_split_at_silence():
+    """목표 길이(10초) ±3초 안의 무음 구간 가운데에서 자른다."""
+    audio = _speech(8000) + _silence(1000) + _speech(8000) + _silence(1000) + _speech(8000)
+
+    points = find_split_points(audio, target_ms=10000, search_ms=3000)
+
+    assert len(points) == 2
+    assert 8000 <= points[0] <= 9000
+    assert 17000 <= points[1] <= 18000
+
+
+def test_split_audio_covers_everything():
+    """청크를 이어 붙이면 원래 길이 그대로 (겹치거나 빠지는 구간 없음)."""
+    audio = _speech(7000) + _silence(600) + _speech(9000) + _silence(600) + _speech(4000)
+
+    chunks = split_audio(audio, target_ms=6000, search_ms=2000)
+
+    assert len(chunks) > 1
+    assert chunks[0][0] == 0
+    for (start, chunk), (next_start, _) in zip(chunks, chunks[1:]):
+        assert start + len(chunk) == next_start
+    assert chunks[-1][0] + len(chunks[-1][1]) == len(audio)
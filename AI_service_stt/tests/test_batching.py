@@ -0,0 +1,84 @@
+# AI_service_stt/tests/test_batching.py
+
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from core.engine.batching import BatchedTranscriber
+
+
+class FakeEngine:
+    """transcribe_many 는 배치에 bad 파일이 있으면 통째로 실패, transcribe 는 그 파일만 실패"""
+
+    model = "fast"
+
+    def __init__(self):
+        self.batches = []
+        self.singles = []
+
+    def transcribe_many(self, paths, refs):
+        self.batches.append(list(paths))
+        if any("bad" in p for p in paths):
+            raise RuntimeError("CUDA out of memory")
+        return [{"text": p} for p in paths]
+
+    def transcribe(self, path, ref=None):
+        self.singles.append(path)
+        if "bad" in path:
+            raise ValueError(f"decode failed: {path}")
+        return {"text": path}
+
+
+def _transcribe_concurrently(batcher, paths):
+    """워커 스레드 여러 개가 동시에 transcribe() 를 부르는 상황. 반환: {path: 결과 또는 예외}"""
+    results = {}
+
+    def worker(path):
+        try:
+            results[path] = batcher.transcribe(path)
+        except Exception as e:
+            results[path] = e
+
+    threads = [threading.Thread(target=worker, args=(p,)) for p in paths]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=10)
+    return results
+
+
+def test_requests_are_batched():
+    engine = FakeEngine()
+    batcher = BatchedTranscriber(engine, max_files=8, wait_ms=300)
+
+    results = _transcribe_concurrently(batcher, ["a.wav", "b.wav", "c.wav"])
+
+    assert {p: r["text"] for p, r in results.items()} == {"a.wav": "a.wav", "b.wav": "b.wav", "c.wav": "c.wav"}
+    assert len(engine.batches) == 1
+    assert sorted(engine.batches[0]) == ["a.wav", "b.wav", "c.wav"]
+    # 엔진의 나머지 속성은 그대로
+    assert batcher.model == "fast"
+
+
+def test_batch_failure_falls_back_per_file():
+    """배치가 실패하면 파일별로 다시 돌려서 문제 있는 파일만 실패시킨다."""
+    engine = FakeEngine()
+    batcher = BatchedTranscriber(engine, max_files=8, wait_ms=300)
+
+    results = _transcribe_concurrently(batcher, ["a.wav", "bad.wav", "c.wav"])
+
+    assert results["a.wav"] == {"text": "a.wav"}
+    assert results["c.wav"] == {"text": "c.wav"}
+    assert isinstance(results["bad.wav"], ValueError)
+    assert sorted(engine.singles) == ["a.wav", "bad.wav", "c.wav"]
+
+
+def test_single_file_failure_not_retried():
+    engine = FakeEngine()
+    batcher = BatchedTranscriber(engine, max_files=8, wait_ms=10)
+
+    with pytest.raises(RuntimeError):
+        batcher.transcribe("bad.wav")
+    assert engine.singles == []
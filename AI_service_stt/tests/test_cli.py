@@ -2,18 +2,24 @@
 STT 실행 메인 파일
 """
 import argparse
+import time
 from pathlib import Path
 from core.engine.hf_engine import HFWhisperSTT
+from core.engine.ct2_engine import CT2WhisperSTT
 from core.engine.openai_engine import OpenAIWhisperSTT
 from core.crud import init_db, save_transcript, save_summary
 from core.metrics import compute_metrics, compute_rtf
 from core.config import STTConfig
+from core.engine.transcode import STT_TRANSCODE_FORMAT, TRANSCODE_PRESETS
 from core.summarize import generate_summary
 from dotenv import load_dotenv
 
 # .env 파일 로드
 load_dotenv()
 
+AUDIO_EXTENSIONS = {".mp3", ".wav", ".m4a", ".flac", ".ogg", ".webm"}
+
+
 def load_reference_text(args):
     """
     평가용 참조 텍스트 로드
@@ -60,19 +66,55 @@ def main():
         help="VAD(Voice Activity Detection) 사용 (HF 모델만 적용)"
     )
 
+    parser.add_argument( #업로드 전 재인코딩
+        "--transcode",
+        type=str,
+        choices=list(TRANSCODE_PRESETS),
+        default=STT_TRANSCODE_FORMAT,
+        help="업로드 전 재인코딩 형식 (OpenAI 모델만 적용, 기본: opus)"
+    )
+
+    parser.add_argument( #HF 배치 추론
+        "--batch-size",
+        type=int,
+        default=None,
+        help="한 번에 모델에 넣는 30초 창 수 (HF 모델만 적용, 기본: STT_HF_BATCH_SIZE=8)"
+    )
+    parser.add_argument( #CTranslate2 추론 설정
+        "--threads",
+        type=int,
+        default=None,
+        help="CPU 스레드 수 (ct2 모델만 적용, 기본: STT_CT2_THREADS 또는 코어 수)"
+    )
+    parser.add_argument(
+        "--beam-size",
+        type=int,
+        default=None,
+        help="빔 크기 (ct2 모델만 적용, 기본: STT_CT2_BEAM_SIZE=1)"
+    )
+
     args = parser.parse_args()
 
     # STT 엔진 선택
     if STTConfig.is_api_model(args.model):
         # OpenAI API 모델
-        stt = OpenAIWhisperSTT(model=args.model)
-        print(f"Using OpenAI API: {args.model}")
+        stt = OpenAIWhisperSTT(model=args.model, transcode=args.transcode)
+        print(f"Using OpenAI API: {args.model} (transcode: {stt.transcoder.describe()})")
+    elif STTConfig.is_ct2_model(args.model):
+        # CTranslate2 int8 로컬 모델
+        stt = CT2WhisperSTT(
+            model=args.model,
+            threads=args.threads,
+            beam_size=args.beam_size,
+            use_vad=args.vad
+        )
     else:
         # HuggingFace 로컬 모델
         stt = HFWhisperSTT(
             model=args.model,
             noise_reduction=not args.no_noise_reduction,
-            use_vad=args.vad
+            use_vad=args.vad,
+            batch_size=args.batch_size
         )
 
     # 테이블 없으면 생성
@@ -99,6 +141,8 @@ def main():
 
         print(f"\n⚡ Performance")
         print(f"  파일 크기: {file_size_mb:.2f} MB")
+        if result.get("upload_bytes") is not None:
+            print(f"  업로드 크기: {result['upload_bytes'] / (1024 * 1024):.2f} MB (재인코딩 {result.get('transcode_time', 0):.2f}초)")
         if audio_length and audio_length > 0:
             if rtf <= 1.0:
                 print(f"  RTF: {rtf:.4f} (오디오 길이 대비 {1/rtf:.2f}배 짧은 시간동안 처리됨)")
@@ -159,6 +203,44 @@ def main():
             print(f"  WER: {m['wer']:.4f}  CER: {m['cer']:.4f}")
             print(f"  참조 글자수: {m['ref_chars']}  인식 글자수: {m['hyp_chars']}")
 
+    # 디렉토리: 평가 세트 일괄 변환 (HF 모델은 파일 간 창을 묶어 배치 추론)
+    elif audio_path.is_dir():
+        audio_files = sorted(p for p in audio_path.iterdir() if p.suffix.lower() in AUDIO_EXTENSIONS)
+        if not audio_files:
+            print(f"❌ No audio files in: {audio_path}")
+            return
+
+        # 파일별 참조 텍스트: 같은 이름의 .txt (예: consultation.mp3 → consultation.txt)
+        ref_texts = [
+            f.with_suffix(".txt").read_text(encoding="utf-8") if f.with_suffix(".txt").exists() else None
+            for f in audio_files
+        ]
+
+        start_time = time.time()
+        if hasattr(stt, "transcribe_many"):
+            results = stt.transcribe_many([str(f) for f in audio_files], ref_texts)
+        else:
+            results = [stt.transcribe(str(f)) for f in audio_files]
+        wall_time = time.time() - start_time
+
+        print("\n" + "="*50)
+        print(f"📂 평가 세트: {len(audio_files)}개 파일")
+        print("="*50)
+        total_audio = 0.0
+        for f, result, ref_text in zip(audio_files, results, ref_texts):
+            audio_length = result.get("audio_length") or 0
+            total_audio += audio_length
+            rtf = compute_rtf(result.get("processing_time", 0), audio_length)
+            line = f"  {f.name:<32} {audio_length:>7.1f}s  RTF {rtf:.4f}"
+            if ref_text:
+                m = compute_metrics(ref_text, result.get("text", ""))
+                line += f"  WER {m['wer']:.4f}  CER {m['cer']:.4f}"
+            print(line)
+
+        print(f"\n⚡ Throughput")
+        print(f"  전체 오디오: {total_audio:.1f}초 / 처리 시간: {wall_time:.1f}초")
+        print(f"  RTF: {compute_rtf(wall_time, total_audio):.4f} ({total_audio / max(wall_time, 0.001):.1f}x real-time)")
+
     else:
         print(f"❌ Invalid audio file path: {audio_path}")
 
@@ -0,0 +1,141 @@
+# AI_service_stt/tests/test_ct2_engine.py
+
+from __future__ import annotations
+
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from pydub import AudioSegment
+from pydub.generators import Sine
+
+# 로컬 엔진 의존성 (requirements.txt 의 선택 항목). faster-whisper 는 아래에서 가짜로 바꾼다
+pytest.importorskip("torch")
+pytest.importorskip("librosa")
+pytest.importorskip("jiwer")
+
+from core.config import STTConfig  # noqa: E402
+
+
+class FakeWhisperModel:
+    """
+    faster_whisper.WhisperModel 대체.
+    생성 인자와 transcribe 호출 인자를 기록하고, 정해 둔 segments 를 generator 로 돌려준다
+    """
+
+    instances = []
+
+    def __init__(self, model_size_or_path, device="auto", compute_type="default", cpu_threads=0):
+        self.model_size_or_path = model_size_or_path
+        self.device = device
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.calls = []
+        self.segments = [(0.0, 1.234, " 머리가 아파요."), (1.234, 2.5, " 언제부터요?")]
+        FakeWhisperModel.instances.append(self)
+
+    def transcribe(self, audio, **kwargs):
+        self.calls.append({"audio": audio, **kwargs})
+        segments = (SimpleNamespace(start=s, end=e, text=t) for s, e, t in self.segments)
+        return segments, SimpleNamespace(language="ko")
+
+
+@pytest.fixture
+def ct2(monkeypatch):
+    FakeWhisperModel.instances = []
+    monkeypatch.setitem(sys.modules, "faster_whisper", SimpleNamespace(WhisperModel=FakeWhisperModel))
+    from core.engine.ct2_engine import CT2WhisperSTT
+    return CT2WhisperSTT
+
+
+def _tone(ms: int) -> AudioSegment:
+    return Sine(440).to_audio_segment(duration=ms, volume=-10)
+
+
+def _wav(tmp_path, audio: AudioSegment, name="a.wav") -> str:
+    path = tmp_path / name
+    audio.set_frame_rate(16000).set_channels(1).export(path, format="wav")
+    return str(path)
+
+
+# =========================================================
+# 생성: 스레드 / 빔 / 연산 타입 전달
+# =========================================================
+
+def test_wiring_explicit(ct2):
+    stt = ct2(model="ct2-balanced", threads=3, beam_size=5, compute_type="float32", use_vad=True)
+
+    model = FakeWhisperModel.instances[0]
+    assert model.model_size_or_path == "medium"
+    assert model.cpu_threads == 3
+    assert model.compute_type == "float32"
+    assert model.device == STTConfig.DEVICE
+    assert stt.get_model_info()["beam_size"] == 5
+
+
+def test_wiring_defaults(ct2, monkeypatch):
+    """인자가 없으면 STT_CT2_* 설정값."""
+    monkeypatch.setattr(STTConfig, "CT2_CPU_THREADS", 6)
+    monkeypatch.setattr(STTConfig, "CT2_BEAM_SIZE", 2)
+    monkeypatch.setattr(STTConfig, "CT2_COMPUTE_TYPE", "int8_float32")
+
+    stt = ct2()
+
+    model = FakeWhisperModel.instances[0]
+    assert model.model_size_or_path == "small"
+    assert (model.cpu_threads, model.compute_type) == (6, "int8_float32")
+    assert (stt.threads, stt.beam_size) == (6, 2)
+
+
+# =========================================================
+# transcribe / transcribe_segment
+# =========================================================
+
+def test_transcribe(ct2, tmp_path):
+    stt = ct2(beam_size=5, use_vad=True)
+    path = _wav(tmp_path, _tone(3000))
+
+    result = stt.transcribe(path, reference_text="머리가 아파요. 언제부터요?")
+
+    call = stt.transcriber.calls[0]
+    assert call["language"] == "ko"
+    assert call["beam_size"] == 5
+    assert call["vad_filter"] is True
+    assert call["initial_prompt"] is None
+    # 16kHz mono float32 로 넘긴다
+    assert call["audio"].dtype == np.float32
+    assert len(call["audio"]) == pytest.approx(3 * 16000, abs=160)
+
+    assert result["text"] == "머리가 아파요. 언제부터요?"
+    assert result["model"] == "ct2/small"
+    assert result["audio_length"] == pytest.approx(3.0, abs=0.01)
+    assert result["segments"][0] == {"timestamp": (0.0, 1.23), "text": " 머리가 아파요."}
+    assert result["metrics"]["wer"] == 0
+    assert "rtf" in result
+
+
+@pytest.mark.parametrize("audio", [_tone(500), AudioSegment.silent(duration=3000, frame_rate=16000)])
+def test_short_or_silent_audio_skipped(ct2, tmp_path, audio):
+    """MIN_AUDIO_LENGTH 미만 / SILENCE_RMS_THRESHOLD 미만이면 모델을 부르지 않고 빈 결과."""
+    stt = ct2()
+
+    result = stt.transcribe(_wav(tmp_path, audio))
+
+    assert result["text"] == ""
+    assert stt.transcriber.calls == []
+
+
+def test_transcribe_segment(ct2):
+    """스트리밍 구간(AudioSegment, 44.1kHz stereo)을 16kHz mono float32 로 바꿔 넘기고 prompt 전달."""
+    stt = ct2()
+    audio = _tone(2000).set_frame_rate(44100).set_channels(2)
+
+    text = stt.transcribe_segment(audio, prompt="앞 문맥")
+
+    call = stt.transcriber.calls[0]
+    assert text == "머리가 아파요. 언제부터요?"
+    assert call["initial_prompt"] == "앞 문맥"
+    assert call["audio"].dtype == np.float32
+    assert len(call["audio"]) == 2 * 16000
+    assert np.abs(call["audio"]).max() <= 1.0
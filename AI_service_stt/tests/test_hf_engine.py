@@ -0,0 +1,139 @@
+# AI_service_stt/tests/test_hf_engine.py
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from pydub import AudioSegment
+from pydub.generators import Sine
+
+# 로컬 엔진 의존성 (requirements.txt 의 선택 항목). transformers pipeline 은 아래에서 가짜로 바꾼다
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+pytest.importorskip("librosa")
+pytest.importorskip("jiwer")
+
+from core.config import STTConfig  # noqa: E402
+from core.engine import hf_engine  # noqa: E402
+
+
+class FakePipeline:
+    """
+    transformers ASR pipeline 대체.
+    호출 인자를 기록하고, 입력마다 "{길이}초" 텍스트를 돌려준다
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, inputs, **kwargs):
+        self.calls.append({"inputs": inputs, **kwargs})
+        if isinstance(inputs, dict):
+            return {"text": "구간"}
+        return [
+            {"text": f"{len(x['array']) / x['sampling_rate']:.0f}초", "chunks": [{"timestamp": (0.0, 1.0)}]}
+            for x in inputs
+        ]
+
+
+@pytest.fixture
+def hf(monkeypatch):
+    created = []
+
+    def pipeline(task, model, device, return_timestamps):
+        created.append({"task": task, "model": model, "return_timestamps": return_timestamps})
+        return FakePipeline()
+
+    monkeypatch.setattr(hf_engine, "pipeline", pipeline)
+    monkeypatch.setattr(hf_engine.HFWhisperSTT, "created", created, raising=False)
+    return hf_engine.HFWhisperSTT
+
+
+def _wav(tmp_path, audio: AudioSegment, name: str) -> str:
+    path = tmp_path / name
+    audio.set_frame_rate(16000).set_channels(1).export(path, format="wav")
+    return str(path)
+
+
+def _tone(ms: int) -> AudioSegment:
+    return Sine(440).to_audio_segment(duration=ms, volume=-10)
+
+
+# =========================================================
+# 생성: 배치 / 창 설정
+# =========================================================
+
+def test_wiring(hf, monkeypatch):
+    monkeypatch.setattr(STTConfig, "HF_BATCH_SIZE", 6)
+    monkeypatch.setattr(STTConfig, "HF_CHUNK_LENGTH_S", 30)
+    monkeypatch.setattr(STTConfig, "HF_STRIDE_LENGTH_S", 5)
+
+    default = hf(model="fast")
+    explicit = hf(model="fast", batch_size=2, chunk_length_s=20, stride_length_s=0)
+
+    assert hf.created[0]["task"] == "automatic-speech-recognition"
+    assert hf.created[0]["model"] == STTConfig.get_model("fast")
+    assert (default.batch_size, default.chunk_length_s, default.stride_length_s) == (6, 30, 5)
+    # stride 0 은 "겹침 없음" 으로 그대로 (기본값으로 바꾸지 않는다)
+    assert (explicit.batch_size, explicit.chunk_length_s, explicit.stride_length_s) == (2, 20, 0)
+
+
+# =========================================================
+# transcribe_many: 파일 여러 개를 창 단위 배치 1회로
+# =========================================================
+
+def test_transcribe_many_single_batched_call(hf, tmp_path):
+    stt = hf(model="fast", batch_size=4, chunk_length_s=30, stride_length_s=5)
+    paths = [_wav(tmp_path, _tone(3000), "a.wav"), _wav(tmp_path, _tone(9000), "b.wav")]
+
+    results = stt.transcribe_many(paths, ["3초", None])
+
+    assert len(stt.transcriber.calls) == 1
+    call = stt.transcriber.calls[0]
+    assert [x["sampling_rate"] for x in call["inputs"]] == [16000, 16000]
+    assert (call["batch_size"], call["chunk_length_s"], call["stride_length_s"]) == (4, 30, 5)
+    assert call["generate_kwargs"] == {"language": STTConfig.LANGUAGE, "task": "transcribe"}
+
+    assert [r["text"] for r in results] == ["3초", "9초"]
+    assert [r["audio_file"] for r in results] == ["a.wav", "b.wav"]
+    assert all(r["batch_files"] == 2 for r in results)
+    assert results[0]["metrics"]["wer"] == 0
+    assert "metrics" not in results[1]
+    # 배치 추론 시간 전체는 파일마다 같은 값으로 남긴다
+    assert results[0]["batch_time"] == results[1]["batch_time"]
+    assert results[1]["segments"] == [{"timestamp": (0.0, 1.0)}]
+
+
+def test_transcribe_many_skips_short_and_silent(hf, tmp_path):
+    """짧은 / 무음 파일은 배치에 넣지 않고 제자리에 빈 결과."""
+    stt = hf(model="fast")
+    paths = [
+        _wav(tmp_path, _tone(500), "short.wav"),
+        _wav(tmp_path, _tone(3000), "ok.wav"),
+        _wav(tmp_path, AudioSegment.silent(duration=3000, frame_rate=16000), "silent.wav"),
+    ]
+
+    results = stt.transcribe_many(paths)
+
+    assert [r["text"] for r in results] == ["", "3초", ""]
+    assert len(stt.transcriber.calls[0]["inputs"]) == 1
+    assert results[1]["batch_files"] == 1
+
+
+def test_transcribe_many_all_skipped(hf, tmp_path):
+    stt = hf(model="fast")
+
+    results = stt.transcribe_many([_wav(tmp_path, _tone(500), "short.wav")])
+
+    assert results[0]["text"] == ""
+    assert stt.transcriber.calls == []
+
+
+def test_transcribe_delegates_to_batch(hf, tmp_path):
+    stt = hf(model="fast")
+
+    result = stt.transcribe(_wav(tmp_path, _tone(3000), "a.wav"))
+
+    assert result["text"] == "3초"
+    assert result["batch_files"] == 1
+    assert isinstance(stt.transcriber.calls[0]["inputs"][0]["array"], np.ndarray)
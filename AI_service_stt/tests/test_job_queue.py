@@ -0,0 +1,246 @@
+# AI_service_stt/tests/test_job_queue.py
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+import pytest
+
+from core import job_queue
+from core.job_queue import JobWorkerPool, Lease, LeaseLost
+from core.models import STTJob
+
+
+# =========================================================
+# 가짜 세션 (SessionLocal 대체)
+# =========================================================
+
+class FakeQuery:
+    def __init__(self, db):
+        self.db = db
+
+    def filter(self, *args):
+        return self
+
+    def order_by(self, *args):
+        return self
+
+    def with_for_update(self, **kwargs):
+        self.db.for_update = kwargs
+        return self
+
+    def first(self):
+        return self.db.job
+
+    def update(self, fields, synchronize_session=None):
+        self.db.updates.append(fields)
+        return self.db.rowcount
+
+
+class FakeSession:
+    """
+    stt_job 행 하나를 흉내 내는 세션.
+    - job: query().first() 가 돌려줄 행 (None 이면 가져갈 작업 없음)
+    - rowcount: query().update() 결과 (0 이면 다른 워커가 lease 를 가져간 상태)
+    """
+
+    def __init__(self, job=None, rowcount=1):
+        self.job = job
+        self.rowcount = rowcount
+        self.updates = []
+        self.added = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.for_update = None
+
+    def __call__(self):
+        # SessionLocal() 대신 자기 자신을 돌려준다
+        return self
+
+    def query(self, *args):
+        return FakeQuery(self)
+
+    def add(self, obj):
+        self.added.append(obj)
+        self.job = obj
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def refresh(self, obj):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    db = FakeSession()
+    monkeypatch.setattr(job_queue, "SessionLocal", db)
+    return db
+
+
+def _lease(stage="transcribe", attempts=1, **fields):
+    job = STTJob(stt_id="7_1700000000000", stage=stage, attempts=attempts, **fields)
+    return Lease(job, token="host-1:abcd1234")
+
+
+def _delay_of(expr) -> timedelta:
+    """func.now() + timedelta(...) 식에서 timedelta 값"""
+    return expr.right.value
+
+
+# =========================================================
+# enqueue / claim
+# =========================================================
+
+def test_enqueue_new_job(fake_db):
+    """새 stt_id 는 queued 행으로 추가되고, 백엔드가 보낸 user_id 를 저장한다."""
+    job_queue.enqueue(
+        "stt_1a2b3c4d", "data/uploads/a.mp3", user_id=7, audio_sha256="ab" * 32, audio_bytes=10,
+    )
+
+    assert len(fake_db.added) == 1
+    job = fake_db.added[0]
+    assert job.status == "queued"
+    assert job.stage == "transcribe"
+    assert job.user_id == 7
+    assert job.attempts == 0
+    assert job.audio_bytes == 10
+    assert fake_db.commits == 1
+
+
+def test_enqueue_existing_job_resets_stage(fake_db):
+    """같은 stt_id 가 다시 오면 새 행 없이 넘겨받은 단계 / 결과로 되돌린다."""
+    fake_db.job = STTJob(
+        stt_id="7_1", user_id=7, status="error", stage="deliver", attempts=3, last_error="boom",
+    )
+
+    job_queue.enqueue("7_1", None, stage="deliver", transcript_text="t", summary={"status": "done"})
+
+    assert fake_db.added == []
+    assert fake_db.job.user_id == 7  # user_id 없이 다시 와도 기존 값 유지
+    assert fake_db.job.status == "queued"
+    assert fake_db.job.stage == "deliver"
+    assert fake_db.job.attempts == 0
+    assert fake_db.job.last_error is None
+    assert fake_db.job.summary == {"status": "done"}
+
+
+def test_claim_nothing_queued(fake_db):
+    assert job_queue.claim("host-1") is None
+    assert fake_db.rollbacks == 1
+
+
+def test_claim_takes_lease(fake_db):
+    """가져간 작업은 running + 시도 횟수 증가 + lease(token, locked_until)."""
+    fake_db.job = STTJob(stt_id="7_1", status="queued", stage="summarize", attempts=1, transcript_text="t")
+
+    lease = job_queue.claim("host-1")
+
+    assert fake_db.for_update == {"skip_locked": True}
+    assert lease.stt_id == "7_1"
+    assert lease.stage == "summarize"
+    assert lease.attempts == 2
+    assert lease.transcript_text == "t"
+    assert lease.token.startswith("host-1:")
+    assert fake_db.job.status == "running"
+    assert fake_db.job.locked_by == lease.token
+    assert _delay_of(fake_db.job.locked_until) == timedelta(seconds=job_queue.STT_VISIBILITY_TIMEOUT_S)
+
+
+# =========================================================
+# save_stage / retry_later / give_up
+# =========================================================
+
+def test_save_stage_updates_lease(fake_db):
+    lease = _lease()
+
+    job_queue.save_stage(lease, "summarize", transcript_text="안녕하세요")
+
+    assert fake_db.updates == [{"stage": "summarize", "transcript_text": "안녕하세요"}]
+    assert lease.stage == "summarize"
+    assert lease.transcript_text == "안녕하세요"
+
+
+def test_save_stage_lease_lost(fake_db):
+    """lease 를 잃었으면 (update 0건) LeaseLost, 로컬 lease 도 그대로."""
+    fake_db.rowcount = 0
+    lease = _lease()
+
+    with pytest.raises(LeaseLost):
+        job_queue.save_stage(lease, "summarize", transcript_text="t")
+    assert lease.stage == "transcribe"
+
+
+@pytest.mark.parametrize("attempts, factor", [(1, 1), (2, 2), (3, 4)])
+def test_retry_later_backoff(fake_db, attempts, factor):
+    """재시도 간격 = STT_RETRY_BACKOFF_S × 2^(시도-1), lease 해제."""
+    lease = _lease(attempts=attempts)
+
+    assert job_queue.retry_later(lease, "x" * 3000)
+
+    fields = fake_db.updates[0]
+    assert fields["status"] == "queued"
+    assert len(fields["last_error"]) == 2000
+    assert fields["locked_by"] is None
+    assert _delay_of(fields["available_at"]) == timedelta(seconds=job_queue.STT_RETRY_BACKOFF_S * factor)
+
+
+def test_give_up(fake_db):
+    assert job_queue.give_up(_lease(), "deliver: 500")
+    assert fake_db.updates[0]["status"] == "error"
+    assert fake_db.updates[0]["last_error"] == "deliver: 500"
+
+
+# =========================================================
+# 워커 풀: 실패 → 재시도 / 포기
+# =========================================================
+
+def test_pool_retries_then_gives_up(fake_db):
+    calls = []
+    given_up = []
+
+    def handler(lease):
+        calls.append(lease.attempts)
+        raise RuntimeError("boom")
+
+    pool = JobWorkerPool(handler, on_give_up=lambda lease, error: given_up.append(error), workers=1)
+
+    pool._run(_lease(attempts=1))
+    assert fake_db.updates[-1]["status"] == "queued"
+    assert given_up == []
+
+    pool._run(_lease(stage="summarize", attempts=job_queue.STT_MAX_ATTEMPTS))
+    assert fake_db.updates[-1]["status"] == "error"
+    assert given_up == ["summarize: boom"]
+    assert pool.in_flight() == 0
+
+
+def test_pool_gives_up_after_repeated_lease_expiry(fake_db):
+    """lease 만료로 시도 횟수를 넘긴 작업은 handler 를 부르지 않고 포기."""
+    calls = []
+    pool = JobWorkerPool(calls.append, workers=1)
+
+    pool._run(_lease(attempts=job_queue.STT_MAX_ATTEMPTS + 1))
+
+    assert calls == []
+    assert fake_db.updates[-1]["status"] == "error"
+
+
+def test_pool_lease_lost_no_give_up(fake_db):
+    """다른 워커가 lease 를 가져갔으면 재시도 / 실패 알림 없이 손을 뗀다."""
+    given_up = []
+
+    def handler(lease):
+        raise LeaseLost("lease 만료")
+
+    pool = JobWorkerPool(handler, on_give_up=lambda lease, error: given_up.append(error), workers=1)
+    pool._run(_lease(attempts=job_queue.STT_MAX_ATTEMPTS))
+
+    assert fake_db.updates == []
+    assert given_up == []
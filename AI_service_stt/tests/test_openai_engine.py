@@ -0,0 +1,108 @@
+# AI_service_stt/tests/test_openai_engine.py
+
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from pydub import AudioSegment
+from pydub.generators import Sine
+
+from core.engine import openai_engine
+from core.engine.audio_split import split_audio
+from core.engine.openai_engine import OpenAIWhisperSTT
+
+
+def _speech(ms: int) -> AudioSegment:
+    return Sine(440).to_audio_segment(duration=ms, volume=-10).set_frame_rate(16000).set_channels(1)
+
+
+def _silence(ms: int) -> AudioSegment:
+    return AudioSegment.silent(duration=ms, frame_rate=16000)
+
+
+class FakeTranscriptions:
+    """
+    client.audio.transcriptions 대체.
+    업로드 파일 내용(청크 길이 ms)을 텍스트로 돌려주고, 길이가 slow_length 인 청크는 늦게 끝나게 한다
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.slow_length = None
+        self.lock = threading.Lock()
+
+    def create(self, model, file, language, response_format, **kwargs):
+        length_ms = file.read().decode("utf-8")
+        with self.lock:
+            self.calls.append({"model": model, "language": language, "response_format": response_format})
+        if length_ms == str(self.slow_length):
+            time.sleep(0.2)
+        return SimpleNamespace(text=f" 청크{length_ms} ", duration=None)
+
+
+@pytest.fixture
+def engine(monkeypatch, tmp_path):
+    """
+    ffmpeg 없이 돌도록 오디오 로드 / 청크 내보내기를 가짜로 바꾼 엔진.
+    청크 임시 파일에는 청크 길이(ms)를 적어 두고, 만든 파일 경로를 기록한다
+    """
+    stt = OpenAIWhisperSTT(model="whisper-1", transcode="none")
+    stt.client = SimpleNamespace(audio=SimpleNamespace(transcriptions=FakeTranscriptions()))
+    stt.temp_files = []
+
+    def export_temp(chunk):
+        path = tmp_path / f"chunk_{uuid.uuid4().hex}.mp3"  # 청크 스레드에서 동시에 불린다
+        path.write_text(str(len(chunk)), encoding="utf-8")
+        stt.temp_files.append(path)
+        return str(path), path.stat().st_size, 0.01
+
+    monkeypatch.setattr(stt.transcoder, "export_temp", export_temp)
+    monkeypatch.setattr(openai_engine, "CHUNK_TARGET_MS", 6000)
+    monkeypatch.setattr(openai_engine, "CHUNK_SEARCH_MS", 2000)
+
+    audio_path = tmp_path / "long.mp3"
+    audio_path.write_bytes(b"ID3")
+    stt.audio_path = str(audio_path)
+    return stt
+
+
+# =========================================================
+# 무음 지점 분할 + 청크 병렬 변환
+# =========================================================
+
+def test_chunked_joins_in_order_and_reports_chunks(engine, monkeypatch):
+    """끝나는 순서와 상관없이 원래 순서로 합치고, 청크가 끝날 때마다 on_chunk 호출."""
+    audio = _speech(7000) + _silence(600) + _speech(9000) + _silence(600) + _speech(4000)
+    monkeypatch.setattr(openai_engine, "_load_audio", lambda path: audio)
+    monkeypatch.setattr(OpenAIWhisperSTT, "_probe_duration_ms", staticmethod(lambda path: len(audio)))
+    expected = [len(chunk) for _, chunk in split_audio(audio, 6000, 2000)]
+    engine.client.audio.transcriptions.slow_length = expected[0]
+    reported = []
+
+    result = engine.transcribe(engine.audio_path, on_chunk=lambda idx, total, text: reported.append((idx, total)))
+
+    calls = engine.client.audio.transcriptions.calls
+    assert result["chunks"] == len(calls) == len(expected) > 1
+    assert all(call["language"] == "ko" and call["response_format"] == "verbose_json" for call in calls)
+    assert sorted(reported) == [(i, len(expected)) for i in range(len(expected))]
+    # 첫 청크가 가장 늦게 끝나도 텍스트는 청크 순서대로
+    assert reported[-1][0] == 0
+    assert result["text"] == " ".join(f"청크{length}" for length in expected)
+    assert result["audio_length"] == pytest.approx(len(audio) / 1000)
+    assert not any(p.exists() for p in engine.temp_files)
+
+
+def test_short_audio_single_request(engine, monkeypatch):
+    """목표 길이 + 탐색 범위 안이면 나누지 않고 원본을 한 번에 올린다."""
+    monkeypatch.setattr(OpenAIWhisperSTT, "_probe_duration_ms", staticmethod(lambda path: 7000))
+    monkeypatch.setattr(openai_engine, "_load_audio", lambda path: pytest.fail("디코딩하지 않아야 함"))
+
+    result = engine.transcribe(engine.audio_path, on_chunk=lambda *args: pytest.fail("청크 콜백 없음"))
+
+    assert len(engine.client.audio.transcriptions.calls) == 1
+    assert "chunks" not in result
+    assert engine.temp_files == []
@@ -0,0 +1,130 @@
+# AI_service_stt/tests/test_process_router.py
+
+from __future__ import annotations
+
+import hashlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import router as router_module
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    """
+    /stt/process 만 붙인 앱. 큐 등록 / 캐시 조회는 가짜로 바꾸고 enqueue 인자를 기록한다.
+    """
+    enqueued = []
+    monkeypatch.setattr(router_module, "STT_UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(router_module, "lookup_cache", lambda sha: None)
+    monkeypatch.setattr(router_module, "enqueue", lambda *args, **kwargs: enqueued.append((args, kwargs)))
+    monkeypatch.setattr(router_module.worker_pool, "notify", lambda: None)
+
+    app = FastAPI()
+    app.include_router(router_module.router)
+    test_client = TestClient(app)
+    test_client.enqueued = enqueued
+    test_client.upload_dir = tmp_path
+    return test_client
+
+
+AUDIO = b"ID3" + bytes(range(256)) * 8
+
+
+def test_process_stores_user_id(client):
+    """백엔드가 폼으로 보낸 user_id 를 작업에 저장한다 (stt_id 는 "stt_{hex8}" 라 user 정보가 없다)."""
+    resp = client.post(
+        "/stt/process",
+        data={"stt_id": "stt_1a2b3c4d", "user_id": "7", "sha256": hashlib.sha256(AUDIO).hexdigest()},
+        files={"file": ("a.mp3", AUDIO, "audio/mpeg")},
+    )
+
+    assert resp.status_code == 200
+    args, kwargs = client.enqueued[0]
+    assert args == ("stt_1a2b3c4d", str(client.upload_dir / "stt_1a2b3c4d.mp3"))
+    assert kwargs["user_id"] == 7
+    assert kwargs["audio_bytes"] == len(AUDIO)
+    assert (client.upload_dir / "stt_1a2b3c4d.mp3").read_bytes() == AUDIO
+
+
+def test_process_without_user_id(client):
+    resp = client.post(
+        "/stt/process",
+        data={"stt_id": "stt_1a2b3c4d"},
+        files={"file": ("a.mp3", AUDIO, "audio/mpeg")},
+    )
+
+    assert resp.status_code == 200
+    assert client.enqueued[0][1]["user_id"] is None
+
+
+def test_process_chunked_upload_over_limit(client, monkeypatch):
+    """Content-Length 없는 (chunked) 요청도 읽는 도중 413, 업로드 디렉터리에 아무것도 남지 않는다."""
+    monkeypatch.setattr(router_module, "MAX_UPLOAD_SIZE", 1000)
+    boundary = "b0undary"
+    body = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"stt_id\"\r\n\r\nstt_1a2b3c4d\r\n"
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.mp3\"\r\n\r\n"
+    ).encode("utf-8") + b"x" * 5000 + f"\r\n--{boundary}--\r\n".encode("utf-8")
+
+    def chunks():
+        for i in range(0, len(body), 512):
+            yield body[i:i + 512]
+
+    resp = client.post(
+        "/stt/process", content=chunks(),
+        headers={"content-type": f"multipart/form-data; boundary={boundary}"},
+    )
+
+    assert resp.status_code == 413
+    assert client.enqueued == []
+    assert list(client.upload_dir.iterdir()) == []
+
+
+def test_process_hash_mismatch(client):
+    resp = client.post(
+        "/stt/process",
+        data={"stt_id": "stt_1a2b3c4d", "sha256": "00" * 32},
+        files={"file": ("a.mp3", AUDIO, "audio/mpeg")},
+    )
+
+    assert resp.status_code == 400
+    assert list(client.upload_dir.iterdir()) == []
+
+
+@pytest.mark.parametrize("data, files, status", [
+    ({}, {"file": ("a.mp3", AUDIO, "audio/mpeg")}, 422),                       # stt_id 없음
+    ({"stt_id": "stt_1", "user_id": "x"}, {"file": ("a.mp3", AUDIO, "audio/mpeg")}, 422),
+    ({"stt_id": "stt_1"}, {"other": ("a.txt", b"a", "text/plain")}, 400),      # file 파트 없음
+])
+def test_process_bad_form(client, data, files, status):
+    resp = client.post("/stt/process", data=data, files=files)
+
+    assert resp.status_code == status
+    assert client.enqueued == []
+    assert list(client.upload_dir.iterdir()) == []
+
+
+def test_process_cache_hit_queues_deliver(client, monkeypatch):
+    """같은 녹음이 다시 오면 파일을 지우고 전송(deliver) 단계부터 큐에 넣는다."""
+    cached = {"transcript_text": "캐시된 텍스트", "summary": {"status": "done", "symptoms": "기침"}}
+    lookups = []
+    monkeypatch.setattr(router_module, "lookup_cache", lambda sha: lookups.append(sha) or cached)
+
+    resp = client.post(
+        "/stt/process",
+        data={"stt_id": "stt_1a2b3c4d"},
+        files={"file": ("a.mp3", AUDIO, "audio/mpeg")},
+    )
+
+    assert resp.status_code == 200
+    assert resp.json()["cached"] is True
+    assert lookups == [hashlib.sha256(AUDIO).hexdigest()]
+    args, kwargs = client.enqueued[0]
+    assert args == ("stt_1a2b3c4d", None)
+    assert kwargs["stage"] == "deliver"
+    assert kwargs["transcript_text"] == "캐시된 텍스트"
+    assert kwargs["summary"]["symptoms"] == "기침"
+    assert list(client.upload_dir.iterdir()) == []
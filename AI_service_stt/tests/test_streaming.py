@@ -0,0 +1,352 @@
+# AI_service_stt/tests/test_streaming.py
+
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+from pydub import AudioSegment
+from pydub.generators import Sine
+
+from core import streaming
+from core.streaming import LockedEngine, StreamingSession
+
+
+class FakeEngine:
+    """transcribe_segment 호출마다 "구간{n}({길이}ms)" 를 돌려준다"""
+
+    def __init__(self):
+        self.calls = []
+
+    def transcribe_segment(self, audio, prompt=None):
+        self.calls.append((len(audio), prompt))
+        return f"구간{len(self.calls)}({len(audio)}ms)"
+
+
+def _pcm(audio: AudioSegment) -> bytes:
+    return audio.set_frame_rate(16000).set_channels(1).set_sample_width(2).raw_data
+
+
+def _speech(ms: int) -> bytes:
+    return _pcm(Sine(440).to_audio_segment(duration=ms, volume=-10))
+
+
+def _silence(ms: int) -> bytes:
+    return _pcm(AudioSegment.silent(duration=ms, frame_rate=16000))
+
+
+@pytest.fixture
+def small_window(monkeypatch):
+    """window 4초 / 탐색 1초 / step 1초 로 줄인다 (StreamingSession 생성 시 읽음)"""
+    monkeypatch.setattr(streaming, "STT_STREAM_WINDOW_S", 4)
+    monkeypatch.setattr(streaming, "STT_STREAM_SEARCH_S", 1)
+    monkeypatch.setattr(streaming, "STT_STREAM_STEP_S", 1)
+
+
+def test_step_partial_only(small_window):
+    """window 안이면 확정 없이 tail 전체를 중간 결과로."""
+    engine = FakeEngine()
+    session = StreamingSession(engine, summarize=False)
+
+    session.add_pcm(_speech(2000))
+    assert session.ready()
+    events = session.step()
+
+    assert [e["type"] for e in events] == ["partial"]
+    assert session.segments == []
+    assert not session.ready()
+
+
+def test_step_commits_at_silence(small_window):
+    """window 를 넘으면 조용한 지점까지 확정하고, 확정한 오디오는 다시 변환하지 않는다."""
+    engine = FakeEngine()
+    session = StreamingSession(engine, summarize=False)
+
+    session.add_pcm(_speech(3000) + _silence(500) + _speech(2500))
+    events = session.step()
+
+    assert [e["type"] for e in events] == ["segment", "partial"]
+    segment = events[0]
+    assert segment["start"] == 0
+    assert 3.0 <= segment["end"] <= 3.5
+    assert session.segments == [segment["text"]]
+    # 남은 tail 만 중간 결과로 변환 (앞 문맥은 확정 텍스트를 prompt 로)
+    assert engine.calls[-1][0] == 6000 - int(segment["end"] * 1000)
+    assert engine.calls[-1][1] == segment["text"]
+
+
+def test_finish_commits_rest(small_window):
+    engine = FakeEngine()
+    session = StreamingSession(engine, summarize=False)
+    session.add_pcm(_speech(3000) + _silence(500) + _speech(2500))
+    session.step()
+
+    session.add_pcm(_speech(1000))
+    events = session.finish()
+
+    assert [e["type"] for e in events] == ["segment"]
+    assert events[0]["index"] == 1
+    assert events[0]["end"] == pytest.approx(session.duration_s, abs=0.01)
+    assert session.partial == ""
+    assert len(session.transcript.split(" ")) == 2
+
+
+def test_silence_and_short_audio_skipped(small_window):
+    """무음 / MIN_SEGMENT_MS 미만 구간은 엔진을 부르지 않고, 빈 확정은 이벤트로 보내지 않는다."""
+    engine = FakeEngine()
+
+    silent = StreamingSession(engine, summarize=False)
+    silent.add_pcm(_silence(2000))
+    assert silent.step() == [{"type": "partial", "text": ""}]
+    assert silent.finish() == []
+
+    short = StreamingSession(engine, summarize=False)
+    short.add_pcm(_speech(500))
+    assert short.finish() == []
+    assert engine.calls == []
+
+
+def test_max_duration(monkeypatch):
+    monkeypatch.setattr(streaming, "STT_STREAM_MAX_S", 1)
+    session = StreamingSession(FakeEngine(), summarize=False)
+
+    session.add_pcm(_speech(1000))
+    with pytest.raises(ValueError):
+        session.add_pcm(_speech(100))
+
+
+def test_summary_blocks_submitted_during_recording(small_window, monkeypatch):
+    """확정 텍스트가 SUMMARY_MAP_CHARS 를 넘을 때마다 블록 요약을 미리 넘긴다."""
+    monkeypatch.setattr(streaming, "SUMMARY_MAP_CHARS", 10)
+    submitted = []
+
+    class FakeSummarizer:
+        def submit(self, index, total, text):
+            submitted.append((index, total, text))
+
+        def result(self, raise_errors=False):
+            return {"blocks": len(submitted)}
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(streaming, "ChunkSummarizer", FakeSummarizer)
+    session = StreamingSession(FakeEngine())
+    session.add_pcm(_speech(3000) + _silence(500) + _speech(3000) + _silence(500) + _speech(2000))
+    session.step()
+    session.finish()
+
+    assert session.summarize() == {"blocks": len(session.segments)}
+    assert [index for index, _, _ in submitted] == list(range(len(session.segments)))
+    assert all(total is None for _, total, _ in submitted)
+
+
+# =========================================================
+# 세션 간 공유 엔진
+# =========================================================
+
+class SlowEngine:
+    """transcribe_segment 가 동시에 몇 개 돌았는지 기록 (로컬 모델은 동시 호출에 안전하지 않음)"""
+
+    model = "fast"
+
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+        self._count_lock = threading.Lock()
+
+    def transcribe_segment(self, audio, prompt=None):
+        with self._count_lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.05)
+        with self._count_lock:
+            self.running -= 1
+        return "텍스트"
+
+
+def test_locked_engine_serializes_sessions():
+    """여러 세션이 같은 로컬 엔진을 써도 transcribe_segment 는 한 번에 하나."""
+    engine = SlowEngine()
+    shared = LockedEngine(engine)
+    audio = _speech(1500)
+
+    def run_session():
+        session = StreamingSession(shared, summarize=False)
+        session.add_pcm(audio)
+        session.step()
+
+    threads = [threading.Thread(target=run_session) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=10)
+
+    assert engine.max_running == 1
+    assert shared.model == "fast"
+
+
+def test_api_engine_not_locked(monkeypatch):
+    """
+    api 는 스트리밍 전용 OpenAIWhisperSTT (요청별로 독립이라 감싸지 않음).
+    STT_ENGINE 이 로컬 모델이어도 작업 큐의 BatchedTranscriber 를 같이 쓰지 않는다.
+    """
+    from core import stt_pipeline
+    from core.engine.openai_engine import OpenAIWhisperSTT
+
+    monkeypatch.setattr(stt_pipeline, "stt_engine", object())
+    streaming._load_stream_engine.cache_clear()
+    try:
+        engine = streaming.get_stream_engine("api")
+        assert type(engine) is OpenAIWhisperSTT
+        assert engine.model == "whisper-1"
+        assert streaming.get_stream_engine("api") is engine
+    finally:
+        streaming._load_stream_engine.cache_clear()
+
+
+def test_local_engine_wrapped(monkeypatch):
+    """로컬 엔진(HF / CT2)은 LockedEngine 으로 감싸서 프로세스당 1개."""
+    import sys
+    from types import SimpleNamespace
+
+    class FakeCT2:
+        def __init__(self, model):
+            self.model = model
+
+    monkeypatch.setitem(sys.modules, "core.engine.ct2_engine", SimpleNamespace(CT2WhisperSTT=FakeCT2))
+    streaming._load_stream_engine.cache_clear()
+    try:
+        engine = streaming.get_stream_engine("ct2-fast")
+        assert isinstance(engine, LockedEngine)
+        assert engine.model == "ct2-fast"
+        assert streaming.get_stream_engine("ct2-fast") is engine
+    finally:
+        streaming._load_stream_engine.cache_clear()
+
+
+# =========================================================
+# WebSocket /stt/stream/{stt_id}
+# =========================================================
+
+SUMMARY = {"symptoms": "기침", "diagnosis": "감기 추정", "notes": "물 많이 마시기", "summary_time": 0.1}
+
+
+@pytest.fixture
+def ws_client(small_window, monkeypatch):
+    """
+    /stt/stream 만 붙인 앱. 엔진 / 요약 / 큐 등록을 가짜로 바꾸고 enqueue 인자를 기록한다.
+    """
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from api import router as router_module
+
+    enqueued = []
+    monkeypatch.setattr(router_module, "get_stream_engine", lambda: FakeEngine())
+    monkeypatch.setattr(router_module, "enqueue", lambda *args, **kwargs: enqueued.append((args, kwargs)))
+    monkeypatch.setattr(router_module.worker_pool, "notify", lambda: None)
+    monkeypatch.setattr(streaming, "generate_summary", lambda text, raise_errors=False: dict(SUMMARY))
+
+    app = FastAPI()
+    app.include_router(router_module.router)
+    client = TestClient(app)
+    client.enqueued = enqueued
+    client.router_module = router_module
+    return client
+
+
+def _receive_until_final(ws) -> list:
+    events = []
+    while not events or events[-1]["type"] != "final":
+        events.append(ws.receive_json())
+    return events
+
+
+def test_ws_stream_to_final(ws_client):
+    """ready → 중간 / 확정 결과 → final, 요약까지 끝난 결과는 deliver 단계로 큐에 넣는다."""
+    with ws_client.websocket_connect("/stt/stream/stt_1a2b3c4d") as ws:
+        ws.send_text('{"type": "start", "sample_rate": 16000}')
+        assert ws.receive_json() == {"type": "ready"}
+        ws.send_bytes(_speech(1500))
+        ws.send_bytes(_speech(1000))
+        ws.send_text('{"type": "stop"}')
+        events = _receive_until_final(ws)
+
+    final = events[-1]
+    assert {"segment"} <= {e["type"] for e in events[:-1]}
+    assert final["text"].startswith("구간")
+    assert final["duration"] == pytest.approx(2.5, abs=0.01)
+    assert final["queued"] is False
+    assert final["summary"]["diagnosis"] == "감기 추정"
+    args, kwargs = ws_client.enqueued[0]
+    assert args == ("stt_1a2b3c4d", None)
+    assert kwargs["stage"] == "deliver"
+    assert kwargs["transcript_text"] == final["text"]
+    assert kwargs["summary"]["status"] == "done"
+
+
+def test_ws_summary_failure_queued(ws_client, monkeypatch):
+    """요약이 실패하면 transcript 만 summarize 단계로 넘겨 워커가 재시도한다."""
+    def generate_summary(text, raise_errors=False):
+        raise RuntimeError("429")
+
+    monkeypatch.setattr(streaming, "generate_summary", generate_summary)
+
+    with ws_client.websocket_connect("/stt/stream/stt_1a2b3c4d") as ws:
+        ws.send_bytes(_speech(1500))
+        assert ws.receive_json() == {"type": "ready"}
+        ws.send_text('{"type": "stop"}')
+        final = _receive_until_final(ws)[-1]
+
+    assert final["queued"] is True
+    assert final["summary"] is None
+    assert ws_client.enqueued[0][1]["stage"] == "summarize"
+    assert ws_client.enqueued[0][1]["transcript_text"] == final["text"]
+
+
+def test_ws_disconnect_finishes_with_received_audio(ws_client):
+    """stop 없이 연결이 끊겨도 그때까지 받은 오디오로 마무리해서 큐에 넣는다."""
+    with ws_client.websocket_connect("/stt/stream/stt_1a2b3c4d") as ws:
+        ws.send_bytes(_speech(1500))
+        assert ws.receive_json() == {"type": "ready"}
+        ws.close()
+        # 서버는 끊긴 뒤에도 마무리를 계속한다 (TestClient 는 블록을 나가면 앱 태스크를 취소하므로 끝까지 기다림)
+        _receive_until_final(ws)
+
+    args, kwargs = ws_client.enqueued[0]
+    assert args == ("stt_1a2b3c4d", None)
+    assert kwargs["stage"] == "deliver"
+    assert kwargs["transcript_text"].startswith("구간")
+
+
+def test_ws_no_audio_not_queued(ws_client):
+    with ws_client.websocket_connect("/stt/stream/stt_1a2b3c4d") as ws:
+        ws.send_text('{"type": "start"}')
+        assert ws.receive_json() == {"type": "ready"}
+        ws.send_text('{"type": "stop"}')
+
+    assert ws_client.enqueued == []
+
+
+def test_ws_invalid_start_and_engine_error(ws_client, monkeypatch):
+    from starlette.websockets import WebSocketDisconnect
+
+    with ws_client.websocket_connect("/stt/stream/stt_1") as ws:
+        ws.send_text('{"type": "start", "sample_rate": "abc"}')
+        assert ws.receive_json() == {"type": "error", "detail": "Invalid start message"}
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+        assert closed.value.code == 1003
+
+    def broken_engine():
+        raise RuntimeError("model load failed")
+
+    monkeypatch.setattr(ws_client.router_module, "get_stream_engine", broken_engine)
+    with ws_client.websocket_connect("/stt/stream/stt_1") as ws:
+        assert ws.receive_json()["type"] == "error"
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+        assert closed.value.code == 1011
+    assert ws_client.enqueued == []
@@ -0,0 +1,216 @@
+# AI_service_stt/tests/test_stt_pipeline.py
+
+from __future__ import annotations
+
+import pytest
+
+from core import job_queue, stt_pipeline, summarize, transcript_cache
+from core.job_queue import Lease
+from core.models import STTJob
+
+from tests.test_job_queue import FakeSession
+
+SUMMARY = {"symptoms": "기침", "diagnosis": "감기 추정", "notes": "물 많이 마시기", "summary_time": 0.1}
+
+
+class FakeEngine:
+    model = "whisper-1"
+    language = "ko"
+
+    def __init__(self, text="기침이 나요"):
+        self.text = text
+        self.calls = []
+
+    def transcribe(self, audio_path, on_chunk=None):
+        self.calls.append(audio_path)
+        return {"text": self.text}
+
+
+@pytest.fixture
+def pipeline(monkeypatch, tmp_path):
+    """
+    DB / STT / 요약 / 백엔드 호출을 모두 가짜로 바꾼 run_job 환경.
+    반환: 호출 기록 (engine.calls, summaries, posts, stored)
+    """
+    db = FakeSession()
+    monkeypatch.setattr(job_queue, "SessionLocal", db)
+
+    engine = FakeEngine()
+    record = {"engine": engine, "db": db, "summaries": [], "posts": [], "stored": [], "cached": None}
+    monkeypatch.setattr(stt_pipeline, "stt_engine", engine)
+    monkeypatch.setattr(stt_pipeline, "STT_SUMMARY_PIPELINE", False)
+
+    def generate_summary(text, raise_errors=False):
+        record["summaries"].append(text)
+        return dict(SUMMARY)
+
+    monkeypatch.setattr(stt_pipeline, "generate_summary", generate_summary)
+    monkeypatch.setattr(stt_pipeline, "_post_result", lambda stt_id, payload: record["posts"].append(payload) or True)
+    monkeypatch.setattr(stt_pipeline, "lookup_cache", lambda sha: record["cached"])
+    monkeypatch.setattr(transcript_cache, "store_transcript", lambda *a: record["stored"].append(("transcript", a)))
+    monkeypatch.setattr(transcript_cache, "store_summary", lambda *a: record["stored"].append(("summary", a)))
+
+    audio = tmp_path / "7_1.mp3"
+    audio.write_bytes(b"ID3")
+    record["audio"] = audio
+    return record
+
+
+def _lease(stage, **fields):
+    job = STTJob(stt_id="7_1", stage=stage, attempts=1, audio_sha256="ab" * 32, **fields)
+    return Lease(job, token="host-1:abcd1234")
+
+
+# =========================================================
+# run_job: 단계별 재개
+# =========================================================
+
+def test_run_job_from_transcribe(pipeline):
+    """처음부터: STT → 요약 → 전송, 단계마다 저장하고 업로드 파일은 STT 후 삭제."""
+    lease = _lease("transcribe", file_path=str(pipeline["audio"]))
+
+    stt_pipeline.run_job(lease)
+
+    assert pipeline["engine"].calls == [str(pipeline["audio"])]
+    assert pipeline["summaries"] == ["기침이 나요"]
+    assert [u["stage"] for u in pipeline["db"].updates] == ["summarize", "deliver"]
+    assert [kind for kind, _ in pipeline["stored"]] == ["transcript", "summary"]
+    assert pipeline["posts"][0]["status"] == "done"
+    assert pipeline["posts"][0]["diagnosis"] == "감기 추정"
+    assert not pipeline["audio"].exists()
+
+
+def test_run_job_from_summarize(pipeline):
+    """요약 단계부터: 저장된 transcript 로 요약만 다시 (STT 호출 없음)."""
+    lease = _lease("summarize", transcript_text="저장된 텍스트")
+
+    stt_pipeline.run_job(lease)
+
+    assert pipeline["engine"].calls == []
+    assert pipeline["summaries"] == ["저장된 텍스트"]
+    assert [u["stage"] for u in pipeline["db"].updates] == ["deliver"]
+    assert pipeline["posts"][0]["symptoms"] == "기침"
+
+
+def test_run_job_from_deliver(pipeline):
+    """전송 단계부터: 저장된 요약을 그대로 다시 보낸다."""
+    summary = {"status": "done", "symptoms": "a", "diagnosis": "b", "notes": "c", "date": "2025-01-01"}
+    lease = _lease("deliver", transcript_text="t", summary=summary)
+
+    stt_pipeline.run_job(lease)
+
+    assert pipeline["engine"].calls == []
+    assert pipeline["summaries"] == []
+    assert pipeline["db"].updates == []
+    assert pipeline["posts"] == [summary]
+
+
+def test_run_job_empty_transcript(pipeline):
+    """빈 텍스트는 요약하지 않고 에러 payload 를 보낸다."""
+    lease = _lease("summarize", transcript_text="  ")
+
+    stt_pipeline.run_job(lease)
+
+    assert pipeline["summaries"] == []
+    assert pipeline["posts"][0]["status"] == "error"
+
+
+def test_run_job_cache_hit_skips_transcribe(pipeline):
+    """transcribe 단계에서 캐시에 transcript 가 있으면 STT 없이 요약부터."""
+    pipeline["cached"] = {"transcript_text": "캐시된 텍스트", "summary": None}
+    lease = _lease("transcribe", file_path=str(pipeline["audio"]))
+
+    stt_pipeline.run_job(lease)
+
+    assert pipeline["engine"].calls == []
+    assert pipeline["summaries"] == ["캐시된 텍스트"]
+    assert not pipeline["audio"].exists()
+
+
+def test_run_job_backend_error_raises(pipeline, monkeypatch):
+    """백엔드 5xx 는 예외 → 워커 풀이 deliver 단계부터 재시도."""
+    def post(stt_id, payload):
+        raise RuntimeError("백엔드 업데이트 실패: 502")
+
+    monkeypatch.setattr(stt_pipeline, "_post_result", post)
+    lease = _lease("summarize", transcript_text="t")
+
+    with pytest.raises(RuntimeError):
+        stt_pipeline.run_job(lease)
+    assert lease.stage == "deliver"
+
+
+# =========================================================
+# run_job: 청크 STT 와 요약 map 겹치기 (STT_SUMMARY_PIPELINE)
+# =========================================================
+
+class ChunkEngine(FakeEngine):
+    """청크 분할 경로처럼 on_chunk 를 끝나는 순서대로 (뒤 청크 먼저) 부른다"""
+
+    def transcribe(self, audio_path, on_chunk=None):
+        self.calls.append(audio_path)
+        if on_chunk:
+            on_chunk(1, 2, "열이 나요")
+            on_chunk(0, 2, "기침이 나요")
+        return {"text": "기침이 나요 열이 나요"}
+
+
+@pytest.fixture
+def chunk_pipeline(pipeline, monkeypatch):
+    """청크 엔진 + 파이프라인 켜기. summarize_part / reduce_summaries 호출 기록"""
+    pipeline["engine"] = ChunkEngine()
+    pipeline["reduce"] = []
+    monkeypatch.setattr(stt_pipeline, "stt_engine", pipeline["engine"])
+    monkeypatch.setattr(stt_pipeline, "STT_SUMMARY_PIPELINE", True)
+    monkeypatch.setattr(
+        summarize, "summarize_part",
+        lambda text, index, total: {"symptoms": text, "diagnosis": "없음", "notes": "없음"},
+    )
+
+    def reduce_summaries(partials, start_time):
+        pipeline["reduce"].append([p["symptoms"] for p in partials])
+        return dict(SUMMARY)
+
+    monkeypatch.setattr(summarize, "reduce_summaries", reduce_summaries)
+    return pipeline
+
+
+def test_run_job_overlaps_chunk_summaries(chunk_pipeline):
+    """청크 요약은 STT 중에 돌고, 요약 단계는 시간 순서대로 reduce 만 (전체 요약 호출 없음)."""
+    lease = _lease("transcribe", file_path=str(chunk_pipeline["audio"]))
+
+    stt_pipeline.run_job(lease)
+
+    assert chunk_pipeline["reduce"] == [["기침이 나요", "열이 나요"]]
+    assert chunk_pipeline["summaries"] == []
+    assert chunk_pipeline["posts"][0]["diagnosis"] == "감기 추정"
+
+
+def test_run_job_reduce_failure_retries_from_transcript(chunk_pipeline, monkeypatch):
+    """reduce 가 실패하면 summarize 단계에 남고, 재시도는 저장된 전체 transcript 로 요약한다."""
+    def reduce_summaries(partials, start_time):
+        raise RuntimeError("429")
+
+    monkeypatch.setattr(summarize, "reduce_summaries", reduce_summaries)
+    lease = _lease("transcribe", file_path=str(chunk_pipeline["audio"]))
+
+    with pytest.raises(RuntimeError):
+        stt_pipeline.run_job(lease)
+    assert lease.stage == "summarize"
+
+    stt_pipeline.run_job(lease)
+
+    assert chunk_pipeline["engine"].calls == [str(chunk_pipeline["audio"])]
+    assert chunk_pipeline["summaries"] == ["기침이 나요 열이 나요"]
+    assert chunk_pipeline["posts"][0]["status"] == "done"
+
+
+def test_cached_stage():
+    assert stt_pipeline.cached_stage({"transcript_text": "t", "summary": None}) == (
+        "summarize", {"transcript_text": "t"},
+    )
+    stage, results = stt_pipeline.cached_stage({"transcript_text": "t", "summary": {"status": "done"}})
+    assert stage == "deliver"
+    assert results["summary"]["status"] == "done"
+    assert "date" in results["summary"]
+
@@ -0,0 +1,183 @@
+# AI_service_stt/tests/test_summarize.py
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from core import summarize
+from core.summarize import _load_json_object, parse_summary_json
+
+
+# =========================================================
+# 응답 JSON 검증 / 복구
+# =========================================================
+
+def test_parse_plain_json():
+    content = '{"symptoms": "기침", "diagnosis": "감기 추정", "notes": "물 많이 마시기"}'
+    assert parse_summary_json(content) == {"symptoms": "기침", "diagnosis": "감기 추정", "notes": "물 많이 마시기"}
+
+
+def test_parse_code_block_and_korean_keys():
+    """```json 코드 블록 + 앞 설명 문장 + 한글 키 + 리스트 값."""
+    content = '요약입니다.\n```json\n{"증상": "두통", "진단": "편두통", "권고사항": ["타이레놀 500mg", "수면"]}\n```'
+    assert parse_summary_json(content) == {"symptoms": "두통", "diagnosis": "편두통", "notes": "타이레놀 500mg\n수면"}
+
+
+def test_parse_missing_field_is_empty():
+    assert parse_summary_json('{"symptoms": "기침", "diagnosis": ""}') == {
+        "symptoms": "기침", "diagnosis": "없음", "notes": "없음",
+    }
+
+
+def test_parse_numbered_sections():
+    """JSON 이 아니면 예전 "1. 증상:" 형식."""
+    content = "1. 증상:\n- 기침\n2. 진단:\n감기\n3. 권고사항:\n휴식"
+    assert parse_summary_json(content) == {"symptoms": "- 기침", "diagnosis": "감기", "notes": "휴식"}
+
+
+def test_parse_unrecognized():
+    assert parse_summary_json("죄송합니다. 요약할 수 없습니다.") is None
+    assert parse_summary_json("") is None
+
+
+def test_load_json_object_truncated():
+    """뒤가 잘린 JSON: 열린 문자열 / 객체를 닫아서 읽는다."""
+    assert _load_json_object('{"symptoms": "기침", "diagnosis": "감기') == {"symptoms": "기침", "diagnosis": "감기"}
+    assert _load_json_object('{"symptoms": "기침",') == {"symptoms": "기침"}
+    assert _load_json_object("JSON 없음") is None
+
+
+# =========================================================
+# max_tokens 에서 잘린 응답
+# =========================================================
+
+class FakeChatAPI:
+    """
+    max_tokens 별 (응답, finish_reason) 을 돌려주는 chat.completions (호출한 max_tokens / 나머지 인자 기록)
+    같은 max_tokens 로 여러 번 부르면 리스트에서 차례로 꺼낸다
+    """
+
+    def __init__(self, replies):
+        self.replies = replies
+        self.calls = []
+        self.kwargs = []
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, max_tokens, **kwargs):
+        self.calls.append(max_tokens)
+        self.kwargs.append(kwargs)
+        reply = self.replies[max_tokens]
+        content, finish_reason = reply.pop(0) if isinstance(reply, list) else reply
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason=finish_reason)])
+
+
+class FakeGateway:
+    def __init__(self):
+        self.callers = []
+
+    def call(self, caller, model, fn, est_tokens=None, timeout_s=None):
+        self.callers.append(caller)
+        return fn(timeout_s)
+
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    def install(replies):
+        api = FakeChatAPI(replies)
+        gateway = FakeGateway()
+        monkeypatch.setattr(summarize, "get_client", lambda: api)
+        monkeypatch.setattr(summarize, "get_gateway", lambda: gateway)
+        return api, gateway
+    return install
+
+
+FULL = '{"symptoms": "기침", "diagnosis": "감기 추정", "notes": "타이레놀 500mg 하루 3번, 3일 뒤 재방문"}'
+
+
+def test_truncated_response_retried_with_more_tokens(fake_api):
+    """잘린 응답은 로컬에서 닫지 않고 max_tokens 를 늘려 다시 부른다."""
+    api, _ = fake_api({
+        1000: ('{"symptoms": "기침", "diagnosis": "감기 추정", "notes": "타이레놀', "length"),
+        2000: (FULL, "stop"),
+    })
+
+    result = summarize.generate_summary("기침이 나요")
+
+    assert api.calls == [1000, 2000]
+    assert result["notes"] == "타이레놀 500mg 하루 3번, 3일 뒤 재방문"
+
+
+def test_truncated_twice_goes_to_repair(fake_api, monkeypatch):
+    """늘려도 잘리면 repair 호출 (잘린 응답을 요약 결과로 그대로 쓰지 않는다)."""
+    truncated = '{"symptoms": "기침", "diagnosis": "감기'
+    api, gateway = fake_api({1000: (truncated, "length"), 2000: (truncated, "length")})
+    repaired = []
+
+    def repair_summary(content, caller):
+        repaired.append(content)
+        return {"symptoms": "기침", "diagnosis": "감기", "notes": "없음"}
+
+    monkeypatch.setattr(summarize, "repair_summary", repair_summary)
+    result = summarize.generate_summary("기침이 나요")
+
+    assert api.calls == [1000, 2000]
+    assert repaired == [truncated]
+    assert result["diagnosis"] == "감기"
+    assert gateway.callers == ["stt.summarize", "stt.summarize"]
+
+
+def test_truncated_map_part(fake_api):
+    """map 조각(max_tokens=600)도 같은 방식으로 늘려서 재호출."""
+    api, _ = fake_api({600: ('{"symptoms": "기', "length"), 1200: (FULL, "stop")})
+
+    assert summarize.summarize_part("기침이 나요", 0, 2)["diagnosis"] == "감기 추정"
+    assert api.calls == [600, 1200]
+
+
+# =========================================================
+# JSON schema 요청 / repair
+# =========================================================
+
+def test_request_uses_json_schema(fake_api):
+    """json_schema(strict) response_format + 게이트웨이가 준 timeout 으로 호출."""
+    api, gateway = fake_api({1000: (FULL, "stop")})
+
+    result = summarize.generate_summary("기침이 나요")
+
+    kwargs = api.kwargs[0]
+    assert kwargs["model"] == summarize.SUMMARY_MODEL
+    assert kwargs["response_format"] == summarize.RESPONSE_FORMAT
+    assert kwargs["response_format"]["json_schema"]["strict"] is True
+    assert kwargs["timeout"] == summarize.SUMMARY_TIMEOUT_S
+    assert kwargs["messages"][0]["content"] == summarize.SYSTEM_PROMPT
+    assert gateway.callers == ["stt.summarize"]
+    assert {k: result[k] for k in summarize.SUMMARY_FIELDS} == {
+        "symptoms": "기침", "diagnosis": "감기 추정", "notes": "타이레놀 500mg 하루 3번, 3일 뒤 재방문",
+    }
+
+
+def test_unparseable_response_repaired(fake_api):
+    """JSON 도 "1. 증상:" 형식도 아니면 응답 텍스트만 보내는 repair 호출 1회 (temperature 0)."""
+    api, gateway = fake_api({1000: [("환자는 기침을 하고 감기로 보입니다.", "stop"), (FULL, "stop")]})
+
+    result = summarize.generate_summary("기침이 나요")
+
+    assert gateway.callers == ["stt.summarize", "stt.summarize.repair"]
+    repair = api.kwargs[1]
+    assert repair["temperature"] == 0.0
+    assert "환자는 기침을 하고 감기로 보입니다." in repair["messages"][1]["content"]
+    assert "기침이 나요" not in repair["messages"][1]["content"]  # transcript 는 다시 보내지 않는다
+    assert result["diagnosis"] == "감기 추정"
+
+
+def test_repair_failure_keeps_raw_text(fake_api):
+    """repair 도 실패하면 원문을 notes 에 담는다 (요약 내용을 버리지 않는다)."""
+    raw = "환자는 기침을 하고 감기로 보입니다."
+    fake_api({1000: [(raw, "stop"), ("여전히 JSON 아님", "stop")]})
+
+    result = summarize.generate_summary("기침이 나요")
+
+    assert (result["symptoms"], result["diagnosis"], result["notes"]) == ("없음", "없음", raw)
@@ -0,0 +1,111 @@
+# AI_service_stt/tests/test_summarize_map_reduce.py
+
+from __future__ import annotations
+
+import pytest
+
+from core import summarize
+from core.summarize import FAILED_SUMMARY, ChunkSummarizer, split_transcript
+
+
+# =========================================================
+# 긴 상담: 나누기 / 청크별 요약
+# =========================================================
+
+def test_split_transcript_sentence_boundary():
+    sentence = "환자가 기침을 합니다. "
+    text = sentence * 50
+
+    parts = split_transcript(text, max_chars=100)
+
+    assert len(parts) > 1
+    assert all(len(p) <= 100 for p in parts)
+    assert all(p.endswith(".") for p in parts)
+    assert " ".join(parts) == text.strip()
+
+
+def test_split_transcript_no_spaces():
+    """공백이 없어도 max_chars 에서 자르고 글자를 잃지 않는다."""
+    text = "가" * 250
+    parts = split_transcript(text, max_chars=100)
+    assert [len(p) for p in parts] == [100, 100, 50]
+
+
+def test_split_transcript_short():
+    assert split_transcript("짧은 상담", max_chars=100) == ["짧은 상담"]
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """summarize_part / reduce_summaries 를 가짜로 (reduce 입력 순서 기록)"""
+    calls = {"reduce": []}
+
+    def summarize_part(text, index, total):
+        return {"symptoms": text, "diagnosis": "없음", "notes": "없음"}
+
+    def reduce_summaries(partials, start_time):
+        calls["reduce"].append([p["symptoms"] for p in partials])
+        return {"symptoms": "합침", "diagnosis": "감기", "notes": "휴식", "summary_time": 0.1}
+
+    monkeypatch.setattr(summarize, "summarize_part", summarize_part)
+    monkeypatch.setattr(summarize, "reduce_summaries", reduce_summaries)
+    return calls
+
+
+def test_chunk_summarizer_reduces_in_order(fake_llm):
+    """청크는 끝나는 순서대로 들어와도 reduce 는 시간 순서(index)대로."""
+    summarizer = ChunkSummarizer(workers=2)
+    summarizer.submit(2, 3, "셋")
+    summarizer.submit(0, 3, "하나")
+    summarizer.submit(1, 3, "  ")  # 빈 청크는 요약하지 않음
+
+    result = summarizer.result(raise_errors=True)
+
+    assert fake_llm["reduce"] == [["하나", "셋"]]
+    assert result["diagnosis"] == "감기"
+    assert summarizer.parts == 3
+    assert "summary_time" in result
+
+
+def test_chunk_summarizer_empty(fake_llm):
+    summarizer = ChunkSummarizer(workers=1)
+    with pytest.raises(ValueError):
+        summarizer.result(raise_errors=True)
+    assert ChunkSummarizer(workers=1).result()["notes"] == "요약 생성 실패"
+
+
+# =========================================================
+# generate_summary: 긴 transcript 는 map-reduce
+# =========================================================
+
+def test_long_transcript_uses_map_reduce(fake_llm, monkeypatch):
+    """SUMMARY_MAP_CHARS 보다 길면 문장 단위로 나눠 조각별 요약 → 시간 순서대로 합친다."""
+    monkeypatch.setattr(summarize, "SUMMARY_MAP_CHARS", 20)
+    text = "처음에 기침이 났어요. 그다음 열이 났어요. 마지막에 목이 아파요."
+
+    result = summarize.generate_summary(text)
+
+    assert fake_llm["reduce"] == [["처음에 기침이 났어요.", "그다음 열이 났어요.", "마지막에 목이 아파요."]]
+    assert result["symptoms"] == "합침"
+
+
+def test_short_transcript_single_call(fake_llm, monkeypatch):
+    calls = []
+    monkeypatch.setattr(summarize, "_summary_call", lambda prompt, start_time: calls.append(prompt) or {})
+
+    summarize.generate_summary("기침이 나요")
+
+    assert len(calls) == 1
+    assert fake_llm["reduce"] == []
+
+
+def test_map_reduce_failure(monkeypatch):
+    """조각 하나라도 실패하면 raise_errors 면 예외 (작업 큐 재시도), 아니면 "요약 생성 실패"."""
+    def summarize_part(text, index, total):
+        raise RuntimeError("429")
+
+    monkeypatch.setattr(summarize, "summarize_part", summarize_part)
+
+    with pytest.raises(RuntimeError):
+        summarize.summarize_map_reduce(["a", "b"], raise_errors=True)
+    assert summarize.summarize_map_reduce(["a", "b"]) == FAILED_SUMMARY
@@ -0,0 +1,132 @@
+# AI_service_stt/tests/test_transcript_cache.py
+
+from __future__ import annotations
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from core import transcript_cache
+from core.models import TranscriptCache
+
+from tests.test_job_queue import FakeSession
+
+SHA = "ab" * 32
+
+
+class RecordingSession(FakeSession):
+    """execute() 로 넘어온 문장도 기록한다 (store_transcript 의 upsert)"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.executed = []
+
+    def execute(self, statement):
+        self.executed.append(statement)
+
+
+def _entry(summary_model="gpt-4o-mini"):
+    return TranscriptCache(
+        audio_sha256=SHA, model="whisper-1", language="ko",
+        transcript_text="캐시된 텍스트", summary={"status": "done"}, summary_model=summary_model, hits=2,
+    )
+
+
+# =========================================================
+# lookup
+# =========================================================
+
+def test_cache_hit(monkeypatch):
+    db = FakeSession(job=_entry())
+    monkeypatch.setattr(transcript_cache, "SessionLocal", db)
+
+    cached = transcript_cache.lookup(SHA, "whisper-1", "ko", summary_model="gpt-4o-mini")
+
+    assert cached == {"transcript_text": "캐시된 텍스트", "summary": {"status": "done"}}
+    assert db.job.hits == 3
+    assert db.commits == 1
+
+
+def test_cache_summary_model_mismatch(monkeypatch):
+    """다른 요약 모델로 만든 요약은 쓰지 않는다 (transcript 만 재사용)."""
+    monkeypatch.setattr(transcript_cache, "SessionLocal", FakeSession(job=_entry("gpt-4o")))
+
+    cached = transcript_cache.lookup(SHA, "whisper-1", "ko", summary_model="gpt-4o-mini")
+
+    assert cached == {"transcript_text": "캐시된 텍스트", "summary": None}
+
+
+class BrokenSession(FakeSession):
+    def query(self, *args):
+        raise RuntimeError("connection refused")
+
+
+def test_cache_miss_and_db_error(monkeypatch):
+    """없는 항목 / 해시 없음 / DB 오류는 모두 캐시 없음 (작업 처리를 막지 않는다)."""
+    monkeypatch.setattr(transcript_cache, "SessionLocal", FakeSession(job=None))
+    assert transcript_cache.lookup(SHA, "whisper-1", "ko") is None
+    assert transcript_cache.lookup(None, "whisper-1", "ko") is None
+
+    monkeypatch.setattr(transcript_cache, "SessionLocal", BrokenSession())
+    assert transcript_cache.lookup(SHA, "whisper-1", "ko") is None
+
+
+def test_cache_disabled(monkeypatch):
+    monkeypatch.setattr(transcript_cache, "STT_TRANSCRIPT_CACHE", False)
+    monkeypatch.setattr(transcript_cache, "SessionLocal", lambda: pytest.fail("DB 를 열지 않아야 함"))
+
+    assert transcript_cache.lookup(SHA, "whisper-1", "ko") is None
+    transcript_cache.store_transcript(SHA, "whisper-1", "ko", "텍스트")
+
+
+# =========================================================
+# store_transcript / store_summary
+# =========================================================
+
+def test_store_transcript_upserts_and_drops_old_summary(monkeypatch):
+    """(sha256, 모델, 언어) 충돌이면 덮어쓰고, 새 transcript 에 맞지 않는 이전 요약은 지운다."""
+    db = RecordingSession()
+    monkeypatch.setattr(transcript_cache, "SessionLocal", db)
+
+    transcript_cache.store_transcript(SHA, "whisper-1", "ko", "기침이 나요")
+
+    compiled = db.executed[0].compile(dialect=postgresql.dialect())
+    assert "ON CONFLICT (audio_sha256, model, language) DO UPDATE SET transcript_text" in str(compiled)
+    # INSERT 값과 UPDATE SET 값 모두: 새 transcript, 요약 / 요약 모델은 비움
+    assert compiled.params["transcript_text"] == compiled.params["param_1"] == "기침이 나요"
+    assert compiled.params["param_2"] is None
+    assert compiled.params["param_3"] is None
+    assert db.commits == 1
+
+
+@pytest.mark.parametrize("sha, text", [(None, "기침이 나요"), (SHA, "   ")])
+def test_store_transcript_skips(monkeypatch, sha, text):
+    """해시가 없거나 빈 transcript 는 저장하지 않는다."""
+    db = RecordingSession()
+    monkeypatch.setattr(transcript_cache, "SessionLocal", db)
+
+    transcript_cache.store_transcript(sha, "whisper-1", "ko", text)
+
+    assert db.executed == []
+
+
+def test_store_summary_records_model(monkeypatch):
+    db = FakeSession()
+    monkeypatch.setattr(transcript_cache, "SessionLocal", db)
+
+    transcript_cache.store_summary(SHA, "whisper-1", "ko", {"status": "done"}, "gpt-4o-mini")
+
+    assert db.updates == [{"summary": {"status": "done"}, "summary_model": "gpt-4o-mini"}]
+    assert db.commits == 1
+
+
+def test_store_errors_are_swallowed(monkeypatch):
+    """저장 실패는 로그만 (STT / 요약 결과 전달을 막지 않는다)."""
+    class BrokenExecute(RecordingSession):
+        def execute(self, statement):
+            raise RuntimeError("connection refused")
+
+    monkeypatch.setattr(transcript_cache, "SessionLocal", BrokenExecute())
+    transcript_cache.store_transcript(SHA, "whisper-1", "ko", "텍스트")
+
+    monkeypatch.setattr(transcript_cache, "SessionLocal", BrokenSession())
+    transcript_cache.store_summary(SHA, "whisper-1", "ko", {"status": "done"}, "gpt-4o-mini")
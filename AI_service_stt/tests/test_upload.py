@@ -0,0 +1,122 @@
+# AI_service_stt/tests/test_upload.py
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+
+import pytest
+from starlette.requests import Request
+
+from core.upload import InvalidUpload, UploadTooLarge, check_content_length, receive_upload
+
+BOUNDARY = "testboundary1234"
+
+
+def _multipart(file_data: bytes = None, fields: dict = None, filename: str = "a.mp3") -> bytes:
+    body = b""
+    for name, value in (fields or {}).items():
+        body += (
+            f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"{name}\"\r\n\r\n{value}\r\n"
+        ).encode("utf-8")
+    if file_data is not None:
+        body += (
+            f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{filename}\"\r\n"
+            "Content-Type: audio/mpeg\r\n\r\n"
+        ).encode("utf-8") + file_data + b"\r\n"
+    return body + f"--{BOUNDARY}--\r\n".encode("utf-8")
+
+
+def _request(body: bytes, chunk_size: int = 1000, content_type: str = None) -> Request:
+    """본문을 chunk_size 단위로 흘려보내는 (Content-Length 없는) 요청"""
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)] or [b""]
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": i < len(chunks) - 1}
+        for i, chunk in enumerate(chunks)
+    ]
+
+    async def receive():
+        return messages.pop(0)
+
+    content_type = content_type or f"multipart/form-data; boundary={BOUNDARY}"
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/stt/process",
+        "headers": [(b"content-type", content_type.encode("latin-1"))],
+    }
+    return Request(scope, receive)
+
+
+def _receive(request: Request, part_path, max_bytes: int):
+    return asyncio.run(receive_upload(request, str(part_path), max_bytes))
+
+
+def test_receive_upload_size_hash_and_fields(tmp_path):
+    """청크 단위로 받아도 크기 / sha256 이 원본 전체와 같고, 폼 필드도 모은다."""
+    data = bytes(range(256)) * 40  # 10240 bytes → 요청 청크 11개 이상
+    body = _multipart(data, fields={"stt_id": "stt_1a2b3c4d"})
+    part = tmp_path / "upload.part"
+
+    fields, filename, size, digest = _receive(_request(body), part, max_bytes=len(data))
+
+    assert fields == {"stt_id": "stt_1a2b3c4d"}
+    assert filename == "a.mp3"
+    assert size == len(data)
+    assert digest == hashlib.sha256(data).hexdigest()
+    assert part.read_bytes() == data
+
+
+def test_receive_upload_field_after_file(tmp_path):
+    """필드 순서와 상관없이 (파일 뒤에 온 sha256 도) 읽는다."""
+    data = b"ID3" * 100
+    body = _multipart(data)[: -len(f"--{BOUNDARY}--\r\n")] + _multipart(fields={"sha256": "ab"})
+
+    fields, _, size, _ = _receive(_request(body, chunk_size=7), tmp_path / "u.part", max_bytes=1000)
+
+    assert fields == {"sha256": "ab"}
+    assert size == len(data)
+
+
+def test_receive_upload_too_large_while_reading(tmp_path):
+    """Content-Length 가 없어도 읽는 도중 제한을 넘으면 UploadTooLarge, 부분 파일도 남기지 않는다."""
+    received = []
+    body = _multipart(b"x" * 20000)
+    request = _request(body)
+    receive = request._receive
+
+    async def counting_receive():
+        message = await receive()
+        received.append(len(message["body"]))
+        return message
+
+    request._receive = counting_receive
+
+    with pytest.raises(UploadTooLarge):
+        _receive(request, tmp_path / "u.part", max_bytes=5000)
+
+    assert list(tmp_path.iterdir()) == []
+    # 본문 끝까지 읽지 않고 멈춘다
+    assert sum(received) < len(body)
+
+
+@pytest.mark.parametrize("body, content_type", [
+    (_multipart(fields={"stt_id": "stt_1"}), None),             # 파일 파트 없음
+    (_multipart(b"abc")[:-10], None),                           # 끝 경계 전에 끊김
+    (b"stt_id=stt_1", "application/x-www-form-urlencoded"),     # multipart 아님
+])
+def test_receive_upload_invalid(tmp_path, body, content_type):
+    with pytest.raises(InvalidUpload):
+        _receive(_request(body, content_type=content_type), tmp_path / "u.part", max_bytes=1000)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_check_content_length():
+    mb = 1024 * 1024
+    check_content_length(None, 10 * mb)
+    check_content_length("abc", 10 * mb)
+    # multipart 여유분(1MB)까지는 본문을 읽어서 정확히 잰다
+    check_content_length(str(11 * mb), 10 * mb)
+    with pytest.raises(UploadTooLarge):
+        check_content_length(str(11 * mb + 1), 10 * mb)
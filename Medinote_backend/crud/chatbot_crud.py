@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 from models import ChatSession, ChatLog
 
+# 세션 목록 미리보기용 답변 스니펫 길이 (AI_service_LLM chat_repository.PREVIEW_SNIPPET_CHARS 와 같은 값)
+PREVIEW_SNIPPET_CHARS = 200
+
 
 # ============================================================
 # 1) 새 세션 생성
@@ -11,7 +14,9 @@ from models import ChatSession, ChatLog
 def create_session(db: Session, user_id: int, title: str) -> ChatSession:
     session = ChatSession(
         user_id=user_id,
-        title=title
+        title=title,
+        last_activity_at=func.now(),
+        message_count=0,
     )
     db.add(session)
     db.commit()
@@ -38,6 +43,8 @@ def get_session(db: Session, user_id: int, session_id: int) -> ChatSession | Non
 #    - role: "user" / "assistant"
 #    - content: 실제 메시지 텍스트
 #    - sources: assistant 메시지일 때만, 출처 리스트(JSON)
+#    - 같은 트랜잭션에서 chat_session 미리보기 컬럼도 갱신
+#      (first_query / first_answer_snippet / last_activity_at / message_count)
 # ============================================================
 def save_message(
     db: Session,
@@ -55,6 +62,23 @@ def save_message(
         sources=sources,  # 🔥 새 필드 저장 (없으면 None)
     )
     db.add(msg)
+
+    preview = {
+        ChatSession.message_count: func.coalesce(ChatSession.message_count, 0) + 1,
+        ChatSession.last_activity_at: func.now(),
+    }
+    if role == "user":
+        preview[ChatSession.first_query] = func.coalesce(ChatSession.first_query, content)
+    elif role == "assistant":
+        preview[ChatSession.first_answer_snippet] = func.coalesce(
+            ChatSession.first_answer_snippet, content[:PREVIEW_SNIPPET_CHARS]
+        )
+    (
+        db.query(ChatSession)
+        .filter(ChatSession.session_id == session_id)
+        .update(preview, synchronize_session=False)
+    )
+
     db.commit()
     db.refresh(msg)
     return msg
@@ -1,6 +1,6 @@
 from sqlalchemy import (
     Column, Integer, String, DateTime, Float, ForeignKey,
-    Text, Date
+    Text, Date, Index
 )
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -239,6 +239,17 @@ class ChatSession(Base):
     title = Column(String(200), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    # 세션 목록 미리보기 (chat_log 쓰기 시점에 갱신하는 비정규화 컬럼: LLM chat_repository / crud.chatbot_crud)
+    first_query = Column(Text, nullable=True)
+    first_answer_snippet = Column(Text, nullable=True)
+    last_activity_at = Column(DateTime, nullable=True)
+    message_count = Column(Integer, nullable=True)
+
+    # 세션 목록 키셋 페이지네이션 (user_id, created_at, session_id)
+    __table_args__ = (
+        Index("ix_chat_session_user_created", "user_id", "created_at", "session_id"),
+    )
+
     user = relationship("User", back_populates="chat_sessions")
     messages = relationship(
         "ChatLog",
@@ -265,6 +276,11 @@ class ChatLog(Base):
     content = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    # 세션 메시지 키셋 페이지네이션 (session_id, created_at, message_id)
+    __table_args__ = (
+        Index("ix_chat_log_session_created", "session_id", "created_at", "message_id"),
+    )
+
     session = relationship("ChatSession", back_populates="messages")
     user = relationship("User", back_populates="chatlogs")
 
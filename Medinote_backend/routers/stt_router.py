@@ -2,7 +2,8 @@
 # STT ROUTER (테스트용: user_id = 1 고정)
 # ============================================================
 
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 import httpx
 import os
@@ -18,6 +19,7 @@ from schemas.stt_schemas import (
     STTStatusResponse,
     STTResultInput,
 )
+from utils.upload_stream import measure_upload, reject_large_request
 
 router = APIRouter(prefix="/stt", tags=["STT"])
 
@@ -33,27 +35,30 @@ STT_SERVER_URL = os.getenv("STT_SERVER_URL", "http://localhost:8002")
 # ------------------------------------------------------------
 @router.post("/analyze", response_model=STTAnalyzeResponse)
 async def analyze_stt(
+    request: Request,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
 ):
     """
     음성 파일을 받아 STT 작업(stt_id)을 생성하고
     STT 서버로 전달하여 백그라운드 처리.
+    업로드는 메모리에 통째로 올리지 않고, 디스크에 spool 된 파일을 청크 단위로 STT 서버에 흘려보낸다.
     """
 
     user_id = FAKE_USER_ID
 
+    # 크기 제한 확인 + sha256 (청크 단위 한 번 훑기, 제한 초과 시 413 → 작업 생성 안 함)
+    reject_large_request(request.headers.get("content-length"))
+    size, digest = await run_in_threadpool(measure_upload, file.file)
+
     # STTJob 생성
     stt_item = create_stt_job(db, user_id=user_id)
 
-    # STT 서버로 파일 전송
+    # STT 서버로 파일 전송 (파일 객체를 넘기면 httpx 가 청크 단위로 읽어 multipart 로 스트리밍)
     try:
-        file_content = await file.read()
-        await file.seek(0)  # 파일 포인터 리셋
-
         async with httpx.AsyncClient(timeout=30.0) as client:
-            files = {"file": (file.filename, file_content, file.content_type)}
-            data = {"stt_id": stt_item.stt_id}
+            files = {"file": (file.filename, file.file, file.content_type)}
+            data = {"stt_id": stt_item.stt_id, "sha256": digest, "user_id": user_id}
 
             response = await client.post(
                 f"{STT_SERVER_URL}/stt/process",
@@ -63,6 +68,8 @@ async def analyze_stt(
 
             if response.status_code != 200:
                 print(f"⚠️ STT 서버 요청 실패: {response.status_code}")
+            else:
+                print(f"📤 STT 서버 전송 완료: {stt_item.stt_id} ({size} bytes)")
 
     except Exception as e:
         print(f"❌ STT 서버 연결 실패: {e}")
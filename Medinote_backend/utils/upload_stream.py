@@ -0,0 +1,36 @@
+import hashlib
+import os
+from typing import BinaryIO, Optional, Tuple
+
+from fastapi import HTTPException
+
+# 업로드 크기 제한 (STT 서버 MAX_UPLOAD_SIZE 와 맞춤)
+MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_SIZE", str(100 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def reject_large_request(content_length: Optional[str], max_bytes: int = MAX_UPLOAD_SIZE):
+    """본문을 읽기 전에 Content-Length 로 거름 (multipart 헤더 몫 1MB 여유)"""
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes + UPLOAD_CHUNK_SIZE:
+        raise HTTPException(status_code=413, detail="파일 크기 제한을 초과했습니다.")
+
+
+def measure_upload(fileobj: BinaryIO, max_bytes: int = MAX_UPLOAD_SIZE) -> Tuple[int, str]:
+    """
+    업로드 파일을 청크 단위로 한 번 훑어서 (크기, sha256) 반환.
+    크기 제한을 넘는 순간 413. 끝나면 파일 포인터를 처음으로 되돌린다.
+    (UploadFile.file 은 디스크에 spool 된 임시 파일이라 메모리에 전체를 올리지 않음)
+    """
+    digest = hashlib.sha256()
+    size = 0
+    fileobj.seek(0)
+    while True:
+        chunk = fileobj.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(status_code=413, detail="파일 크기 제한을 초과했습니다.")
+        digest.update(chunk)
+    fileobj.seek(0)
+    return size, digest.hexdigest()
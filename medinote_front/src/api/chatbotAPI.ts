@@ -38,9 +38,13 @@ export interface SessionDetailResponse {
   messages: SessionMessage[];
 }
 
-// DELETE /chatbot/sessions, DELETE /chatbot/sessions/{session_id} 는
-// 200 "string" 형태라고 했으니 string으로 받자.
-export type DeleteAllSessionsResponse = string;
+// DELETE /chatbot/sessions 는 삭제 작업만 등록하고 바로 응답 (백그라운드 배치 삭제)
+// 진행 상황은 GET /chatbot/sessions/delete-jobs/{job_id}
+export interface DeleteAllSessionsResponse {
+  message: string;
+  job_id: string;
+}
+// DELETE /chatbot/sessions/{session_id} 는 200 "string"
 export type DeleteOneSessionResponse = string;
 
 /* ==============================
@@ -70,7 +74,7 @@ export async function getChatbotSessions(): Promise<SessionsResponse> {
 
 /**
  * DELETE /chatbot/sessions
- * 응답: 200 "string"
+ * 응답: { message, job_id }
  */
 export async function deleteAllChatbotSessions(): Promise<DeleteAllSessionsResponse> {
   const res = await chatbotClient.delete<DeleteAllSessionsResponse>("/chatbot/sessions");
@@ -0,0 +1,482 @@
+# openai_mock/app.py
+
+"""
+OpenAI 호환 Mock 서버 (부하 테스트 / 오프라인 용량 테스트용)
+
+실제 OpenAI 쿼터를 쓰지 않고 LLM / OCR / STT 서비스를 돌려보기 위한 대역 서버.
+각 서비스에 OPENAI_BASE_URL=http://<mock>:8010/v1 을 주면 이 서버로 요청이 간다.
+
+지원 엔드포인트
+  - POST /v1/chat/completions        (stream=true SSE, response_format json_object / json_schema)
+  - POST /v1/embeddings
+  - POST /v1/audio/transcriptions    (json / verbose_json / text)
+  - GET  /v1/models
+  - GET  /mock/stats                 (엔드포인트별 요청/에러 수)
+
+동작 설정 (환경변수)
+  - MOCK_LATENCY / MOCK_LATENCY_CHAT / MOCK_LATENCY_EMBEDDINGS / MOCK_LATENCY_AUDIO
+      지연 분포. "fixed:200" | "uniform:100,400" | "normal:300,50" | "lognormal:300,900"(중앙값,p95) | "0"
+  - MOCK_AUDIO_RTF          : 오디오 길이(초) 대비 추가 지연 비율 (0.05 → 60초 음성에 3초)
+  - MOCK_STREAM_CHUNK_MS    : 스트리밍 청크 사이 간격(ms)
+  - MOCK_ERROR_RATE / MOCK_ERROR_RATE_CHAT / ..._EMBEDDINGS / ..._AUDIO : 에러 비율 (0.0 ~ 1.0)
+  - MOCK_ERROR_CODES        : 에러 시 사용할 상태 코드 목록 (기본 "429,500,503")
+  - MOCK_SEED               : 지연/에러 난수 시드. 응답 내용은 입력 해시 기반이라 항상 동일.
+
+실행:
+    uvicorn app:app --host 0.0.0.0 --port 8010
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+import wave
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi import FastAPI, File, Form, Request, UploadFile
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+
+
+# ============================================
+# 설정
+# ============================================
+
+def _env(name: str, default: str) -> str:
+    return os.getenv(name) or default
+
+
+MOCK_SEED = int(_env("MOCK_SEED", "42"))
+MOCK_STREAM_CHUNK_MS = float(_env("MOCK_STREAM_CHUNK_MS", "20"))
+MOCK_AUDIO_RTF = float(_env("MOCK_AUDIO_RTF", "0.05"))
+MOCK_ERROR_CODES = [
+    int(c) for c in _env("MOCK_ERROR_CODES", "429,500,503").split(",") if c.strip()
+]
+
+_DEFAULT_LATENCY = {
+    "chat": "lognormal:800,2500",
+    "embeddings": "lognormal:80,250",
+    "audio": "lognormal:500,1500",
+}
+
+
+class LatencyModel:
+    """
+    지연 분포 스펙 파서.
+      fixed:200 / uniform:100,400 / normal:300,50 / lognormal:300,900 (중앙값, p95) / 0
+    """
+
+    def __init__(self, spec: str):
+        self.spec = (spec or "0").strip()
+        kind, sep, args = self.spec.partition(":")
+        if not sep:
+            # "200" 처럼 숫자만 주면 fixed
+            kind, args = "fixed", kind
+        self.kind = kind
+        self.params = [float(v) for v in args.split(",") if v.strip()] or [0.0]
+
+        if self.kind not in ("fixed", "uniform", "normal", "lognormal"):
+            raise ValueError(f"알 수 없는 지연 분포: {spec!r}")
+
+    def sample_ms(self, rng: random.Random) -> float:
+        p = self.params
+        if self.kind == "fixed":
+            return p[0]
+        if self.kind == "uniform":
+            return rng.uniform(p[0], p[1])
+        if self.kind == "normal":
+            return max(0.0, rng.gauss(p[0], p[1]))
+        # lognormal: 중앙값 = exp(mu), p95 = exp(mu + 1.645 * sigma)
+        median, p95 = p[0], p[1]
+        mu = math.log(max(median, 1e-3))
+        sigma = max(0.0, (math.log(max(p95, median)) - mu) / 1.645)
+        return rng.lognormvariate(mu, sigma)
+
+
+def _latency_for(endpoint: str) -> LatencyModel:
+    spec = os.getenv(f"MOCK_LATENCY_{endpoint.upper()}") or os.getenv("MOCK_LATENCY") or _DEFAULT_LATENCY[endpoint]
+    return LatencyModel(spec)
+
+
+def _error_rate_for(endpoint: str) -> float:
+    return float(os.getenv(f"MOCK_ERROR_RATE_{endpoint.upper()}") or os.getenv("MOCK_ERROR_RATE") or 0.0)
+
+
+LATENCY = {name: _latency_for(name) for name in ("chat", "embeddings", "audio")}
+ERROR_RATE = {name: _error_rate_for(name) for name in ("chat", "embeddings", "audio")}
+
+_rng = random.Random(MOCK_SEED)
+_rng_lock = threading.Lock()
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = {
+    name: {"requests": 0, "errors": 0} for name in ("chat", "embeddings", "audio")
+}
+
+
+# ============================================
+# 공통 유틸
+# ============================================
+
+def _digest(*parts: Any) -> str:
+    h = hashlib.sha256()
+    for p in parts:
+        h.update(json.dumps(p, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _approx_tokens(text: str) -> int:
+    # 한국어 기준 대략 2글자 = 1토큰으로 근사
+    return max(1, math.ceil(len(text or "") / 2))
+
+
+async def _simulate(endpoint: str, extra_ms: float = 0.0) -> Optional[JSONResponse]:
+    """
+    지연 주입 + 에러 주입. 에러를 내야 하면 OpenAI 형식 에러 응답을 반환.
+    """
+    with _rng_lock:
+        delay_ms = LATENCY[endpoint].sample_ms(_rng) + extra_ms
+        fail = _rng.random() < ERROR_RATE[endpoint]
+        status = _rng.choice(MOCK_ERROR_CODES) if fail and MOCK_ERROR_CODES else 500
+
+    with _stats_lock:
+        _stats[endpoint]["requests"] += 1
+        if fail:
+            _stats[endpoint]["errors"] += 1
+
+    if delay_ms > 0:
+        await asyncio.sleep(delay_ms / 1000)
+
+    if not fail:
+        return None
+
+    error_type = "rate_limit_exceeded" if status == 429 else "server_error"
+    headers = {"retry-after": "1"} if status == 429 else None
+    return JSONResponse(
+        status_code=status,
+        content={
+            "error": {
+                "message": f"[mock] injected {status} error",
+                "type": error_type,
+                "param": None,
+                "code": error_type,
+            }
+        },
+        headers=headers,
+    )
+
+
+# ============================================
+# 결정적(deterministic) 응답 생성
+# ============================================
+
+_FILLER_SENTENCES = [
+    "충분한 휴식과 수분 섭취가 도움이 됩니다.",
+    "증상이 지속되면 가까운 병원에서 진료를 받아보세요.",
+    "복용 중인 약이 있다면 의사나 약사와 상의하는 것이 좋습니다.",
+    "규칙적인 생활 습관을 유지하는 것이 중요합니다.",
+    "갑자기 증상이 심해지면 바로 응급실을 방문하세요.",
+    "식사 후 30분 정도 지나서 복용하는 것이 일반적입니다.",
+]
+
+
+def _pick(seed: str, items: List[str], n: int) -> List[str]:
+    start = int(seed[:8], 16)
+    return [items[(start + i) % len(items)] for i in range(n)]
+
+
+# 값이 리스트여야 하는 키 (예: 플래너의 {"routes": [...]}, 처방전의 medications)
+_LIST_JSON_KEYS = {"routes", "items", "medications", "drugs"}
+
+
+def _extract_json_keys(text: str) -> List[str]:
+    """
+    프롬프트에서 기대하는 JSON 키를 추정.
+      1) {"routes": [...]} 같은 예시의 "key":
+      2) "- hospital : ..." 같은 목록형 키 설명
+    """
+    keys = re.findall(r'"([A-Za-z_][A-Za-z0-9_]*)"\s*:', text)
+    if not keys:
+        keys = re.findall(r"(?m)^\s*-\s*([A-Za-z_][A-Za-z0-9_]*)\s*:", text)
+    seen: List[str] = []
+    for k in keys:
+        if k not in seen:
+            seen.append(k)
+    return seen
+
+
+def _extract_sections(text: str) -> List[str]:
+    """'1. 증상:' 처럼 번호 붙은 섹션 제목을 추출 (STT 요약 포맷 등)."""
+    return re.findall(r"(?m)^\s*\d+\.\s*([^:\n]{1,20}):\s*$", text)
+
+
+def _schema_value(schema: Dict[str, Any], seed: str) -> Any:
+    """json_schema 에 맞는 값 (문자열은 결정적인 filler 문장, 객체는 재귀)"""
+    kind = schema.get("type")
+    if kind == "object":
+        return {
+            key: _schema_value(sub, _digest(seed, key))
+            for key, sub in (schema.get("properties") or {}).items()
+        }
+    if kind == "array":
+        return []
+    if kind in ("integer", "number"):
+        return 0
+    if kind == "boolean":
+        return False
+    return _pick(seed, _FILLER_SENTENCES, 1)[0]
+
+
+def _chat_content(
+    messages: List[Dict[str, Any]],
+    json_mode: bool,
+    json_schema: Optional[Dict[str, Any]] = None,
+) -> str:
+    prompt_text = "\n".join(
+        m.get("content") if isinstance(m.get("content"), str) else json.dumps(m.get("content"), ensure_ascii=False)
+        for m in messages
+    )
+    seed = _digest(messages)
+    last_user = next(
+        (m.get("content") for m in reversed(messages) if m.get("role") == "user" and isinstance(m.get("content"), str)),
+        "",
+    )
+
+    if json_schema:
+        return json.dumps(_schema_value(json_schema, seed), ensure_ascii=False)
+
+    if json_mode:
+        keys = _extract_json_keys(prompt_text) or ["result"]
+        return json.dumps(
+            {k: ([] if k in _LIST_JSON_KEYS else "") for k in keys},
+            ensure_ascii=False,
+        )
+
+    sections = _extract_sections(prompt_text)
+    if sections:
+        lines = []
+        for i, (title, sentence) in enumerate(zip(sections, _pick(seed, _FILLER_SENTENCES, len(sections)))):
+            lines.append(f"{i + 1}. {title}:\n{sentence}\n")
+        return "\n".join(lines).strip()
+
+    head = (last_user or "질문")[:40]
+    body = " ".join(_pick(seed, _FILLER_SENTENCES, 3))
+    return f"[mock:{seed[:8]}] '{head}'에 대한 안내입니다. {body}"
+
+
+def _embedding(text: str, dim: int) -> List[float]:
+    """입력 텍스트 해시로 만든 정규화 벡터 (같은 입력 → 같은 벡터)."""
+    rng = random.Random(int(_digest(text)[:16], 16))
+    vec = [rng.gauss(0.0, 1.0) for _ in range(dim)]
+    norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+    return [v / norm for v in vec]
+
+
+def _embedding_dim(model: str, dimensions: Optional[int]) -> int:
+    if dimensions:
+        return int(dimensions)
+    if "large" in model:
+        return 3072
+    return 1536
+
+
+_TRANSCRIPT_SENTENCES = [
+    "의사: 어디가 불편해서 오셨어요?",
+    "환자: 며칠 전부터 머리가 아프고 열이 조금 있어요.",
+    "의사: 기침이나 콧물은 없으세요?",
+    "환자: 기침이 조금 있고 목이 따끔거려요.",
+    "의사: 감기 증상으로 보이니 해열진통제를 처방해 드릴게요.",
+    "의사: 하루 세 번 식후에 드시고 물을 많이 드세요.",
+    "환자: 술은 마셔도 되나요?",
+    "의사: 약 드시는 동안에는 음주를 피하시는 게 좋습니다.",
+]
+
+
+def _audio_duration_sec(data: bytes, filename: str) -> float:
+    """wav 는 헤더로, 그 외는 128kbps 기준으로 길이 추정."""
+    if filename.lower().endswith(".wav"):
+        try:
+            with wave.open(io.BytesIO(data)) as w:
+                return w.getnframes() / float(w.getframerate() or 1)
+        except Exception:
+            pass
+    return len(data) / (128_000 / 8)
+
+
+# ============================================
+# FastAPI 앱
+# ============================================
+
+app = FastAPI(title="MediNote OpenAI Mock", version="0.1.0")
+
+
+@app.get("/health")
+async def health_check():
+    return {"status": "ok"}
+
+
+@app.get("/mock/stats")
+async def mock_stats():
+    with _stats_lock:
+        stats = {k: dict(v) for k, v in _stats.items()}
+    return {
+        "stats": stats,
+        "latency": {k: v.spec for k, v in LATENCY.items()},
+        "error_rate": ERROR_RATE,
+        "seed": MOCK_SEED,
+    }
+
+
+@app.get("/v1/models")
+async def list_models():
+    models = [
+        "gpt-4o-mini", "gpt-4o", "text-embedding-3-large", "text-embedding-3-small",
+        "whisper-1", "gpt-4o-transcribe", "gpt-4o-mini-transcribe",
+    ]
+    return {
+        "object": "list",
+        "data": [{"id": m, "object": "model", "created": 0, "owned_by": "mock"} for m in models],
+    }
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model") or "gpt-4o-mini"
+    messages: List[Dict[str, Any]] = body.get("messages") or []
+    response_format = body.get("response_format") or {}
+    json_mode = isinstance(response_format, dict) and response_format.get("type") == "json_object"
+    json_schema = None
+    if isinstance(response_format, dict) and response_format.get("type") == "json_schema":
+        json_schema = (response_format.get("json_schema") or {}).get("schema") or {"type": "object"}
+    stream = bool(body.get("stream"))
+
+    error = await _simulate("chat")
+    if error is not None:
+        return error
+
+    content = _chat_content(messages, json_mode, json_schema)
+    completion_id = f"chatcmpl-mock-{_digest(messages)[:24]}"
+    created = int(time.time())
+    prompt_tokens = sum(_approx_tokens(str(m.get("content") or "")) for m in messages)
+    completion_tokens = _approx_tokens(content)
+    usage = {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "prompt_tokens_details": {"cached_tokens": 0},
+    }
+
+    if not stream:
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": usage,
+        }
+
+    include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+
+    async def _events() -> AsyncIterator[str]:
+        def _chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+        yield _chunk({"role": "assistant", "content": ""})
+        # 4글자 단위로 끊어서 전송 (토큰 스트리밍 흉내)
+        for i in range(0, len(content), 4):
+            if MOCK_STREAM_CHUNK_MS > 0:
+                await asyncio.sleep(MOCK_STREAM_CHUNK_MS / 1000)
+            yield _chunk({"content": content[i:i + 4]})
+        yield _chunk({}, finish_reason="stop")
+        if include_usage:
+            usage_payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [],
+                "usage": usage,
+            }
+            yield f"data: {json.dumps(usage_payload)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(_events(), media_type="text/event-stream")
+
+
+@app.post("/v1/embeddings")
+async def embeddings(request: Request):
+    body = await request.json()
+    model = body.get("model") or "text-embedding-3-large"
+    raw_input = body.get("input")
+    inputs: List[str] = [raw_input] if isinstance(raw_input, str) else [str(x) for x in (raw_input or [])]
+    dim = _embedding_dim(model, body.get("dimensions"))
+
+    error = await _simulate("embeddings")
+    if error is not None:
+        return error
+
+    prompt_tokens = sum(_approx_tokens(t) for t in inputs)
+    return {
+        "object": "list",
+        "model": model,
+        "data": [
+            {"object": "embedding", "index": i, "embedding": _embedding(t, dim)}
+            for i, t in enumerate(inputs)
+        ],
+        "usage": {"prompt_tokens": prompt_tokens, "total_tokens": prompt_tokens},
+    }
+
+
+@app.post("/v1/audio/transcriptions")
+async def audio_transcriptions(
+    file: UploadFile = File(...),
+    model: str = Form("whisper-1"),
+    language: Optional[str] = Form(None),
+    response_format: str = Form("json"),
+    prompt: Optional[str] = Form(None),
+):
+    data = await file.read()
+    duration = _audio_duration_sec(data, file.filename or "")
+
+    error = await _simulate("audio", extra_ms=duration * MOCK_AUDIO_RTF * 1000)
+    if error is not None:
+        return error
+
+    seed = _digest(hashlib.sha256(data).hexdigest(), model)
+    # 대략 5초에 한 문장
+    n = max(1, min(200, int(duration // 5) or 1))
+    text = " ".join(_pick(seed, _TRANSCRIPT_SENTENCES, n))
+
+    if response_format == "text":
+        return PlainTextResponse(text)
+    if response_format == "verbose_json":
+        return {
+            "task": "transcribe",
+            "language": language or "korean",
+            "duration": round(duration, 2),
+            "text": text,
+            "segments": [],
+        }
+    return {"text": text}
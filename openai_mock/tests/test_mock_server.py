@@ -0,0 +1,123 @@
+# openai_mock/tests/test_mock_server.py
+
+from __future__ import annotations
+
+import io
+import json
+import wave
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app as mock
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    # 테스트에서는 지연 / 에러 주입 없이
+    for name in ("chat", "embeddings", "audio"):
+        monkeypatch.setitem(mock.LATENCY, name, mock.LatencyModel("0"))
+        monkeypatch.setitem(mock.ERROR_RATE, name, 0.0)
+    monkeypatch.setattr(mock, "MOCK_STREAM_CHUNK_MS", 0.0)
+    monkeypatch.setattr(mock, "MOCK_AUDIO_RTF", 0.0)
+    return TestClient(mock.app)
+
+
+def test_latency_spec_parsing():
+    assert mock.LatencyModel("250").kind == "fixed"
+    assert mock.LatencyModel("uniform:100,400").params == [100.0, 400.0]
+    with pytest.raises(ValueError):
+        mock.LatencyModel("poisson:3")
+
+
+def test_chat_completion_is_deterministic_and_json_mode(client):
+    body = {
+        "model": "gpt-4o-mini",
+        "messages": [
+            {"role": "system", "content": "반드시 다음 키를 모두 포함해야 한다:\n- hospital : 병원\n- date : 날짜"},
+            {"role": "user", "content": "메디노트의원 2025-10-01"},
+        ],
+        "response_format": {"type": "json_object"},
+    }
+
+    first = client.post("/v1/chat/completions", json=body).json()
+    second = client.post("/v1/chat/completions", json=body).json()
+
+    assert first == second
+    assert json.loads(first["choices"][0]["message"]["content"]) == {"hospital": "", "date": ""}
+    assert first["usage"]["total_tokens"] > 0
+
+
+def test_chat_completion_json_schema(client):
+    schema = {
+        "type": "object",
+        "properties": {"symptoms": {"type": "string"}, "diagnosis": {"type": "string"}, "tags": {"type": "array"}},
+        "required": ["symptoms", "diagnosis", "tags"],
+        "additionalProperties": False,
+    }
+    body = {
+        "model": "gpt-4o-mini",
+        "messages": [{"role": "user", "content": "두통과 발열이 있어요"}],
+        "response_format": {"type": "json_schema", "json_schema": {"name": "summary", "strict": True, "schema": schema}},
+    }
+
+    data = json.loads(client.post("/v1/chat/completions", json=body).json()["choices"][0]["message"]["content"])
+
+    assert list(data) == ["symptoms", "diagnosis", "tags"]
+    assert data["symptoms"] and isinstance(data["diagnosis"], str)
+    assert data["tags"] == []
+
+
+def test_chat_completion_stream(client):
+    body = {
+        "model": "gpt-4o-mini",
+        "messages": [{"role": "user", "content": "두통이 있어요"}],
+        "stream": True,
+    }
+    with client.stream("POST", "/v1/chat/completions", json=body) as resp:
+        lines = [l for l in resp.iter_lines() if l.startswith("data: ")]
+
+    assert lines[-1] == "data: [DONE]"
+    pieces = [json.loads(l[6:])["choices"][0]["delta"].get("content", "") for l in lines[:-1]]
+    full = client.post("/v1/chat/completions", json={**body, "stream": False}).json()
+    assert "".join(pieces) == full["choices"][0]["message"]["content"]
+
+
+def test_embeddings_dimensions(client):
+    resp = client.post(
+        "/v1/embeddings",
+        json={"model": "text-embedding-3-large", "input": ["두통", "두통"]},
+    ).json()
+
+    a, b = (d["embedding"] for d in resp["data"])
+    assert len(a) == 3072
+    assert a == b
+
+
+def test_audio_transcription_verbose_json(client):
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(16000)
+        w.writeframes(b"\x00\x00" * 16000 * 12)  # 12초 무음
+
+    resp = client.post(
+        "/v1/audio/transcriptions",
+        files={"file": ("visit.wav", buf.getvalue(), "audio/wav")},
+        data={"model": "whisper-1", "response_format": "verbose_json", "language": "ko"},
+    ).json()
+
+    assert resp["duration"] == 12.0
+    assert resp["text"]
+
+
+def test_injected_errors_use_openai_error_shape(client, monkeypatch):
+    monkeypatch.setitem(mock.ERROR_RATE, "embeddings", 1.0)
+    monkeypatch.setattr(mock, "MOCK_ERROR_CODES", [429])
+
+    resp = client.post("/v1/embeddings", json={"model": "text-embedding-3-small", "input": "x"})
+
+    assert resp.status_code == 429
+    assert resp.headers["retry-after"] == "1"
+    assert resp.json()["error"]["type"] == "rate_limit_exceeded"